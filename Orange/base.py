@@ -1,5 +1,7 @@
+import hashlib
 import inspect
 import itertools
+import pickle
 from collections.abc import Iterable
 import re
 import warnings
@@ -13,6 +15,7 @@ from Orange.data.filter import HasClass
 from Orange.data.table import DomainTransformationError
 from Orange.data.util import one_hot
 from Orange.misc.environ import cache_dir
+from Orange.version import short_version
 from Orange.misc.wrapper_meta import WrapperMeta
 from Orange.preprocess import Continuize, RemoveNaNColumns, SklImpute, Normalize
 from Orange.statistics.util import all_nan
@@ -79,13 +82,24 @@ class Learner(ReprableWithPreprocessors):
         this resolves the active preprocessors using a lazy approach.
     params : dict
         The params that the learner is constructed with.
+    model_cache : Orange.misc.cache.DiskCache (default None)
+        If set, models are stored in and retrieved from this cache. The key
+        consists of the content of the training data (`X`, `Y`, `W` and
+        the domain), the class of the learner and its parameters, including
+        preprocessors. Note that a learner with randomness that is not fixed
+        by its parameters will return the same model for the same data.
 
     """
     supports_multiclass = False
     supports_weights = False
+    #: Indicates whether models can be updated with further chunks of data
+    #: (see `partial_fit`)
+    supports_partial_fit = False
     #: A sequence of data preprocessors to apply on data prior to
     #: fitting the model
     preprocessors = ()
+    #: Cache of fitted models (see `model_cache_key`)
+    model_cache = None
 
     # Note: Do not use this class attribute.
     #       It remains here for compatibility reasons.
@@ -110,6 +124,30 @@ class Learner(ReprableWithPreprocessors):
         return self.fit(X, Y, W)
 
     def __call__(self, data, progress_callback=None):
+        return self._call(data, progress_callback)
+
+    def fit_preprocessed(self, data, preprocessed, progress_callback=None):
+        """
+        Fit a model on data that has already been preprocessed.
+
+        `preprocessed` must be the result of `self.preprocess(data)`, or of
+        preprocessing by another learner with the same `preprocessing_key`.
+        The model is the same as the one returned by `self(data)`.
+        """
+        return self._call(data, progress_callback, preprocessed)
+
+    def preprocessing_key(self, data):
+        """
+        Return a key that is equal for learners that preprocess `data` in
+        the same way, or `None` if the preprocessing cannot be shared.
+        """
+        try:
+            chain = pickle.dumps(tuple(self.active_preprocessors), protocol=4)
+        except Exception:  # pylint: disable=broad-except
+            return None
+        return type(self).preprocess, chain
+
+    def _call(self, data, progress_callback=None, preprocessed=None):
         reason = self.incompatibility_reason(data.domain)
         if reason is not None:
             raise ValueError(reason)
@@ -122,17 +160,23 @@ class Learner(ReprableWithPreprocessors):
 
         if progress_callback is None:
             progress_callback = dummy_callback
+
+        cache_key = None
+        if self.model_cache is not None:
+            cache_key = self.model_cache_key(data)
+            if cache_key is not None:
+                model = self.model_cache.get(cache_key)
+                if model is not None:
+                    model.original_domain = origdomain
+                    model.original_data = origdata
+                    progress_callback(1)
+                    return model
+
         progress_callback(0, "Preprocessing...")
-        try:
-            cb = wrap_callback(progress_callback, end=0.1)
-            data = self.preprocess(data, progress_callback=cb)
-        except TypeError:
-            data = self.preprocess(data)
-            warnings.warn("A keyword argument 'progress_callback' has been "
-                          "added to the preprocess() signature. Implementing "
-                          "the method without the argument is deprecated and "
-                          "will result in an error in the future.",
-                          OrangeDeprecationWarning)
+        if preprocessed is not None:
+            data = preprocessed
+        else:
+            data = self._preprocess_with_callback(data, progress_callback)
 
         if len(data.domain.class_vars) > 1 and not self.supports_multiclass:
             raise TypeError("%s doesn't support multiple class variables" %
@@ -150,9 +194,57 @@ class Learner(ReprableWithPreprocessors):
         model.name = self.name
         model.original_domain = origdomain
         model.original_data = origdata
+        if cache_key is not None:
+            self.model_cache.put(cache_key, model)
         progress_callback(1)
         return model
 
+    def _preprocess_with_callback(self, data, progress_callback):
+        try:
+            cb = wrap_callback(progress_callback, end=0.1)
+            return self.preprocess(data, progress_callback=cb)
+        except TypeError:
+            data = self.preprocess(data)
+            warnings.warn("A keyword argument 'progress_callback' has been "
+                          "added to the preprocess() signature. Implementing "
+                          "the method without the argument is deprecated and "
+                          "will result in an error in the future.",
+                          OrangeDeprecationWarning)
+            return data
+
+    def model_cache_key(self, data):
+        """
+        Return the key under which a model fitted on `data` is cached.
+
+        The key is a digest of the data and of the learner's class and
+        attributes. It is `None` (and the model is not cached) if the data
+        has no fingerprint (see `Table.fingerprint`) or the learner cannot
+        be pickled.
+        """
+        if not isinstance(data, Table):
+            return None
+        data_digest = data.fingerprint(include_metas=False)
+        if data_digest is None:
+            return None
+        try:
+            params = pickle.dumps((type(self), self._model_cache_params()),
+                                  protocol=4)
+        except Exception:  # pylint: disable=broad-except
+            return None
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(short_version.encode())
+        digest.update(params)
+        digest.update(data_digest.encode())
+        return digest.hexdigest()
+
+    def _model_cache_params(self):
+        """Return attributes that define the fitted model."""
+        params = {name: value for name, value in vars(self).items()
+                  if name not in ("model_cache", "_Learner__name")}
+        # name is set lazily, but is also given to the model
+        params["_Learner__name"] = self.name
+        return params
+
     def _fit_model(self, data):
         if type(self).fit is Learner.fit:
             return self.fit_storage(data)
@@ -160,6 +252,91 @@ class Learner(ReprableWithPreprocessors):
             X, Y, W = data.X, data.Y, data.W if data.has_weights() else None
             return self.fit(X, Y, W)
 
+    def partial_fit(self, model, data, progress_callback=None):
+        """
+        Update the model with a chunk of data (incremental learning).
+
+        If `model` is None, a new model is fitted on `data`. Preprocessors
+        are fitted on this first chunk only and are then frozen: subsequent
+        chunks are transformed into the domain of the model, as is data on
+        which the model predicts.
+
+        Parameters
+        ----------
+        model : Model or None
+            A model returned by a previous call, or None for the first chunk
+        data : Table
+            A chunk of data
+        progress_callback : callable, optional
+            Callback for reporting progress when fitting a new model
+
+        Returns
+        -------
+        model : Model
+            A new model or the given model, updated in place
+        """
+        if not self.supports_partial_fit:
+            raise TypeError(f"{type(self).__name__} does not support "
+                            "incremental learning")
+        if isinstance(data, Instance):
+            data = Table.from_list(data.domain, [data])
+        if model is None:
+            model = self(data, progress_callback)
+            if type(self).init_partial_fit is not Learner.init_partial_fit:
+                self.init_partial_fit(model,
+                                      self._partial_fit_data(model, data))
+            return model
+
+        data = self._partial_fit_data(model, data)
+        if len(data):
+            self.update_model(model, data)
+            if model.used_vals is not None:
+                model.used_vals = [
+                    np.union1d(used, np.unique(y).astype(int))
+                    for used, y in zip(model.used_vals, data.Y[:, None].T)]
+        return model
+
+    @staticmethod
+    def _partial_fit_data(model, data):
+        data = model.data_to_model_domain(data)
+        if data.domain.class_vars:
+            data = HasClass()(data)
+        return data
+
+    def init_partial_fit(self, model, data):
+        """
+        Prepare a model, fitted on the first chunk, for incremental updates.
+
+        Learners that support incremental learning, but whose models do not
+        keep the required statistics, should override this method to compute
+        them from the first chunk.
+
+        Parameters
+        ----------
+        model : Model
+            A model fitted on `data`
+        data : Table
+            The first chunk, transformed into the model's domain
+        """
+
+    def update_model(self, model, data):
+        """
+        Update the model with a chunk of data in the model's domain.
+
+        Learners that support incremental learning must override this method
+        and set `supports_partial_fit`. Data is already preprocessed and
+        instances with missing class values are removed.
+
+        Parameters
+        ----------
+        model : Model
+            The model to update in place
+        data : Table
+            A chunk of data
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not implement update_model")
+
     def preprocess(self, data, progress_callback=None):
         """Apply the `preprocessors` to the data"""
         if progress_callback is None:
@@ -576,8 +753,8 @@ class SklLearner(Learner, metaclass=WrapperMeta):
 
         return data
 
-    def __call__(self, data, progress_callback=None):
-        m = super().__call__(data, progress_callback)
+    def _fit_model(self, data):
+        m = super()._fit_model(data)
         m.params = self.params
         return m
 
@@ -598,6 +775,25 @@ class SklLearner(Learner, metaclass=WrapperMeta):
         """
         return 'sample_weight' in self.__wraps__.fit.__code__.co_varnames
 
+    @property
+    def supports_partial_fit(self):
+        """Indicates whether the wrapped estimator supports incremental
+        learning.
+        """
+        return hasattr(self.__wraps__, "partial_fit")
+
+    def update_model(self, model, data):
+        X, Y = data.X, data.Y.reshape(-1)
+        skl_model = model.skl_model
+        classes = getattr(skl_model, "classes_", None)
+        if classes is not None and not np.isin(Y, classes).all():
+            raise ValueError("Data contains class values that were not "
+                             "present in the first chunk")
+        if self.supports_weights and data.has_weights():
+            skl_model.partial_fit(X, Y, sample_weight=data.W.reshape(-1))
+        else:
+            skl_model.partial_fit(X, Y)
+
     def __getattr__(self, item):
         try:
             return self.params[item]
@@ -832,8 +1028,8 @@ class CatGBBaseLearner(Learner, metaclass=WrapperMeta):
             self.__wraps__.__init__).parameters.keys())
         return {name: values[name] for name in spec[1:] if name in values}
 
-    def __call__(self, data, progress_callback=None):
-        m = super().__call__(data, progress_callback)
+    def _fit_model(self, data):
+        m = super()._fit_model(data)
         m.params = self.params
         return m
 
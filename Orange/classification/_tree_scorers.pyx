@@ -8,6 +8,12 @@
 
 import numpy as np
 cimport numpy as np
+from cython cimport floating
+
+# class values of float32 tables are also in float32
+ctypedef fused target_t:
+    float
+    double
 
 from libc.math cimport log
 
@@ -17,7 +23,7 @@ cdef extern from "numpy/npy_math.h":
 cpdef enum:
     NULL_BRANCH = -1
 
-def contingency(const double[:] x, int nx, const double[:] y, int ny):
+def contingency(const floating[:] x, int nx, const target_t[:] y, int ny):
     cdef:
         np.ndarray[np.uint32_t, ndim=2] cont = np.zeros((ny, nx), dtype=np.uint32)
         int n = len(x), yi, xi
@@ -28,7 +34,7 @@ def contingency(const double[:] x, int nx, const double[:] y, int ny):
             cont[yi, xi] += 1
     return cont
 
-def find_threshold_entropy(const double[:] x, const double[:] y,
+def find_threshold_entropy(const floating[:] x, const target_t[:] y,
                            const np.intp_t[:] idx,
                            int n_classes, int min_leaf):
     """
@@ -189,8 +195,8 @@ def find_binarization_entropy(const double[:, :] cont,
     return (class_entro - best_entro) / N / log(2), best_mapping
 
 
-def find_threshold_MSE(const double[:] x,
-                       const double[:] y,
+def find_threshold_MSE(const floating[:] x,
+                       const target_t[:] y,
                        const np.intp_t[:] idx, int min_leaf):
     """
     Find the threshold for continuous attribute values that minimizes MSE.
@@ -236,8 +242,8 @@ def find_threshold_MSE(const double[:] x,
     return (best_inter - (sum * sum) / N) / N, x[idx[best_idx]]
 
 
-def find_binarization_MSE(const double[:] x,
-                          const double[:] y, int n_values, int min_leaf):
+def find_binarization_MSE(const floating[:] x,
+                          const target_t[:] y, int n_values, int min_leaf):
     """
     Find the split of discrete values into two groups that minimizes the MSE.
 
@@ -320,8 +326,8 @@ def find_binarization_MSE(const double[:] x,
     return (best_inter - start_inter) / x.shape[0], best_mapping
 
 
-def compute_grouped_MSE(const double[:] x,
-                        const double[:] y,
+def compute_grouped_MSE(const floating[:] x,
+                        const target_t[:] y,
                         int n_values, int min_leaf):
     """
     Compute the MSE decrease of the given split into groups.
@@ -378,7 +384,7 @@ def compute_grouped_MSE(const double[:] x,
     return (inter - sum * sum / n) / x.shape[0]
 
 
-def compute_predictions(const double[:, :] X,
+def compute_predictions(const floating[:, :] X,
                         const int[:] code,
                         const double[:, :] values,
                         const double[:] thresholds):
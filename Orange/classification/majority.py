@@ -19,26 +19,44 @@ class MajorityLearner(Learner):
     class value is selected randomly. In order to produce consistent results on
     the same dataset, this value is selected based on hash of the class vector.
     """
+    supports_partial_fit = True
+
     def fit_storage(self, dat):
         if not dat.domain.has_discrete_class:
             raise ValueError("classification.MajorityLearner expects a domain "
                              "with a (single) categorical variable")
-        dist = distribution.get_distribution(dat, dat.domain.class_var)
+        counts = np.array(
+            distribution.get_distribution(dat, dat.domain.class_var))
+        model = ConstantModel(*self._distribution(counts, dat.Y))
+        model.counts = counts
+        return model
+
+    def update_model(self, model, data):
+        if getattr(model, "counts", None) is None:
+            raise ValueError("Model does not keep counts needed for updating")
+        model.counts += distribution.get_distribution(
+            data, data.domain.class_var)
+        # the class vector is not kept, so ties are broken by counts
+        model.dist, model.unif_maj = \
+            self._distribution(model.counts, model.counts)
+
+    @staticmethod
+    def _distribution(counts, tie_data):
+        dist = counts.astype(float)
         N = dist.sum()
         if N > 0:
             dist /= N
         else:
             dist.fill(1 / len(dist))
 
-        probs = np.array(dist)
-        ties = np.flatnonzero(probs == probs.max())
+        ties = np.flatnonzero(dist == dist.max())
         if len(ties) > 1:
-            random_idx = int(sha1(np.ascontiguousarray(dat.Y).data)
+            random_idx = int(sha1(np.ascontiguousarray(tie_data).data)
                              .hexdigest(), 16) % len(ties)
             unif_maj = ties[random_idx]
         else:
             unif_maj = None
-        return ConstantModel(dist=dist, unif_maj=unif_maj)
+        return dist, unif_maj
 
 
 class ConstantModel(Model):
@@ -62,6 +80,8 @@ class ConstantModel(Model):
         """
         self.dist = np.array(dist)
         self.unif_maj = unif_maj
+        # class counts for incremental updates
+        self.counts = None
 
     def predict(self, X):
         """
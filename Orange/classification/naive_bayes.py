@@ -1,3 +1,7 @@
+import copy
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import scipy.sparse as sp
 
@@ -14,6 +18,11 @@ class NaiveBayesLearner(Learner):
     Naive Bayes classifier. Works only with discrete attributes. By default,
     continuous attributes are discretized.
 
+    Class-conditional counts of values of all attributes are computed in a
+    single pass over the data (in parallel over blocks of rows for large data)
+    and stored in a single matrix, so models fitted on chunks of data can be
+    merged (see `NaiveBayesModel.merge` and `partial_fit`).
+
     Parameters
     ----------
     preprocessors : list, optional (default="[Orange.preprocess.Discretize]")
@@ -22,6 +31,7 @@ class NaiveBayesLearner(Learner):
     """
     preprocessors = [RemoveNaNColumns(), Discretize()]
     name = 'naive bayes'
+    supports_partial_fit = True
 
     def fit_storage(self, table):
         if not isinstance(table, Storage):
@@ -31,13 +41,162 @@ class NaiveBayesLearner(Learner):
             raise NotImplementedError("Only categorical variables are "
                                       "supported.")
 
+        counts, class_freq = self._counts(table)
+        if not (class_freq != 0).sum():
+            raise ValueError("Data has no defined target values.")
+        return NaiveBayesModel.from_counts(counts, class_freq, table.domain)
+
+    def update_model(self, model, data):
+        if getattr(model, "counts", None) is None:
+            raise ValueError("Model does not keep counts needed for updating")
+        counts, class_freq = self._counts(data)
+        model.set_counts(model.counts + counts, model.class_freq + class_freq)
+
+    @staticmethod
+    def _counts(table):
+        # contingencies of compact tables are computed from codes
+        if isinstance(table, Table) and not table.is_compact():
+            return class_conditional_counts(
+                table.X, table.Y, table.W if table.has_weights() else None,
+                [len(attr.values) for attr in table.domain.attributes],
+                len(table.domain.class_var.values))
+
         cont = contingency.get_contingencies(table)
         class_freq = np.array(np.diag(
             contingency.get_contingency(table, table.domain.class_var)))
-        nclss = (class_freq != 0).sum()
-        if not nclss:
-            raise ValueError("Data has no defined target values.")
+        counts = np.hstack([np.array(c) for c in cont]) if cont \
+            else np.zeros((len(class_freq), 0))
+        return counts, class_freq
+
+
+# number of rows in a block of data counted by a single thread
+_BLOCK_SIZE = 50000
+
+
+def class_conditional_counts(X, Y, W, n_values, n_classes):
+    """
+    Count values of discrete attributes in each class.
+
+    Columns of the resulting matrix correspond to values of all attributes,
+    one attribute after another. Missing values and instances with missing
+    classes are not counted. For sparse data, implicit zeros are counted as
+    the first value of the attribute.
+
+    Blocks of rows are counted in parallel threads.
+
+    Parameters
+    ----------
+    X : np.ndarray or sp.spmatrix
+        Data with indices of values
+    Y : np.ndarray
+        Indices of classes
+    W : np.ndarray or None
+        Instance weights
+    n_values : list of int
+        Number of values of each attribute
+    n_classes : int
+        Number of classes
+
+    Returns
+    -------
+    counts : np.ndarray
+        Counts of shape (n_classes, sum(n_values))
+    class_freq : np.ndarray
+        Frequencies of classes
+    """
+    Y = Y.reshape(-1)
+    W = None if W is None else W.reshape(-1)
+    known = ~np.isnan(Y)
+    if not known.all():
+        X, Y = X[known], Y[known]
+        W = None if W is None else W[known]
+    Y = Y.astype(np.intp)
+    class_freq = np.bincount(Y, weights=W, minlength=n_classes).astype(float)
+
+    offsets = np.zeros(len(n_values) + 1, dtype=np.intp)
+    np.cumsum(n_values, out=offsets[1:])
+    n_columns = offsets[-1]
+    if sp.issparse(X):
+        X = X.tocsr()
+        count_block = _count_sparse_block
+    else:
+        count_block = _count_dense_block
+
+    def count(start):
+        end = start + _BLOCK_SIZE
+        return count_block(X[start:end], Y[start:end],
+                           None if W is None else W[start:end],
+                           offsets, n_classes)
+
+    starts = range(0, X.shape[0], _BLOCK_SIZE)
+    if len(starts) > 1:
+        with ThreadPoolExecutor(
+                max_workers=min(len(starts), os.cpu_count() or 1)) as executor:
+            blocks = list(executor.map(count, starts))
+    else:
+        blocks = [count(start) for start in starts]
+    counts = sum(blocks, np.zeros(n_classes * (n_columns + len(n_values))))
+    counts = counts.reshape(n_classes, n_columns + len(n_values))
+    # the last len(n_values) columns count explicit entries of sparse data;
+    # the remaining (implicit zeros) are counted as the first values
+    explicit = counts[:, n_columns:]
+    counts = counts[:, :n_columns]
+    if sp.issparse(X):
+        counts[:, offsets[:-1]] += class_freq[:, None] - explicit
+    return counts, class_freq
 
+
+def _count_dense_block(X, Y, W, offsets, n_classes):
+    n_columns = offsets[-1]
+    width = n_columns + len(offsets) - 1
+    known = ~np.isnan(X)
+    indices = (X + offsets[:-1])[known].astype(np.intp)
+    indices += np.repeat(Y * width, known.sum(axis=1))
+    weights = None if W is None else np.repeat(W, known.sum(axis=1))
+    return np.bincount(indices, weights=weights, minlength=n_classes * width)
+
+
+def _count_sparse_block(X, Y, W, offsets, n_classes):
+    n_columns = offsets[-1]
+    width = n_columns + len(offsets) - 1
+    row_lengths = np.diff(X.indptr)
+    row_offsets = np.repeat(Y * width, row_lengths)
+    weights = None if W is None else np.repeat(W, row_lengths)
+    known = ~np.isnan(X.data)
+    indices = (X.data[known] + offsets[X.indices[known]]).astype(np.intp)
+    indices += row_offsets[known]
+    counts = np.bincount(indices,
+                         weights=None if weights is None else weights[known],
+                         minlength=n_classes * width)
+    # all explicit entries, including missing values, are not implicit zeros
+    counts += np.bincount(row_offsets + n_columns + X.indices,
+                          weights=weights, minlength=n_classes * width)
+    return counts
+
+
+class NaiveBayesModel(Model):
+    def __init__(self, log_cont_prob, class_prob, domain):
+        super().__init__(domain)
+        self.log_cont_prob = log_cont_prob
+        self.class_prob = class_prob
+        # counts for merging and incremental updates; see `from_counts`
+        self.counts = None
+        self.class_freq = None
+
+    @classmethod
+    def from_counts(cls, counts, class_freq, domain):
+        """
+        Construct a model from class-conditional counts of attribute values
+        (see `class_conditional_counts`) and class frequencies.
+        """
+        model = cls(None, None, domain)
+        model.set_counts(counts, class_freq)
+        return model
+
+    def set_counts(self, counts, class_freq):
+        """Set counts and recompute probabilities."""
+        self.counts, self.class_freq = counts, class_freq
+        nclss = (class_freq != 0).sum()
         # Laplacian smoothing considers only classes that appear in the data,
         # in part to avoid cases where the probabilities are affected by empty
         # (or completely spurious) classes that appear because of Orange's reuse
@@ -46,24 +205,39 @@ class NaiveBayesLearner(Learner):
         # mock non-zero values are used in computation of log_cont_prob to
         # prevent division by zero.
         class_prob = (class_freq + 1) / (np.sum(class_freq) + nclss)
-        log_cont_prob = [np.log(
-            (np.array(c) + 1) / (np.sum(np.array(c), axis=0)[None, :] + nclss)
+        log_prob = np.log(
+            (counts + 1) / (np.sum(counts, axis=0)[None, :] + nclss)
             / class_prob[:, None])
-                         for c in cont]
         class_prob[class_freq == 0] = 0
-        return NaiveBayesModel(log_cont_prob, class_prob, table.domain)
+        self.class_prob = class_prob
+        n_values = [len(attr.values) for attr in self.domain.attributes]
+        self.log_cont_prob = \
+            np.split(log_prob, np.cumsum(n_values)[:-1], axis=1) \
+            if n_values else []
 
+    def merge(self, other):
+        """
+        Return a model with counts of both models, that is, a model that
+        would be fitted on data of both models.
 
-class NaiveBayesModel(Model):
-    def __init__(self, log_cont_prob, class_prob, domain):
-        super().__init__(domain)
-        self.log_cont_prob = log_cont_prob
-        self.class_prob = class_prob
+        Both models must have the same domain, for instance, when they are
+        fitted on chunks of data preprocessed in the same way.
+        """
+        if self.domain != other.domain:
+            raise ValueError("Models with different domains can not be merged")
+        if self.counts is None or other.counts is None:
+            raise ValueError("Models do not keep counts needed for merging")
+        model = copy.copy(self)
+        model.set_counts(self.counts + other.counts,
+                         self.class_freq + other.class_freq)
+        return model
 
     def predict_storage(self, data):
         if isinstance(data, Instance):
             data = Table.from_numpy(None, np.atleast_2d(data.x))
         if type(data) is Table:  # pylint: disable=unidiomatic-typecheck
+            if data.is_compact():
+                return self._compact_predict(data.compact_columns)
             return self.predict(data.X)
 
         if not len(data) or not len(data[0]):
@@ -83,51 +257,75 @@ class NaiveBayesModel(Model):
 
     def predict(self, X):
         probs = np.zeros((X.shape[0], self.class_prob.shape[0]))
-        if self.log_cont_prob is not None:
+        if self.log_cont_prob is not None and len(self.log_cont_prob):
             if sp.issparse(X):
                 self._sparse_probs(X, probs)
             else:
                 self._dense_probs(X, probs)
+        return self._from_log_probs(probs)
+
+    def _compact_predict(self, columns):
+        # add log probabilities column by column; missing values index
+        # an appended column of zeros
+        probs = np.zeros((len(columns), self.class_prob.shape[0]))
+        for i, log_prob in enumerate(self.log_cont_prob or []):
+            n_values = log_prob.shape[1]
+            log_prob = np.hstack((log_prob, np.zeros((len(log_prob), 1))))
+            codes = columns.codes(i)
+            if codes is None:
+                col = columns.column(i)
+                codes = np.where(np.isnan(col), n_values, col)
+            probs += log_prob[:, np.minimum(codes, n_values).astype(np.intp)].T
+        return self._from_log_probs(probs)
+
+    def _from_log_probs(self, probs):
         np.exp(probs, probs)
         probs *= self.class_prob
         probs /= probs.sum(axis=1)[:, None]
         values = probs.argmax(axis=1)
         return values, probs
 
+    def _offsets(self):
+        offsets = np.zeros(len(self.log_cont_prob) + 1, dtype=np.intp)
+        np.cumsum([p.shape[1] for p in self.log_cont_prob], out=offsets[1:])
+        return offsets
+
     def _dense_probs(self, data, probs):
-        zeros = np.zeros((1, probs.shape[1]))
-        for col, attr_prob in zip(data.T, self.log_cont_prob):
-            col = col.copy()
-            col[np.isnan(col)] = attr_prob.shape[1] - 1
-            col = col.astype(int)
-            probs0 = np.vstack((attr_prob.T, zeros))
-            probs += probs0[col]
+        # sum log probabilities of values as a product of one-hot encoded
+        # data and a matrix of log probabilities; missing values are skipped
+        offsets = self._offsets()
+        log_prob = np.hstack(self.log_cont_prob)
+        known = ~np.isnan(data)
+        indptr = np.zeros(data.shape[0] + 1, dtype=np.intp)
+        np.cumsum(known.sum(axis=1), out=indptr[1:])
+        indices = (data + offsets[:-1])[known].astype(np.intp)
+        onehot = sp.csr_matrix(
+            (np.ones(len(indices)), indices, indptr),
+            shape=(data.shape[0], offsets[-1]))
+        probs += onehot @ log_prob.T
         return probs
 
     def _sparse_probs(self, data, probs):
-        n_vals = max(p.shape[1] for p in self.log_cont_prob) + 1
-        log_prob = np.zeros((len(self.log_cont_prob),
-                             n_vals,
-                             self.log_cont_prob[0].shape[0]))
-        for i, p in enumerate(self.log_cont_prob):
-            p0 = p.T[0].copy()
-            probs[:] += p0
-            log_prob[i, :p.shape[1]] = p.T - p0
-
-        dat = data.data.copy()
-        dat[np.isnan(dat)] = n_vals - 1
-        dat = dat.astype(int)
-
-        if sp.isspmatrix_csr(data):
-            for row, start, end in zip(probs, data.indptr, data.indptr[1:]):
-                row += log_prob[data.indices[start:end],
-                                dat[start:end]].sum(axis=0)
-        else:
-            csc = data.tocsc()
-            for start, end, attr_prob in zip(csc.indptr, csc.indptr[1:],
-                                             log_prob):
-                probs[csc.indices[start:end]] += attr_prob[dat[start:end]]
+        # implicit zeros contribute log probabilities of first values;
+        # explicit entries replace them with the log probability of their
+        # value, and missing values remove them
+        data = data.tocsr()
+        offsets = self._offsets()
+        log_prob = np.hstack(self.log_cont_prob)
+        first = log_prob[:, offsets[:-1]]
+        probs += first.sum(axis=1)
+        delta = np.vstack((
+            log_prob.T - np.repeat(first.T, np.diff(offsets), axis=0),
+            -first.T))
 
+        dat = data.data
+        missing = np.isnan(dat)
+        indices = np.where(missing, offsets[-1] + data.indices,
+                           np.nan_to_num(dat) + offsets[data.indices])
+        onehot = sp.csr_matrix(
+            (np.ones(len(indices)), indices.astype(np.intp), data.indptr),
+            shape=(data.shape[0], len(delta)))
+        probs += onehot @ delta
         return probs
 
 
@@ -135,6 +135,156 @@ def get_dist(Y, W, domain):
     return np.bincount(Y, weights=W, minlength=len(domain.class_var.values))
 
 
+def popcount(bits):
+    """
+    Count the set bits in packed bitsets.
+
+    Parameters
+    ----------
+    bits : ndarray, uint8
+        Packed bitsets (see numpy.packbits), one per row; the number of
+        bytes in a row must be a multiple of 8.
+
+    Returns
+    -------
+    count : ndarray, int
+        Number of set bits in each row.
+    """
+    # parallel bit count on 64-bit words
+    x = bits.view(np.uint64)
+    x = x - ((x >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    x = ((x & np.uint64(0x3333333333333333)) +
+         ((x >> np.uint64(2)) & np.uint64(0x3333333333333333)))
+    x = (x + (x >> np.uint64(4))) & np.uint64(0x0f0f0f0f0f0f0f0f)
+    x = (x * np.uint64(0x0101010101010101)) >> np.uint64(56)
+    return x.sum(axis=-1, dtype=np.int64)
+
+
+class BitsetIndex:
+    """
+    Packed bitset coverage over a fixed set of learning instances.
+
+    Coverage of each selector is computed once and kept as a packed
+    bitset (one bit per instance). Rule coverage is then obtained by
+    intersecting selector bitsets, and class distributions of covered
+    instances by counting bits in intersections with per-class
+    bitsets, which avoids indexing the data for every candidate rule.
+    """
+    def __init__(self, X, Y=None, n_classes=None):
+        """
+        Initialise the index.
+
+        Parameters
+        ----------
+        X : ndarray
+            Data on which coverage is computed.
+        Y : ndarray, int
+            Classifications; if given, per-class bitsets are prepared.
+        n_classes : int
+            Number of classes.
+        """
+        self.X = X
+        self.Y = Y
+        self.n_examples = X.shape[0]
+        self.selector_bits = {}
+        self.class_bits = None
+        if Y is not None:
+            self.class_bits = np.vstack(
+                [self.pack(Y == c) for c in range(n_classes)])
+
+    def is_compatible(self, X, Y):
+        """
+        Return True if the index was built on the given data.
+        """
+        return self.X is X and self.Y is Y
+
+    def pack(self, covered):
+        """
+        Pack a boolean coverage array into a bitset, padded to whole
+        64-bit words.
+        """
+        bits = np.packbits(covered)
+        return np.pad(bits, (0, -len(bits) % 8))
+
+    def unpack(self, bits):
+        """
+        Unpack a bitset into a boolean coverage array.
+        """
+        return np.unpackbits(bits, count=self.n_examples).view(bool)
+
+    def all(self):
+        """
+        Return a bitset covering all instances.
+        """
+        return self.pack(np.ones(self.n_examples, dtype=bool))
+
+    def selector(self, selector):
+        """
+        Return the (cached) bitset of instances covered by a selector.
+        """
+        bits = self.selector_bits.get(selector)
+        if bits is None:
+            bits = self.selector_bits[selector] = \
+                self.pack(selector.filter_data(self.X))
+        return bits
+
+    def rule(self, selectors):
+        """
+        Return the bitset of instances covered by all selectors.
+        """
+        if not selectors:
+            return self.all()
+        bits = self.selector(selectors[0]).copy()
+        for selector in selectors[1:]:
+            bits &= self.selector(selector)
+        return bits
+
+    def class_dist(self, bits, W=None):
+        """
+        Determine the class distribution of covered instances.
+
+        Parameters
+        ----------
+        bits : ndarray, uint8
+            Bitset of covered instances.
+        W : ndarray, float
+            Weights.
+
+        Returns
+        -------
+        dist : ndarray
+            Class distribution.
+        """
+        return self.class_dists(bits[None, :], W)[0]
+
+    def class_dists(self, bits, W=None):
+        """
+        Determine class distributions for several bitsets at once.
+
+        Parameters
+        ----------
+        bits : ndarray, uint8
+            A 2-D array with one bitset per row.
+        W : ndarray, float
+            Weights.
+
+        Returns
+        -------
+        dists : ndarray
+            Class distributions, one per row.
+        """
+        if W is not None:
+            n_classes = len(self.class_bits)
+            dists = np.empty((len(bits), n_classes))
+            for i, row in enumerate(bits):
+                covered = self.unpack(row)
+                dists[i] = np.bincount(self.Y[covered], weights=W[covered],
+                                       minlength=n_classes)
+            return dists
+        return np.column_stack([popcount(bits & cbits)
+                                for cbits in self.class_bits])
+
+
 def hash_dist(x):
     """
     For a given distribution, calculate a hash value that can be used to
@@ -444,6 +594,11 @@ class TopDownSearchStrategy(SearchStrategy):
                         initial_class_dist, prior_class_dist,
                         quality_evaluator, complexity_evaluator,
                         significance_validator, general_validator):
+        # optimisation: store covered examples when a selector is found;
+        # selector coverage stays valid as long as the data does not change
+        if self.storage is None or not self.storage.is_compatible(X, Y):
+            self.storage = BitsetIndex(X, Y, len(domain.class_var.values))
+
         rules = []
         default_rule = Rule(domain=domain,
                             initial_class_dist=initial_class_dist,
@@ -453,7 +608,8 @@ class TopDownSearchStrategy(SearchStrategy):
                             significance_validator=significance_validator,
                             general_validator=general_validator)
 
-        default_rule.filter_and_store(X, Y, W, target_class)
+        default_rule.filter_and_store(X, Y, W, target_class,
+                                      index=self.storage)
         if not base_rules and default_rule.is_valid():
             if self.evaluate:
                 default_rule.do_evaluate()
@@ -469,14 +625,13 @@ class TopDownSearchStrategy(SearchStrategy):
                              significance_validator=significance_validator,
                              general_validator=general_validator)
 
-            temp_rule.filter_and_store(X, Y, W, target_class)
+            temp_rule.filter_and_store(X, Y, W, target_class,
+                                       index=self.storage)
             if temp_rule.is_valid():
                 if self.evaluate:
                     temp_rule.do_evaluate()
                 rules.append(temp_rule)
 
-        # optimisation: store covered examples when a selector is found
-        self.storage = {}
         return rules
 
     def refine_rule(self, X, Y, W, candidate_rule):
@@ -496,8 +651,24 @@ class TopDownSearchStrategy(SearchStrategy):
             if W is not None else None,
             domain, candidate_rule_selectors)
 
+        if self.storage is None or not self.storage.is_compatible(X, Y):
+            self.storage = BitsetIndex(X, Y, len(domain.class_var.values))
+        index = self.storage
+        candidate_rule_covered_bits = (
+            candidate_rule.covered_bits
+            if candidate_rule.covered_bits is not None
+            else index.pack(candidate_rule_covered_examples))
+
+        # optimisation: coverage and class distributions of all
+        # refinements are computed at once from selector bitsets
+        if possible_selectors:
+            possible_bits = np.vstack(
+                [index.selector(selector) for selector in possible_selectors])
+            possible_bits &= candidate_rule_covered_bits
+            possible_dists = index.class_dists(possible_bits, W)
+
         new_rules = []
-        for curr_selector in possible_selectors:
+        for i, curr_selector in enumerate(possible_selectors):
             copied_selectors = copy(candidate_rule_selectors)
             copied_selectors.append(curr_selector)
 
@@ -511,13 +682,12 @@ class TopDownSearchStrategy(SearchStrategy):
                             significance_validator=significance_validator,
                             general_validator=general_validator)
 
-            if curr_selector not in self.storage:
-                self.storage[curr_selector] = curr_selector.filter_data(X)
-            # optimisation: faster calc. of covered examples
-            pdc = candidate_rule_covered_examples & self.storage[curr_selector]
             # to ensure that the covered_examples matrices are of
             # the same size throughout the rule_finder iteration
-            new_rule.filter_and_store(X, Y, W, target_class, predef_covered=pdc)
+            new_rule.filter_and_store(X, Y, W, target_class,
+                                      predef_covered=possible_bits[i],
+                                      predef_dist=possible_dists[i],
+                                      index=index)
             if new_rule.is_valid():
                 if self.evaluate:
                     new_rule.do_evaluate()
@@ -664,7 +834,9 @@ class Rule:
         self.general_validator = general_validator
 
         self.target_class = None
-        self.covered_examples = None
+        self.covered_bits = None
+        self._covered_examples = None
+        self._n_examples = None
         self.curr_class_dist = None
         self.quality = None
         self.complexity = None
@@ -672,7 +844,32 @@ class Rule:
         self.probabilities = None
         self.length = len(self.selectors)
 
-    def filter_and_store(self, X, Y, W, target_class, predef_covered=None):
+    @property
+    def covered_examples(self):
+        """
+        Boolean array of covered learning instances; unpacked from
+        the coverage bitset on first access.
+        """
+        if self._covered_examples is None and self.covered_bits is not None:
+            self._covered_examples = np.unpackbits(
+                self.covered_bits, count=self._n_examples).view(bool)
+        return self._covered_examples
+
+    @covered_examples.setter
+    def covered_examples(self, covered):
+        self._covered_examples = covered
+        self.covered_bits = None
+        self._n_examples = None if covered is None else len(covered)
+
+    @property
+    def n_examples(self):
+        """
+        Number of learning instances the rule was applied to.
+        """
+        return self._n_examples
+
+    def filter_and_store(self, X, Y, W, target_class, predef_covered=None,
+                         index=None, predef_dist=None):
         """
         Apply data and target class to a rule.
 
@@ -684,9 +881,27 @@ class Rule:
             Index of the class to model.
         predef_covered : ndarray
             Built-in optimisation variable to enable external
-            computation of covered examples.
+            computation of covered examples. A packed bitset if index
+            is given, else a boolean array.
+        index : BitsetIndex
+            Selector bitsets of the learning data; if given, coverage
+            is stored as a bitset and class distribution is computed
+            from bit counts.
+        predef_dist : ndarray
+            Class distribution of 'predef_covered', if already known
+            (requires index).
         """
         self.target_class = target_class
+        if index is not None:
+            self._covered_examples = None
+            self._n_examples = index.n_examples
+            self.covered_bits = (predef_covered if predef_covered is not None
+                                 else index.rule(self.selectors))
+            self.curr_class_dist = (
+                predef_dist if predef_dist is not None
+                else index.class_dist(self.covered_bits, W))
+            return
+
         if predef_covered is not None:
             self.covered_examples = predef_covered
         else:
@@ -776,8 +991,21 @@ class Rule:
                 self.quality_evaluator, self.complexity_evaluator,
                 self.significance_validator, self.general_validator)
 
+    def __setstate__(self, state):
+        # rules pickled before coverage was kept as bitsets
+        if "covered_examples" in state:
+            state = dict(state)
+            covered = state.pop("covered_examples")
+            self.__dict__.update(state)
+            self.covered_examples = covered
+        else:
+            self.__dict__.update(state)
+
     def __eq__(self, other):
         # return self.selectors == other.selectors
+        if self.covered_bits is not None and other.covered_bits is not None:
+            return (self._n_examples == other._n_examples and
+                    np.array_equal(self.covered_bits, other.covered_bits))
         return np.array_equal(self.covered_examples, other.covered_examples)
 
     def __len__(self):
@@ -867,6 +1095,10 @@ class RuleHunter:
 
         rules = sorted(rules, key=rcmp, reverse=True)
         best_rule = rules[0]
+        # optimisation: rules are equal only if they cover the same
+        # learning data, so rules found on different data are skipped
+        existing_rules = [rule for rule in existing_rules
+                          if rule.n_examples in (None, X.shape[0])]
 
         while len(rules) > 0:
             candidates, rules = self.search_algorithm.select_candidates(rules)
@@ -1160,6 +1392,10 @@ class _RuleClassifier(Model):
     Descendants classify instances following either an unordered set of
     rules or a decision list.
     """
+    # maximal number of elements of the rule coverage matrix computed
+    # at once during prediction
+    MAX_COVERAGE_SIZE = 2 ** 24
+
     def __init__(self, domain=None, rule_list=None):
         super().__init__(domain)
         self.domain = domain
@@ -1168,6 +1404,46 @@ class _RuleClassifier(Model):
     def predict(self, X):
         raise NotImplementedError
 
+    def coverage(self, X, rules=None):
+        """
+        Determine which instances are covered by each rule.
+
+        Selector coverage is computed once per distinct selector and
+        kept as a packed bitset; rule coverage is the intersection of
+        its selectors' bitsets.
+
+        Parameters
+        ----------
+        X : ndarray
+            Evaluate this data.
+        rules : list of Rule
+            Rules to evaluate; defaults to the model's rule list.
+
+        Returns
+        -------
+        res : ndarray, bool
+            Array of shape (number of rules, number of instances).
+        """
+        rules = self.rule_list if rules is None else rules
+        if not rules:
+            return np.zeros((0, X.shape[0]), dtype=bool)
+        index = BitsetIndex(X)
+        bits = np.vstack([index.rule(rule.selectors) for rule in rules])
+        return np.unpackbits(bits, axis=1, count=X.shape[0]).view(bool)
+
+    def _predict_blocks(self, X, predict_block):
+        """
+        Apply 'predict_block' on blocks of rows, so that the coverage
+        matrix of a block stays small.
+        """
+        num_classes = len(self.domain.class_var.values)
+        block_size = max(
+            1, self.MAX_COVERAGE_SIZE // max(len(self.rule_list), 1))
+        blocks = [predict_block(X[start:start + block_size])
+                  for start in range(0, X.shape[0], block_size)]
+        return (np.vstack(blocks) if blocks
+                else np.zeros((0, num_classes), dtype=float))
+
     def ordered_predict(self, X):
         """
         Following a decision list, for each instance, rules are tried in
@@ -1184,16 +1460,21 @@ class _RuleClassifier(Model):
             Probabilistic classification.
         """
         num_classes = len(self.domain.class_var.values)
-        probabilities = np.array([np.zeros(num_classes, dtype=float)
-                                  for _ in range(X.shape[0])])
-
-        status = np.ones(X.shape[0], dtype=bool)
-        for rule in self.rule_list:
-            curr_covered = rule.evaluate_data(X)
-            curr_covered &= status
-            status &= np.bitwise_not(curr_covered)
-            probabilities[curr_covered] = rule.probabilities
-        return probabilities
+        if not self.rule_list:
+            return np.zeros((X.shape[0], num_classes), dtype=float)
+        rule_probabilities = np.vstack([rule.probabilities
+                                        for rule in self.rule_list])
+
+        def predict_block(X):
+            probabilities = np.zeros((X.shape[0], num_classes), dtype=float)
+            covered = self.coverage(X)
+            # the first rule (in order) that fires on each instance
+            first = np.argmax(covered, axis=0)
+            fired = covered[first, np.arange(X.shape[0])]
+            probabilities[fired] = rule_probabilities[first[fired]]
+            return probabilities
+
+        return self._predict_blocks(X, predict_block)
 
     def unordered_predict(self, X):
         """
@@ -1219,26 +1500,28 @@ class _RuleClassifier(Model):
             Probabilistic classification.
         """
         num_classes = len(self.domain.class_var.values)
-        probabilities = np.array([np.zeros(num_classes, dtype=float)
-                                  for _ in range(X.shape[0])])
-
-        num_hits = np.zeros(X.shape[0], dtype=int)
-        total_weight = np.vstack(np.zeros(X.shape[0], dtype=float))
-        for rule in self.rule_list[:-1]:
-            if rule.length > 0:
-                curr_covered = rule.evaluate_data(X)
-                num_hits += curr_covered
-                temp = rule.curr_class_dist.sum()
-                probabilities[curr_covered] += rule.probabilities * temp
-                total_weight[curr_covered] += temp
-
+        rules = [rule for rule in self.rule_list[:-1] if rule.length > 0]
         default_rule = self.rule_list[-1]
-        weigh_down = num_hits > 0
-        apply_default = num_hits == 0
-
-        probabilities[weigh_down] /= total_weight[weigh_down]
-        probabilities[apply_default] = default_rule.probabilities
-        return probabilities
+        weights = np.array([rule.curr_class_dist.sum() for rule in rules],
+                           dtype=float)
+        weighted = (np.vstack([rule.probabilities for rule in rules])
+                    * weights[:, None] if rules
+                    else np.zeros((0, num_classes)))
+
+        def predict_block(X):
+            covered = self.coverage(X, rules).astype(float)
+            num_hits = covered.sum(axis=0)
+            total_weight = covered.T @ weights
+            probabilities = covered.T @ weighted
+
+            weigh_down = num_hits > 0
+            apply_default = num_hits == 0
+
+            probabilities[weigh_down] /= total_weight[weigh_down, None]
+            probabilities[apply_default] = default_rule.probabilities
+            return probabilities
+
+        return self._predict_blocks(X, predict_block)
 
 
 class _BaseCN2Learner(_RuleLearner):
@@ -1,6 +1,5 @@
 """Tree inducers: SKL and Orange's own inducer"""
 import numpy as np
-import scipy.sparse as sp
 import sklearn.tree as skl_tree
 
 from Orange.base import TreeModel as TreeModelInterface
@@ -159,17 +158,14 @@ class TreeLearner(Learner):
 
         #######################################
         # The real _select_attr starts here
-        is_sparse = sp.issparse(data.X)
         domain = data.domain
         class_var = domain.class_var
         best_score, *best_res = REJECT_ATTRIBUTE
         best_res = [Node(None, None, None)] + best_res[1:]
         disc_scorer = _score_disc_bin if self.binarize else _score_disc
         for attr_no, attr in enumerate(domain.attributes):
-            col_x = data.X[:, attr_no]
-            if is_sparse:
-                col_x = col_x.toarray()
-                col_x = col_x.flatten()
+            # dense columns, also from sparse or compact data
+            col_x = data.get_column(attr_no)
             sc, *res = disc_scorer() if attr.is_discrete else _score_cont()
             if res[0] is not None and sc > best_score:
                 best_score, best_res = sc, res
@@ -0,0 +1,324 @@
+#cython: embedsignature=True
+#cython: infer_types=True
+#cython: cdivision=True
+#cython: boundscheck=False
+#cython: wraparound=False
+#cython: language_level=3
+
+import numpy as np
+cimport numpy as np
+from libc.math cimport sqrt, INFINITY
+
+cdef enum:
+    SINGLE = 0
+    COMPLETE = 1
+    AVERAGE = 2
+    WEIGHTED = 3
+    WARD = 4
+
+
+cdef inline np.int64_t condensed_index(np.int64_t n, np.int64_t i,
+                                       np.int64_t j) nogil:
+    if i > j:
+        i, j = j, i
+    return n * i - i * (i + 1) // 2 + j - i - 1
+
+
+def nn_chain(np.float32_t[:] dists, Py_ssize_t n, int method):
+    """
+    Compute merges of agglomerative clustering with the nearest-neighbour
+    chain algorithm on a condensed distance matrix.
+
+    The matrix is overwritten with distances between clusters. `method` is
+    0 (single), 1 (complete), 2 (average), 3 (weighted) or 4 (ward).
+
+    Returns an array with a row `(a, b, height)` for each merge, where `a`
+    and `b` are indices of the first rows of the merged clusters; merges are
+    not sorted by height.
+    """
+    cdef:
+        np.ndarray[np.float64_t, ndim=2] merges_arr = np.empty((n - 1, 3))
+        np.ndarray[np.int64_t] size_arr = np.ones(n, dtype=np.int64)
+        np.ndarray[np.int64_t] chain_arr = np.empty(n, dtype=np.int64)
+        np.float64_t[:, :] merges = merges_arr
+        np.int64_t[:] size = size_arr
+        np.int64_t[:] chain = chain_arr
+        Py_ssize_t k, i, x = 0, y = 0, chain_length = 0
+        np.int64_t nx, ny, ni
+        double current_min, dist, dxi, dyi, dxy
+
+    with nogil:
+        for k in range(n - 1):
+            if chain_length == 0:
+                for i in range(n):
+                    if size[i] > 0:
+                        chain[0] = i
+                        chain_length = 1
+                        break
+            # grow the chain until reaching reciprocal nearest neighbours
+            while True:
+                x = chain[chain_length - 1]
+                if chain_length > 1:
+                    y = chain[chain_length - 2]
+                    current_min = dists[condensed_index(n, x, y)]
+                else:
+                    current_min = INFINITY
+                for i in range(n):
+                    if size[i] == 0 or i == x:
+                        continue
+                    dist = dists[condensed_index(n, x, i)]
+                    if dist < current_min:
+                        current_min = dist
+                        y = i
+                if chain_length > 1 and y == chain[chain_length - 2]:
+                    break
+                chain[chain_length] = y
+                chain_length += 1
+
+            chain_length -= 2
+            if x > y:
+                x, y = y, x
+            nx, ny = size[x], size[y]
+            merges[k, 0] = x
+            merges[k, 1] = y
+            merges[k, 2] = current_min
+            size[x] = 0
+            size[y] = nx + ny
+
+            # Lance-Williams update; the merged cluster is stored at y
+            dxy = current_min
+            for i in range(n):
+                ni = size[i]
+                if ni == 0 or i == y:
+                    continue
+                dxi = dists[condensed_index(n, i, x)]
+                dyi = dists[condensed_index(n, i, y)]
+                if method == SINGLE:
+                    dist = dxi if dxi < dyi else dyi
+                elif method == COMPLETE:
+                    dist = dxi if dxi > dyi else dyi
+                elif method == AVERAGE:
+                    dist = (nx * dxi + ny * dyi) / (nx + ny)
+                elif method == WEIGHTED:
+                    dist = 0.5 * (dxi + dyi)
+                else:
+                    dist = sqrt(((ni + nx) * dxi * dxi + (ni + ny) * dyi * dyi
+                                 - ni * dxy * dxy) / (ni + nx + ny))
+                dists[condensed_index(n, i, y)] = dist
+    return merges_arr
+
+
+def ward_chain(np.float64_t[:, :] X):
+    """
+    Compute merges of Ward's clustering of rows of `X` with Euclidean
+    distance using the nearest-neighbour chain on cluster centroids.
+
+    The memory used is linear in the number of rows. Heights are the same
+    as in `scipy.cluster.hierarchy.linkage` with `method="ward"`.
+
+    Returns merges as :obj:`nn_chain`.
+    """
+    cdef:
+        Py_ssize_t n = X.shape[0], m = X.shape[1]
+        np.ndarray[np.float64_t, ndim=2] merges_arr = np.empty((n - 1, 3))
+        np.ndarray[np.float64_t, ndim=2] centroids_arr = np.array(X)
+        np.ndarray[np.int64_t] size_arr = np.ones(n, dtype=np.int64)
+        np.ndarray[np.int64_t] chain_arr = np.empty(n, dtype=np.int64)
+        np.float64_t[:, :] merges = merges_arr
+        np.float64_t[:, :] centroids = centroids_arr
+        np.int64_t[:] size = size_arr
+        np.int64_t[:] chain = chain_arr
+        Py_ssize_t k, i, d, x = 0, y = 0, chain_length = 0
+        np.int64_t nx, ny
+        double current_min, dist
+
+    with nogil:
+        for k in range(n - 1):
+            if chain_length == 0:
+                for i in range(n):
+                    if size[i] > 0:
+                        chain[0] = i
+                        chain_length = 1
+                        break
+            while True:
+                x = chain[chain_length - 1]
+                if chain_length > 1:
+                    y = chain[chain_length - 2]
+                    current_min = _ward_distance(centroids, size, x, y, m)
+                else:
+                    current_min = INFINITY
+                for i in range(n):
+                    if size[i] == 0 or i == x:
+                        continue
+                    dist = _ward_distance(centroids, size, x, i, m)
+                    if dist < current_min:
+                        current_min = dist
+                        y = i
+                if chain_length > 1 and y == chain[chain_length - 2]:
+                    break
+                chain[chain_length] = y
+                chain_length += 1
+
+            chain_length -= 2
+            if x > y:
+                x, y = y, x
+            nx, ny = size[x], size[y]
+            merges[k, 0] = x
+            merges[k, 1] = y
+            merges[k, 2] = sqrt(current_min)
+            for d in range(m):
+                centroids[y, d] = \
+                    (nx * centroids[x, d] + ny * centroids[y, d]) / (nx + ny)
+            size[x] = 0
+            size[y] = nx + ny
+    return merges_arr
+
+
+cdef inline double _ward_distance(np.float64_t[:, :] centroids,
+                                  np.int64_t[:] size, Py_ssize_t a,
+                                  Py_ssize_t b, Py_ssize_t m) nogil:
+    # squared increase of the within-cluster variance, times 2
+    cdef:
+        Py_ssize_t d
+        double diff, dist = 0
+    for d in range(m):
+        diff = centroids[a, d] - centroids[b, d]
+        dist += diff * diff
+    return 2. * size[a] * size[b] / (size[a] + size[b]) * dist
+
+
+def mst_single(np.float64_t[:, :] X):
+    """
+    Compute merges of single linkage clustering of rows of `X` with
+    Euclidean distance from the minimum spanning tree, computed with Prim's
+    algorithm in memory that is linear in the number of rows.
+
+    Returns merges as :obj:`nn_chain`.
+    """
+    cdef:
+        Py_ssize_t n = X.shape[0], m = X.shape[1]
+        np.ndarray[np.float64_t, ndim=2] merges_arr = np.empty((n - 1, 3))
+        np.ndarray[np.float64_t] best_arr = np.full(n, np.inf)
+        np.ndarray[np.int64_t] parent_arr = np.zeros(n, dtype=np.int64)
+        np.ndarray[np.int8_t] in_tree_arr = np.zeros(n, dtype=np.int8)
+        np.float64_t[:, :] merges = merges_arr
+        np.float64_t[:] best = best_arr
+        np.int64_t[:] parent = parent_arr
+        np.int8_t[:] in_tree = in_tree_arr
+        Py_ssize_t k, i, d, current = 0, closest
+        double dist, diff, closest_dist
+
+    with nogil:
+        in_tree[0] = 1
+        for k in range(n - 1):
+            closest = -1
+            closest_dist = INFINITY
+            for i in range(n):
+                if in_tree[i]:
+                    continue
+                dist = 0
+                for d in range(m):
+                    diff = X[current, d] - X[i, d]
+                    dist += diff * diff
+                if dist < best[i]:
+                    best[i] = dist
+                    parent[i] = current
+                if best[i] < closest_dist or closest == -1:
+                    closest_dist = best[i]
+                    closest = i
+            in_tree[closest] = 1
+            merges[k, 0] = parent[closest]
+            merges[k, 1] = closest
+            merges[k, 2] = sqrt(closest_dist)
+            current = closest
+    return merges_arr
+
+
+def label_merges(np.float64_t[:, :] merges, Py_ssize_t n):
+    """
+    Return a linkage matrix in the format of `scipy.cluster.hierarchy`
+    for merges, sorted by heights, of clusters given by any of their rows.
+    """
+    cdef:
+        np.ndarray[np.float64_t, ndim=2] Z_arr = np.empty((n - 1, 4))
+        np.ndarray[np.int64_t] parent_arr = np.arange(2 * n - 1,
+                                                      dtype=np.int64)
+        np.ndarray[np.int64_t] size_arr = np.ones(2 * n - 1, dtype=np.int64)
+        np.float64_t[:, :] Z = Z_arr
+        np.int64_t[:] parent = parent_arr
+        np.int64_t[:] size = size_arr
+        Py_ssize_t k
+        np.int64_t a, b
+
+    with nogil:
+        for k in range(n - 1):
+            a = _find(parent, <np.int64_t>merges[k, 0])
+            b = _find(parent, <np.int64_t>merges[k, 1])
+            if a > b:
+                a, b = b, a
+            Z[k, 0] = a
+            Z[k, 1] = b
+            Z[k, 2] = merges[k, 2]
+            Z[k, 3] = size[a] + size[b]
+            size[n + k] = size[a] + size[b]
+            parent[a] = n + k
+            parent[b] = n + k
+    return Z_arr
+
+
+cdef inline np.int64_t _find(np.int64_t[:] parent, np.int64_t x) nogil:
+    cdef np.int64_t root = x, next_
+    while parent[root] != root:
+        root = parent[root]
+    # path compression
+    while parent[x] != root:
+        next_ = parent[x]
+        parent[x] = root
+        x = next_
+    return root
+
+
+def leaf_ranges(np.int64_t[:, :] children):
+    """
+    Return the order of leaves in the tree given by `children` of internal
+    nodes, and the first position of each node's leaves in this order and
+    the number of its leaves.
+    """
+    cdef:
+        Py_ssize_t n = children.shape[0] + 1, k
+        np.ndarray[np.int64_t] first_arr = np.zeros(2 * n - 1, dtype=np.int64)
+        np.ndarray[np.int64_t] sizes_arr = np.ones(2 * n - 1, dtype=np.int64)
+        np.ndarray[np.int64_t] order_arr = np.empty(n, dtype=np.int64)
+        np.int64_t[:] first = first_arr
+        np.int64_t[:] sizes = sizes_arr
+        np.int64_t[:] order = order_arr
+        np.int64_t left, right, node
+
+    with nogil:
+        for k in range(n - 1):
+            sizes[n + k] = sizes[children[k, 0]] + sizes[children[k, 1]]
+        for k in range(n - 2, -1, -1):
+            node = n + k
+            left, right = children[k, 0], children[k, 1]
+            first[left] = first[node]
+            first[right] = first[node] + sizes[left]
+        for k in range(n):
+            order[first[k]] = k
+    return order_arr, first_arr, sizes_arr
+
+
+def node_depths(np.int64_t[:, :] children):
+    """
+    Return depths of nodes in the tree given by `children` of internal
+    nodes; the root's depth is 0.
+    """
+    cdef:
+        Py_ssize_t n = children.shape[0] + 1, k
+        np.ndarray[np.int64_t] depths_arr = np.zeros(2 * n - 1, dtype=np.int64)
+        np.int64_t[:] depths = depths_arr
+
+    with nogil:
+        for k in range(n - 2, -1, -1):
+            depths[children[k, 0]] = depths[n + k] + 1
+            depths[children[k, 1]] = depths[n + k] + 1
+    return depths_arr
@@ -0,0 +1,118 @@
+#cython: embedsignature=True
+#cython: infer_types=True
+#cython: cdivision=True
+#cython: boundscheck=False
+#cython: wraparound=False
+#cython: language_level=3
+
+import numpy as np
+cimport numpy as np
+
+
+def one_level(np.int64_t[:] indptr, np.int64_t[:] indices,
+              np.float64_t[:] weights, double resolution,
+              np.int64_t[:] order, double min_increase=1e-7):
+    """
+    Run the local moving phase of the Louvain method on a symmetric graph in
+    CSR format.
+
+    Nodes are visited in the given order and moved to the neighbouring
+    community with the largest gain in modularity, until a pass over all
+    nodes improves the modularity by less than `min_increase`.
+
+    Returns a tuple with community indices (0, 1, ...) of nodes and the
+    modularity of the partition.
+    """
+    cdef:
+        Py_ssize_t n = indptr.shape[0] - 1
+        Py_ssize_t i, ii, j, p, t, n_neigh, moves
+        np.int64_t ci, c, best
+        double m2 = 0, gain, best_gain, modularity, new_modularity
+        np.ndarray[np.float64_t] degrees_arr = np.zeros(n)
+        np.ndarray[np.float64_t] totals_arr
+        np.ndarray[np.float64_t] neigh_weights_arr = np.full(n, -1.)
+        np.ndarray[np.int64_t] community_arr = np.arange(n, dtype=np.int64)
+        np.ndarray[np.int64_t] neigh_comms_arr = np.empty(n, dtype=np.int64)
+        np.float64_t[:] degrees = degrees_arr
+        np.float64_t[:] totals
+        np.float64_t[:] neigh_weights = neigh_weights_arr
+        np.int64_t[:] community = community_arr
+        np.int64_t[:] neigh_comms = neigh_comms_arr
+
+    for i in range(n):
+        for p in range(indptr[i], indptr[i + 1]):
+            degrees[i] += weights[p]
+        m2 += degrees[i]
+    if m2 == 0:
+        return community_arr, 0.
+    totals_arr = degrees_arr.copy()
+    totals = totals_arr
+
+    modularity = _modularity(indptr, indices, weights, community, totals,
+                             m2, resolution)
+    while True:
+        moves = 0
+        with nogil:
+            for ii in range(n):
+                i = order[ii]
+                ci = community[i]
+                # sum weights of edges to each neighbouring community
+                neigh_weights[ci] = 0
+                neigh_comms[0] = ci
+                n_neigh = 1
+                for p in range(indptr[i], indptr[i + 1]):
+                    j = indices[p]
+                    if j == i:
+                        continue
+                    c = community[j]
+                    if neigh_weights[c] < 0:
+                        neigh_weights[c] = 0
+                        neigh_comms[n_neigh] = c
+                        n_neigh += 1
+                    neigh_weights[c] += weights[p]
+
+                totals[ci] -= degrees[i]
+                best = ci
+                best_gain = \
+                    neigh_weights[ci] - resolution * totals[ci] * degrees[i] / m2
+                for t in range(n_neigh):
+                    c = neigh_comms[t]
+                    gain = \
+                        neigh_weights[c] - resolution * totals[c] * degrees[i] / m2
+                    if gain > best_gain:
+                        best_gain = gain
+                        best = c
+                    neigh_weights[c] = -1
+                totals[best] += degrees[i]
+                if best != ci:
+                    community[i] = best
+                    moves += 1
+        if moves == 0:
+            break
+        new_modularity = _modularity(indptr, indices, weights, community,
+                                     totals, m2, resolution)
+        if new_modularity - modularity < min_increase:
+            modularity = new_modularity
+            break
+        modularity = new_modularity
+
+    _, labels = np.unique(community_arr, return_inverse=True)
+    return labels, modularity
+
+
+cdef double _modularity(np.int64_t[:] indptr, np.int64_t[:] indices,
+                        np.float64_t[:] weights, np.int64_t[:] community,
+                        np.float64_t[:] totals, double m2, double resolution):
+    cdef:
+        Py_ssize_t n = indptr.shape[0] - 1
+        Py_ssize_t i, p
+        double internal = 0, expected = 0
+
+    with nogil:
+        for i in range(n):
+            for p in range(indptr[i], indptr[i + 1]):
+                if community[indices[p]] == community[i]:
+                    internal += weights[p]
+            # totals of empty communities are 0
+            expected += totals[i] * totals[i]
+    return internal / m2 - resolution * expected / (m2 * m2)
@@ -30,15 +30,7 @@ class ClusteringModel:
             if isinstance(data, Instance):
                 data = Table.from_list(data.domain, [data])
                 one_d = True
-            if data.domain != self.domain:
-                if self.original_domain.attributes != data.domain.attributes \
-                        and data.X.size \
-                        and not np.isnan(data.X).all():
-                    data = data.transform(self.original_domain)
-                    if np.isnan(data.X).all():
-                        raise DomainTransformationError(
-                            "domain transformation produced no defined values")
-                data = data.transform(self.domain)
+            data = self.data_to_model_domain(data)
             prediction = self.predict(data.X)
         elif isinstance(data, (list, tuple)):
             if not isinstance(data[0], (list, tuple)):
@@ -53,6 +45,19 @@ class ClusteringModel:
 
         return fix_dim(prediction)
 
+    def data_to_model_domain(self, data):
+        """Transform data into the domain of the (preprocessed) model."""
+        if data.domain != self.domain:
+            if self.original_domain.attributes != data.domain.attributes \
+                    and data.X.size \
+                    and not np.isnan(data.X).all():
+                data = data.transform(self.original_domain)
+                if np.isnan(data.X).all():
+                    raise DomainTransformationError(
+                        "domain transformation produced no defined values")
+            data = data.transform(self.domain)
+        return data
+
     def predict(self, X):
         raise NotImplementedError(
             "This clustering algorithm does not support predicting.")
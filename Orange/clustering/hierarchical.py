@@ -10,6 +10,7 @@ import numpy
 import scipy.cluster.hierarchy
 import scipy.spatial.distance
 
+from Orange.clustering import _hierarchical
 from Orange.distance import Euclidean, PearsonR
 
 __all__ = ['HierarchicalClustering']
@@ -22,6 +23,14 @@ COMPLETE = "complete"
 WEIGHTED = "weighted"
 WARD = "ward"
 
+_LINKAGE_CODES = {SINGLE: 0, COMPLETE: 1, AVERAGE: 2, WEIGHTED: 3, WARD: 4}
+
+#: Matrices with more rows are clustered in single precision, in place
+NN_CHAIN_THRESHOLD = 10000
+
+#: The number of rows of distances computed at once in `data_linkage`
+DISTANCES_BLOCK_SIZE = 1000
+
 
 def condensedform(X, mode="upper"):
     X = numpy.asarray(X)
@@ -31,7 +40,14 @@ def condensedform(X, mode="upper"):
     N = X.shape[0]
 
     if mode == "upper":
-        i, j = numpy.triu_indices(N, k=1)
+        # copy by rows; indices of the triangle would take 8 times more
+        # memory than the result
+        condensed = numpy.empty(N * (N - 1) // 2, dtype=X.dtype)
+        start = 0
+        for i in range(N - 1):
+            condensed[start:start + N - i - 1] = X[i, i + 1:]
+            start += N - i - 1
+        return condensed
     elif mode == "lower":
         i, j = numpy.tril_indices(N, k=-1)
     else:
@@ -88,14 +104,86 @@ def dist_matrix_linkage(matrix, linkage=AVERAGE):
     """
     Return linkage using a precomputed distance matrix.
 
+    Matrices with more than :obj:`NN_CHAIN_THRESHOLD` rows are clustered
+    with :obj:`condensed_linkage` in single precision.
+
     :param Orange.misc.DistMatrix matrix:
     :param str linkage:
     """
     # Extract compressed upper triangular distance matrix.
+    if len(matrix) > NN_CHAIN_THRESHOLD:
+        distances = condensedform(numpy.asarray(matrix, dtype=numpy.float32))
+        return condensed_linkage(distances, linkage=linkage)
     distances = condensedform(matrix)
     return scipy.cluster.hierarchy.linkage(distances, method=linkage)
 
 
+def condensed_linkage(distances, linkage=AVERAGE):
+    """
+    Return linkage for a condensed distance matrix in single precision.
+
+    Clusters are merged with the nearest-neighbour chain algorithm, which
+    overwrites `distances` instead of copying them.
+
+    :param numpy.ndarray distances: condensed distances of type float32
+    :param str linkage: single, complete, average, weighted or ward
+    """
+    if linkage not in _LINKAGE_CODES:
+        raise ValueError("unsupported linkage: {}".format(linkage))
+    distances = numpy.ascontiguousarray(distances, dtype=numpy.float32)
+    n = int(numpy.ceil(numpy.sqrt(len(distances) * 2)))
+    if n * (n - 1) // 2 != len(distances):
+        raise ValueError("invalid size of a condensed distance matrix")
+    if n < 2:
+        return numpy.empty((0, 4))
+    merges = _hierarchical.nn_chain(distances, n, _LINKAGE_CODES[linkage])
+    return _linkage_from_merges(merges, n)
+
+
+def data_linkage(X, linkage=AVERAGE, metric="euclidean"):
+    """
+    Return linkage of rows of `X` without storing all distances in memory
+    when possible.
+
+    Single and Ward linkage with Euclidean distance are computed in feature
+    space, in memory linear in the number of rows. Other combinations
+    compute condensed distances in single precision by blocks of rows and
+    cluster them with :obj:`condensed_linkage`.
+
+    :param numpy.ndarray X: data
+    :param str linkage: single, complete, average, weighted or ward
+    :param str metric: a metric supported by `scipy.spatial.distance.cdist`
+    """
+    X = numpy.asarray(X, dtype=float)
+    assert len(X.shape) == 2
+    n = len(X)
+    if n < 2:
+        return numpy.empty((0, 4))
+    if metric == "euclidean" and linkage in (SINGLE, WARD):
+        X = numpy.ascontiguousarray(X)
+        if linkage == SINGLE:
+            merges = _hierarchical.mst_single(X)
+        else:
+            merges = _hierarchical.ward_chain(X)
+        return _linkage_from_merges(merges, n)
+
+    distances = numpy.empty(n * (n - 1) // 2, dtype=numpy.float32)
+    start = 0
+    for block in range(0, n - 1, DISTANCES_BLOCK_SIZE):
+        block_dist = scipy.spatial.distance.cdist(
+            X[block:block + DISTANCES_BLOCK_SIZE], X[block:], metric)
+        for row, i in enumerate(range(block, min(block + DISTANCES_BLOCK_SIZE,
+                                                 n - 1))):
+            distances[start:start + n - i - 1] = block_dist[row, row + 1:]
+            start += n - i - 1
+    return condensed_linkage(distances, linkage=linkage)
+
+
+def _linkage_from_merges(merges, n):
+    merges = merges[numpy.argsort(merges[:, 2], kind="stable")]
+    return _hierarchical.label_merges(merges, n)
+
+
 def dist_matrix_clustering(matrix, linkage=AVERAGE):
     """
     Return the hierarchical clustering using a precomputed distance matrix.
@@ -128,7 +216,21 @@ class Tree(object):
         return self.__hash
 
     def __eq__(self, other):
-        return isinstance(other, Tree) and tuple(self) == tuple(other)
+        if not isinstance(other, Tree):
+            return False
+        # compare without recursion, which would fail on deep trees
+        stack = [(self, other)]
+        while stack:
+            first, second = stack.pop()
+            if first is second:
+                continue
+            if not isinstance(second, Tree) \
+                    or first.__hash != second.__hash \
+                    or first.value != second.value \
+                    or len(first.branches) != len(second.branches):
+                return False
+            stack.extend(zip(first.branches, second.branches))
+        return True
 
     def __lt__(self, other):
         if not isinstance(other, Tree):
@@ -198,56 +300,117 @@ def tree_from_linkage(linkage):
     """
     scipy.cluster.hierarchy.is_valid_linkage(
         linkage, throw=True, name="linkage")
-    T = {}
-    N, _ = linkage.shape
-    N = N + 1
-    order = []
-    for i, (c1, c2, d, _) in enumerate(linkage):
-        if c1 < N:
-            left = Tree(SingletonData(range=(len(order), len(order) + 1),
-                                      height=0.0, index=int(c1)),
-                        ())
-            order.append(c1)
-        else:
-            left = T[c1]
+    return LinkageTree(linkage).to_tree()
 
-        if c2 < N:
-            right = Tree(SingletonData(range=(len(order), len(order) + 1),
-                                       height=0.0, index=int(c2)),
-                         ())
-            order.append(c2)
-        else:
-            right = T[c2]
-
-        t = Tree(ClusterData(range=(left.value.first, right.value.last),
-                             height=d),
-                 (left, right))
-        T[N + i] = t
-
-    root = T[N + N - 2]
-    T = {}
 
-    leaf_idx = 0
-    for node in postorder(root):
-        if node.is_leaf:
-            T[node] = Tree(
-                node.value._replace(range=(leaf_idx, leaf_idx + 1)), ())
-            leaf_idx += 1
-        else:
-            left, right = T[node.left].value, T[node.right].value
-            assert left.first < right.first
+class LinkageTree:
+    """
+    Array-based representation of a clustering encoded in a linkage matrix.
+
+    Leaves `0, ..., n - 1` are data instances and node `n + i` is the
+    cluster formed in the `i`-th merge, as in the linkage matrix. Unlike
+    :obj:`Tree`, the representation takes a few arrays of size `n`, so it is
+    suitable for large data; :obj:`prune` builds a :obj:`Tree` of only the
+    top part of the clustering.
+
+    Attributes:
+        linkage (np.ndarray): linkage matrix
+        n_leaves (int): the number of data instances
+        children (np.ndarray): children of internal nodes, one row per merge
+        heights (np.ndarray): heights of all nodes; 0 for leaves
+        order (np.ndarray): data instances in the order of leaves
+        ranges (np.ndarray): for each node, the first position of its leaves
+            in `order` and the position after the last
+    """
+    def __init__(self, linkage):
+        linkage = numpy.asarray(linkage, dtype=float)
+        n = len(linkage) + 1
+        self.linkage = linkage
+        self.n_leaves = n
+        self.children = \
+            numpy.ascontiguousarray(linkage[:, :2], dtype=numpy.int64)
+        self.heights = numpy.hstack((numpy.zeros(n), linkage[:, 2]))
+        self.order, first, sizes = _hierarchical.leaf_ranges(self.children)
+        self.ranges = numpy.column_stack((first, first + sizes))
 
-            t = Tree(
-                node.value._replace(range=(left.range[0], right.range[1])),
-                tuple(T[ch] for ch in node.branches)
-            )
-            assert t.value.range[0] <= t.value.range[-1]
-            assert left.first == t.value.first and right.last == t.value.last
-            assert t.value.first < right.first
-            assert t.value.last > left.last
-            T[node] = t
+    @property
+    def root(self):
+        """Index of the root node"""
+        return 2 * self.n_leaves - 2
+
+    def leaves(self, node):
+        """Return indices of data instances in the cluster"""
+        first, last = self.ranges[node]
+        return self.order[first:last]
+
+    def depths(self):
+        """Return depths of nodes; the depth of the root is 0"""
+        return _hierarchical.node_depths(self.children)
+
+    def top_clusters(self, k):
+        """
+        Return nodes of `k` topmost clusters, in the order of leaves.
+
+        The clusters are those remaining after undoing the last `k - 1`
+        merges, which are the highest for linkages that never decrease.
+        """
+        n = self.n_leaves
+        k = min(k, n)
+        if k <= 1:
+            return numpy.array([self.root])
+        nodes = self.children[n - k:].ravel()
+        nodes = nodes[nodes < 2 * n - k]
+        return nodes[numpy.argsort(self.ranges[nodes, 0])]
+
+    def cut(self, k):
+        """
+        Return labels of data instances for `k` topmost clusters (see
+        :obj:`top_clusters`).
+        """
+        labels = numpy.empty(self.n_leaves, dtype=int)
+        for i, (first, last) in enumerate(self.ranges[self.top_clusters(k)]):
+            labels[self.order[first:last]] = i
+        return labels
+
+    def prune(self, level=None, height=None):
+        """
+        Return a :obj:`Tree` without clusters deeper than `level` or lower
+        than `height`; see :obj:`Orange.clustering.hierarchical.prune`.
+        """
+        n = self.n_leaves
+        children = self.children.tolist()
+        heights = self.heights.tolist()
+        ranges = self.ranges.tolist()
+        depths = self.depths().tolist() if level is not None else None
+
+        def pruned(node):
+            return level is not None and depths[node] >= level \
+                or height is not None and heights[node] <= height
+
+        # nodes in the order of visits from the top
+        nodes = [self.root]
+        for node in nodes:
+            if node >= n and not pruned(node):
+                nodes += children[node - n]
+
+        T = {}
+        for node in reversed(nodes):
+            first, last = ranges[node]
+            if node < n:
+                T[node] = Tree(SingletonData(range=(first, last), height=0.0,
+                                             index=node), ())
+            else:
+                value = ClusterData(range=(first, last), height=heights[node])
+                if pruned(node):
+                    T[node] = Tree(value, ())
+                else:
+                    left, right = children[node - n]
+                    T[node] = Tree(value, (T[left], T[right]))
+        return T[self.root]
 
-    return T[root]
+    def to_tree(self):
+        """Return a :obj:`Tree` with the entire clustering"""
+        return self.prune()
 
 
 def linkage_from_tree(tree: Tree) -> numpy.ndarray:
@@ -316,7 +479,8 @@ def prune(cluster, level=None, height=None, condition=None):
     """
     Prune the clustering instance ``cluster``.
 
-    :param Tree cluster: Cluster root node to prune.
+    :param cluster: Cluster root node to prune.
+    :type cluster: Tree or LinkageTree
     :param int level: If not `None` prune all clusters deeper then `level`.
     :param float height:
         If not `None` prune all clusters with height lower then `height`.
@@ -332,6 +496,11 @@ def prune(cluster, level=None, height=None, condition=None):
     if not any(arg is not None for arg in [level, height, condition]):
         raise ValueError("At least one pruning argument must be supplied")
 
+    if isinstance(cluster, LinkageTree):
+        if condition is not None:
+            raise ValueError("Condition can not be used with LinkageTree")
+        return cluster.prune(level=level, height=height)
+
     level_check = height_check = condition_check = lambda cl: False
 
     if level is not None:
@@ -381,11 +550,16 @@ def top_clusters(tree, k):
     """
     Return `k` topmost clusters from hierarchical clustering.
 
-    :param Tree root: Root cluster.
+    :param tree: Root cluster.
+    :type tree: Tree or LinkageTree
     :param int k: Number of top clusters.
 
-    :rtype: list of :class:`Tree` instances
+    :rtype: list of :class:`Tree` instances, or node indices for
+        :class:`LinkageTree`
     """
+    if isinstance(tree, LinkageTree):
+        return tree.top_clusters(k)
+
     def item(node):
         return ((node.is_leaf, -node.value.height), node)
 
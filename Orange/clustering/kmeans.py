@@ -1,12 +1,21 @@
 import warnings
 
+import numpy as np
+import scipy.sparse as sp
 import sklearn.cluster
+from sklearn.metrics import silhouette_samples, silhouette_score
+from sklearn.utils.extmath import row_norms
 
 from Orange.clustering.clustering import Clustering, ClusteringModel
 from Orange.data import Table
 
 
-__all__ = ["KMeans"]
+__all__ = ["KMeans", "MiniBatchKMeans", "KMeansSweep"]
+
+#: Data with more instances is clustered with mini-batch k-means
+MINIBATCH_THRESHOLD = 50000
+#: Silhouettes of larger data are estimated from a sample of this size
+SILHOUETTE_SAMPLE_SIZE = 5000
 
 
 class KMeansModel(ClusteringModel):
@@ -15,6 +24,9 @@ class KMeansModel(ClusteringModel):
         super().__init__(projector)
         self.centroids = projector.cluster_centers_
         self.k = projector.get_params()["n_clusters"]
+        # number of instances assigned to each centroid; used as
+        # per-centroid learning rates in incremental (mini-batch) updates
+        self.counts = np.bincount(projector.labels_, minlength=self.k)
 
     def predict(self, X):
         return self.projector.predict(X)
@@ -37,6 +49,257 @@ class KMeans(Clustering):
             preprocessors, {k: v for k, v in vars().items()
                             if k != "compute_silhouette_score"})
 
+    def partial_fit(self, model, data):
+        """
+        Update centroids with a chunk of data (mini-batch k-means).
+
+        If `model` is None, a new model is fitted on `data`; preprocessors
+        are fitted on this first chunk and are then frozen.
+
+        Each instance of the chunk moves its nearest centroid towards
+        itself with a learning rate inversely proportional to the number
+        of instances assigned to the centroid so far.
+
+        Parameters
+        ----------
+        model : KMeansModel or None
+            A model returned by a previous call, or None for the first chunk
+        data : Table
+            A chunk of data
+
+        Returns
+        -------
+        model : KMeansModel
+            A new model or the given model, updated in place
+        """
+        if model is None:
+            return self.get_model(data)
+        X = model.data_to_model_domain(data).X
+        if not X.shape[0]:
+            return model
+        centroids = model.projector.cluster_centers_
+        labels = model.predict(X)
+        batch_counts = np.bincount(labels, minlength=model.k)
+        counts = model.counts + batch_counts
+        assigned = batch_counts > 0
+        # sums of instances assigned to each centroid
+        assignment = sp.csr_matrix(
+            (np.ones(len(labels)), (labels, np.arange(len(labels)))),
+            shape=(model.k, len(labels)))
+        sums = assignment @ X
+        if sp.issparse(sums):
+            sums = sums.toarray()
+        centroids[assigned] += (
+            sums[assigned] - batch_counts[assigned, None] * centroids[assigned]
+        ) / counts[assigned, None]
+        model.counts = counts
+        return model
+
+
+class MiniBatchKMeans(Clustering):
+
+    __wraps__ = sklearn.cluster.MiniBatchKMeans
+    __returns__ = KMeansModel
+
+    def __init__(self, n_clusters=8, init='k-means++', n_init=3, max_iter=100,
+                 batch_size=1024, tol=0.0, random_state=None,
+                 preprocessors=None):
+        super().__init__(preprocessors, vars())
+
+
+class KMeansSweep:
+    """
+    Fit k-means with different numbers of clusters on the same data.
+
+    The data is expected to be preprocessed; it is stored, together with
+    squared norms of instances, and shared by all fits. Data with more than
+    `minibatch_threshold` instances is clustered with mini-batch k-means.
+
+    With warm start, centroids for k clusters are initialized with centroids
+    for a smaller number of clusters, to which new centroids are added with
+    the k-means++ rule, and k-means is run only once instead of `n_init`
+    times. By default, warm start is used only with mini-batch k-means.
+
+    Silhouettes of data with at most `silhouette_sample_size` instances are
+    exact; for larger data, they are either estimated on a sample, which is
+    the same for all k, or, if `simplified_silhouette` is set, computed for
+    all instances from distances to centroids instead of to other instances.
+
+    Parameters
+    ----------
+    data : Table
+        Preprocessed data
+    init, n_init, max_iter, tol, random_state :
+        Parameters of k-means (see `KMeans`)
+    warm_start : bool or None
+        Initialize centroids from fits with fewer clusters; if None, warm
+        start is used with mini-batch k-means
+    minibatch_threshold : int
+        The number of instances above which mini-batch k-means is used
+    batch_size : int
+        The size of batches for mini-batch k-means
+    silhouette_sample_size : int
+        The number of instances above which silhouettes are estimated
+    simplified_silhouette : bool
+        Estimate silhouettes from distances to centroids
+    """
+    chunk_size = 65536  #: Number of rows for which distances are computed at once
+
+    def __init__(self, data, init='k-means++', n_init=10, max_iter=300,
+                 tol=0.0001, random_state=0, warm_start=None,
+                 minibatch_threshold=MINIBATCH_THRESHOLD, batch_size=1024,
+                 silhouette_sample_size=SILHOUETTE_SAMPLE_SIZE,
+                 simplified_silhouette=False):
+        self.data = data
+        self.X = data.X if sp.issparse(data.X) \
+            else np.ascontiguousarray(data.X, dtype=float)
+        self.init = init
+        self.n_init = n_init
+        self.max_iter = max_iter
+        self.tol = tol
+        self.random_state = random_state
+        self.minibatch = len(data) > minibatch_threshold
+        self.warm_start = self.minibatch if warm_start is None else warm_start
+        self.batch_size = batch_size
+        self.silhouette_sample_size = silhouette_sample_size
+        self.simplified_silhouette = simplified_silhouette
+        self._sq_norms = row_norms(self.X, squared=True)
+        self._silhouette_sample = None
+
+    def fit(self, k, previous=None):
+        """
+        Fit k-means with `k` clusters and compute silhouettes.
+
+        Silhouettes are stored in the model's attributes `silhouette`, the
+        average, and `silhouette_samples`, silhouettes of instances, which
+        is None if the silhouettes were estimated on a sample.
+
+        Parameters
+        ----------
+        k : int
+            The number of clusters
+        previous : KMeansModel or None
+            A model with fewer clusters, used to initialize centroids if
+            warm start is enabled
+
+        Returns
+        -------
+        model : KMeansModel
+        """
+        if self.warm_start and previous is not None and previous.k < k:
+            init, n_init = self._extend_centroids(previous.centroids, k), 1
+        else:
+            init, n_init = self.init, self.n_init
+        if self.minibatch:
+            learner = MiniBatchKMeans(
+                n_clusters=k, init=init, n_init=n_init,
+                max_iter=self.max_iter, batch_size=self.batch_size,
+                random_state=self.random_state, preprocessors=[])
+        else:
+            learner = KMeans(
+                n_clusters=k, init=init, n_init=n_init,
+                max_iter=self.max_iter, tol=self.tol,
+                random_state=self.random_state, preprocessors=[])
+        model = learner.fit(self.X)
+        model.domain = model.original_domain = self.data.domain
+        self._set_silhouette(model)
+        return model
+
+    def sweep(self, ks):
+        """
+        Fit models for the given numbers of clusters in increasing order.
+
+        Yields pairs `(k, model)`; if fitting fails, `model` is the exception.
+        """
+        previous = None
+        for k in sorted(ks):
+            try:
+                previous = self.fit(k, previous)
+            except Exception as ex:  # pylint: disable=broad-except
+                yield k, ex
+            else:
+                yield k, previous
+
+    def _chunks(self):
+        return (slice(start, start + self.chunk_size)
+                for start in range(0, self.X.shape[0], self.chunk_size))
+
+    def _sq_distances(self, rows, centroids):
+        dist = self.X[rows] @ centroids.T
+        if sp.issparse(dist):
+            dist = dist.toarray()
+        dist = np.asarray(dist)
+        dist *= -2
+        dist += self._sq_norms[rows, None]
+        dist += row_norms(centroids, squared=True)
+        return np.maximum(dist, 0, out=dist)
+
+    def _extend_centroids(self, centroids, k):
+        # greedy k-means++ rule: for each new centroid, sample a few
+        # instances with probabilities proportional to squared distances to
+        # the closest existing centroid, and take the one that most reduces
+        # the sum of these distances
+        rgen = np.random.RandomState(self.random_state)
+        n_trials = 2 + int(np.log(k))
+        closest = np.empty(self.X.shape[0])
+        for rows in self._chunks():
+            closest[rows] = self._sq_distances(rows, centroids).min(axis=1)
+        new = []
+        for _ in range(k - len(centroids)):
+            cumulative = np.cumsum(closest)
+            if cumulative[-1] > 0:
+                indices = np.searchsorted(
+                    cumulative, rgen.uniform(size=n_trials) * cumulative[-1])
+                indices = np.minimum(indices, len(closest) - 1)
+            else:
+                indices = rgen.randint(len(closest), size=n_trials)
+            candidates = self.X[indices]
+            if sp.issparse(candidates):
+                candidates = candidates.toarray()
+            updated = np.empty((n_trials, len(closest)))
+            for rows in self._chunks():
+                np.minimum(closest[rows, None],
+                           self._sq_distances(rows, candidates),
+                           out=updated[:, rows].T)
+            best = np.argmin(updated.sum(axis=1))
+            new.append(candidates[best:best + 1])
+            closest = updated[best]
+        return np.vstack([centroids] + new)
+
+    def _set_silhouette(self, model):
+        n = self.X.shape[0]
+        if n <= self.silhouette_sample_size:
+            model.silhouette_samples = \
+                silhouette_samples(self.data.X, model.labels)
+            model.silhouette = np.mean(model.silhouette_samples)
+        elif self.simplified_silhouette:
+            model.silhouette_samples = self._simplified_silhouette(model)
+            model.silhouette = np.mean(model.silhouette_samples)
+        else:
+            if self._silhouette_sample is None:
+                # the same sample as in silhouette_score with the same seed
+                rows = np.random.RandomState(self.random_state) \
+                    .permutation(n)[:self.silhouette_sample_size]
+                self._silhouette_sample = rows, self.data.X[rows]
+            rows, sample = self._silhouette_sample
+            model.silhouette_samples = None
+            model.silhouette = silhouette_score(sample, model.labels[rows])
+
+    def _simplified_silhouette(self, model):
+        labels = model.labels
+        scores = np.empty(len(labels))
+        for rows in self._chunks():
+            dist = np.sqrt(self._sq_distances(rows, model.centroids))
+            own_labels = labels[rows]
+            indices = np.arange(len(dist))
+            own = dist[indices, own_labels]
+            dist[indices, own_labels] = np.inf
+            other = dist.min(axis=1)
+            denom = np.maximum(own, other)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                scores[rows] = np.where(denom > 0, (other - own) / denom, 0)
+        return scores
+
 
 if __name__ == "__main__":
     d = Table("iris")
@@ -6,18 +6,27 @@ https://sites.google.com/site/findcommunities/
 """
 
 import numpy as np
+import scipy.sparse as sp
 import networkx as nx
-# NOTE: The ``community`` package might be renamed in the near future, see
-# GH issue https://github.com/taynaud/python-louvain/issues/23
-from community import best_partition
 from sklearn.base import BaseEstimator
 from sklearn.neighbors import NearestNeighbors
+from sklearn.utils import check_random_state
 
+from Orange.clustering import _louvain
 from Orange.clustering.clustering import Clustering
 from Orange.data import Table
 
+try:
+    import pynndescent
+except ImportError:  # pragma: no cover
+    pynndescent = None
 
-__all__ = ["Louvain", "matrix_to_knn_graph"]
+
+__all__ = ["Louvain", "matrix_to_knn_graph", "knn_graph",
+           "louvain_partition"]
+
+#: The number of rows for which shared neighbours are counted at once
+KNN_GRAPH_BLOCK_SIZE = 10000
 
 
 def jaccard(x, y):
@@ -26,23 +35,38 @@ def jaccard(x, y):
     return len(x & y) / len(x | y)
 
 
-def matrix_to_knn_graph(data, k_neighbors, metric, progress_callback=None):
-    """Convert data matrix to a graph using a nearest neighbors approach with
-    the Jaccard similarity as the edge weights.
+def nearest_neighbors(data, k_neighbors, metric, approximate=False,
+                      random_state=None):
+    """Return indices of `k_neighbors` nearest neighbours of each row of
+    `data`; each row is usually its own nearest neighbour.
 
     Parameters
     ----------
-    data : np.ndarray
+    data : np.ndarray or scipy.sparse.spmatrix
     k_neighbors : int
     metric : str
-        A distance metric supported by sklearn.
-    progress_callback : Callable[[float], None]
+        A distance metric supported by sklearn (or by pynndescent, if
+        `approximate` is set).
+    approximate : bool
+        Use approximate search with nearest neighbour descent; this requires
+        package pynndescent.
+    random_state : Union[int, RandomState, None]
+        Random state for approximate search
 
     Returns
     -------
-    nx.Graph
-
+    np.ndarray of shape (len(data), k_neighbors)
     """
+    if approximate:
+        if pynndescent is None:
+            raise ImportError(
+                "Approximate nearest neighbours require package pynndescent")
+        metric = {"l2": "euclidean", "l1": "manhattan"}.get(metric, metric)
+        index = pynndescent.NNDescent(
+            data, n_neighbors=k_neighbors, metric=metric,
+            random_state=random_state)
+        return index.neighbor_graph[0]
+
     # We do k + 1 because each point is closest to itself, which is not useful
     if metric == "cosine":
         # Cosine distance on row-normalized data has the same ranking as
@@ -52,51 +76,155 @@ def matrix_to_knn_graph(data, k_neighbors, metric, progress_callback=None):
         data = data / np.linalg.norm(data, axis=1)[:, None]
         metric = "euclidean"
     knn = NearestNeighbors(n_neighbors=k_neighbors, metric=metric).fit(data)
-    nearest_neighbors = knn.kneighbors(data, return_distance=False)
-    # Convert to list of sets so jaccard can be computed efficiently
-    nearest_neighbors = list(map(set, nearest_neighbors))
-    num_nodes = len(nearest_neighbors)
+    return knn.kneighbors(data, return_distance=False)
+
+
+def knn_graph(data, k_neighbors, metric, approximate=False, random_state=None,
+              progress_callback=None):
+    """Convert data matrix to a symmetric adjacency matrix of the graph of
+    nearest neighbors, with the Jaccard similarity between the sets of nearest
+    neighbors as the edge weights.
 
-    # Create an empty graph and add all the data ids as nodes for easy mapping
-    graph = nx.Graph()
-    graph.add_nodes_from(range(len(data)))
+    Nodes are connected if one is among the nearest neighbors of the other.
+    Sizes of intersections of sets of neighbors are computed as products of
+    the sparse matrix indicating the neighbors with its transpose, in blocks
+    of rows.
 
-    for idx, node in enumerate(graph.nodes):
+    Parameters
+    ----------
+    data : np.ndarray or scipy.sparse.spmatrix
+    k_neighbors : int
+    metric : str
+        A distance metric supported by sklearn.
+    approximate : bool
+        Use approximate nearest neighbours (see `nearest_neighbors`)
+    random_state : Union[int, RandomState, None]
+        Random state for approximate search
+    progress_callback : Callable[[float], None]
+
+    Returns
+    -------
+    sp.csr_matrix
+    """
+    neighbors = nearest_neighbors(data, k_neighbors, metric, approximate,
+                                  random_state)
+    n, k = neighbors.shape
+    indicator = sp.csr_matrix(
+        (np.ones(n * k), neighbors.ravel(), np.arange(0, n * k + 1, k)),
+        shape=(n, n))
+    indicator.sum_duplicates()
+    edges = (indicator + indicator.T).tocsr()
+    edges.sort_indices()
+    sizes = np.diff(indicator.indptr)
+    weights = np.empty(edges.nnz)
+    indicator_t = indicator.T.tocsr()
+    for start in range(0, n, KNN_GRAPH_BLOCK_SIZE):
         if progress_callback:
-            progress_callback(idx / num_nodes)
+            progress_callback(start / n)
+        stop = min(start + KNN_GRAPH_BLOCK_SIZE, n)
+        shared = (indicator[start:stop] @ indicator_t).tocsr()
+        lo, hi = edges.indptr[start], edges.indptr[stop]
+        rows = np.repeat(np.arange(stop - start),
+                         np.diff(edges.indptr[start:stop + 1]))
+        cols = edges.indices[lo:hi]
+        common = np.asarray(shared[rows, cols]).ravel()
+        weights[lo:hi] = \
+            common / (sizes[start + rows] + sizes[cols] - common)
+    return sp.csr_matrix((weights, edges.indices, edges.indptr), shape=(n, n))
+
+
+def matrix_to_knn_graph(data, k_neighbors, metric, progress_callback=None):
+    """Convert data matrix to a graph using a nearest neighbors approach with
+    the Jaccard similarity as the edge weights.
+
+    The graph is constructed from the adjacency matrix returned by
+    `knn_graph`; use the latter directly for large data.
+
+    Parameters
+    ----------
+    data : np.ndarray
+    k_neighbors : int
+    metric : str
+        A distance metric supported by sklearn.
+    progress_callback : Callable[[float], None]
+
+    Returns
+    -------
+    nx.Graph
+
+    """
+    adjacency = knn_graph(data, k_neighbors, metric,
+                          progress_callback=progress_callback)
+    return nx.from_scipy_sparse_array(adjacency)
 
-        for neighbor in nearest_neighbors[node]:
-            graph.add_edge(
-                node,
-                neighbor,
-                weight=jaccard(
-                    nearest_neighbors[node], nearest_neighbors[neighbor]),
-            )
 
-    return graph
+def louvain_partition(adjacency, resolution=1.0, random_state=None):
+    """Find communities in a graph with the Louvain method.
+
+    Each level moves nodes between communities to increase modularity and
+    then merges the communities into nodes of a smaller graph, until the
+    modularity no longer increases.
+
+    Parameters
+    ----------
+    adjacency : sp.spmatrix
+        A symmetric matrix of edge weights
+    resolution : float
+        Larger values give smaller communities
+    random_state : Union[int, RandomState, None]
+        Random state for the order in which nodes are visited
+
+    Returns
+    -------
+    np.ndarray with indices of communities
+    """
+    rgen = check_random_state(random_state)
+    adjacency = sp.csr_matrix(adjacency, dtype=np.float64)
+    labels = np.arange(adjacency.shape[0])
+    modularity = -np.inf
+    while True:
+        level, new_modularity = _louvain.one_level(
+            adjacency.indptr.astype(np.int64),
+            adjacency.indices.astype(np.int64), adjacency.data, resolution,
+            rgen.permutation(adjacency.shape[0]).astype(np.int64))
+        n_communities = level.max(initial=-1) + 1
+        if new_modularity - modularity < 1e-7 \
+                or n_communities == adjacency.shape[0]:
+            if new_modularity > modularity:
+                labels = level[labels]
+            return labels
+        modularity = new_modularity
+        labels = level[labels]
+        membership = sp.csr_matrix(
+            (np.ones(len(level)), (np.arange(len(level)), level)),
+            shape=(len(level), n_communities))
+        adjacency = (membership.T @ adjacency @ membership).tocsr()
 
 
 class LouvainMethod(BaseEstimator):
 
     def __init__(self, k_neighbors=30, metric="l2", resolution=1.0,
-                 random_state=None):
+                 random_state=None, approximate=False):
         self.k_neighbors = k_neighbors
         self.metric = metric
         self.resolution = resolution
         self.random_state = random_state
+        self.approximate = approximate
         self.labels_ = None
 
     def fit(self, X: np.ndarray, y: np.ndarray = None):
         # If we are given a table, we have to convert it to a graph first
-        graph = matrix_to_knn_graph(
-            X, metric=self.metric, k_neighbors=self.k_neighbors)
+        graph = knn_graph(
+            X, metric=self.metric, k_neighbors=self.k_neighbors,
+            approximate=self.approximate, random_state=self.random_state)
         return self.fit_graph(graph)
 
     def fit_graph(self, graph):
-        partition = best_partition(
+        if isinstance(graph, nx.Graph):
+            graph = nx.to_scipy_sparse_array(
+                graph, nodelist=sorted(graph.nodes), format="csr")
+        self.labels_ = louvain_partition(
             graph, resolution=self.resolution, random_state=self.random_state)
-        self.labels_ = np.fromiter(
-            list(zip(*sorted(partition.items())))[1], dtype=int)
         return self
 
 
@@ -127,16 +255,20 @@ class Louvain(Clustering):
         number generator. If the value is a RandomState instance, then it will
         be used as the random number generator. If the value is None, the random
         number generator is the RandomState instance used by `np.random`.
+
+    approximate : bool
+        Use approximate nearest neighbors for the KNN graph (requires package
+        pynndescent).
     """
 
     __wraps__ = LouvainMethod
 
     def __init__(self, k_neighbors=30, metric="l2", resolution=1.0,
-                 random_state=None, preprocessors=None):
+                 random_state=None, preprocessors=None, approximate=False):
         super().__init__(preprocessors, vars())
 
     def get_model(self, data):
-        if isinstance(data, nx.Graph):
+        if isinstance(data, (nx.Graph, sp.spmatrix)):
             return self.__returns__(
                 self.__wraps__(**self.params).fit_graph(data))
         else:
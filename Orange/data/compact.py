@@ -0,0 +1,229 @@
+"""
+Compact storage of attribute values and meta attributes.
+
+Values of discrete variables are stored as unsigned 8- or 16-bit codes, with
+the largest value of the type denoting a missing value. Values of string
+variables are dictionary-encoded: each distinct string is stored once, and
+the column contains its index. Other columns are stored as float64. Columns
+are kept in separate arrays, so selecting rows or columns and computing
+statistics of a single column does not require constructing the entire
+matrix.
+
+Tables with compact storage (see :obj:`Orange.data.Table.to_compact`)
+construct `X` and `metas` only when they are accessed.
+"""
+import numpy as np
+import pandas as pd
+
+__all__ = ["CompactColumns", "code_dtype", "missing_code", "encode", "decode",
+           "encode_strings", "count_codes", "contingency_codes"]
+
+
+def code_dtype(n_values):
+    """
+    Return the smallest unsigned integer type for codes of a variable with
+    `n_values` values, or `None` if the variable has too many values.
+    """
+    for dtype in (np.uint8, np.uint16):
+        if n_values < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return None
+
+
+def missing_code(dtype):
+    """Return the code that denotes a missing value in codes of `dtype`."""
+    return np.iinfo(dtype).max
+
+
+def encode(values, n_values):
+    """Return codes for a float column with indices of values."""
+    codes = np.full(len(values), missing_code(code_dtype(n_values)),
+                    dtype=code_dtype(n_values))
+    known = ~np.isnan(values)
+    codes[known] = values[known]
+    return codes
+
+
+def decode(codes, dtype=np.float64):
+    """Return a float column with indices of values and `nan`'s."""
+    values = codes.astype(dtype)
+    values[codes == missing_code(codes.dtype)] = np.nan
+    return values
+
+
+def encode_strings(values):
+    """
+    Return indices of values into an array of distinct values, and this
+    array; `None` and `nan` are encoded as distinct values.
+    """
+    codes, distinct = pd.factorize(values)
+    missing = codes < 0
+    if missing.any():
+        # pandas treats both as missing
+        is_none = np.fromiter((value is None for value in values[missing]),
+                              dtype=bool, count=np.count_nonzero(missing))
+        codes[missing] = np.where(is_none, len(distinct), len(distinct) + 1)
+        distinct = np.append(distinct.astype(object),
+                             np.array([None, np.nan], dtype=object))
+    distinct = np.asarray(distinct, dtype=object)
+    return codes.astype(np.min_scalar_type(len(distinct))), distinct
+
+
+def count_codes(codes, n_values, weights=None):
+    """
+    Return the (weighted) counts of values and the number of missing values
+    in the same format as :obj:`Orange.statistics.util.bincount`.
+    """
+    missing = missing_code(codes.dtype)
+    counts = np.bincount(codes, weights=weights, minlength=missing + 1)
+    return counts[:n_values].astype(float), float(counts[missing])
+
+
+def contingency_codes(codes, n_values, y, n_classes, weights=None):
+    """
+    Return the contingency of codes and class values `y` (a float column
+    with `nan`'s) in the same format as
+    :obj:`Orange.statistics.util.contingency` for a single column: the
+    contingency matrix with a row for each class, missing values for each
+    class, missing classes for each value and the number of instances with
+    both missing.
+    """
+    # missing values and classes are counted in the last column and row
+    x = np.minimum(codes, n_values).astype(np.intp)
+    y_nan = np.isnan(y)
+    y = np.where(y_nan, n_classes, y).astype(np.intp)
+    counts = np.bincount(y * (n_values + 1) + x, weights=weights,
+                         minlength=(n_classes + 1) * (n_values + 1))
+    counts = counts.reshape(n_classes + 1, n_values + 1).astype(float)
+    return (counts[:n_classes, :n_values], counts[:n_classes, n_values],
+            counts[n_classes, :n_values], counts[n_classes, n_values])
+
+
+class CompactColumns:
+    """
+    Values stored column by column; columns of discrete variables are stored
+    as codes (see :obj:`encode`), columns of string variables as indices
+    into arrays of distinct strings (see :obj:`encode_strings`), and others
+    as float64.
+
+    Columns are read-only, so instances can be shared between tables.
+
+    Attributes:
+        columns (tuple of np.ndarray): columns
+        n_rows (int): number of rows
+        values (dict): arrays of distinct strings for indices of
+            dictionary-encoded columns
+    """
+    def __init__(self, columns, n_rows, values=None):
+        self.columns = tuple(columns)
+        self.n_rows = n_rows
+        self.values = values or {}
+        for column in self.columns:
+            column.flags.writeable = False
+
+    @classmethod
+    def from_array(cls, X, variables):
+        """
+        Construct columns from a dense array of values of `variables`; the
+        array can be of type object, like `metas`.
+        """
+        columns = []
+        values = {}
+        for i, var in enumerate(variables):
+            col = X[:, i]
+            if var.is_string:
+                col, values[i] = encode_strings(col)
+                columns.append(col)
+            elif var.is_discrete and code_dtype(len(var.values)) is not None:
+                columns.append(encode(col.astype(float), len(var.values)))
+            else:
+                columns.append(col.astype(np.float64))
+        return cls(columns, X.shape[0], values)
+
+    def __len__(self):
+        return self.n_rows
+
+    @property
+    def shape(self):
+        return self.n_rows, len(self.columns)
+
+    @property
+    def nbytes(self):
+        return sum(column.nbytes for column in self.columns) \
+            + sum(values.nbytes + sum(len(value) for value in values
+                                      if isinstance(value, str))
+                  for values in self.values.values())
+
+    def codes(self, index):
+        """
+        Return codes of the column of a discrete variable, or `None` if the
+        column is not coded.
+        """
+        column = self.columns[index]
+        if column.dtype.kind == "u" and index not in self.values:
+            return column
+        return None
+
+    def strings(self, index):
+        """
+        Return a tuple with indices and distinct strings for a
+        dictionary-encoded column, or `None` for other columns.
+        """
+        if index in self.values:
+            return self.columns[index], self.values[index]
+        return None
+
+    def column(self, index, dtype=np.float64):
+        """
+        Return a column; codes of discrete values are decoded into floats,
+        and strings of dictionary-encoded columns are returned as objects.
+        """
+        column = self.columns[index]
+        if index in self.values:
+            return self.values[index][column]
+        if column.dtype.kind == "u":
+            if np.dtype(dtype) == object:
+                # floats, as in metas of tables that are not compact
+                return decode(column).astype(object)
+            return decode(column, dtype)
+        return column.astype(dtype)
+
+    def to_array(self, dtype=np.float64):
+        """Return a dense array with all columns."""
+        X = np.empty(self.shape, dtype=dtype)
+        for i in range(len(self.columns)):
+            X[:, i] = self.column(i, dtype)
+        return X
+
+    def count_nans(self):
+        """Return the number of missing values in each column."""
+        def count(index, column):
+            if index in self.values:
+                missing = np.array([value is None or value == ""
+                                    or value != value  # nan
+                                    for value in self.values[index]],
+                                   dtype=bool)
+                return np.count_nonzero(missing[column])
+            if column.dtype.kind == "u":
+                return np.count_nonzero(column == missing_code(column.dtype))
+            return np.isnan(column).sum()
+
+        return np.array([count(index, column)
+                         for index, column in enumerate(self.columns)],
+                        dtype=int)
+
+    def take(self, row_indices):
+        """Return columns with the given rows."""
+        if row_indices is ...:
+            return self
+        n_rows = np.arange(self.n_rows)[row_indices].size
+        return CompactColumns(
+            [column[row_indices] for column in self.columns], n_rows,
+            self.values)
+
+    def select(self, col_indices):
+        """Return the given columns."""
+        return CompactColumns(
+            [self.columns[i] for i in col_indices], self.n_rows,
+            {new: self.values[old] for new, old in enumerate(col_indices)
+             if old in self.values})
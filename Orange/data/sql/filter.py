@@ -31,7 +31,8 @@ class SameValueSql(filter.SameValue):
 class ValuesSql(filter.Values):
     def to_sql(self):
         aggregator = " AND " if self.conjunction else " OR "
-        sql = aggregator.join(c.to_sql() for c in self.conditions)
+        # some conditions (e.g. "x <> 1 OR x IS NULL") need parentheses
+        sql = aggregator.join("(%s)" % c.to_sql() for c in self.conditions)
         if self.negate:
             sql = 'NOT (%s)' % sql
         return sql if self.conjunction else '({})'.format(sql)
@@ -501,6 +501,11 @@ class SqlTable(Table):
         return t2
 
     def _filter_same_value(self, column, value, negate=False):
+        t2 = self.copy()
+        t2.row_filters += (self._sql_same_value(column, value, negate),)
+        return t2
+
+    def _sql_same_value(self, column, value, negate):
         var = self.domain[column]
         if value is None:
             pass
@@ -509,14 +514,31 @@ class SqlTable(Table):
             value = "'%s'" % var.repr_val(value)
         else:
             pass
+        return sql_filter.SameValueSql(var.to_sql(), value, negate)
+
+    def _filter_values(self, f):
         t2 = self.copy()
-        t2.row_filters += \
-            (sql_filter.SameValueSql(var.to_sql(), value, negate),)
+        t2.row_filters += (self._sql_values_filter(f),)
         return t2
 
-    def _filter_values(self, f):
+    def _sql_values_filter(self, f):
+        # translate (nested) conditions into a single WHERE clause
         conditions = []
         for cond in f.conditions:
+            if isinstance(cond, filter.Values):
+                conditions.append(self._sql_values_filter(cond))
+                continue
+            if isinstance(cond, filter.IsDefined):
+                columns = cond.columns
+                if columns is None:
+                    columns = range(len(self.domain.variables))
+                conditions.append(sql_filter.IsDefinedSql(
+                    [self.domain[i].to_sql() for i in columns], cond.negate))
+                continue
+            if isinstance(cond, filter.SameValue):
+                conditions.append(self._sql_same_value(
+                    cond.column, cond.value, cond.negate))
+                continue
             var = self.domain[cond.column]
             if isinstance(cond, filter.FilterDiscrete):
                 if cond.values is None:
@@ -549,11 +571,9 @@ class SqlTable(Table):
             else:
                 raise ValueError('Invalid condition %s' % type(cond))
             conditions.append(new_condition)
-        t2 = self.copy()
-        t2.row_filters += (sql_filter.ValuesSql(conditions=conditions,
-                                                conjunction=f.conjunction,
-                                                negate=f.negate),)
-        return t2
+        return sql_filter.ValuesSql(conditions=conditions,
+                                    conjunction=f.conjunction,
+                                    negate=f.negate)
 
     @classmethod
     def from_table(cls, domain, source, row_indices=...):
@@ -655,6 +675,9 @@ class SqlTable(Table):
     def checksum(self, include_metas=True):
         return np.nan
 
+    def fingerprint(self, include_metas=True):
+        return None
+
     def __get_nan_frequency(self, columns):
         try:
             query = self._sql_query([" + ".join([f"COUNT(*) - COUNT({col.to_sql()})"
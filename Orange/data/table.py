@@ -1,11 +1,15 @@
+import hashlib
+import io
+import itertools
 import operator
 import os
+import pickle
 import sys
 import threading
 import warnings
 import weakref
-import zlib
 from collections.abc import Iterable, Sequence, Sized
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from copy import deepcopy
 from functools import reduce
@@ -26,6 +30,8 @@ from Orange.data import (
     Domain, Variable, Storage, StringVariable, Unknown, Value, Instance,
     ContinuousVariable, DiscreteVariable, MISSING_VALUES,
     DomainConversion)
+from Orange.data.compact import CompactColumns, count_codes, \
+    contingency_codes
 from Orange.data.util import SharedComputeValue, \
     assure_array_dense, assure_array_sparse, \
     assure_column_dense, assure_column_sparse, get_unique_names_duplicates
@@ -218,6 +224,50 @@ def _compute_column(func, *args, **kwargs):
     return col
 
 
+class _RowView:
+    """
+    Rows of an array that may be shared with other tables, given by indices
+    into the array (see :obj:`Table.LAZY_ROWS`).
+
+    Attributes:
+        base (np.ndarray or sp.spmatrix): the shared array
+        indices (np.ndarray): indices of rows
+    """
+    def __init__(self, base, indices):
+        self.base = base
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def take(self, row_indices):
+        """Return a view of the given rows."""
+        return _RowView(self.base, self.indices[row_indices])
+
+    def column(self, index):
+        """Return a column of selected rows."""
+        return self.base[self.indices, index]
+
+    def to_array(self):
+        """Return an array with selected rows."""
+        return self.base[self.indices]
+
+    def shares(self, buffers):
+        """Return `True` if the base uses any of the given buffers (ids)."""
+        return any(id(buffer) in buffers for buffer in _buffers(self.base))
+
+
+def _part_rows(source, part, row_indices):
+    # the array from which to take the rows of `part`, and indices of rows;
+    # lazy rows are taken directly from the shared array
+    view = source._row_view if part == "X" else source._row_view_metas
+    if view is None:
+        return getattr(source, part), row_indices
+    if row_indices is ...:
+        return view.base, view.indices
+    return view.base, view.indices[row_indices]
+
+
 class _ArrayConversion:
     def __init__(self, target, src_cols, variables, is_sparse, source_domain):
         self.target = target
@@ -233,6 +283,14 @@ class _ArrayConversion:
         self.row_selection_needed = any(not isinstance(x, Integral)
                                         for x in src_cols)
 
+    def target_dtype(self, source):
+        # the precision of a table is that of its X; tables with float32
+        # attributes keep float32 attributes and class values
+        if self.dtype is not object and self.target != "metas" \
+                and _x_dtype(source) == np.float32:
+            return np.float32
+        return self.dtype
+
     def _can_copy_all(self, src_cols, source_domain):
         n_src_attrs = len(source_domain.attributes)
         if all(isinstance(x, Integral) and 0 <= x < n_src_attrs
@@ -248,16 +306,33 @@ class _ArrayConversion:
         n_rows = _selection_length(row_indices, len(source))
         if not len(self.src_cols):
             if self.is_sparse:
-                return sp.csr_matrix((n_rows, 0), dtype=source.X.dtype)
+                return sp.csr_matrix((n_rows, 0), dtype=_x_dtype(source))
             else:
-                return np.zeros((n_rows, 0), dtype=source.X.dtype)
+                return np.zeros((n_rows, 0), dtype=_x_dtype(source))
 
         match_density = assure_array_sparse if self.is_sparse else assure_array_dense
         n_src_attrs = len(source.domain.attributes)
-        if self.subarray_from == "X":
-            arr = match_density(_subarray(source.X, row_indices, self.src_cols))
+        if self.subarray_from == "X" and source.is_compact():
+            # attributes of compact tables remain compact
+            columns = source.compact_columns.select(self.src_cols) \
+                .take(_optimize_indices(row_indices, len(source)))
+            if self.target == "X" and not self.is_sparse:
+                return columns
+            arr = match_density(columns.to_array())
+        elif self.subarray_from == "X":
+            X, rows = _part_rows(source, "X", row_indices)
+            arr = match_density(_subarray(X, rows, self.src_cols))
+        elif self.subarray_from == "metas" \
+                and source.compact_metas is not None:
+            columns = source.compact_metas.select(
+                [-1 - x for x in self.src_cols]) \
+                .take(_optimize_indices(row_indices, len(source)))
+            if self.target == "metas" and not self.is_sparse:
+                return columns
+            arr = match_density(columns.to_array(self.dtype))
         elif self.subarray_from == "metas":
-            arr = match_density(_subarray(source.metas, row_indices,
+            metas, rows = _part_rows(source, "metas", row_indices)
+            arr = match_density(_subarray(metas, rows,
                                           [-1 - x for x in self.src_cols]))
         elif self.subarray_from == "Y":
             Y = source.Y if source.Y.ndim == 2 else source.Y[:, None]
@@ -266,8 +341,9 @@ class _ArrayConversion:
                 [x - n_src_attrs for x in self.src_cols]))
         else:
             assert False
-        if arr.dtype != self.dtype:
-            arr = arr.astype(self.dtype)
+        dtype = self.target_dtype(source)
+        if arr.dtype != dtype:
+            arr = arr.astype(dtype)
         assert arr.ndim == 2 or self.subarray_from == "Y" and arr.ndim == 1
         return arr
 
@@ -282,13 +358,21 @@ class _ArrayConversion:
 
         # converting to csc before instead of each column is faster
         # do not convert if not required
+        compact = source.compact_columns
+        compact_metas = source.compact_metas
+        X_rows = metas_rows = row_indices
         if any(isinstance(x, int) for x in self.src_cols):
-            X = source.X
+            X = None
+            if compact is None:
+                X, X_rows = _part_rows(source, "X", row_indices)
             Y = source.Y
             if Y.ndim == 1:
                 Y = Y[:, None]
             if self.is_sparse:
-                X = csc_matrix(X)
+                if X is not None and X_rows is not row_indices:
+                    # convert only the rows of a lazy selection
+                    X, X_rows = X[X_rows], slice(None)
+                X = None if X is None else csc_matrix(X)
                 Y = csc_matrix(Y)
 
         if self.row_selection_needed:
@@ -297,6 +381,7 @@ class _ArrayConversion:
             else:
                 sourceri = source[row_indices]
 
+        metas = None
         shared_cache = _thread_local.conversion_cache
         for i, col in enumerate(self.src_cols):
             if col is None:
@@ -313,12 +398,20 @@ class _ArrayConversion:
                         _compute_column(col, sourceri, shared_data=shared))
                 else:
                     col_array = match_density(_compute_column(col, sourceri))
+            elif col < 0 and compact_metas is not None:
+                col_array = match_density(
+                    compact_metas.select([-1 - col]).take(row_indices)
+                    .column(0))
             elif col < 0:
+                if metas is None:
+                    metas, metas_rows = \
+                        _part_rows(source, "metas", row_indices)
+                col_array = match_density(metas[metas_rows, -1 - col])
+            elif col < n_src_attrs and compact is not None:
                 col_array = match_density(
-                    source.metas[row_indices, -1 - col]
-                )
+                    compact.select([col]).take(row_indices).column(0))
             elif col < n_src_attrs:
-                col_array = match_density(X[row_indices, col])
+                col_array = match_density(X[X_rows, col])
             else:
                 col_array = match_density(
                     Y[row_indices, col - n_src_attrs]
@@ -332,9 +425,9 @@ class _ArrayConversion:
         if self.results_inplace:
             return out
         else:
-            return self.join_columns(data)
+            return self.join_columns(data, self.target_dtype(source))
 
-    def join_columns(self, data):
+    def join_columns(self, data, dtype):
         if self.is_sparse:
             # creating csr directly would need plenty of manual work which
             # would probably slow down the process - conversion coo to csr
@@ -350,7 +443,7 @@ class _ArrayConversion:
             out = sp.coo_matrix(
                 (np.hstack(coo_data), (np.hstack(coo_row), np.hstack(coo_col))),
                 shape=(n_rows, len(self.src_cols)),
-                dtype=self.dtype
+                dtype=dtype
             )
             return out.tocsr()
 
@@ -360,14 +453,14 @@ class _ArrayConversion:
         else:
             return parts
 
-    def init_partial_results(self, n_rows):
+    def init_partial_results(self, n_rows, dtype):
         if not self.results_inplace:
             return []  # list to store partial results
         else:  # a dense numpy array
             # F-order enables faster writing to the array while accessing and
             # matrix operations work with same speed (e.g. dot)
             return np.zeros((n_rows, len(self.src_cols)),
-                            order="F", dtype=self.dtype)
+                            order="F", dtype=dtype)
 
     def add_partial_result(self, parts, part):
         if not self.results_inplace:
@@ -412,7 +505,8 @@ class _FromTableConversion:
         parts = {}
 
         for array_conv in self.columnwise:
-            parts[array_conv.target] = array_conv.init_partial_results(n_rows)
+            parts[array_conv.target] = array_conv.init_partial_results(
+                n_rows, array_conv.target_dtype(source))
 
         if n_rows <= self.max_rows_at_once:
             for array_conv in self.columnwise:
@@ -459,11 +553,28 @@ class Table(Sequence, Storage):
     the same behaviour to distinguish the unchanged default (None) form
     explicit deactivation (False) that some add-ons might need. """
 
+    LAZY_ROWS = False
+    """ If the class attribute LAZY_ROWS is True, selecting rows by indices
+    or masks (`from_table_rows`, indexing and filters) returns a table that
+    keeps the source's X and metas with indices of selected rows instead of
+    copying them. Each part is copied when it is first accessed, while
+    single columns (`get_column`) and domain conversions only take the
+    selected rows. Selections from such tables combine the indices, so
+    chains of selections keep only indices.
+
+    Unlocking (see `unlocked`) the source's arrays for changes first copies
+    the selected rows into the tables that use them (copy-on-write), so
+    selections do not see later changes of the source. Changes made without
+    unlocking (possible only when `LOCKING` is disabled) are not tracked. """
+
+
     __file__ = None
     name = "untitled"
 
     domain = Domain([])
     _X = _Y = _metas = _W = np.zeros((0, 0))  # pylint: disable=invalid-name
+    _compact = _compact_metas = None
+    _row_view = _row_view_metas = None
     ids = np.zeros(0)
     ids.setflags(write=False)
     attributes = frozendict()
@@ -472,6 +583,9 @@ class Table(Sequence, Storage):
     _Unlocked_X_ref, _Unlocked_Y_ref, _Unlocked_metas_ref, _Unlocked_W_ref = 16, 32, 64, 128
     _unlocked = 0xff  # pylint: disable=invalid-name
 
+    _version = 0
+    _digests = frozendict()
+
     @property
     def columns(self):
         """
@@ -491,13 +605,96 @@ class Table(Sequence, Storage):
 
     @property
     def X(self):  # pylint: disable=invalid-name
+        if self._compact is not None:
+            self._expand_compact()
+        elif self._row_view is not None:
+            self._materialize_rows()
         return self._X
 
     @X.setter
     def X(self, value):
         self._check_unlocked(self._Unlocked_X_ref)
+        self._compact = None
+        self._row_view = None
         self._X = _dereferenced(value)
         self._update_locks()
+        self._set_modified()
+
+    @property
+    def compact_columns(self):
+        """
+        Attribute values in compact storage (see :obj:`to_compact`), or
+        `None` if the table stores them in `X`.
+        """
+        return self._compact
+
+    @property
+    def compact_metas(self):
+        """
+        Meta attributes in compact storage (see :obj:`to_compact`), or
+        `None` if the table stores them in `metas`.
+        """
+        return self._compact_metas
+
+    def is_compact(self):
+        """
+        Return `True` if the table stores attribute values compactly
+        """
+        return self._compact is not None
+
+    def _set_compact(self, columns):
+        self._X = None
+        self._compact = columns
+        self._set_modified()
+
+    def _set_compact_metas(self, columns):
+        self._metas = None
+        self._compact_metas = columns
+        self._set_modified()
+
+    def _expand_compact(self):
+        # legacy code needs X as a float matrix; once constructed, X
+        # replaces compact storage
+        self._X = self._compact.to_array()
+        self._compact = None
+        self._update_locks()
+
+    def _expand_compact_metas(self):
+        self._metas = self._compact_metas.to_array(object)
+        self._compact_metas = None
+        self._update_locks()
+
+    def is_lazy(self):
+        """
+        Return `True` if X or metas are lazily selected rows of another
+        table (see :obj:`LAZY_ROWS`)
+        """
+        return self._row_view is not None or self._row_view_metas is not None
+
+    def _set_row_views(self, X, metas):
+        self._X = None if X is not None else self._X
+        self._metas = None if metas is not None else self._metas
+        self._row_view, self._row_view_metas = X, metas
+        if self.is_lazy():
+            _lazy_tables.add(self)
+        self._set_modified()
+
+    def _materialize_rows(self, X=True, metas=False, buffers=None):
+        # copy the selected rows of X and/or metas; if `buffers` are given,
+        # only parts with rows of these buffers are copied
+        view = self._row_view
+        if X and view is not None \
+                and (buffers is None or view.shares(buffers)):
+            self._X = view.to_array()
+            self._row_view = None
+        view = self._row_view_metas
+        if metas and view is not None \
+                and (buffers is None or view.shares(buffers)):
+            self._metas = view.to_array()
+            self._row_view_metas = None
+        if not self.is_lazy():
+            _lazy_tables.discard(self)
+        self._update_locks()
 
     @property
     def Y(self):  # pylint: disable=invalid-name
@@ -514,16 +711,24 @@ class Table(Sequence, Storage):
             value = value[:, 0].copy()  # no views!
         self._Y = value
         self._update_locks()
+        self._set_modified()
 
     @property
     def metas(self):
+        if self._compact_metas is not None:
+            self._expand_compact_metas()
+        elif self._row_view_metas is not None:
+            self._materialize_rows(X=False, metas=True)
         return self._metas
 
     @metas.setter
     def metas(self, value):
         self._check_unlocked(self._Unlocked_metas_ref)
+        self._compact_metas = None
+        self._row_view_metas = None
         self._metas = _dereferenced(value)
         self._update_locks()
+        self._set_modified()
 
     @property
     def W(self):  # pylint: disable=invalid-name
@@ -534,6 +739,7 @@ class Table(Sequence, Storage):
         self._check_unlocked(self._Unlocked_W_ref)
         self._W = value
         self._update_locks()
+        self._set_modified()
 
     def __setstate__(self, state):
         # Backward compatibility with pickles before table locking
@@ -557,6 +763,18 @@ class Table(Sequence, Storage):
         # Compatibility with pickles before table locking:
         # return the same state as before table lock
         state = self.__dict__.copy()
+        compact = state.pop("_compact", None)
+        if compact is not None:
+            state["_X"] = compact.to_array()
+        compact = state.pop("_compact_metas", None)
+        if compact is not None:
+            state["_metas"] = compact.to_array(object)
+        view = state.pop("_row_view", None)
+        if view is not None:
+            state["_X"] = view.to_array()
+        view = state.pop("_row_view_metas", None)
+        if view is not None:
+            state["_metas"] = view.to_array()
         for k in ["X", "metas", "W"]:
             if "_" + k in state:  # Check existence; SQL tables do not contain them
                 state[k] = state.pop("_" + k)
@@ -566,6 +784,8 @@ class Table(Sequence, Storage):
             y2d = y.reshape(-1, 1) if y.ndim == 1 else y
             state["_Y"] = y2d
         state.pop("_unlocked", None)
+        state.pop("_version", None)
+        state.pop("_digests", None)
         return state
 
     def _lock_parts_val(self):
@@ -641,12 +861,103 @@ class Table(Sequence, Storage):
         for part, flag, _ in lock_parts:
             if not parts or any(ppart is part for ppart in parts):
                 self._unlocked |= flag
+        # Values can only be changed within this context; references are
+        # handled by setters
+        modified = () if reference_only else \
+            [part for part, _, _ in self._lock_parts_val()
+             if not parts or any(ppart is part for ppart in parts)]
+        _detach_row_views(modified)
+        if not Table.LOCKING:
+            _thaw(modified)
         try:
             forced_bases = self._update_locks(force)
+            self._set_modified(modified)
             yield
         finally:
             self._unlocked = prev_state
             self._update_locks(lock_bases=forced_bases)
+            self._set_modified(modified)
+
+    def _set_modified(self, parts=()):
+        version = next(_version_counter)
+        self._version = version
+        for part in parts:
+            _mark_buffers(part, version)
+
+    @property
+    def version(self):
+        """
+        A number that increases whenever the table's data may have changed.
+
+        The version changes when X, Y, metas or W are replaced and when
+        they are unlocked for in-place changes through this or any other
+        table that shares the same arrays. Changes made without unlocking
+        (possible only when `LOCKING` is disabled and only to arrays that
+        were not hashed by `fingerprint`) are not tracked.
+        """
+        return max([self._version]
+                   + [_buffers_version(part)
+                      for part, _, _ in self._lock_parts_val()])
+
+    def fingerprint(self, include_metas=True):
+        """
+        Return a digest of the table's content as a hexadecimal string.
+
+        The digest covers X, Y, W, metas (if `include_metas` is set) and
+        the types, names and values of variables. Tables with equal content
+        have equal fingerprints, regardless of the identity of arrays and
+        variables.
+
+        Digests of individual parts are cached and recomputed only after
+        the part is replaced or unlocked for changes (see `version`). If
+        `LOCKING` is disabled, hashed arrays are made read-only, so that
+        they are not changed without unlocking; `unlocked` makes them
+        writable again. Large arrays are hashed in blocks in parallel;
+        compact storage and lazily selected rows are hashed as the values
+        into which they would be expanded, block by block, without
+        constructing `X` or `metas`.
+        """
+        digests = dict(self._digests)
+        X, metas = self._X, self._metas
+        if self._compact is not None:
+            X = self._compact
+        elif self._row_view is not None:
+            X = self._row_view
+        if self._compact_metas is not None:
+            metas = self._compact_metas
+        elif self._row_view_metas is not None:
+            metas = self._row_view_metas
+        parts = [("X", X), ("Y", self._Y), ("W", self._W)]
+        if include_metas:
+            parts.append(("metas", metas))
+        digest = hashlib.sha256()
+        variables = self.domain.variables
+        if include_metas:
+            variables += self.domain.metas
+        # cached digests are stored with weak references to the parts
+        # from which they were computed
+        domain_key = ("domain", include_metas)
+        cached = digests.get(domain_key)
+        if cached is None or cached[0]() is not self.domain:
+            cached = digests[domain_key] = \
+                (weakref.ref(self.domain), 0, _variables_digest(variables))
+        digest.update(cached[2])
+        for name, part in parts:
+            version = _part_version(part)
+            cached = digests.get(name)
+            if cached is None or _deref(cached[0]) is not part \
+                    or cached[1] != version \
+                    or not (Table.LOCKING or _is_read_only(part)):
+                ref = None if part is None else weakref.ref(part)
+                compact_dtype = object if name == "metas" else np.float64
+                cached = digests[name] = \
+                    (ref, version, _part_digest(part, compact_dtype))
+                if not Table.LOCKING:
+                    _freeze(part)
+            digest.update(name.encode())
+            digest.update(cached[2])
+        self._digests = frozendict(digests)
+        return digest.hexdigest()
 
     def force_unlocked(self, *parts):
         """
@@ -826,9 +1137,17 @@ class Table(Sequence, Storage):
             # on the whole table, because this avoids needless copies of contents
 
             with self.unlocked_reference():
-                self.X, self.Y, self.metas = \
+                X, self.Y, metas = \
                     table_conversion.convert(source, row_indices,
                                              clear_cache_after_part=new_cache)
+                if isinstance(X, CompactColumns):
+                    self._set_compact(X)
+                else:
+                    self.X = X
+                if isinstance(metas, CompactColumns):
+                    self._set_compact_metas(metas)
+                else:
+                    self.metas = metas
                 self.W = source.W[row_indices]
                 self.name = getattr(source, 'name', '')
                 self.ids = source.ids[row_indices]
@@ -879,23 +1198,33 @@ class Table(Sequence, Storage):
         """
         self = cls()
         self.domain = source.domain
+        X_view, metas_view = _row_views(source, row_indices)
         with self.unlocked_reference():
-            self.X = source.X[row_indices]
-            if self.X.ndim == 1:
-                self.X = self.X.reshape(-1, len(self.domain.attributes))
+            if source.is_compact():
+                self._set_compact(source.compact_columns.take(row_indices))
+            elif X_view is None:
+                self.X = source.X[row_indices]
+                if self.X.ndim == 1:
+                    self.X = self.X.reshape(-1, len(self.domain.attributes))
             self.Y = source.Y[row_indices]
-            self.metas = source.metas[row_indices]
-            if self.metas.ndim == 1:
-                self.metas = self.metas.reshape(-1, len(self.domain.metas))
+            if source.compact_metas is not None:
+                self._set_compact_metas(
+                    source.compact_metas.take(row_indices))
+            elif metas_view is None:
+                self.metas = source.metas[row_indices]
+                if self.metas.ndim == 1:
+                    self.metas = self.metas.reshape(-1, len(self.domain.metas))
             self.W = source.W[row_indices]
             self.name = getattr(source, 'name', '')
             self.ids = source.ids[row_indices]
             self.attributes = deepcopy(getattr(source, 'attributes', {}))
+            if X_view is not None or metas_view is not None:
+                self._set_row_views(X_view, metas_view)
         return self
 
     @classmethod
     def from_numpy(cls, domain, X, Y=None, metas=None, W=None,
-                   attributes=None, ids=None):
+                   attributes=None, ids=None, dtype=None):
         """
         Construct a table from numpy arrays with the given domain. The number
         of variables in the domain must match the number of columns in the
@@ -912,9 +1241,25 @@ class Table(Sequence, Storage):
         :type metas: np.array
         :param W: array with weights
         :type W: np.array
+        :param dtype: type of attribute and class values, `np.float64` or
+            `np.float32`; by default, dense arrays are converted to float64
+            and sparse keep their type. Tables derived from tables with
+            float32 attributes (e.g. by `transform`) are also float32.
+        :type dtype: np.dtype
         :return:
         """
-        X, Y, W = _check_arrays(X, Y, W, dtype='float64')
+        if dtype is None:
+            X, Y, W = _check_arrays(X, Y, W, dtype='float64')
+        else:
+            dtype = np.dtype(dtype)
+            if dtype not in (np.float32, np.float64):
+                raise ValueError(
+                    f"values must be float32 or float64, not {dtype}")
+            X, Y = _check_arrays(X, Y, dtype=dtype)
+            X, Y = (arr.astype(dtype) if sp.issparse(arr) and arr.dtype != dtype
+                    else arr
+                    for arr in (X, Y))
+            W, = _check_arrays(W, dtype='float64', shape_1=X.shape[0])
         metas, = _check_arrays(metas, dtype=object, shape_1=X.shape[0])
         ids, = _check_arrays(ids, dtype=int, shape_1=X.shape[0])
 
@@ -923,7 +1268,7 @@ class Table(Sequence, Storage):
 
         if Y is None:
             if not domain.class_vars or sp.issparse(X):
-                Y = np.empty((X.shape[0], 0), dtype=np.float64)
+                Y = np.empty((X.shape[0], 0), dtype=dtype or np.float64)
             else:
                 own_data = X.flags.owndata and X.base is None
                 Y = X[:, len(domain.attributes):]
@@ -1141,7 +1486,7 @@ class Table(Sequence, Storage):
             attrs = domain.attributes
             if len(example) != len(domain.variables):
                 raise ValueError("invalid length")
-            if self._X.size:
+            if self.X.size:
                 self._X[row] = [var.to_val(val) for var, val in zip(attrs, example)]
             if self._Y.size:
                 if self._Y.ndim == 1:
@@ -1150,7 +1495,7 @@ class Table(Sequence, Storage):
                     self._Y[row] = [var.to_val(val)
                                     for var, val in zip(domain.class_vars,
                                                         example[len(attrs):])]
-            if self._metas.size:
+            if self.metas.size:
                 self.metas[row] = np.array([var.Unknown for var in domain.metas],
                                        dtype=object)
 
@@ -1301,10 +1646,14 @@ class Table(Sequence, Storage):
                     else:
                         self._Y[row_idx, class_cols] = value
             if len(meta_cols):
-                if self._metas.size:
+                if self.metas.size:
                     self.metas[row_idx, meta_cols] = value
 
     def __len__(self):
+        if self._compact is not None:
+            return len(self._compact)
+        if self._row_view is not None:
+            return len(self._row_view)
         return self.X.shape[0]
 
     def __str__(self):
@@ -1386,12 +1735,14 @@ class Table(Sequence, Storage):
         if any(table.domain != domain for table in tables):
             raise ValueError('concatenated tables must have the same domain')
 
+        X, Y = vstack(collect("X")), merge1d(collect("Y"))
         conc = cls.from_numpy(
             domain,
-            vstack(collect("X")),
-            merge1d(collect("Y")),
+            X,
+            Y,
             vstack(collect("metas")),
-            merge1d(collect("W"))
+            merge1d(collect("W")),
+            dtype=_values_dtype(X, Y)
         )
         conc.ids = np.hstack([t.ids for t in tables])
         return conc
@@ -1419,7 +1770,8 @@ class Table(Sequence, Storage):
 
         parts = all_of(doms, ("attributes", "class_vars", "metas"))
         domain = Domain(*(tuple(chain(*lst)) for lst in parts))
-        return cls.from_numpy(domain, Xs, Ys, Ms, W, ids=tables[0].ids)
+        return cls.from_numpy(domain, Xs, Ys, Ms, W, ids=tables[0].ids,
+                              dtype=_values_dtype(Xs, Ys))
 
     def add_column(self, variable, data, to_metas=None):
         """
@@ -1454,7 +1806,10 @@ class Table(Sequence, Storage):
         """
         Return `True` if the table stores data in sparse format
         """
-        return any(sp.issparse(i) for i in [self._X, self._Y, self._metas])
+        X = self._X if self._row_view is None else self._row_view.base
+        metas = self._metas if self._row_view_metas is None \
+            else self._row_view_metas.base
+        return any(sp.issparse(i) for i in [X, self._Y, metas])
 
     def ensure_copy(self):
         """
@@ -1462,6 +1817,8 @@ class Table(Sequence, Storage):
         """
 
         def is_view(x):
+            if x is None:
+                return False
             if not sp.issparse(x):
                 return x.base is not None
             else:
@@ -1558,16 +1915,10 @@ class Table(Sequence, Storage):
         return self.__get_nan_frequency(self.Y)
 
     def checksum(self, include_metas=True):
-        # TODO: zlib.adler32 does not work for numpy arrays with dtype object
-        # (after pickling and unpickling such arrays, checksum changes)
-        # Why, and should we fix it or remove it?
-        """Return a checksum over X, Y, metas and W."""
-        cs = zlib.adler32(np.ascontiguousarray(self._X))
-        cs = zlib.adler32(np.ascontiguousarray(self._Y), cs)
-        if include_metas:
-            cs = zlib.adler32(np.ascontiguousarray(self._metas), cs)
-        cs = zlib.adler32(np.ascontiguousarray(self._W), cs)
-        return cs
+        """Return a checksum over X, Y, metas and W.
+
+        The checksum is a 32-bit integer derived from `fingerprint`."""
+        return int(self.fingerprint(include_metas)[:8], 16)
 
     def shuffle(self):
         """Randomly shuffle the rows of the table."""
@@ -1656,7 +2007,18 @@ class Table(Sequence, Storage):
                 mapper = index.get_mapper_from(self.domain[index])
             index = self.domain.index(index)
 
-        col = self._get_column_view(index)
+        if self._compact is not None \
+                and 0 <= index < len(self.domain.attributes):
+            col = self._compact.column(index)
+        elif self._compact_metas is not None and index < 0:
+            col = self._compact_metas.column(-1 - index)
+        elif self._row_view is not None \
+                and 0 <= index < len(self.domain.attributes):
+            col = self._row_view.column(index)
+        elif self._row_view_metas is not None and index < 0:
+            col = self._row_view_metas.column(-1 - index)
+        else:
+            col = self._get_column_view(index)
         if sp.issparse(col):
             col = col.toarray().reshape(-1)
         if col.dtype == object and self.domain[index].is_primitive():
@@ -1755,18 +2117,26 @@ class Table(Sequence, Storage):
         selection = self._values_filter_to_indicator(filter)
         return self.from_table(self.domain, self, selection)
 
-    def _values_filter_to_indicator(self, filter):
+    def _values_filter_to_indicator(self, filter, rows=None):
         """Return selection of rows matching the filter conditions
 
         Handles conjunction/disjunction and negate modifiers
 
+        Conditions are evaluated from the cheapest to the most expensive
+        (see `_filter_cost`). After each condition, the remaining conditions
+        are evaluated only on rows whose selection is not yet decided (the
+        selected rows in conjunctions and the rejected rows in
+        disjunctions), if there are sufficiently few of them; evaluation
+        stops when all rows are decided.
+
         Parameters
         ----------
         filter: Values object containing the conditions
+        rows: indices of rows to check (default: all rows)
 
         Returns
         -------
-        A 1d bool array. len(result) == len(self)
+        A 1d bool array. len(result) == len(self) or len(rows)
         """
         from Orange.data.filter import Values
 
@@ -1776,40 +2146,71 @@ class Table(Sequence, Storage):
         else:
             conditions = [filter]
             conjunction = True
-        if conjunction:
-            sel = np.ones(len(self), dtype=bool)
-        else:
-            sel = np.zeros(len(self), dtype=bool)
+        n_rows = len(self) if rows is None else len(rows)
+        sel = np.full(n_rows, conjunction, dtype=bool)
 
-        for f in conditions:
-            selection = self._filter_to_indicator(f)
-
-            if conjunction:
-                sel *= selection
+        for i, f in enumerate(sorted(conditions, key=self._filter_cost)):
+            undecided = sel if conjunction else ~sel
+            n_undecided = np.count_nonzero(undecided)
+            if n_undecided == 0:
+                break
+            # gathering rows pays off for expensive conditions or when
+            # most rows are decided
+            if i and n_undecided < n_rows * (
+                    1 if self._filter_cost(f) else _FILTER_SUBSET_RATIO):
+                indices = np.flatnonzero(undecided)
+                sel[indices] = self._filter_to_indicator(
+                    f, indices if rows is None else rows[indices])
+            elif conjunction:
+                sel &= self._filter_to_indicator(f, rows)
             else:
-                sel += selection
+                sel |= self._filter_to_indicator(f, rows)
 
         if filter.negate:
             sel = ~sel
         return sel
 
-    def _filter_to_indicator(self, filter):
+    def _filter_cost(self, filter):
+        # 0 for conditions that compare numbers, 1 for conditions that
+        # compare strings of dictionary-encoded columns and 2 for others
+        from Orange.data.filter import (
+            FilterContinuous, FilterDiscrete, IsDefined, SameValue, Values
+        )
+        if isinstance(filter, Values):
+            return max(map(self._filter_cost, filter.conditions))
+        if isinstance(filter, (FilterContinuous, FilterDiscrete, SameValue)):
+            return 0
+        if isinstance(filter, IsDefined):
+            columns = filter.columns
+            if columns is None:
+                columns = chain(self.domain.variables, self.domain.metas)
+            return 0 if all(
+                (col if isinstance(col, Variable)
+                 else self.domain[col]).is_primitive()
+                for col in columns) else 2
+        if getattr(filter, "column", None) is not None \
+                and self._encoded_strings(filter.column) is not None:
+            return 1
+        return 2
+
+    def _filter_to_indicator(self, filter, rows=None):
         """Return selection of rows that match the condition.
 
         Parameters
         ----------
         filter: ValueFilter describing the condition
+        rows: indices of rows to check (default: all rows)
 
         Returns
         -------
-        A 1d bool array. len(result) == len(self)
+        A 1d bool array. len(result) == len(self) or len(rows)
         """
         from Orange.data.filter import (
             FilterContinuous, FilterDiscrete, FilterRegex, FilterString,
-            FilterStringList, IsDefined, Values
+            FilterStringList, IsDefined, SameValue, Values
         )
         if isinstance(filter, Values):
-            return self._values_filter_to_indicator(filter)
+            return self._values_filter_to_indicator(filter, rows)
 
         def get_col_indices():
             cols = chain(self.domain.variables, self.domain.metas)
@@ -1822,7 +2223,7 @@ class Table(Sequence, Storage):
             if filter.column is not None:
                 return [filter.column]
 
-            if isinstance(filter, FilterDiscrete):
+            if isinstance(filter, (FilterDiscrete, SameValue)):
                 raise ValueError("Discrete filter can't be applied across rows")
             if isinstance(filter, FilterContinuous):
                 return [col for col in cols if col.is_continuous]
@@ -1832,7 +2233,21 @@ class Table(Sequence, Storage):
             raise TypeError("Invalid filter")
 
         def col_filter(col_idx):
+            strings = self._encoded_strings(col_idx)
+            if strings is not None \
+                    and not isinstance(filter, (FilterDiscrete,
+                                                FilterContinuous)):
+                # match distinct strings and look up the rows' results
+                codes, values = strings
+                if rows is not None:
+                    codes = codes[rows]
+                return values_filter(col_idx, values)[codes]
             col = self.get_column(col_idx)
+            if rows is not None:
+                col = col[rows]
+            return values_filter(col_idx, col)
+
+        def values_filter(col_idx, col):
             if isinstance(filter, IsDefined):
                 if self.domain[col_idx].is_primitive():
                     return ~np.isnan(col.astype(float))
@@ -1853,20 +2268,37 @@ class Table(Sequence, Storage):
                 return reduce(operator.add, (col == val for val in vals))
             if isinstance(filter, FilterRegex):
                 return np.vectorize(filter)(col)
+            if isinstance(filter, SameValue):
+                value = filter.value
+                if not isinstance(value, Real):
+                    value = self.domain[col_idx].to_val(value)
+                return col == value
             raise TypeError("Invalid filter")
 
         col_indices = get_col_indices()
         if len(col_indices) == 1:
             sel = col_filter(col_indices[0])
         else:
-            sel = np.ones(len(self), dtype=bool)
+            sel = np.ones(len(self) if rows is None else len(rows),
+                          dtype=bool)
             for col_idx in col_indices:
                 sel *= col_filter(col_idx)
 
-        if isinstance(filter, IsDefined) and filter.negate:
+        if isinstance(filter, (IsDefined, SameValue)) and filter.negate:
             sel = ~sel
         return sel
 
+    def _encoded_strings(self, index):
+        # indices and distinct values of a dictionary-encoded string column
+        if self._compact_metas is None \
+                or isinstance(index, Variable) and index not in self.domain:
+            return None
+        if not isinstance(index, Integral):
+            index = self.domain.index(index)
+        if index >= 0:
+            return None
+        return self._compact_metas.strings(-1 - index)
+
     def _discrete_filter_to_indicator(self, filter, col):
         """Return selection of rows matched by the given discrete filter.
 
@@ -1877,18 +2309,16 @@ class Table(Sequence, Storage):
 
         Returns
         -------
-        A 1d bool array. len(result) == len(self)
+        A 1d bool array. len(result) == len(col)
         """
         if filter.values is None:  # <- is defined filter
             col = col.astype(float)
             return ~np.isnan(col)
 
-        sel = np.zeros(len(self), dtype=bool)
-        for val in filter.values:
-            if not isinstance(val, Real):
-                val = self.domain[filter.column].to_val(val)
-            sel += (col == val)
-        return sel
+        values = [val if isinstance(val, Real)
+                  else self.domain[filter.column].to_val(val)
+                  for val in filter.values]
+        return np.isin(col, values)
 
     def _continuous_filter_to_indicator(self, filter, col):
         """Return selection of rows matched by the given continuous filter.
@@ -1900,7 +2330,7 @@ class Table(Sequence, Storage):
 
         Returns
         -------
-        A 1d bool array. len(result) == len(self)
+        A 1d bool array. len(result) == len(col)
         """
         if filter.oper == filter.IsDefined:
             col = col.astype(float)
@@ -1918,7 +2348,7 @@ class Table(Sequence, Storage):
 
         Returns
         -------
-        A 1d bool array. len(result) == len(self)
+        A 1d bool array. len(result) == len(col)
         """
         if filter.oper == filter.IsDefined:
             return col.astype(bool)
@@ -1972,9 +2402,13 @@ class Table(Sequence, Storage):
             if filter.oper == filter.GreaterEqual:
                 return col >= fmin
             if filter.oper == filter.Between:
-                return (col >= fmin) * (col <= fmax)
+                sel = col >= fmin
+                sel &= col <= fmax
+                return sel
             if filter.oper == filter.Outside:
-                return (col < fmin) + (col > fmax)
+                sel = col < fmin
+                sel |= col > fmax
+                return sel
 
             raise TypeError("Invalid operator")
 
@@ -1985,8 +2419,14 @@ class Table(Sequence, Storage):
         stats = []
         if not columns:
             if self.domain.attributes:
-                rr.append(fast_stats(self._X, W,
-                                     compute_variance=compute_variance))
+                if self._compact is None:
+                    rr.append(fast_stats(self.X, W,
+                                         compute_variance=compute_variance))
+                else:
+                    # column by column, without constructing X
+                    rr += [fast_stats(self._compact.column(i)[:, None], W,
+                                      compute_variance=compute_variance)
+                           for i in range(len(self.domain.attributes))]
             if self.domain.class_vars:
                 rr.append(fast_stats(self._Y, W,
                                      compute_variance=compute_variance))
@@ -2000,7 +2440,9 @@ class Table(Sequence, Storage):
             for column in columns:
                 c = self.domain.index(column)
                 if 0 <= c < nattrs:
-                    S = fast_stats(self._X[:, [c]], W and W[:, [c]],
+                    x = self.X[:, [c]] if self._compact is None \
+                        else self._compact.column(c)[:, None]
+                    S = fast_stats(x, W and W[:, [c]],
                                    compute_variance=compute_variance)
                 elif c >= nattrs:
                     if self._Y.ndim == 1 and c == nattrs:
@@ -2010,7 +2452,9 @@ class Table(Sequence, Storage):
                         S = fast_stats(self._Y[:, [c - nattrs]], W and W[:, [c - nattrs]],
                                        compute_variance=compute_variance)
                 else:
-                    S = fast_stats(self._metas[:, [-1 - c]], W and W[:, [-1 - c]],
+                    x = self.metas[:, [-1 - c]] if self._compact_metas is None \
+                        else self._compact_metas.column(-1 - c)[:, None]
+                    S = fast_stats(x, W and W[:, [-1 - c]],
                                    compute_variance=compute_variance)
                 stats.append(S[0])
         return stats
@@ -2022,10 +2466,14 @@ class Table(Sequence, Storage):
             columns = [self.domain.index(var) for var in columns]
 
         distributions = []
-        X = self.X
-        if sp.issparse(X):
-            X = X.tocsc()
-
+        n_atts = len(self.domain.attributes)
+        compact = self._compact
+        X = None
+        if compact is None and self._row_view is None \
+                and any(0 <= col < n_atts for col in columns):
+            X = self.X
+            if sp.issparse(X):
+                X = X.tocsc()
 
         W = self.W.ravel() if self.has_weights() else None
 
@@ -2033,16 +2481,25 @@ class Table(Sequence, Storage):
             variable = self.domain[col]
 
             # Select the correct data column from X, Y or metas
-            if 0 <= col < X.shape[1]:
+            if 0 <= col < n_atts and compact is not None:
+                codes = compact.codes(col)
+                if codes is not None:
+                    distributions.append(
+                        count_codes(codes, len(variable.values), W))
+                    continue
+                x = compact.column(col)
+            elif 0 <= col < n_atts and X is None:
+                x = self.get_column(col)
+            elif 0 <= col < n_atts:
                 x = X[:, col]
             elif col < 0:
                 x = self.metas[:, col * (-1) - 1]
                 if np.issubdtype(x.dtype, np.dtype(object)):
                     x = x.astype(float)
-            elif self._Y.ndim == 1 and col == X.shape[1]:
+            elif self._Y.ndim == 1 and col == n_atts:
                 x = self._Y
             else:
-                x = self._Y[:, col - X.shape[1]]
+                x = self._Y[:, col - n_atts]
 
             if variable.is_discrete:
                 dist, unknowns = bincount(x, weights=W, max_val=len(variable.values) - 1)
@@ -2081,7 +2538,7 @@ class Table(Sequence, Storage):
         return distributions
 
     def _compute_contingency(self, col_vars=None, row_var=None):
-        n_atts = self.X.shape[1]
+        n_atts = len(self.domain.attributes)
 
         if col_vars is None:
             col_vars = range(len(self.domain.variables))
@@ -2098,7 +2555,7 @@ class Table(Sequence, Storage):
         row_indi = self.domain.index(row_var)
         n_rows = len(row_desc.values)
         if 0 <= row_indi < n_atts:
-            row_data = self.X[:, row_indi]
+            row_data = self.get_column(row_indi)
         elif row_indi < 0:
             row_data = self.metas[:, -1 - row_indi]
         elif self._Y.ndim == 1 and row_indi == n_atts:
@@ -2121,12 +2578,16 @@ class Table(Sequence, Storage):
         # it to dense and make it 1D
         if issparse(row_data):
             row_data = row_data.toarray().ravel()
-        if row_data.dtype.kind != "f":  # meta attributes can be stored as type object
+        # meta attributes can be stored as type object, and class values of
+        # tables with float32 attributes are in float32
+        if row_data.dtype != np.float64:
             row_data = row_data.astype(float)
 
         contingencies = [None] * len(col_desc)
+        compact = self._compact
         for arr, f_cond, f_ind in (
-                (self.X, lambda i: 0 <= i < n_atts, lambda i: i),
+                (compact if compact is not None else self.X,
+                 lambda i: 0 <= i < n_atts, lambda i: i),
                 (self._Y, lambda i: i >= n_atts, lambda i: i - n_atts),
                 (self.metas, lambda i: i < 0, lambda i: -1 - i)):
 
@@ -2134,6 +2595,24 @@ class Table(Sequence, Storage):
 
             vars = [(e, f_ind(col_indi[e]), col_desc[e]) for e in arr_indi]
             disc_vars = [v for v in vars if v[2].is_discrete]
+            if compact is not None and arr is compact and vars:
+                # compact columns are processed one by one, without X
+                W_ = None if W is None else W.ravel()
+                for col_i, arr_i, var in vars:
+                    codes = compact.codes(arr_i)
+                    if codes is not None:
+                        contingencies[col_i] = contingency_codes(
+                            codes, len(var.values), row_data, n_rows, W_)
+                    elif var.is_discrete:
+                        contingencies[col_i] = contingency(
+                            compact.column(arr_i), row_data,
+                            len(var.values) - 1, n_rows - 1, W)
+                    else:
+                        contingencies[col_i] = \
+                            _contingency.contingency_floatarray(
+                                compact.column(arr_i), row_data, n_rows,
+                                None if W is None else W.astype(np.float64))
+                continue
             if disc_vars:
                 if sp.issparse(arr):
                     max_vals = max(len(v[2].values) for v in disc_vars)
@@ -2355,6 +2834,31 @@ class Table(Sequence, Storage):
         t.ids = self.ids  # preserve indices
         return t
 
+    def to_compact(self, metas=True):
+        """
+        Return a table that stores values of discrete attributes as 8- or
+        16-bit codes, and, if `metas` is set, meta attributes in compact
+        storage with dictionary-encoded strings (see
+        :obj:`Orange.data.compact`).
+
+        Statistics, contingencies, distributions, filters and learners that
+        support compact storage use the codes directly. `X` and `metas` are
+        constructed (and replace compact storage) only when accessed.
+        Class values are shared with this table.
+        """
+        table = self.from_table_rows(self, ...)
+        with table.unlocked_reference():
+            if not self.is_compact():
+                if sp.issparse(self.X):
+                    raise ValueError("Sparse data cannot be stored compactly")
+                table._set_compact(CompactColumns.from_array(
+                    self.X, self.domain.attributes))
+            if metas and self.compact_metas is None \
+                    and not sp.issparse(self.metas):
+                table._set_compact_metas(CompactColumns.from_array(
+                    self.metas, self.domain.metas))
+        return table
+
     def groupby(self, columns: List[Variable]) -> "OrangeTableGroupBy":
         """
         Group Table by variables defined in the columns list. Behaviour is
@@ -2373,6 +2877,227 @@ class Table(Sequence, Storage):
         return Orange.data.aggregate.OrangeTableGroupBy(self, columns)
 
 
+# Versions of tables and of arrays that were unlocked for changes
+_version_counter = itertools.count(1)
+# Versions of base arrays, keyed by their id; entries are removed by
+# finalizers when arrays are deleted
+_buffer_versions = {}
+# Weak references to arrays that were made read-only by fingerprint
+# without locking, keyed by their id
+_frozen_arrays = {}
+
+# Conditions of filters are evaluated only on undecided rows when their
+# proportion is below this ratio (see Table._values_filter_to_indicator)
+_FILTER_SUBSET_RATIO = 0.25
+
+# Tables with lazily selected rows (see Table.LAZY_ROWS)
+_lazy_tables = weakref.WeakSet()
+
+# size of blocks (in bytes) of large arrays that are hashed in parallel
+_HASH_BLOCK_SIZE = 2 ** 24
+# the number of threads that hash blocks
+_HASH_THREADS = min(8, os.cpu_count() or 1)
+# the number of rows of object arrays that are pickled at once
+_PICKLE_BLOCK_ROWS = 4096
+
+
+def _arrays(part):
+    """Return arrays that hold the data of the (sparse) array."""
+    if part is None:
+        return []
+    if sp.issparse(part):
+        return [getattr(part, name) for name in
+                ("data", "indices", "indptr", "row", "col")
+                if isinstance(getattr(part, name, None), np.ndarray)]
+    return [part]
+
+
+def _buffers(part):
+    """Return base arrays that hold the data of the (sparse) array."""
+    roots = []
+    for arr in _arrays(part):
+        while isinstance(arr.base, np.ndarray):
+            arr = arr.base
+        roots.append(arr)
+    return roots
+
+
+def _mark_buffers(part, version):
+    for buffer in _buffers(part):
+        key = id(buffer)
+        if key not in _buffer_versions:
+            weakref.finalize(buffer, _buffer_versions.pop, key, None)
+        _buffer_versions[key] = version
+
+
+def _buffers_version(part):
+    return max((_buffer_versions.get(id(buffer), 0)
+                for buffer in _buffers(part)), default=0)
+
+
+def _part_version(part):
+    if isinstance(part, CompactColumns):
+        return 0  # columns are read-only
+    if isinstance(part, _RowView):
+        return _buffers_version(part.base)
+    return _buffers_version(part)
+
+
+def _hashed_arrays(part):
+    # base arrays of a part, followed by the arrays themselves
+    if isinstance(part, CompactColumns):
+        return []
+    if isinstance(part, _RowView):
+        part = part.base
+    return _buffers(part) + _arrays(part)
+
+
+def _is_read_only(part):
+    return not any(arr.flags.writeable for arr in _hashed_arrays(part))
+
+
+def _freeze(part):
+    # without locking, hashed arrays are made read-only, so they cannot be
+    # changed without unlocking, which invalidates the digest
+    for arr in _hashed_arrays(part):
+        if arr.flags.writeable:
+            arr.flags.writeable = False
+            key = id(arr)
+            _frozen_arrays[key] = weakref.ref(
+                arr, lambda _, key=key: _frozen_arrays.pop(key, None))
+
+
+def _thaw(parts):
+    # make arrays of parts that were frozen by _freeze writable again
+    for part in parts:
+        for arr in _hashed_arrays(part):
+            ref = _frozen_arrays.get(id(arr))
+            if ref is not None and ref() is arr:
+                del _frozen_arrays[id(arr)]
+                try:
+                    arr.flags.writeable = True
+                except ValueError:  # the base was locked by someone else
+                    pass
+
+
+def _detach_row_views(parts):
+    # copy the rows of lazy tables whose arrays share buffers with parts
+    # that are about to be changed
+    buffers = {id(buffer) for part in parts for buffer in _buffers(part)}
+    if buffers:
+        for table in list(_lazy_tables):
+            table._materialize_rows(X=True, metas=True, buffers=buffers)
+
+
+def _deref(ref):
+    return None if ref is None else ref()
+
+
+def _variables_digest(variables):
+    digest = hashlib.sha256()
+    for var in variables:
+        digest.update(repr((type(var).__name__, var.name,
+                            getattr(var, "values", None))).encode())
+    return digest.digest()
+
+
+def _block_digest(block):
+    return hashlib.sha256(block).digest()
+
+
+def _pickle_digest(arr):
+    # without memoization, equal objects are pickled equally regardless
+    # of their identity (e.g. strings shared by dictionary encoding)
+    buffer = io.BytesIO()
+    pickler = pickle.Pickler(buffer, protocol=4)
+    pickler.fast = True
+    pickler.dump(arr.tolist())
+    return _block_digest(buffer.getvalue())
+
+
+def _flat_bytes(arr):
+    return np.ascontiguousarray(arr).reshape(-1).view(np.uint8)
+
+
+def _rows_digest(shape, dtype, rows):
+    """
+    Return a digest of a dense array with the given shape and dtype, whose
+    rows from `start` to `stop` are returned by `rows(start, stop)`.
+
+    The digest depends only on the content, so arrays that are constructed
+    on the fly (e.g. from compact storage) are hashed block by block,
+    without constructing the entire array.
+    """
+    n_rows = shape[0]
+    if dtype == object:
+        # objects are pickled in blocks of rows
+        blocks = (_pickle_digest(rows(i, i + _PICKLE_BLOCK_ROWS))
+                  for i in range(0, n_rows, _PICKLE_BLOCK_ROWS))
+        return _block_digest(b"".join(blocks))
+    row_size = dtype.itemsize * int(np.prod(shape[1:]))
+    size = n_rows * row_size
+    if size <= _HASH_BLOCK_SIZE:
+        return _block_digest(_flat_bytes(rows(0, n_rows)))
+
+    def block_digest(start):
+        first = start // row_size
+        stop = min(-(-(start + _HASH_BLOCK_SIZE) // row_size), n_rows)
+        offset = start - first * row_size
+        flat = _flat_bytes(rows(first, stop))
+        return _block_digest(flat[offset:offset + _HASH_BLOCK_SIZE])
+
+    # hashlib releases the GIL, so blocks can be hashed in parallel; each
+    # thread constructs only the rows of its block
+    with ThreadPoolExecutor(max_workers=_HASH_THREADS) as executor:
+        return _block_digest(b"".join(
+            executor.map(block_digest, range(0, size, _HASH_BLOCK_SIZE))))
+
+
+def _buffer_digest(arr):
+    return _rows_digest(arr.shape, arr.dtype,
+                        lambda start, stop: arr[start:stop])
+
+
+def _dense_rows(part, compact_dtype):
+    # shape and dtype of a dense part, and a function that returns its rows
+    if isinstance(part, CompactColumns):
+        return (part.shape, np.dtype(compact_dtype),
+                lambda start, stop:
+                part.take(slice(start, stop)).to_array(compact_dtype))
+    if isinstance(part, _RowView):
+        base, indices = part.base, part.indices
+        return ((len(indices), ) + base.shape[1:], base.dtype,
+                lambda start, stop: base[indices[start:stop]])
+    return part.shape, part.dtype, lambda start, stop: part[start:stop]
+
+
+def _part_digest(part, compact_dtype=np.float64):
+    """
+    Return a digest of a part of the table; compact columns are hashed as
+    an array of `compact_dtype`, into which they would be expanded, and
+    lazy rows as the array of selected rows.
+    """
+    digest = hashlib.sha256()
+    if part is None:
+        return digest.digest()
+    if isinstance(part, _RowView) and sp.issparse(part.base):
+        part = part.to_array()
+    if sp.issparse(part):
+        part = part.tocsr()
+        if not part.has_canonical_format:
+            part = part.copy()
+            part.sum_duplicates()
+        digest.update(repr(("csr", part.shape)).encode())
+        for arr in (part.data, part.indices, part.indptr):
+            digest.update(repr((arr.dtype.str, arr.shape)).encode())
+            digest.update(_buffer_digest(arr))
+        return digest.digest()
+    shape, dtype, rows = _dense_rows(part, compact_dtype)
+    digest.update(repr((dtype.str, shape)).encode())
+    digest.update(_rows_digest(shape, dtype, rows))
+    return digest.digest()
+
+
 def _dereferenced(array):
     # CSR and CSC matrices are constructed so that array.data is a
     # view to a base, which prevents unlocking them. Therefore, if
@@ -2386,6 +3111,17 @@ def _dereferenced(array):
     return array
 
 
+def _values_dtype(*arrays):
+    """
+    Return float32 if all non-empty arrays are of float32, so that tables
+    constructed from them keep the precision, and None otherwise
+    """
+    dtypes = [arr.dtype for arr in arrays if arr is not None and arr.size]
+    if dtypes and np.result_type(*dtypes) == np.float32:
+        return np.float32
+    return None
+
+
 def _check_arrays(*arrays, dtype=None, shape_1=None):
     checked = []
     if not len(arrays):
@@ -2435,6 +3171,39 @@ def _check_inf(array):
            np.isinf(array.data).any()
 
 
+def _x_dtype(table):
+    # the type of X without constructing it for compact and lazy tables
+    if table.is_compact():
+        return np.dtype(np.float64)
+    if table._row_view is not None:
+        return table._row_view.base.dtype
+    return table.X.dtype
+
+
+def _row_views(source, row_indices):
+    # lazy selections of rows of X and metas, or None for parts that are
+    # copied (or are views for slices); selections from lazy parts are
+    # always lazy
+    def view(lazy, compact, part):
+        if compact is not None:
+            return None
+        if lazy is not None:
+            return lazy.take(row_indices)
+        if rows is None:
+            return None
+        return _RowView(getattr(source, part), rows)
+
+    if row_indices is ...:
+        row_indices = slice(None)
+    elif not isinstance(row_indices, slice) and np.ndim(row_indices) != 1:
+        return None, None
+    rows = None
+    if Table.LAZY_ROWS and not isinstance(row_indices, slice):
+        rows = np.arange(len(source))[row_indices]
+    return (view(source._row_view, source.compact_columns, "X"),
+            view(source._row_view_metas, source.compact_metas, "metas"))
+
+
 def _subarray(arr, rows, cols):
     rows = _optimize_indices(rows, arr.shape[0])
     if arr.ndim == 1:
@@ -2554,11 +3323,19 @@ def assure_domain_conversion_sparsity(target, source):
         Table: with fixed sparsity. The sparsity is set as it is recommended by domain conversion
             for transformation from source to the target domain.
     """
+    def matches(view, sparse):
+        # lazy rows with the right density are kept lazy
+        return view is not None and sp.issparse(view.base) == bool(sparse)
+
     conversion = DomainConversion(source.domain, target.domain)
     match_density = [assure_array_dense, assure_array_sparse]
-    target.X = match_density[conversion.sparse_X](target.X)
+    if not target.is_compact() \
+            and not matches(target._row_view, conversion.sparse_X):
+        target.X = match_density[conversion.sparse_X](target.X)
     target.Y = match_density[conversion.sparse_Y](target.Y)
-    target.metas = match_density[conversion.sparse_metas](target.metas)
+    if target.compact_metas is None \
+            and not matches(target._row_view_metas, conversion.sparse_metas):
+        target.metas = match_density[conversion.sparse_metas](target.metas)
     return target
 
 
@@ -0,0 +1,268 @@
+# Test methods with long descriptive names can omit docstrings
+# pylint: disable=missing-docstring, protected-access
+
+import pickle
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from Orange.classification import TreeLearner
+from Orange.data import Table, Domain, DiscreteVariable, StringVariable
+from Orange.data.compact import CompactColumns, encode, decode, \
+    encode_strings, count_codes, contingency_codes
+from Orange.data.table import _part_digest
+from Orange.data.filter import FilterString, FilterStringList, \
+    FilterRegex, Values
+from Orange.preprocess import RemoveNaNColumns
+from Orange.statistics import contingency, distribution
+from Orange.statistics.util import bincount, contingency as util_contingency
+
+
+class TestCodes(unittest.TestCase):
+    def test_encode_decode(self):
+        values = np.array([0, 2, np.nan, 1])
+        codes = encode(values, 3)
+        self.assertEqual(codes.dtype, np.uint8)
+        np.testing.assert_equal(codes, [0, 2, 255, 1])
+        np.testing.assert_equal(decode(codes), values)
+
+        codes = encode(np.array([300, np.nan]), 400)
+        self.assertEqual(codes.dtype, np.uint16)
+        np.testing.assert_equal(decode(codes), [300, np.nan])
+
+    def test_encode_strings(self):
+        values = np.array(["b", None, "a", "b", np.nan, ""], dtype=object)
+        codes, distinct = encode_strings(values)
+        self.assertEqual(codes.dtype, np.uint8)
+        self.assertEqual(len(distinct), 5)
+        decoded = distinct[codes]
+        self.assertEqual(list(decoded[[0, 2, 3, 5]]), ["b", "a", "b", ""])
+        self.assertIsNone(decoded[1])
+        self.assertTrue(np.isnan(decoded[4]))
+
+    def test_counts_match_util(self):
+        rng = np.random.RandomState(0)
+        x = rng.randint(0, 4, 100).astype(float)
+        x[rng.rand(100) < 0.2] = np.nan
+        y = rng.randint(0, 3, 100).astype(float)
+        y[rng.rand(100) < 0.2] = np.nan
+        w = rng.rand(100)
+        codes = encode(x, 4)
+        for weights in (None, w):
+            dist, unknowns = count_codes(codes, 4, weights)
+            expected = bincount(x, weights=weights, max_val=3)
+            np.testing.assert_almost_equal(dist, expected[0])
+            self.assertAlmostEqual(unknowns, expected[1])
+
+            for computed, expected in zip(
+                    contingency_codes(codes, 4, y, 3, weights),
+                    util_contingency(x, y, 3, 2, weights)):
+                np.testing.assert_almost_equal(computed, expected)
+
+
+class TestCompactTable(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.data = Table("heart_disease")
+
+    def setUp(self):
+        self.compact = self.data.to_compact()
+
+    def test_storage(self):
+        compact = self.compact
+        self.assertTrue(compact.is_compact())
+        self.assertFalse(self.data.is_compact())
+        self.assertEqual(len(compact), len(self.data))
+        columns = compact.compact_columns
+        for i, attr in enumerate(self.data.domain.attributes):
+            self.assertEqual(columns.codes(i) is not None, attr.is_discrete)
+            np.testing.assert_equal(compact.get_column(attr),
+                                    self.data.get_column(attr))
+        self.assertLess(columns.nbytes, self.data.X.nbytes)
+        self.assertTrue(np.shares_memory(compact.Y, self.data.Y))
+
+        np.testing.assert_equal(compact.X, self.data.X)
+        self.assertFalse(compact.is_compact())
+
+    def test_rows_and_columns_remain_compact(self):
+        rows = self.compact[10:50:3]
+        self.assertTrue(rows.is_compact())
+        np.testing.assert_equal(rows.X, self.data[10:50:3].X)
+
+        attrs = self.data.domain.attributes
+        domain = Domain(attrs[5:1:-1], attrs[1], attrs[:1])
+        transformed = self.compact.transform(domain)
+        self.assertTrue(transformed.is_compact())
+        expected = self.data.transform(domain)
+        np.testing.assert_equal(transformed.X, expected.X)
+        np.testing.assert_equal(transformed.Y, expected.Y)
+        np.testing.assert_equal(transformed.metas, expected.metas)
+        self.assertTrue(self.compact.is_compact())
+
+    def test_statistics_without_x(self):
+        with patch.object(Table, "_expand_compact") as expand:
+            dists = distribution.get_distributions(self.compact)
+            conts = contingency.get_contingencies(self.compact)
+            RemoveNaNColumns()(self.compact)
+            with patch.object(CompactColumns, "to_array") as to_array:
+                stats = self.compact._compute_basic_stats(
+                    compute_variance=True)
+                to_array.assert_not_called()
+            expand.assert_not_called()
+        np.testing.assert_almost_equal(
+            stats,
+            self.data._compute_basic_stats(compute_variance=True))
+        for dist, expected in zip(dists,
+                                  distribution.get_distributions(self.data)):
+            np.testing.assert_almost_equal(np.asarray(dist),
+                                           np.asarray(expected))
+            self.assertEqual(dist.unknowns, expected.unknowns)
+        for cont, expected in zip(conts,
+                                  contingency.get_contingencies(self.data)):
+            if isinstance(cont, contingency.Discrete):
+                np.testing.assert_almost_equal(np.asarray(cont),
+                                               np.asarray(expected))
+            else:
+                np.testing.assert_almost_equal(cont.values, expected.values)
+                np.testing.assert_almost_equal(cont.counts, expected.counts)
+            np.testing.assert_almost_equal(cont.col_unknowns,
+                                           expected.col_unknowns)
+            np.testing.assert_almost_equal(cont.row_unknowns,
+                                           expected.row_unknowns)
+            self.assertEqual(cont.unknowns, expected.unknowns)
+
+    def test_tree_without_x(self):
+        data = Table("zoo")
+        compact = data.to_compact()
+        with patch.object(Table, "_expand_compact") as expand:
+            model = TreeLearner()(compact)
+            expand.assert_not_called()
+        np.testing.assert_equal(model(data), TreeLearner()(data)(data))
+
+    def test_pickle_and_fingerprint(self):
+        with patch.object(Table, "_expand_compact") as expand, \
+                patch.object(Table, "_expand_compact_metas") as expand_metas:
+            fingerprint = self.compact.fingerprint()
+            expand.assert_not_called()
+            expand_metas.assert_not_called()
+        self.assertEqual(fingerprint, self.data.fingerprint())
+        self.assertTrue(self.compact.is_compact())
+        # digests of compact columns are cached even without locking
+        with patch.object(Table, "LOCKING", None), \
+                patch("Orange.data.table._part_digest",
+                      side_effect=_part_digest) as part_digest:
+            self.assertEqual(self.compact.fingerprint(), fingerprint)
+        self.assertFalse(any(isinstance(args[0], CompactColumns)
+                             for args, _ in part_digest.call_args_list))
+        # blocks are constructed from columns
+        with patch("Orange.data.table._HASH_BLOCK_SIZE", 1000):
+            self.assertEqual(self.data.to_compact().fingerprint(),
+                             self.data.copy().fingerprint())
+        unpickled = pickle.loads(pickle.dumps(self.compact))
+        np.testing.assert_equal(unpickled.X, self.data.X)
+
+    def test_many_values(self):
+        var = DiscreteVariable("x", values=tuple(map(str, range(70000))))
+        data = Table.from_numpy(Domain([var]), np.array([[0], [69999]]))
+        compact = data.to_compact()
+        self.assertIsNone(compact.compact_columns.codes(0))
+        np.testing.assert_equal(compact.X, data.X)
+
+    def test_columns(self):
+        columns = CompactColumns.from_array(self.data.X,
+                                            self.data.domain.attributes)
+        self.assertEqual(columns.shape, self.data.X.shape)
+        np.testing.assert_equal(columns.to_array(), self.data.X)
+        np.testing.assert_equal(columns.count_nans(),
+                                np.isnan(self.data.X).sum(axis=0))
+        selected = columns.select([3, 1]).take(np.array([4, 0, 2]))
+        np.testing.assert_equal(selected.to_array(),
+                                self.data.X[[4, 0, 2]][:, [3, 1]])
+        self.assertRaises(ValueError, np.put, columns.columns[1], 0, 1)
+
+
+class TestCompactMetas(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        data = Table("zoo")
+        domain = data.domain
+        # with a discrete meta attribute
+        cls.data = data.transform(
+            Domain(domain.attributes, None, domain.metas + domain.class_vars))
+        cls.name = cls.data.domain.metas[0]
+
+    def setUp(self):
+        self.compact = self.data.to_compact()
+
+    def test_storage(self):
+        compact = self.compact
+        codes, values = compact.compact_metas.strings(0)
+        self.assertEqual(len(values), len(set(self.data.metas[:, 0])))
+        np.testing.assert_equal(values[codes], self.data.metas[:, 0])
+        np.testing.assert_equal(compact.get_column(self.name),
+                                self.data.get_column(self.name))
+        self.assertIsNone(self.data.to_compact(metas=False).compact_metas)
+
+        rows = compact[5:40:2]
+        self.assertIsNotNone(rows.compact_metas)
+        np.testing.assert_equal(rows.metas, self.data[5:40:2].metas)
+
+        domain = Domain(self.data.domain.attributes[:3], None, [self.name])
+        transformed = compact.transform(domain)
+        self.assertIsNotNone(transformed.compact_metas)
+        np.testing.assert_equal(transformed.metas,
+                                self.data.transform(domain).metas)
+
+        self.assertEqual(compact.fingerprint(), self.data.fingerprint())
+        with patch("Orange.data.table._PICKLE_BLOCK_ROWS", 7):
+            self.assertEqual(self.data.to_compact().fingerprint(),
+                             self.data.copy().fingerprint())
+        np.testing.assert_equal(pickle.loads(pickle.dumps(compact)).metas,
+                                self.data.metas)
+        metas = compact.metas
+        self.assertIsNone(compact.compact_metas)
+        np.testing.assert_equal(metas, self.data.metas)
+        self.assertTrue(all(type(value) is float  # pylint: disable=C0123
+                            for value in metas[:, 1]))
+
+    def test_string_filters(self):
+        name = self.name
+        filters = [
+            FilterString(name, FilterString.Equal, "bear"),
+            FilterString(name, FilterString.NotEqual, "bear"),
+            FilterString(name, FilterString.StartsWith, "b"),
+            FilterString(name, FilterString.Contains, "A",
+                         case_sensitive=False),
+            FilterString(name, FilterString.Between, "b", "d"),
+            FilterString(name, FilterString.IsDefined),
+            FilterStringList(name, ["bear", "Crab"], case_sensitive=False),
+            FilterRegex(name, "^c.*b$")]
+        for filter_ in filters:
+            with patch.object(Table, "_expand_compact_metas") as expand:
+                filtered = Values([filter_])(self.compact)
+                expand.assert_not_called()
+            expected = Values([filter_])(self.data)
+            self.assertIsNotNone(filtered.compact_metas)
+            np.testing.assert_equal(filtered.metas, expected.metas)
+            np.testing.assert_equal(filtered.X, expected.X)
+
+    def test_mixed_metas(self):
+        domain = Domain([], None, [StringVariable("s"),
+                                   DiscreteVariable("d", values=("a", "b"))])
+        metas = np.array([["x", 0], [None, 1], ["", np.nan], ["x", 1]],
+                         dtype=object)
+        data = Table.from_numpy(domain, np.empty((4, 0)), metas=metas)
+        compact = data.to_compact()
+        self.assertIsNotNone(compact.compact_metas.codes(1))
+        np.testing.assert_equal(compact.compact_metas.count_nans(), [2, 1])
+        filtered = Values([FilterString("s", FilterString.Equal, "x")])(
+            compact)
+        self.assertEqual(len(filtered), 2)
+        self.assertEqual(list(compact.metas[:, 0]), list(metas[:, 0]))
+        np.testing.assert_equal(compact.metas[:, 1].astype(float),
+                                metas[:, 1].astype(float))
+
+
+if __name__ == "__main__":
+    unittest.main()
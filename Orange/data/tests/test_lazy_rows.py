@@ -0,0 +1,151 @@
+# Test methods with long descriptive names can omit docstrings
+# pylint: disable=missing-docstring, protected-access
+
+import pickle
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import scipy.sparse as sp
+
+from Orange.data import Table, Domain
+from Orange.data.filter import FilterString, FilterContinuous, Values
+
+
+class TestLazyRows(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.data = Table("zoo")
+
+    def setUp(self):
+        self.lazy_rows = Table.LAZY_ROWS
+        Table.LAZY_ROWS = True
+        self.data = self.data.copy()
+        self.rows = np.arange(1, 100, 3)
+
+    def tearDown(self):
+        Table.LAZY_ROWS = self.lazy_rows
+
+    def test_selection_keeps_indices(self):
+        data = self.data
+        subset = data[self.rows]
+        self.assertTrue(subset.is_lazy())
+        self.assertFalse(data.is_lazy())
+        self.assertEqual(len(subset), len(self.rows))
+        self.assertIs(subset._row_view.base, data.X)
+        np.testing.assert_equal(subset.Y, data.Y[self.rows])
+        np.testing.assert_equal(subset.ids, data.ids[self.rows])
+
+        # selections of selections combine indices
+        subsubset = subset[[2, 0, 5]]
+        self.assertIs(subsubset._row_view.base, data.X)
+        np.testing.assert_equal(subsubset._row_view.indices,
+                                self.rows[[2, 0, 5]])
+        sliced = subset[3:10]
+        self.assertIs(sliced._row_view_metas.base, data.metas)
+
+        np.testing.assert_equal(subsubset.X, data.X[self.rows[[2, 0, 5]]])
+        self.assertIsNone(subsubset._row_view)
+        self.assertTrue(subsubset.is_lazy())
+        np.testing.assert_equal(subsubset.metas,
+                                data.metas[self.rows[[2, 0, 5]]])
+        self.assertFalse(subsubset.is_lazy())
+
+        Table.LAZY_ROWS = False
+        self.assertFalse(data[self.rows].is_lazy())
+        self.assertTrue(subset[[1, 2]].is_lazy())
+
+    def test_columns_without_materializing(self):
+        data = self.data
+        subset = data[self.rows]
+        domain = Domain(data.domain.attributes[3:8], data.domain.class_var,
+                        data.domain.metas)
+        with patch.object(Table, "_materialize_rows") as materialize:
+            legs = subset.get_column("legs")
+            name = subset.get_column("name")
+            transformed = subset.transform(domain)
+            filtered = Values([
+                FilterContinuous("legs", FilterContinuous.Greater, 2)])(subset)
+            materialize.assert_not_called()
+        np.testing.assert_equal(legs, data.get_column("legs")[self.rows])
+        np.testing.assert_equal(name, data.get_column("name")[self.rows])
+        expected = data.transform(domain)[self.rows]
+        np.testing.assert_equal(transformed.X, expected.X)
+        np.testing.assert_equal(transformed.metas, expected.metas)
+        self.assertTrue(filtered.is_lazy())
+        np.testing.assert_equal(filtered.X, data.X[self.rows][legs > 2])
+
+    def test_copy_on_write(self):
+        data = self.data
+        subset = data[self.rows]
+        subsubset = subset[[0, 1]]
+        expected = data.X[self.rows].copy()
+        with data.unlocked(data.X):
+            self.assertIsNone(subset._row_view)
+            self.assertIsNone(subsubset._row_view)
+            data.X[:] = 42
+        np.testing.assert_equal(subset.X, expected)
+        np.testing.assert_equal(subsubset.X, expected[:2])
+        # metas are not shared with X
+        self.assertIsNotNone(subset._row_view_metas)
+
+        subset = data[self.rows]
+        with subset.unlocked(subset.X):
+            subset.X[:] = 1
+        np.testing.assert_equal(data.X, 42)
+
+        subset = data[self.rows]
+        with subset.unlocked_reference():
+            subset.metas = np.zeros((len(subset), 1), dtype=object)
+        self.assertIsNone(subset._row_view_metas)
+        self.assertIsNotNone(subset._row_view)
+
+    def test_pickle_and_fingerprint(self):
+        subset = self.data[self.rows]
+        Table.LAZY_ROWS = False
+        expected = self.data[self.rows]
+        with patch.object(Table, "_materialize_rows") as materialize:
+            fingerprint = subset.fingerprint()
+            materialize.assert_not_called()
+        self.assertEqual(fingerprint, expected.fingerprint())
+        self.assertTrue(subset.is_lazy())
+        with patch.object(Table, "LOCKING", True), \
+                patch("Orange.data.table._part_digest") as part_digest:
+            self.assertEqual(subset.fingerprint(), fingerprint)
+            part_digest.assert_not_called()
+        # only the selected rows are hashed, block by block
+        with patch("Orange.data.table._HASH_BLOCK_SIZE", 100), \
+                patch("Orange.data.table._PICKLE_BLOCK_ROWS", 3):
+            Table.LAZY_ROWS = True
+            self.assertEqual(self.data[self.rows].fingerprint(),
+                             expected.copy().fingerprint())
+        unpickled = pickle.loads(pickle.dumps(subset))
+        self.assertFalse(unpickled.is_lazy())
+        np.testing.assert_equal(unpickled.X, expected.X)
+        np.testing.assert_equal(unpickled.metas, expected.metas)
+
+    def test_string_filter(self):
+        subset = self.data[self.rows]
+        filtered = Values([
+            FilterString("name", FilterString.StartsWith, "c")])(subset)
+        self.assertTrue(filtered.is_lazy())
+        self.assertTrue(all(name.startswith("c")
+                            for name in filtered.metas[:, 0]))
+
+    def test_sparse(self):
+        data = self.data.to_sparse()
+        subset = data[self.rows]
+        self.assertTrue(subset.is_sparse())
+        self.assertTrue(subset.is_lazy())
+        np.testing.assert_equal(subset.get_column("legs"),
+                                self.data.get_column("legs")[self.rows])
+        fingerprint = subset.fingerprint()
+        self.assertTrue(sp.issparse(subset.X))
+        self.assertIsNone(subset._row_view)
+        self.assertEqual(subset.fingerprint(), fingerprint)
+        np.testing.assert_equal(subset.X.toarray(),
+                                self.data.X[self.rows])
+
+
+if __name__ == "__main__":
+    unittest.main()
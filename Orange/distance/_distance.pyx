@@ -7,6 +7,13 @@
 
 import numpy as np
 cimport numpy as np
+from cython cimport floating
+
+# Data may be in float32 or float64; distance matrices computed from
+# float32 data with BLAS are in float32, too
+ctypedef fused data_t:
+    np.float32_t
+    np.float64_t
 
 cdef extern from "numpy/npy_math.h":
     bint npy_isnan(double x) nogil
@@ -16,7 +23,7 @@ cdef extern from "math.h":
     double sqrt(double x) nogil
 
 
-def lower_to_symmetric(double [:, :] distances, callback):
+def lower_to_symmetric(floating [:, :] distances, callback):
     cdef int row1, row2, step, n_rows1
 
     n_rows1 = distances.shape[0]
@@ -29,9 +36,9 @@ def lower_to_symmetric(double [:, :] distances, callback):
                     distances[row2, row1] = distances[row1, row2]
 
 
-def euclidean_rows_discrete(np.ndarray[np.float64_t, ndim=2] distances,
-                            np.ndarray[np.float64_t, ndim=2] x1,
-                            np.ndarray[np.float64_t, ndim=2] x2,
+def euclidean_rows_discrete(np.ndarray[floating, ndim=2] distances,
+                            np.ndarray[data_t, ndim=2] x1,
+                            np.ndarray[data_t, ndim=2] x2,
                             double[:, :] dist_missing,
                             np.ndarray[np.float64_t, ndim=1] dist_missing2,
                             char two_tables,
@@ -66,9 +73,9 @@ def euclidean_rows_discrete(np.ndarray[np.float64_t, ndim=2] distances,
 
 
 def fix_euclidean_rows(
-    np.ndarray[np.float64_t, ndim=2] distances,
-    np.ndarray[np.float64_t, ndim=2] x1,
-    np.ndarray[np.float64_t, ndim=2] x2,
+    np.ndarray[floating, ndim=2] distances,
+    np.ndarray[data_t, ndim=2] x1,
+    np.ndarray[data_t, ndim=2] x2,
     np.ndarray[np.float64_t, ndim=1] means,
     np.ndarray[np.float64_t, ndim=1] vars,
     np.ndarray[np.float64_t, ndim=1] dist_missing2,
@@ -105,9 +112,9 @@ def fix_euclidean_rows(
 
 
 def fix_euclidean_rows_normalized(
-    np.ndarray[np.float64_t, ndim=2] distances,
-    np.ndarray[np.float64_t, ndim=2] x1,
-    np.ndarray[np.float64_t, ndim=2] x2,
+    np.ndarray[floating, ndim=2] distances,
+    np.ndarray[data_t, ndim=2] x1,
+    np.ndarray[data_t, ndim=2] x2,
     np.ndarray[np.float64_t, ndim=1] means,
     np.ndarray[np.float64_t, ndim=1] vars,
     np.ndarray[np.float64_t, ndim=1] dist_missing2,
@@ -144,8 +151,8 @@ def fix_euclidean_rows_normalized(
 
 
 def fix_euclidean_cols(
-    np.ndarray[np.float64_t, ndim=2] distances,
-    np.ndarray[np.float64_t, ndim=2] x,
+    np.ndarray[floating, ndim=2] distances,
+    np.ndarray[data_t, ndim=2] x,
     double[:] means,
     double[:] vars,
     callback):
@@ -178,8 +185,8 @@ def fix_euclidean_cols(
 
 
 def fix_euclidean_cols_normalized(
-    np.ndarray[np.float64_t, ndim=2] distances,
-    np.ndarray[np.float64_t, ndim=2] x,
+    np.ndarray[floating, ndim=2] distances,
+    np.ndarray[data_t, ndim=2] x,
     double[:] means,
     double[:] vars,
     callback):
@@ -210,8 +217,8 @@ def fix_euclidean_cols_normalized(
                         distances[col1, col2] = distances[col2, col1] = d
 
 
-def manhattan_rows_cont(np.ndarray[np.float64_t, ndim=2] x1,
-                        np.ndarray[np.float64_t, ndim=2] x2,
+def manhattan_rows_cont(np.ndarray[data_t, ndim=2] x1,
+                        np.ndarray[data_t, ndim=2] x2,
                         char two_tables,
                         callback):
     cdef:
@@ -235,8 +242,8 @@ def manhattan_rows_cont(np.ndarray[np.float64_t, ndim=2] x1,
     return distances
 
 def fix_manhattan_rows(np.ndarray[np.float64_t, ndim=2] distances,
-                       np.ndarray[np.float64_t, ndim=2] x1,
-                       np.ndarray[np.float64_t, ndim=2] x2,
+                       np.ndarray[data_t, ndim=2] x1,
+                       np.ndarray[data_t, ndim=2] x2,
                        np.ndarray[np.float64_t, ndim=1] medians,
                        np.ndarray[np.float64_t, ndim=1] mads,
                        np.ndarray[np.float64_t, ndim=1] dist_missing2_cont,
@@ -272,8 +279,8 @@ def fix_manhattan_rows(np.ndarray[np.float64_t, ndim=2] distances,
 
 
 def fix_manhattan_rows_normalized(np.ndarray[np.float64_t, ndim=2] distances,
-                                  np.ndarray[np.float64_t, ndim=2] x1,
-                                  np.ndarray[np.float64_t, ndim=2] x2,
+                                  np.ndarray[data_t, ndim=2] x1,
+                                  np.ndarray[data_t, ndim=2] x2,
                                   char two_tables,
                                   callback):
     cdef:
@@ -305,7 +312,7 @@ def fix_manhattan_rows_normalized(np.ndarray[np.float64_t, ndim=2] distances,
     return distances
 
 
-def manhattan_cols(np.ndarray[np.float64_t, ndim=2] x,
+def manhattan_cols(np.ndarray[data_t, ndim=2] x,
                    np.ndarray[np.float64_t, ndim=1] medians,
                    np.ndarray[np.float64_t, ndim=1] mads,
                    char normalize,
@@ -350,7 +357,7 @@ def manhattan_cols(np.ndarray[np.float64_t, ndim=2] x,
     return distances
 
 
-def p_nonzero(np.ndarray[np.float64_t, ndim=1] x):
+def p_nonzero(np.ndarray[data_t, ndim=1] x):
     cdef:
         int row, nonzeros, nonnans
         double val
@@ -364,7 +371,7 @@ def p_nonzero(np.ndarray[np.float64_t, ndim=1] x):
                 nonzeros += 1
     return float(nonzeros) / nonnans
 
-def any_nan_row(np.ndarray[np.float64_t, ndim=2] x,
+def any_nan_row(np.ndarray[data_t, ndim=2] x,
                 callback):
     cdef:
         int row, n_cols, n_rows, step
@@ -386,8 +393,8 @@ def any_nan_row(np.ndarray[np.float64_t, ndim=2] x,
 
 def jaccard_rows(np.ndarray[np.int8_t, ndim=2] nonzeros1,
                  np.ndarray[np.int8_t, ndim=2] nonzeros2,
-                 np.ndarray[np.float64_t, ndim=2] x1,
-                 np.ndarray[np.float64_t, ndim=2] x2,
+                 np.ndarray[data_t, ndim=2] x1,
+                 np.ndarray[data_t, ndim=2] x2,
                  np.ndarray[np.int8_t, ndim=1] nans1,
                  np.ndarray[np.int8_t, ndim=1] nans2,
                  np.ndarray[np.float64_t, ndim=1] ps,
@@ -466,7 +473,7 @@ def jaccard_rows(np.ndarray[np.int8_t, ndim=2] nonzeros1,
 
 
 def jaccard_cols(np.ndarray[np.int8_t, ndim=2] nonzeros,
-                 np.ndarray[np.float64_t, ndim=2] x,
+                 np.ndarray[data_t, ndim=2] x,
                  np.ndarray[np.int8_t, ndim=1] nans,
                  np.ndarray[np.float64_t, ndim=1] ps,
                  callback):
@@ -38,7 +38,8 @@ def _interruptible_dot(a: np.ndarray, b: np.ndarray, step: int = 100,
     if a.ndim < 2 or b.ndim < 2:
         return np.dot(a, b)
 
-    c = np.zeros((a.shape[0], b.shape[1]), dtype=float)
+    c = np.zeros((a.shape[0], b.shape[1]),
+                 dtype=np.result_type(a.dtype, b.dtype, np.float32))
     n_cols = b.shape[1]
     for col in range(0, n_cols, step):
         callback(col * 100 / n_cols)
@@ -55,7 +56,7 @@ def _interruptible_sqrt(a: np.ndarray, step: int = 100,
         a = np.array(a)
     if a.ndim < 2:
         return np.sqrt(a)
-    new_a = np.zeros(a.shape, dtype=float)
+    new_a = np.zeros(a.shape, dtype=a.dtype if a.dtype.kind == "f" else float)
     n_rows = len(a)
     for row in range(0, n_rows, step):
         callback(row * 100 / n_rows)
@@ -175,8 +176,9 @@ class EuclideanColumnsModel(FittedDistanceModel):
         callbacks = StepwiseCallbacks(self.callback, [40, 30, 30])
 
         if self.normalize:
-            x1 = x1 - self.means
-            x1 /= np.sqrt(2 * self.vars)
+            # keep the precision of float32 data
+            x1 = x1 - self.means.astype(x1.dtype, copy=False)
+            x1 /= np.sqrt(2 * self.vars).astype(x1.dtype, copy=False)
         # adapted from sklearn.metric.euclidean_distances
         xx = row_norms(x1.T, squared=True)[:, np.newaxis]
         distances = _safe_sparse_dot(x1.T, x1, dense_output=True,
@@ -243,8 +245,8 @@ class Euclidean(FittedDistance):
         # warning would be annoying and slow, hence patching
         orig_warn = warnings.warn
         with patch("warnings.warn", new=nowarn):
-            means = np.nanmean(x, axis=0)
-            stdvars = np.nanvar(x, axis=0)
+            means = np.nanmean(x, axis=0, dtype=np.float64)
+            stdvars = np.nanvar(x, axis=0, dtype=np.float64)
         if self.normalize and not stdvars.all():
             raise ValueError("some columns are constant")
         return EuclideanColumnsModel(
@@ -379,7 +381,7 @@ class Manhattan(FittedDistance):
             medians = np.zeros(len(x))
             mads = np.zeros(len(x))
         else:
-            medians = np.nanmedian(x, axis=0)
+            medians = np.nanmedian(x, axis=0).astype(np.float64)
             mads = np.nanmedian(np.abs(x - medians), axis=0)
         if self.normalize and (np.isnan(mads).any() or not mads.all()):
             raise ValueError(
@@ -1,3 +1,5 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 
 from Orange.base import Learner, Model
@@ -6,6 +8,7 @@ from Orange.classification import LogisticRegressionLearner
 from Orange.classification.base_classification import LearnerClassification
 from Orange.data import Domain, ContinuousVariable, Table
 from Orange.evaluation import CrossValidation
+from Orange.evaluation.testing import with_model_cache
 from Orange.regression import RidgeRegressionLearner
 from Orange.regression.base_regression import LearnerRegression
 
@@ -45,6 +48,11 @@ class StackedLearner(Learner):
     K-fold cross-validation is used to get predictions of the base learners
     and fit the aggregator to obtain a stacked model.
 
+    If the learner has a `model_cache`, base models are cached, too. Base
+    models fitted on the entire training data are thus shared with the
+    evaluation of base learners on the same data, e.g. within the same
+    outer cross-validation.
+
     Args:
         learners (list):
             list of `Learner`s used for base models
@@ -56,22 +64,29 @@ class StackedLearner(Learner):
         k (int):
             number of folds for cross-validation
 
+        n_jobs (int):
+            number of threads for fitting base models; -1 uses the default
+            number of threads
+
     Returns:
         instance of StackedModel
     """
 
     __returns__ = StackedModel
 
-    def __init__(self, learners, aggregate, k=5, preprocessors=None):
+    def __init__(self, learners, aggregate, k=5, preprocessors=None,
+                 n_jobs=1):
         super().__init__(preprocessors=preprocessors)
         self.learners = learners
         self.aggregate = aggregate
         self.k = k
+        self.n_jobs = n_jobs
         self.params = vars()
 
     def fit_storage(self, data):
         cv = CrossValidation(k=self.k)
-        res = cv(data, self.learners)
+        res = cv(data, self.learners, model_cache=self.model_cache,
+                 n_jobs=self.n_jobs)
         if data.domain.class_var.is_discrete:
             X = np.hstack(res.probabilities)
             use_prob = True
@@ -85,11 +100,21 @@ class StackedLearner(Learner):
         with stacked_data.unlocked_reference():
             stacked_data.X = X
             stacked_data.Y = res.actual
-        models = [l(data) for l in self.learners]
+        models = self._fit_base_models(data)
         aggregate_model = self.aggregate(stacked_data)
         return StackedModel(models, aggregate_model, use_prob=use_prob,
                             domain=data.domain)
 
+    def _fit_base_models(self, data):
+        learners = [with_model_cache(learner, self.model_cache)
+                    for learner in self.learners]
+        if self.n_jobs == 1:
+            return [learner(data) for learner in learners]
+        n_jobs = None if self.n_jobs is None or self.n_jobs < 0 \
+            else self.n_jobs
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            return list(executor.map(lambda learner: learner(data), learners))
+
 
 class StackedClassificationLearner(StackedLearner, LearnerClassification):
     """
@@ -100,8 +125,9 @@ class StackedClassificationLearner(StackedLearner, LearnerClassification):
     """
 
     def __init__(self, learners, aggregate=LogisticRegressionLearner(), k=5,
-                 preprocessors=None):
-        super().__init__(learners, aggregate, k=k, preprocessors=preprocessors)
+                 preprocessors=None, n_jobs=1):
+        super().__init__(learners, aggregate, k=k, preprocessors=preprocessors,
+                         n_jobs=n_jobs)
 
 
 class StackedRegressionLearner(StackedLearner, LearnerRegression):
@@ -112,8 +138,9 @@ class StackedRegressionLearner(StackedLearner, LearnerRegression):
     regression-specific aggregator (`RidgeRegressionLearner`).
     """
     def __init__(self, learners, aggregate=RidgeRegressionLearner(), k=5,
-                 preprocessors=None):
-        super().__init__(learners, aggregate, k=k, preprocessors=preprocessors)
+                 preprocessors=None, n_jobs=1):
+        super().__init__(learners, aggregate, k=k, preprocessors=preprocessors,
+                         n_jobs=n_jobs)
 
 
 class StackedFitter(Fitter):
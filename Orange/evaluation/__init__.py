@@ -4,3 +4,4 @@
 from .clustering import *
 from .scoring import *
 from .testing import *
+from .tuning import *
@@ -1,7 +1,8 @@
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
-from sklearn.metrics import silhouette_score, adjusted_mutual_info_score, silhouette_samples
+from sklearn.metrics import adjusted_mutual_info_score, pairwise_distances
 
 from Orange.data import Table
 from Orange.evaluation.testing import Results, Validation
@@ -57,7 +58,90 @@ class Silhouette(ClusteringScore):
     separate_folds = True
 
     def compute_score(self, results):
-        return self.from_predicted(results, silhouette_score)
+        return self.from_predicted(results, _silhouette_score)
+
+
+#: The maximal size (in bytes) of a block of distances in silhouette_samples
+SILHOUETTE_BLOCK_MEMORY = 2 ** 26
+
+
+def silhouette_samples(distances, labels, *, block_size=None, n_jobs=1):
+    """
+    Compute silhouettes of instances without storing the distance matrix.
+
+    Distances are computed in blocks of rows; for each block, only the sums
+    of distances to instances in each cluster are kept. Undefined distances
+    (nan) are ignored, hence instances whose distances are all undefined do
+    not count as members of their clusters.
+
+    Args:
+        distances (np.ndarray or callable): a distance matrix, or a function
+            that receives a slice of rows and returns the matrix of distances
+            between these rows and all instances
+        labels (np.ndarray): cluster indices; instances with nan or negative
+            labels are ignored
+        block_size (int or None): the number of rows in a block; by default
+            blocks take at most `SILHOUETTE_BLOCK_MEMORY` bytes
+        n_jobs (int or None): the number of threads that process blocks;
+            -1 or `None` for the default number of threads
+
+    Returns:
+        silhouettes (np.ndarray); nan for ignored instances, instances whose
+        distances are undefined and instances from data with a single cluster
+    """
+    labels = np.asarray(labels, dtype=float)
+    n = len(labels)
+    clustered = ~np.isnan(labels)
+    clustered[clustered] = labels[clustered] >= 0
+    _, codes = np.unique(labels[clustered], return_inverse=True)
+    membership = np.zeros((n, np.max(codes, initial=-1) + 1))
+    membership[np.flatnonzero(clustered), codes] = 1
+    sizes = membership.sum(axis=0)
+    if isinstance(distances, np.ndarray):
+        matrix = distances
+        distances = lambda rows: matrix[rows]
+    if block_size is None:
+        block_size = max(1, SILHOUETTE_BLOCK_MEMORY // (8 * max(n, 1)))
+    silhouettes = np.full(n, np.nan)
+
+    def compute_block(start):
+        rows = slice(start, min(start + block_size, n))
+        dist = np.asarray(distances(rows), dtype=float)
+        undefined = np.isnan(dist)
+        if undefined.any():
+            sums = np.where(undefined, 0, dist) @ membership
+            counts = (~undefined).astype(float) @ membership
+        else:
+            sums = dist @ membership
+            counts = np.broadcast_to(sizes, sums.shape)
+        own = membership[rows].astype(bool)
+        own_count = counts[own]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # the count includes the instance itself
+            intra = sums[own] / (own_count - 1)
+            means = sums / counts
+            means[own | (counts == 0)] = np.inf
+            inter = means.min(axis=1)[own.any(axis=1)]
+            sil = np.nan_to_num((inter - intra) / np.maximum(intra, inter))
+        sil[own_count == 1] = 0  # singletons, as in sklearn
+        sil[(own_count == 0) | ~np.isfinite(inter)] = np.nan
+        block = silhouettes[rows]
+        block[own.any(axis=1)] = sil
+        silhouettes[rows] = block
+
+    starts = range(0, n, block_size)
+    if n_jobs == 1:
+        for start in starts:
+            compute_block(start)
+    else:
+        with ThreadPoolExecutor(None if n_jobs == -1 else n_jobs) as executor:
+            list(executor.map(compute_block, starts))
+    return silhouettes
+
+
+def _silhouette_score(x, labels):
+    return np.nanmean(silhouette_samples(
+        lambda rows: pairwise_distances(x[rows], x), labels))
 
 
 class AdjustedMutualInfoScore(ClusteringScore):
@@ -138,7 +222,7 @@ def graph_silhouette(X, y, xlim=None, colors=None, figsize=None, filename=None):
         return
 
     # Silhouette coefficients
-    s = silhouette_samples(X, y)
+    s = silhouette_samples(lambda rows: pairwise_distances(X[rows], X), y)
     s = s[np.argsort(y)]  # Sort by clusters
     parts = []
     # Within clusters sort by silhouette scores
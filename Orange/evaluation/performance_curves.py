@@ -1,3 +1,5 @@
+import copy
+
 import numpy as np
 
 
@@ -38,13 +40,26 @@ class Curves:
     """
     def __init__(self, ytrue, probs):
         sortind = np.argsort(probs)
-        self.probs = np.hstack((probs[sortind], [1]))
-        self.ytrue = ytrue[sortind]
+        self._set_sorted(ytrue[sortind], probs[sortind])
+
+    def _set_sorted(self, ytrue, probs):
+        self.probs = np.hstack((probs, [1]))
+        self.ytrue = ytrue
         self.fn = np.hstack(([0], np.cumsum(self.ytrue)))
         self.tot = len(probs)
         self.p = self.fn[-1]
         self.n = self.tot - self.p
 
+    @classmethod
+    def from_score_index(cls, index):
+        """
+        Construct an instance of `Curves` from a :obj:`ScoreIndex`, without
+        sorting the probabilities again.
+        """
+        curves = cls.__new__(cls)
+        curves._set_sorted(index.positive, index.probs)
+        return curves
+
     @classmethod
     def from_results(cls, results, target_class=None, model_index=None):
         """
@@ -148,3 +163,154 @@ class Curves:
     def tpr(self):
         """TPR curve"""
         return self.sensitivity()
+
+
+class ScoreIndex:
+    """
+    Test instances ordered by predicted probability of the target class.
+
+    The index is computed once per model and target class (see
+    :obj:`Orange.evaluation.Results.score_index`) and shared by AUC and by
+    ROC, lift, precision-recall and other performance curves. Indices
+    for folds are derived from it without sorting again. Instances with
+    missing class values or probabilities are omitted.
+
+    Arguments:
+        actual (np.ndarray): true classes
+        probs (np.ndarray): predicted probabilities of the target class
+        target (int): target class index
+
+    Attributes:
+        rows (np.ndarray): indices of instances, ordered by increasing
+            probability; ties are in the order of instances
+        probs (np.ndarray): ordered probabilities
+        positive (np.ndarray): a boolean vector telling whether the
+            corresponding instance belongs to the target class
+        nrows (int): number of all instances, including the omitted
+    """
+    def __init__(self, actual, probs, target):
+        self.nrows = len(probs)
+        valid = ~(np.isnan(actual) | np.isnan(probs))
+        if valid.all():
+            self.rows = np.argsort(probs, kind="stable")
+        else:
+            valid = np.flatnonzero(valid)
+            self.rows = valid[np.argsort(probs[valid], kind="stable")]
+        self.probs = probs[self.rows]
+        self.positive = actual[self.rows] == target
+        self._ends = None
+
+    @classmethod
+    def from_results(cls, results, model_index, target):
+        """
+        Return the index for the given model and target class; use the one
+        cached on results if possible.
+        """
+        if getattr(type(results), "score_index", None) is not None:
+            return results.score_index(model_index, target)
+        return cls(np.asarray(results.actual),
+                   results.probabilities[model_index][:, target], target)
+
+    def subset(self, rows):
+        """
+        Return the index for a subset of instances, e.g. a fold.
+
+        Args:
+            rows (slice or np.ndarray): indices of instances
+
+        Returns:
+            index (:obj:`ScoreIndex`)
+        """
+        if rows is Ellipsis:
+            return self
+        mask = np.zeros(self.nrows, dtype=bool)
+        mask[rows] = True
+        keep = mask[self.rows]
+        index = copy.copy(self)
+        index.rows = self.rows[keep]
+        index.probs = self.probs[keep]
+        index.positive = self.positive[keep]
+        index._ends = None
+        return index
+
+    def counts(self):
+        """
+        Return distinct thresholds in decreasing order, and the numbers of
+        positive and negative instances whose probabilities equal or exceed
+        each threshold.
+
+        Returns:
+            (thresholds, tps, fps)
+        """
+        probs = self.probs[::-1]
+        if not len(probs):
+            return np.array([]), np.array([], dtype=int), \
+                np.array([], dtype=int)
+        if self._ends is None:
+            self._ends = np.append(np.flatnonzero(probs[1:] != probs[:-1]),
+                                   len(probs) - 1)
+        tps = np.cumsum(self.positive[::-1])[self._ends]
+        fps = self._ends + 1 - tps
+        return probs[self._ends], tps, fps
+
+    def auc(self):
+        """Area under ROC curve; `nan` if one of the classes is missing"""
+        _, tps, fps = self.counts()
+        if not len(tps) or not tps[-1] or not fps[-1]:
+            return np.nan
+        tps = np.hstack(([0], tps))
+        fps = np.hstack(([0], fps))
+        area = np.dot(np.diff(fps), tps[1:] + tps[:-1]) / 2
+        return area / (tps[-1] * fps[-1])
+
+    def roc_curve(self, drop_intermediate=True):
+        """
+        Return false and true positive rates and thresholds, as in
+        :obj:`sklearn.metrics.roc_curve`.
+
+        The first threshold is 1 if probabilities do not exceed 1.
+        """
+        thresholds, tps, fps = self.counts()
+        if drop_intermediate and len(fps) > 2:
+            optimal = np.flatnonzero(np.hstack((
+                [True],
+                np.logical_or(np.diff(fps, 2), np.diff(tps, 2)),
+                [True])))
+            thresholds, tps, fps = \
+                thresholds[optimal], tps[optimal], fps[optimal]
+        tps = np.hstack(([0], tps))
+        fps = np.hstack(([0], fps))
+        if len(thresholds) and thresholds[0] > 1:
+            first = thresholds[0] + 1
+        else:
+            first = 1
+        thresholds = np.hstack(([first], thresholds))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return fps / fps[-1], tps / tps[-1], thresholds
+
+    def cumulative_gains(self):
+        """
+        Return proportions of contacted instances and of respondents
+        (positive instances) with probabilities at least equal to each
+        threshold, and the thresholds.
+        """
+        thresholds, tps, fps = self.counts()
+        if not len(thresholds):
+            return np.array([], dtype=int), np.array([], dtype=int), \
+                thresholds
+        contacted = tps + fps
+        return contacted / contacted[-1], tps / tps[-1], thresholds
+
+    def precision_recall_curve(self):
+        """
+        Return precision, recall and thresholds, as in
+        :obj:`sklearn.metrics.precision_recall_curve`.
+        """
+        thresholds, tps, fps = self.counts()
+        precision = tps / (tps + fps)
+        if tps[-1] == 0:
+            recall = np.ones(len(tps))
+        else:
+            recall = tps / tps[-1]
+        return np.hstack((precision[::-1], [1])), \
+            np.hstack((recall[::-1], [0])), thresholds[::-1]
@@ -10,13 +10,16 @@ Examples
 
 """
 
+import copy
 import math
 
 import numpy as np
+import scipy.sparse as sp
 import sklearn.metrics as skl_metrics
 from sklearn.metrics import confusion_matrix
 
 from Orange.data import DiscreteVariable, ContinuousVariable, Domain
+from Orange.evaluation.performance_curves import ScoreIndex
 from Orange.misc.wrapper_meta import WrapperMeta
 
 __all__ = ["CA", "Precision", "Recall", "F1", "PrecisionRecallFSupport", "AUC",
@@ -41,6 +44,10 @@ class ScoreMetaType(WrapperMeta):
                 cls.registry[name] = cls
         else:
             cls.registry = {}
+        # Vectorized scores reimplement compute_score; remember which one,
+        # so that subclasses that override it are not vectorized anymore
+        if "vectorized" in dict_ or "weighted_scores" in dict_:
+            cls._vectorizes = getattr(cls, "compute_score", None)
         return cls
 
     def __init__(cls, *args, **_):
@@ -59,7 +66,10 @@ class Score(metaclass=ScoreMetaType):
 
     separate_folds = False
     is_scalar = True
+    #: If true, `weighted_scores` computes scores for all weightings at once
+    vectorized = False
     is_binary = False  #: If true, compute_score accepts `target` and `average`
+    lower_is_better = False  #: If true, lower scores are better (e.g. errors)
     #: If the class doesn't explicitly contain `abstract=True`, it is not
     #: abstract; essentially, this attribute is not inherited
     abstract = True
@@ -79,6 +89,9 @@ class Score(metaclass=ScoreMetaType):
             return self
 
     def __call__(self, results, **kwargs):
+        stored = self._stored_scores(results, kwargs)
+        if stored is not None:
+            return self.average(stored)
         if self.separate_folds and results.score_by_folds and results.folds:
             scores = self.scores_by_folds(results, **kwargs)
             return self.average(scores)
@@ -91,8 +104,14 @@ class Score(metaclass=ScoreMetaType):
         return NotImplementedError
 
     def scores_by_folds(self, results, **kwargs):
+        stored = self._stored_scores(results, kwargs)
+        if stored is not None:
+            return stored.copy()
         nfolds = len(results.folds)
         nmodels = len(results.predicted)
+        if self.is_scalar and self._is_vectorized():
+            return self._scores_by_weights(
+                results, _fold_weights(results), **kwargs)
         if self.is_scalar:
             scores = np.empty((nfolds, nmodels), dtype=np.float64)
         else:
@@ -102,6 +121,93 @@ class Score(metaclass=ScoreMetaType):
             scores[fold] = self.compute_score(fold_results, **kwargs)
         return scores
 
+    def bootstrap(self, results, n_samples=1000, confidence=0.95,
+                  random_state=0, **kwargs):
+        """
+        Estimate the distribution of the score by bootstrapping.
+
+        Rows of `results` are resampled with replacement and the score is
+        computed on each sample. Vectorized scores are computed for
+        many samples at once.
+
+        Parameters
+        ----------
+        results : Orange.evaluation.Results
+            Stored predictions and actual data in model testing.
+        n_samples : int
+            number of bootstrap samples
+        confidence : float
+            confidence level of the interval
+        random_state : int or None
+            seed for the random number generator
+
+        Returns
+        -------
+        scores : np.ndarray of shape (n_samples, n_models)
+            bootstrap distribution of scores
+        ci : np.ndarray of shape (n_models, 2)
+            lower and upper bounds of the percentile confidence interval
+        """
+        if not self.is_scalar:
+            raise ValueError(f"{self.name} is not a scalar score")
+        if n_samples < 1:
+            raise ValueError("at least one bootstrap sample is required")
+        weights = _bootstrap_weights(
+            len(results.actual), n_samples, random_state)
+        if self._is_vectorized():
+            scores = self._scores_by_weights(results, weights, **kwargs)
+        else:
+            scores = Score._scores_by_weights(self, results, weights, **kwargs)
+        alpha = (1 - confidence) / 2
+        ci = np.nanquantile(scores, [alpha, 1 - alpha], axis=0).T
+        return scores, ci
+
+    def weighted_scores(self, results, weights, **kwargs):
+        """
+        Compute the score with data instances weighted by each row of
+        `weights`.
+
+        Weights of shape (n_weightings, n_rows) can represent folds
+        (indicators of rows) or bootstrap samples (multiplicities of rows).
+        Scores that are `vectorized` compute this with matrix products;
+        the default implementation resamples the results for each row of
+        weights and therefore requires integer weights.
+
+        Returns
+        -------
+        scores : np.ndarray of shape (n_weightings, n_models)
+        """
+        weights = np.asarray(weights)
+        counts = weights.astype(int)
+        if np.any(counts != weights):
+            raise ValueError(
+                f"{self.name} requires integer weights (multiplicities)")
+        rows = np.arange(weights.shape[1])
+        return np.array([
+            self.compute_score(_results_subset(results, np.repeat(rows, w)),
+                               **kwargs)
+            for w in counts])
+
+    def _stored_scores(self, results, kwargs):
+        # Fold scores computed during testing, when predictions were
+        # discarded; these exist only for scores with default arguments
+        fold_scores = getattr(results, "fold_scores", None)
+        if results.predicted is not None or not fold_scores or kwargs:
+            return None
+        return fold_scores.get(type(self))
+
+    def _is_vectorized(self):
+        return self.vectorized \
+            and type(self).compute_score is type(self)._vectorizes
+
+    def _scores_by_weights(self, results, weight_chunks, **kwargs):
+        if not self._is_vectorized():
+            return np.vstack([Score.weighted_scores(self, results, weights,
+                                                    **kwargs)
+                              for weights in weight_chunks])
+        return np.vstack([self.weighted_scores(results, weights, **kwargs)
+                          for weights in weight_chunks])
+
     def compute_score(self, results):
         wraps = type(self).__wraps__  # self.__wraps__ is invisible
         if wraps:
@@ -121,6 +227,86 @@ class Score(metaclass=ScoreMetaType):
         raise NotImplementedError
 
 
+# maximal number of elements in a block of weights
+_MAX_WEIGHTS_SIZE = 2 ** 23
+
+
+def _fold_weights(results):
+    """Yield blocks of indicator weights of folds."""
+    n = len(results.actual)
+    chunk = max(1, _MAX_WEIGHTS_SIZE // max(n, 1))
+    folds = results.folds
+    for start in range(0, len(folds), chunk):
+        block = folds[start:start + chunk]
+        weights = np.zeros((len(block), n))
+        for i, fold in enumerate(block):
+            weights[i, fold] = 1
+        yield weights
+
+
+def _bootstrap_weights(n, n_samples, random_state):
+    """Yield blocks of multiplicities of rows in bootstrap samples."""
+    rgen = np.random.RandomState(random_state)
+    chunk = max(1, _MAX_WEIGHTS_SIZE // max(n, 1))
+    for start in range(0, n_samples, chunk):
+        size = min(chunk, n_samples - start)
+        indices = rgen.randint(0, n, (size, n))
+        weights = np.empty((size, n))
+        for i, sample in enumerate(indices):
+            weights[i] = np.bincount(sample, minlength=n)
+        yield weights
+
+
+def _results_subset(results, indices):
+    subset = copy.copy(results)
+    subset.row_indices = results.row_indices[indices]
+    subset.actual = results.actual[indices]
+    subset.predicted = results.predicted[:, indices]
+    if results.probabilities is not None:
+        subset.probabilities = results.probabilities[:, indices]
+    subset.folds = None
+    return subset
+
+
+def _weighted_sums(weights, values):
+    """Return `weights @ values` for dense or sparse `values`."""
+    if sp.issparse(values):
+        return np.asarray((values.T @ weights.T).T)
+    return weights @ values
+
+
+def _indicators(values, n_values):
+    """Return a sparse matrix with ones at the given (non-nan) values."""
+    rows = np.flatnonzero(~np.isnan(values))
+    return sp.csr_matrix(
+        (np.ones(len(rows)), (rows, values[rows].astype(int))),
+        shape=(len(values), n_values))
+
+
+def _class_counts(results, weights):
+    """
+    Return weighted counts of actual classes (shape (n_weightings,
+    n_classes)), and of predicted classes and true positives (both of
+    shape (n_weightings, n_models, n_classes)).
+    """
+    n_classes = len(results.domain.class_var.values)
+    actual = results.actual.astype(float)
+    true = _weighted_sums(weights, _indicators(actual, n_classes))
+    pred = np.empty((len(weights), len(results.predicted), n_classes))
+    tp = np.empty_like(pred)
+    for i, predicted in enumerate(results.predicted):
+        predicted = predicted.astype(float)
+        pred[:, i] = _weighted_sums(weights, _indicators(predicted, n_classes))
+        hits = np.where(predicted == actual, predicted, np.nan)
+        tp[:, i] = _weighted_sums(weights, _indicators(hits, n_classes))
+    return true, pred, tp
+
+
+def _safe_divide(a, b):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(b != 0, a / np.where(b != 0, b, 1), 0.)
+
+
 class ClassificationScore(Score, abstract=True):
     class_types = (DiscreteVariable, )
 
@@ -143,6 +329,11 @@ class CA(ClassificationScore):
     name = "CA"
     long_name = "Classification accuracy"
     priority = 20
+    vectorized = True
+
+    def weighted_scores(self, results, weights, **kwargs):
+        correct = (results.predicted == results.actual).T.astype(float)
+        return _safe_divide(weights @ correct, weights.sum(axis=1)[:, None])
 
 
 class PrecisionRecallFSupport(ClassificationScore):
@@ -188,6 +379,45 @@ class TargetScore(ClassificationScore):
         return self.from_predicted(
             results, type(self).__wraps__, labels=labels, average=average)
 
+    vectorized = True
+
+    @staticmethod
+    def from_counts(tp, true, pred):
+        """Compute the score from (weighted) numbers of true positives,
+        actual and predicted instances of the target class."""
+        raise NotImplementedError
+
+    def weighted_scores(self, results, weights, target=None,
+                        average='binary'):
+        if average == 'binary':
+            if target is None:
+                if len(results.domain.class_var.values) > 2:
+                    raise ValueError(
+                        "Multiclass data: specify target class or select "
+                        "averaging ('weighted', 'macro', 'micro')")
+                target = 1
+            average = None
+        if average not in (None, 'weighted', 'macro', 'micro'):
+            raise ValueError(f"Unsupported averaging: '{average}'")
+
+        true, pred, tp = _class_counts(results, weights)
+        true = np.broadcast_to(true[:, None], tp.shape)
+        if target is not None:
+            true, pred, tp = (x[..., [target]] for x in (true, pred, tp))
+        if average == 'micro':
+            return self.from_counts(tp.sum(axis=2), true.sum(axis=2),
+                                    pred.sum(axis=2))
+        scores = self.from_counts(tp, true, pred)
+        if average == 'weighted':
+            return _safe_divide((scores * true).sum(axis=2),
+                                true.sum(axis=2))
+        # labels that appear among actual or predicted values
+        present = (true + pred) > 0
+        if target is not None:
+            present[:] = True
+        return _safe_divide((scores * present).sum(axis=2),
+                            present.sum(axis=2))
+
 
 class Precision(TargetScore):
     __wraps__ = skl_metrics.precision_score
@@ -195,18 +425,30 @@ class Precision(TargetScore):
     long_name = "Precision"
     priority = 40
 
+    @staticmethod
+    def from_counts(tp, true, pred):
+        return _safe_divide(tp, pred)
+
 
 class Recall(TargetScore):
     __wraps__ = skl_metrics.recall_score
     name = long_name = "Recall"
     priority = 50
 
+    @staticmethod
+    def from_counts(tp, true, pred):
+        return _safe_divide(tp, true)
+
 
 class F1(TargetScore):
     __wraps__ = skl_metrics.f1_score
     name = long_name = "F1"
     priority = 30
 
+    @staticmethod
+    def from_counts(tp, true, pred):
+        return _safe_divide(2 * tp, true + pred)
+
 
 class AUC(ClassificationScore):
     """
@@ -242,10 +484,17 @@ class AUC(ClassificationScore):
 
     @staticmethod
     def single_class_auc(results, target):
-        y = np.array(results.actual == target, dtype=int)
+        def auc(model_index):
+            index = ScoreIndex.from_results(results, model_index, int(target))
+            if len(index.rows) < index.nrows:
+                raise ValueError("Input contains NaN")
+            if index.positive.all() or not index.positive.any():
+                raise ValueError("Only one class present in y_true. ROC AUC "
+                                 "score is not defined in that case.")
+            return index.auc()
+
         return np.fromiter(
-            (skl_metrics.roc_auc_score(y, probabilities[:, int(target)])
-             for probabilities in results.probabilities),
+            (auc(i) for i in range(len(results.probabilities))),
             dtype=np.float64, count=len(results.predicted))
 
     def multi_class_auc(self, results):
@@ -269,6 +518,101 @@ class AUC(ClassificationScore):
             else:
                 return self.single_class_auc(results, target)
 
+    vectorized = True
+
+    @staticmethod
+    def weighted_auc(weights, positive, scores):
+        """
+        Compute AUC for each row of `weights`.
+
+        AUC is the weighted proportion of pairs of positive and negative
+        instances in which the positive instance has a higher score; ties
+        count as half.
+        """
+        return AUC._auc_from_sorted(weights, AUC._sort_scores(positive, scores))
+
+    @staticmethod
+    def _sort_scores(positive, scores):
+        order = np.argsort(scores, kind="mergesort")
+        sorted_scores = scores[order]
+        starts = np.flatnonzero(
+            np.r_[True, sorted_scores[1:] != sorted_scores[:-1]])
+        if len(starts) == len(scores):
+            starts = None  # no ties
+        return order, starts, positive[order]
+
+    @staticmethod
+    def _sorted_from_index(index):
+        probs = index.probs
+        starts = np.flatnonzero(np.r_[True, probs[1:] != probs[:-1]])
+        if len(starts) == len(probs):
+            starts = None
+        return index.rows, starts, index.positive
+
+    @staticmethod
+    def _auc_from_sorted(weights, sorted_scores):
+        order, starts, positive = sorted_scores
+        if not len(order):
+            return np.full(len(weights), np.nan)
+        weights = np.take(np.asarray(weights, dtype=float), order, axis=1)
+        pos = weights * positive
+        neg = weights
+        neg -= pos
+        if starts is not None:
+            pos = np.add.reduceat(pos, starts, axis=1)
+            neg = np.add.reduceat(neg, starts, axis=1)
+        pairs = pos.sum(axis=1) * neg.sum(axis=1)
+        # weight of negatives below each position plus half of the ties
+        below = np.cumsum(neg, axis=1)
+        below -= neg / 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.einsum("ij,ij->i", pos, below) / pairs
+
+    def weighted_scores(self, results, weights, target=None, average=None):
+        return self._scores_by_weights(results, [weights], target, average)
+
+    def _scores_by_weights(self, results, weight_chunks, target=None,
+                           average=None):
+        # scores are sorted once for all blocks of weights
+        n_classes = len(results.domain.class_var.values)
+        if n_classes < 2:
+            raise ValueError("Class variable has less than two values")
+        nmodels = len(results.probabilities)
+        if n_classes == 2 or target is not None:
+            target = 1 if target is None else int(target)
+            sorted_scores = [
+                self._sorted_from_index(
+                    ScoreIndex.from_results(results, i, target))
+                for i in range(nmodels)]
+            return np.vstack([
+                np.column_stack([self._auc_from_sorted(weights, sorted_)
+                                 for sorted_ in sorted_scores])
+                for weights in weight_chunks])
+
+        # weighted average of one-vs-rest AUCs, as in multi_class_auc
+        positives = [results.actual == class_ for class_ in range(n_classes)]
+        sorted_scores = [
+            [self._sorted_from_index(
+                ScoreIndex.from_results(results, i, class_))
+             for i in range(nmodels)]
+            for class_ in range(n_classes)]
+        chunk_scores = []
+        for weights in weight_chunks:
+            total = weights.sum(axis=1)
+            scores = np.zeros((len(weights), len(results.probabilities)))
+            norm = np.zeros(len(weights))
+            for positive, class_sorted in zip(positives, sorted_scores):
+                n_pos = weights @ positive
+                class_weight = n_pos * (total - n_pos)
+                norm += class_weight
+                for i, sorted_ in enumerate(class_sorted):
+                    auc = self._auc_from_sorted(weights, sorted_)
+                    scores[:, i] += \
+                        np.where(class_weight > 0, auc, 0) * class_weight
+            with np.errstate(divide="ignore", invalid="ignore"):
+                chunk_scores.append(scores / norm[:, None])
+        return np.vstack(chunk_scores)
+
 
 class LogLoss(ClassificationScore):
     """
@@ -300,6 +644,7 @@ class LogLoss(ClassificationScore):
     priority = 120
     name = "LogLoss"
     long_name = "Logistic loss"
+    lower_is_better = True
     default_visible = False
 
     def compute_score(self, results, eps=1e-15, normalize=True,
@@ -313,6 +658,25 @@ class LogLoss(ClassificationScore):
              for probabilities in results.probabilities),
             dtype=np.float64, count=len(results.probabilities))
 
+    vectorized = True
+
+    def weighted_scores(self, results, weights, eps=1e-15, normalize=True,
+                        sample_weight=None):
+        if sample_weight is not None:
+            weights = weights * sample_weight
+        actual = results.actual.astype(int)
+        rows = np.arange(len(actual))
+        losses = np.empty((len(actual), len(results.probabilities)))
+        for i, probabilities in enumerate(results.probabilities):
+            probabilities = np.clip(probabilities, eps, 1 - eps)
+            probabilities /= probabilities.sum(axis=1)[:, None]
+            losses[:, i] = -np.log(probabilities[rows, actual])
+        scores = weights @ losses
+        if normalize:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                scores /= weights.sum(axis=1)[:, None]
+        return scores
+
 
 class Specificity(ClassificationScore):
     is_binary = True
@@ -367,21 +731,73 @@ class Specificity(ClassificationScore):
         elif target is not None:
             return self.single_class_specificity(results, target)
 
+    vectorized = True
+
+    def weighted_scores(self, results, weights, target=None,
+                        average="binary"):
+        n_classes = len(results.domain.class_var.values)
+        if target is None:
+            if average == "binary":
+                if n_classes != 2:
+                    raise ValueError(
+                        "Binary averaging needs two classes in data: "
+                        "specify target class or use "
+                        "weighted averaging.")
+                target = 1
+            elif average != "weighted":
+                raise ValueError(
+                    "Wrong parameters: For averaging select one of the "
+                    "following values: ('weighted', 'binary')")
+        true, pred, tp = _class_counts(results, weights)
+        total = weights.sum(axis=1)[:, None, None]
+        true = true[:, None]
+        false_pos = pred - tp
+        true_neg = total - true - false_pos
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = true_neg / (true_neg + false_pos)
+        if target is not None:
+            return scores[..., target]
+        # weighted by proportions of classes that appear among actual values
+        true = np.broadcast_to(true, scores.shape)
+        return (np.where(true > 0, scores, 0) * true).sum(axis=2) \
+            / true.sum(axis=2)
+
 
 class MatthewsCorrCoefficient(ClassificationScore):
     __wraps__ = skl_metrics.matthews_corrcoef
     name = "MCC"
     long_name = "Matthews correlation coefficient"
+    vectorized = True
+
+    def weighted_scores(self, results, weights, **kwargs):
+        true, pred, tp = _class_counts(results, weights)
+        total = weights.sum(axis=1)[:, None]
+        correct = tp.sum(axis=2)
+        cov_ytyp = correct * total - (pred * true[:, None]).sum(axis=2)
+        cov_ypyp = total ** 2 - (pred ** 2).sum(axis=2)
+        cov_ytyt = total ** 2 - (true ** 2).sum(axis=1)[:, None]
+        return _safe_divide(cov_ytyp, np.sqrt(cov_ytyt * cov_ypyp))
 
 
 # Regression scores
 
 
+def _weighted_means(weights, values):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return weights @ values / weights.sum(axis=1)[:, None]
+
+
 class MSE(RegressionScore):
     __wraps__ = skl_metrics.mean_squared_error
     name = "MSE"
     long_name = "Mean square error"
     priority = 20
+    lower_is_better = True
+    vectorized = True
+
+    def weighted_scores(self, results, weights, **kwargs):
+        return _weighted_means(
+            weights, ((results.predicted - results.actual) ** 2).T)
 
 
 class RMSE(RegressionScore):
@@ -391,6 +807,11 @@ class RMSE(RegressionScore):
     def compute_score(self, results):
         return np.sqrt(MSE(results))
     priority = 30
+    lower_is_better = True
+    vectorized = True
+
+    def weighted_scores(self, results, weights, **kwargs):
+        return np.sqrt(MSE().weighted_scores(results, weights))
 
 
 class MAE(RegressionScore):
@@ -398,6 +819,12 @@ class MAE(RegressionScore):
     name = "MAE"
     long_name = "Mean absolute error"
     priority = 40
+    lower_is_better = True
+    vectorized = True
+
+    def weighted_scores(self, results, weights, **kwargs):
+        return _weighted_means(
+            weights, np.abs(results.predicted - results.actual).T)
 
 
 # pylint: disable=invalid-name
@@ -406,6 +833,20 @@ class R2(RegressionScore):
     name = "R2"
     long_name = "Coefficient of determination"
     priority = 50
+    vectorized = True
+
+    def weighted_scores(self, results, weights, **kwargs):
+        actual = results.actual
+        residual = weights @ ((results.predicted - actual) ** 2).T
+        # center to reduce cancellation in the sum of squares
+        centered = actual - np.mean(actual)
+        mean = _weighted_means(weights, centered[:, None])[:, 0]
+        total = weights @ centered ** 2 - mean ** 2 * weights.sum(axis=1)
+        total = np.broadcast_to(total[:, None], residual.shape)
+        # as in sklearn: constant actual values give 1 if fit is perfect
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(total > 0, 1 - residual / total,
+                            np.where(residual == 0, 1., 0.))
 
 
 class CVRMSE(RegressionScore):
@@ -413,9 +854,17 @@ class CVRMSE(RegressionScore):
     long_name = "Coefficient of variation of the RMSE"
     priority = 110
     default_visible = False
+    lower_is_better = True
 
     def compute_score(self, results):
         mean = np.nanmean(results.actual)
         if mean < 1e-10:
             raise ValueError("Mean value is too small")
         return RMSE(results) / mean * 100
+
+    vectorized = True
+
+    def weighted_scores(self, results, weights, **kwargs):
+        mean = _weighted_means(weights, results.actual[:, None])
+        mean = np.where(mean < 1e-10, np.nan, mean)
+        return RMSE().weighted_scores(results, weights) / mean * 100
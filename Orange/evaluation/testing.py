@@ -1,7 +1,12 @@
 # __new__ methods have different arguments
 # pylint: disable=arguments-differ
+import copy
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from warnings import warn
-from collections import namedtuple
+from collections import namedtuple, deque
 from itertools import chain
 from time import time
 
@@ -9,8 +14,10 @@ import numpy as np
 
 import sklearn.model_selection as skl
 
+from Orange.base import Learner, Model
 from Orange.data import Domain, ContinuousVariable, DiscreteVariable
 from Orange.data.util import get_unique_names
+from Orange.evaluation.performance_curves import ScoreIndex
 
 __all__ = ["Results", "CrossValidation", "LeaveOneOut", "TestOnTrainingData",
            "ShuffleSplit", "TestOnTestData", "sample", "CrossValidationFeature"]
@@ -24,19 +31,102 @@ def _identity(x):
     return x
 
 
+def _empty_array(shape, dtype, memmap_dir=None):
+    if memmap_dir is None or not np.prod(shape):
+        return np.empty(shape, dtype=dtype)
+    # the file is removed when closed; the mapping stays valid
+    with tempfile.TemporaryFile(dir=memmap_dir) as f:
+        return np.memmap(f, dtype=dtype, mode="w+", shape=shape)
+
+
+class _SharedPreprocessing:
+    """
+    Training and test data of a fold, transformed once for all learners
+    that preprocess data in the same way and for all models with the
+    same domain.
+
+    Parts may run in parallel threads; each entry is computed by the first
+    thread that needs it, while others wait for it under the entry's lock.
+    """
+    def __init__(self, train_data, test_data):
+        self.train_data = train_data
+        self.test_data = test_data
+        self._lock = threading.Lock()
+        self._preprocessed = {}
+        self._transformed = []
+
+    @staticmethod
+    def _computed(entry, compute):
+        lock, value = entry
+        with lock:
+            if not value:
+                value.append(compute())
+        return value[0]
+
+    def fit(self, learner):
+        if not isinstance(learner, Learner) \
+                or type(learner).__call__ is not Learner.__call__:
+            return learner(self.train_data)
+        key = learner.preprocessing_key(self.train_data)
+        if key is None:
+            return learner(self.train_data)
+        with self._lock:
+            entry = self._preprocessed.setdefault(key, (threading.Lock(), []))
+        preprocessed = self._computed(
+            entry, lambda: learner.preprocess(self.train_data))
+        return learner.fit_preprocessed(self.train_data, preprocessed)
+
+    def test_data_for(self, model):
+        if not isinstance(model, Model) \
+                or getattr(type(model), "data_to_model_domain", None) \
+                is not Model.data_to_model_domain:
+            return self.test_data
+        domain = getattr(model, "domain", None)
+        original_domain = getattr(model, "original_domain", None)
+        if domain is None or original_domain is None:
+            return self.test_data
+        with self._lock:
+            for tdomain, toriginal_domain, entry in self._transformed:
+                if tdomain is domain and toriginal_domain is original_domain:
+                    break
+            else:
+                entry = (threading.Lock(), [])
+                self._transformed.append((domain, original_domain, entry))
+        return self._computed(
+            entry, lambda: model.data_to_model_domain(self.test_data))
+
+
+def with_model_cache(learner, model_cache):
+    """
+    Return the learner, or its copy that uses `model_cache` if the learner
+    does not have its own cache.
+    """
+    if model_cache is not None \
+            and getattr(learner, "model_cache", False) is None:
+        learner = copy.copy(learner)
+        learner.model_cache = model_cache
+    return learner
+
+
 def _mp_worker(fold_i, train_data, test_data, learner_i, learner,
-               store_models):
+               store_models, model_cache=None, shared=None):
     predicted, probs, model, failed = None, None, None, False
     train_time, test_time = None, None
     try:
         if not train_data or not test_data:
             raise RuntimeError('Test fold is empty')
+        learner = with_model_cache(learner, model_cache)
         # training
         t0 = time()
-        model = learner(train_data)
+        if shared is None:
+            model = learner(train_data)
+        else:
+            model = shared.fit(learner)
         train_time = time() - t0
         t0 = time()
         # testing
+        if shared is not None:
+            test_data = shared.test_data_for(model)
         class_var = train_data.domain.class_var
         if class_var and class_var.is_discrete:
             predicted, probs = model(test_data, model.ValueProbs)
@@ -51,6 +141,30 @@ def _mp_worker(fold_i, train_data, test_data, learner_i, learner,
                       train_time, test_time)
 
 
+def _run_parts(args_iter, n_jobs=1):
+    """
+    Call `_mp_worker` with each tuple of arguments and yield the results in
+    order. With `n_jobs` other than 1, parts run in a pool of threads; -1
+    (or None) uses the default number of threads. Arguments are consumed
+    only as threads become free, so data for all parts is not held at once.
+    """
+    if n_jobs == 1:
+        for args in args_iter:
+            yield _mp_worker(*args)
+        return
+    if n_jobs is None or n_jobs < 0:
+        # the default of ThreadPoolExecutor
+        n_jobs = min(32, (os.cpu_count() or 1) + 4)
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        pending = deque()
+        for args in args_iter:
+            pending.append(executor.submit(_mp_worker, *args))
+            if len(pending) > n_jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
 class Results:
     """
     Class for storing predictions in model testing.
@@ -89,6 +203,11 @@ class Results:
         train_time (np.ndarray): training times of batches
 
         test_time (np.ndarray): testing times of batches
+
+        fold_scores (Optional[Dict[type, np.ndarray]]): scores computed
+            during testing, in arrays of shape (number-of-folds,
+            number-of-methods), keyed by the type of the score; used when
+            predictions are not stored
     """
     def __init__(self, data=None, *,
                  nmethods=None, nrows=None, nclasses=None,
@@ -97,7 +216,8 @@ class Results:
                  learners=None, models=None, failed=None,
                  actual=None, predicted=None, probabilities=None,
                  store_data=None, store_models=None,
-                 train_time=None, test_time=None):
+                 train_time=None, test_time=None,
+                 compact=False, memmap_dir=None, store_predictions=True):
         """
         Construct an instance.
 
@@ -138,6 +258,13 @@ class Results:
             probabilities (np.ndarray): see class documentation
             store_data (bool): ignored; kept for backward compatibility
             store_models (bool): ignored; kept for backward compatibility
+            compact (bool): if set, empty `probabilities` are float32 and
+                empty `predicted` are int32 for classification and float32
+                for regression
+            memmap_dir (str): if given, empty `predicted` and `probabilities`
+                are backed by temporary memory-mapped files in this directory
+            store_predictions (bool): if set to `False`, empty `predicted`
+                and `probabilities` are not prepared
         """
 
         # Set given data directly from arguments
@@ -158,6 +285,8 @@ class Results:
 
         self.train_time = train_time
         self.test_time = test_time
+        self.fold_scores = None
+        self._score_indices = {}
 
         # Guess the rest -- or check for ambguities
         def set_or_raise(value, exp_values, msg):
@@ -203,20 +332,60 @@ class Results:
                 and nrows is not None:
             self.actual = np.empty(nrows)
 
-        if predicted is None \
+        if not compact:
+            predicted_dtype = probabilities_dtype = float
+        else:
+            predicted_dtype = np.float32 if nclasses is None else np.int32
+            probabilities_dtype = np.float32
+
+        if predicted is None and store_predictions \
                 and nmethods is not None and nrows is not None:
-            self.predicted = np.empty((nmethods, nrows))
+            self.predicted = _empty_array(
+                (nmethods, nrows), predicted_dtype, memmap_dir)
 
-        if probabilities is None \
+        if probabilities is None and store_predictions \
                 and nmethods is not None and nrows is not None \
                 and nclasses is not None:
-            self.probabilities = \
-                np.empty((nmethods, nrows, nclasses))
+            self.probabilities = _empty_array(
+                (nmethods, nrows, nclasses), probabilities_dtype, memmap_dir)
 
         if failed is None \
                 and nmethods is not None:
             self.failed = [False] * nmethods
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_score_indices", None)
+        return state
+
+    def score_index(self, model_index, target):
+        """
+        Return instances ordered by probabilities of the target class, as
+        predicted by the given model.
+
+        The index is computed once and reused until `actual` or
+        `probabilities` are replaced; it is not updated when the arrays are
+        modified in place.
+
+        Args:
+            model_index (int): model index
+            target (int): target class index
+
+        Returns:
+            index (:obj:`Orange.evaluation.performance_curves.ScoreIndex`)
+        """
+        # Results may come from pickles that precede the cache
+        cache = self.__dict__.setdefault("_score_indices", {})
+        key = (model_index, target)
+        if key in cache:
+            actual, probabilities, index = cache[key]
+            if actual is self.actual and probabilities is self.probabilities:
+                return index
+        index = ScoreIndex(np.asarray(self.actual),
+                           self.probabilities[model_index][:, target], target)
+        cache[key] = self.actual, self.probabilities, index
+        return index
+
     def get_fold(self, fold):
         results = Results()
         results.data = self.data
@@ -426,7 +595,9 @@ class Validation:
              DeprecationWarning)
         return self(*args, **kwargs)
 
-    def __call__(self, data, learners, preprocessor=None, *, callback=None):
+    def __call__(self, data, learners, preprocessor=None, *, callback=None,
+                 model_cache=None, compact=False, memmap_dir=None,
+                 scorers=None, n_jobs=1):
         """
         Args:
             data (Orange.data.Table): data to be used (usually split) into
@@ -435,6 +606,16 @@ class Validation:
             preprocessor (Orange.preprocess.Preprocess): preprocessor applied
                 on training data
             callback (Callable): a function called to notify about the progress
+            model_cache (Orange.misc.cache.DiskCache): cache for models
+                fitted by learners that do not have their own cache
+            compact (bool): store predictions in 32-bit arrays
+            memmap_dir (str): store predictions in memory-mapped files in
+                this directory
+            scorers (list of Orange.evaluation.Score): if given, predictions
+                are scored on each fold and discarded; scores are kept in
+                `fold_scores` of the results
+            n_jobs (int): number of threads for fitting and testing
+                models; -1 uses the default number of threads
 
         Returns:
             results (Result): results of testing
@@ -449,18 +630,32 @@ class Validation:
         data_splits = (
             (fold_i, preprocessor(data[train_i]), data[test_i])
             for fold_i, (train_i, test_i) in enumerate(indices))
+        # preprocessing is shared among learners within each fold
         args_iter = (
-            (fold_i, data, test_data, learner_i, learner, self.store_models)
+            (fold_i, data, test_data, learner_i, learner, self.store_models,
+             model_cache, shared)
             for (fold_i, data, test_data) in data_splits
+            for shared in [_SharedPreprocessing(data, test_data)]
             for (learner_i, learner) in enumerate(learners))
 
-        part_results = []
+        results = self._prepare_results(
+            data, learners, len(indices), row_indices, folds, actual,
+            compact, memmap_dir, scorers)
+
+        # parts are stored as they come, so all predictions are never kept
+        # in memory twice
+        offsets = np.cumsum([0] + [len(test) for _, test in indices])
         parts = np.linspace(.0, .99, len(learners) * len(indices) + 1)[1:]
-        for progress, part in zip(parts, args_iter):
-            part_results.append(_mp_worker(*(part + ())))
+        for progress, res in zip(parts, _run_parts(args_iter, n_jobs)):
+            self._store_part_result(
+                results, res,
+                slice(offsets[res.fold_i], offsets[res.fold_i + 1]), scorers)
             callback(progress)
         callback(1)
+        return results
 
+    def _prepare_results(self, data, learners, nfolds, row_indices, folds,
+                         actual, compact=False, memmap_dir=None, scorers=None):
         results = Results(
             data=data if self.store_data else None,
             domain=data.domain,
@@ -468,11 +663,16 @@ class Validation:
             row_indices=row_indices, folds=folds, actual=actual,
             score_by_folds=self.score_by_folds,
             train_time=np.zeros((len(learners),)),
-            test_time=np.zeros((len(learners),)))
+            test_time=np.zeros((len(learners),)),
+            compact=compact, memmap_dir=memmap_dir,
+            store_predictions=not scorers)
 
         if self.store_models:
-            results.models = np.tile(None, (len(indices), len(learners)))
-        self._collect_part_results(results, part_results)
+            results.models = np.tile(None, (nfolds, len(learners)))
+        if scorers:
+            results.fold_scores = {
+                type(scorer): np.full((nfolds, len(learners)), np.nan)
+                for scorer in scorers}
         return results
 
     @classmethod
@@ -526,30 +726,31 @@ class Validation:
         """
         raise NotImplementedError()
 
-    def _collect_part_results(self, results, part_results):
-        part_results = sorted(part_results)
-
-        ptr, prev_fold_i, prev_n_values = 0, 0, 0
-        for res in part_results:
-            if res.fold_i != prev_fold_i:
-                ptr += prev_n_values
-                prev_fold_i = res.fold_i
-            result_slice = slice(ptr, ptr + res.n_values)
-            prev_n_values = res.n_values
+    def _store_part_result(self, results, res, result_slice, scorers=None):
+        if res.failed:
+            results.failed[res.learner_i] = res.failed
+            return
 
-            if res.failed:
-                results.failed[res.learner_i] = res.failed
-                continue
-
-            if self.store_models:
-                results.models[res.fold_i][res.learner_i] = res.model
-
-            results.predicted[res.learner_i][result_slice] = res.values
-            results.train_time[res.learner_i] += res.train_time
-            results.test_time[res.learner_i] += res.test_time
-            if res.probs is not None:
-                results.probabilities[res.learner_i][result_slice, :] = \
-                    res.probs
+        if self.store_models:
+            results.models[res.fold_i][res.learner_i] = res.model
+
+        results.train_time[res.learner_i] += res.train_time
+        results.test_time[res.learner_i] += res.test_time
+        if scorers:
+            part = Results(
+                domain=results.domain,
+                row_indices=results.row_indices[result_slice],
+                actual=results.actual[result_slice],
+                predicted=np.atleast_1d(res.values)[None],
+                probabilities=None if res.probs is None else res.probs[None])
+            for scorer in scorers:
+                results.fold_scores[type(scorer)][res.fold_i, res.learner_i] \
+                    = scorer.compute_score(part)[0]
+            return
+
+        results.predicted[res.learner_i][result_slice] = res.values
+        if res.probs is not None:
+            results.probabilities[res.learner_i][result_slice, :] = res.probs
 
 
 class CrossValidation(Validation):
@@ -718,7 +919,8 @@ class TestOnTestData(Validation):
             test_data=test_data, **kwargs)
 
     def __call__(self, data, test_data, learners, preprocessor=None,
-                 *, callback=None):
+                 *, callback=None, model_cache=None, compact=False,
+                 memmap_dir=None, scorers=None, n_jobs=1):
         """
         Args:
             data (Orange.data.Table): training data
@@ -727,6 +929,16 @@ class TestOnTestData(Validation):
             preprocessor (Orange.preprocess.Preprocess): preprocessor applied
                 on training data
             callback (Callable): a function called to notify about the progress
+            model_cache (Orange.misc.cache.DiskCache): cache for models
+                fitted by learners that do not have their own cache
+            compact (bool): store predictions in 32-bit arrays
+            memmap_dir (str): store predictions in memory-mapped files in
+                this directory
+            scorers (list of Orange.evaluation.Score): if given, predictions
+                are scored and discarded; scores are kept in `fold_scores`
+                of the results
+            n_jobs (int): number of threads for fitting and testing
+                models; -1 uses the default number of threads
 
         Returns:
             results (Result): results of testing
@@ -737,28 +949,18 @@ class TestOnTestData(Validation):
             callback = _identity
 
         train_data = preprocessor(data)
-        part_results = []
-        for (learner_i, learner) in enumerate(learners):
-            part_results.append(
-                _mp_worker(0, train_data, test_data, learner_i, learner,
-                           self.store_models))
-            callback((learner_i + 1) / len(learners))
+        shared = _SharedPreprocessing(train_data, test_data)
+        results = self._prepare_results(
+            test_data, learners, 1, np.arange(len(test_data)), (Ellipsis, ),
+            test_data.Y, compact, memmap_dir, scorers)
+        args_iter = (
+            (0, train_data, test_data, learner_i, learner, self.store_models,
+             model_cache, shared)
+            for (learner_i, learner) in enumerate(learners))
+        for res in _run_parts(args_iter, n_jobs):
+            self._store_part_result(results, res, slice(None), scorers)
+            callback((res.learner_i + 1) / len(learners))
         callback(1)
-
-        results = Results(
-            data=test_data if self.store_data else None,
-            domain=test_data.domain,
-            nrows=len(test_data), learners=learners,
-            row_indices=np.arange(len(test_data)),
-            folds=(Ellipsis, ),
-            actual=test_data.Y,
-            score_by_folds=self.score_by_folds,
-            train_time=np.zeros((len(learners),)),
-            test_time=np.zeros((len(learners),)))
-
-        if self.store_models:
-            results.models = np.tile(None, (1, len(learners)))
-        self._collect_part_results(results, part_results)
         return results
 
 
@@ -2,9 +2,10 @@ import unittest
 from unittest.mock import patch
 
 import numpy as np
+from sklearn import metrics
 
 from Orange.evaluation.testing import Results
-from Orange.evaluation.performance_curves import Curves
+from Orange.evaluation.performance_curves import Curves, ScoreIndex
 
 
 # Test data and sensitivity/specificity are taken from
@@ -123,3 +124,76 @@ class TestCurves(unittest.TestCase):
         cytrue, cprobs = init.call_args[0]
         np.testing.assert_equal(cytrue, ytrue[1:-1])
         np.testing.assert_equal(cprobs, probs[1:-1])
+
+
+class TestScoreIndex(unittest.TestCase):
+    def setUp(self):
+        rgen = np.random.RandomState(42)
+        self.actual = rgen.randint(0, 3, 200).astype(float)
+        # rounding gives ties
+        self.probs = np.round(
+            np.clip(rgen.random(200) + 0.2 * (self.actual == 1), 0, 1), 1)
+
+    def test_curves(self):
+        index = ScoreIndex(self.actual, self.probs, 1)
+        ytrue = self.actual == 1
+        fpr, tpr, thresholds = index.roc_curve(drop_intermediate=False)
+        sfpr, stpr, sthresholds = metrics.roc_curve(
+            ytrue, self.probs, drop_intermediate=False)
+        np.testing.assert_almost_equal(fpr, sfpr)
+        np.testing.assert_almost_equal(tpr, stpr)
+        np.testing.assert_almost_equal(thresholds[1:], sthresholds[1:])
+        self.assertEqual(thresholds[0], 1)
+
+        fpr, tpr, _ = index.roc_curve()
+        sfpr, stpr, _ = metrics.roc_curve(ytrue, self.probs)
+        np.testing.assert_almost_equal(fpr, sfpr)
+        np.testing.assert_almost_equal(tpr, stpr)
+
+        for computed, expected in zip(
+                index.precision_recall_curve(),
+                metrics.precision_recall_curve(ytrue, self.probs)):
+            np.testing.assert_almost_equal(computed, expected)
+
+        self.assertAlmostEqual(index.auc(),
+                               metrics.roc_auc_score(ytrue, self.probs))
+
+        # without ties, so that the order of instances is defined
+        probs = self.probs + np.arange(200) * 1e-6
+        curves = Curves.from_score_index(ScoreIndex(self.actual, probs, 1))
+        expected = Curves(ytrue, probs)
+        np.testing.assert_equal(curves.probs, expected.probs)
+        np.testing.assert_equal(curves.tp, expected.tp)
+        np.testing.assert_equal(curves.fp, expected.fp)
+
+    def test_subset(self):
+        index = ScoreIndex(self.actual, self.probs, 1)
+        for rows in (slice(50, 120), np.arange(0, 200, 3)):
+            subset = index.subset(rows)
+            expected = ScoreIndex(self.actual[rows], self.probs[rows], 1)
+            np.testing.assert_equal(subset.probs, expected.probs)
+            np.testing.assert_equal(subset.positive, expected.positive)
+            np.testing.assert_equal(
+                subset.rows, np.arange(200)[rows][expected.rows])
+            self.assertAlmostEqual(subset.auc(), expected.auc())
+        self.assertIs(index.subset(...), index)
+
+    def test_nans(self):
+        self.actual[0] = np.nan
+        self.probs[1] = np.nan
+        index = ScoreIndex(self.actual, self.probs, 1)
+        self.assertEqual(len(index.rows), 198)
+        self.assertEqual(index.nrows, 200)
+        self.assertNotIn(0, index.rows)
+        self.assertNotIn(1, index.rows)
+
+    def test_cached_on_results(self):
+        res = Results(actual=self.actual,
+                      probabilities=np.random.random((2, 200, 3)))
+        index = res.score_index(1, 2)
+        self.assertIs(res.score_index(1, 2), index)
+        self.assertIsNot(res.score_index(0, 2), index)
+        self.assertIs(ScoreIndex.from_results(res, 1, 2), index)
+
+        res.probabilities = res.probabilities.copy()
+        self.assertIsNot(res.score_index(1, 2), index)
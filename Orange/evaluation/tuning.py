@@ -0,0 +1,338 @@
+"""
+Search for parameters of learning algorithms.
+
+A search takes a function that constructs a learner from keyword arguments
+(usually a learner class, such as `LogisticRegressionLearner`) and a space
+of parameters, and evaluates the learners with one of the sampling
+procedures from :obj:`Orange.evaluation.testing`. All candidates are
+evaluated in a single call of the sampling procedure, so preprocessed
+training data is shared among them within each fold.
+
+:obj:`GridSearch` and :obj:`RandomSearch` evaluate all candidates on all
+data. :obj:`SuccessiveHalving` and :obj:`Hyperband` first evaluate many
+candidates on small samples of data and then only the best on larger.
+"""
+import itertools
+import math
+
+import numpy as np
+
+from Orange.base import Learner
+from Orange.evaluation.scoring import CA, RMSE
+from Orange.evaluation.testing import CrossValidation
+
+__all__ = ["GridSearch", "RandomSearch", "SuccessiveHalving", "Hyperband",
+           "TuningResults", "TunedLearner"]
+
+
+class TuningResults:
+    """
+    Results of a parameter search.
+
+    Attributes:
+        factory (callable): function that constructs learners
+        params (list of dict): evaluated combinations of parameters
+        scores (np.ndarray): scores of combinations on the largest sample
+            of data on which they were evaluated
+        resources (np.ndarray): the number of data instances on which each
+            combination was last evaluated
+        rounds (list of tuple): a tuple `(resources, indices, scores)` for
+            each round of evaluation, where `indices` are indices of
+            evaluated combinations
+        best_index (int): index of the best combination
+    """
+    def __init__(self, factory, params, scores, resources, rounds,
+                 best_index):
+        self.factory = factory
+        self.params = params
+        self.scores = scores
+        self.resources = resources
+        self.rounds = rounds
+        self.best_index = best_index
+
+    @property
+    def best_params(self):
+        """The best combination of parameters"""
+        return self.params[self.best_index]
+
+    @property
+    def best_score(self):
+        """The score of the best combination"""
+        return self.scores[self.best_index]
+
+    @property
+    def learner(self):
+        """A learner with the best parameters"""
+        return self.factory(**self.best_params)
+
+
+class ParameterSearch:
+    """
+    Base class for parameter searches.
+
+    Calling the search with data returns :obj:`TuningResults`.
+
+    Args:
+        learner (callable): a function that returns a learner for the given
+            keyword arguments, usually a learner class
+        params (dict): names of parameters and their values; derived classes
+            define which values they accept
+        validation (Orange.evaluation.testing.Validation): sampling
+            procedure; the default is 5-fold cross validation
+        score (Orange.evaluation.scoring.Score): score to optimize; the
+            default is classification accuracy for classification and RMSE
+            for regression
+        n_jobs (int): number of threads for validation (see
+            :obj:`Orange.evaluation.testing.Validation`)
+        random_state (int): seed for sampling of parameters and data
+    """
+    def __init__(self, learner, params, *, validation=None, score=None,
+                 n_jobs=1, random_state=0):
+        self.learner = learner
+        self.params = params
+        self.validation = validation or CrossValidation(k=5)
+        self.score = score
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+
+    def candidates(self):
+        """Return a list of combinations of parameters to evaluate."""
+        raise NotImplementedError
+
+    def __call__(self, data):
+        params = self.candidates()
+        scores = self.evaluate(data, params)
+        return TuningResults(
+            self.learner, params, scores, np.full(len(params), len(data)),
+            [(len(data), np.arange(len(params)), scores)],
+            self._ranking(data, scores)[0])
+
+    def evaluate(self, data, params):
+        """
+        Return scores of learners with the given parameters on the data;
+        scores of learners that fail are `nan`.
+        """
+        learners = [self.learner(**kwargs) for kwargs in params]
+        results = self.validation(data, learners, n_jobs=self.n_jobs)
+        score = self._score(data)
+        failed = [bool(failed) for failed in results.failed]
+        if not any(failed):
+            return np.array(score(results), dtype=float)
+        # predictions of failed learners are undefined and may break scoring
+        return np.array([np.nan if fail else score(res)[0]
+                         for res, fail in zip(results.split_by_model(),
+                                              failed)])
+
+    def _score(self, data):
+        if self.score is not None:
+            return self.score
+        return RMSE() if data.domain.has_continuous_class else CA()
+
+    def _ranking(self, data, scores):
+        # indices from the best to the worst; nan's are the worst
+        if self._score(data).lower_is_better:
+            keys = scores
+        else:
+            keys = -scores
+        return np.argsort(np.where(np.isnan(keys), np.inf, keys),
+                          kind="stable")
+
+
+class GridSearch(ParameterSearch):
+    """
+    Evaluate all combinations of parameters.
+
+    Args:
+        params (dict): names of parameters and lists of their values
+    """
+    def candidates(self):
+        return _grid(self.params)
+
+
+class RandomSearch(ParameterSearch):
+    """
+    Evaluate random combinations of parameters.
+
+    Args:
+        params (dict): names of parameters and either lists of values, from
+            which values are chosen with equal probabilities, or
+            distributions with method `rvs`, such as those from
+            `scipy.stats`
+        n_candidates (int): number of combinations
+    """
+    def __init__(self, learner, params, n_candidates=10, **kwargs):
+        super().__init__(learner, params, **kwargs)
+        self.n_candidates = n_candidates
+
+    def candidates(self):
+        return _sample(self.params, self.n_candidates,
+                       np.random.RandomState(self.random_state))
+
+
+class SuccessiveHalving(ParameterSearch):
+    """
+    Evaluate candidates on increasing samples of data, keeping the best.
+
+    All candidates are first evaluated on a sample of `min_resources`
+    instances. In each following round, the best `1 / eta` of the candidates
+    are evaluated on a sample that is `eta` times larger, until a single
+    candidate remains or the entire data is used. Smaller samples are
+    subsets of larger ones.
+
+    Args:
+        params (dict): names of parameters and their values; as in
+            :obj:`GridSearch` or, if `n_candidates` is given, as in
+            :obj:`RandomSearch`
+        n_candidates (int): number of random combinations; if `None`, all
+            combinations are evaluated
+        eta (int): the reduction factor for the number of candidates
+        min_resources (int): the number of data instances in the first
+            round; by default, it is chosen so that the last round uses the
+            entire data, but at least `2 * k * number of classes` for
+            k-fold cross validation
+    """
+    def __init__(self, learner, params, n_candidates=None, eta=3,
+                 min_resources=None, **kwargs):
+        super().__init__(learner, params, **kwargs)
+        self.n_candidates = n_candidates
+        self.eta = eta
+        self.min_resources = min_resources
+
+    def candidates(self):
+        if self.n_candidates is None:
+            return _grid(self.params)
+        return _sample(self.params, self.n_candidates,
+                       np.random.RandomState(self.random_state))
+
+    def __call__(self, data):
+        params = self.candidates()
+        n_rounds = _ceil_log(len(params), self.eta) + 1
+        resources = max(len(data) // self.eta ** (n_rounds - 1),
+                        self._min_resources(data))
+        scores, last_resources, rounds = \
+            self._halving(data, params, resources)
+        best = rounds[-1][1][self._ranking(data, rounds[-1][2])[0]]
+        return TuningResults(self.learner, params, scores, last_resources,
+                             rounds, best)
+
+    def _min_resources(self, data):
+        if self.min_resources is not None:
+            return self.min_resources
+        class_var = data.domain.class_var
+        n_classes = len(class_var.values) if class_var.is_discrete else 1
+        return 2 * getattr(self.validation, "k", 5) * n_classes
+
+    def _halving(self, data, params, resources):
+        order = np.random.RandomState(self.random_state) \
+            .permutation(len(data))
+        scores = np.full(len(params), np.nan)
+        last_resources = np.zeros(len(params), dtype=int)
+        rounds = []
+        indices = np.arange(len(params))
+        while True:
+            resources = min(resources, len(data))
+            if resources < len(data):
+                sample = data[np.sort(order[:resources])]
+            else:
+                sample = data
+            round_scores = self.evaluate(sample, [params[i] for i in indices])
+            scores[indices] = round_scores
+            last_resources[indices] = resources
+            rounds.append((resources, indices, round_scores))
+            if len(indices) == 1 or resources == len(data):
+                return scores, last_resources, rounds
+            n_best = math.ceil(len(indices) / self.eta)
+            indices = indices[self._ranking(data, round_scores)[:n_best]]
+            resources *= self.eta
+
+
+class Hyperband(SuccessiveHalving):
+    """
+    Run successive halving with different trade-offs between the number of
+    random candidates and the size of the initial sample.
+
+    Each bracket starts with more candidates on smaller samples than the
+    previous; each ends on the entire data. The best candidate is chosen
+    among those evaluated on the entire data.
+
+    Args:
+        params (dict): parameters as in :obj:`RandomSearch`
+        eta (int): the reduction factor for the number of candidates
+        min_resources (int): the number of data instances in the first
+            round of the most exploratory bracket; defaults to
+            `2 * k * number of classes` for k-fold cross validation
+    """
+    def __init__(self, learner, params, eta=3, min_resources=None,
+                 **kwargs):
+        super().__init__(learner, params, eta=eta,
+                         min_resources=min_resources, **kwargs)
+
+    def __call__(self, data):
+        eta = self.eta
+        min_resources = min(self._min_resources(data), len(data))
+        s_max = _ceil_log(len(data) // min_resources + 1, eta) - 1
+        rgen = np.random.RandomState(self.random_state)
+        params, scores, last_resources, rounds = [], [], [], []
+        for s in range(s_max, -1, -1):
+            n_candidates = math.ceil((s_max + 1) / (s + 1) * eta ** s)
+            bracket = _sample(self.params, n_candidates, rgen)
+            b_scores, b_resources, b_rounds = \
+                self._halving(data, bracket, len(data) // eta ** s)
+            offset = len(params)
+            params += bracket
+            scores.append(b_scores)
+            last_resources.append(b_resources)
+            rounds += [(resources, indices + offset, round_scores)
+                       for resources, indices, round_scores in b_rounds]
+        scores = np.hstack(scores)
+        last_resources = np.hstack(last_resources)
+        final = np.flatnonzero(last_resources == len(data))
+        best = final[self._ranking(data, scores[final])[0]]
+        return TuningResults(self.learner, params, scores, last_resources,
+                             rounds, best)
+
+
+class TunedLearner(Learner):
+    """
+    A learner that finds the best parameters on training data and then
+    fits a model with them on the entire training data.
+
+    Results of the search are stored in the model's `tuning_results`.
+
+    Args:
+        search (ParameterSearch): parameter search
+    """
+    def __init__(self, search, preprocessors=None):
+        super().__init__(preprocessors=preprocessors)
+        self.search = search
+
+    def fit_storage(self, data):
+        results = self.search(data)
+        model = results.learner(data)
+        model.tuning_results = results
+        return model
+
+
+def _grid(params):
+    names = list(params)
+    return [dict(zip(names, values))
+            for values in itertools.product(*params.values())]
+
+
+def _sample(params, n, rgen):
+    def draw(values):
+        if hasattr(values, "rvs"):
+            return values.rvs(random_state=rgen)
+        return values[rgen.randint(len(values))]
+
+    return [{name: draw(values) for name, values in params.items()}
+            for _ in range(n)]
+
+
+def _ceil_log(n, base):
+    """Return the smallest r such that `base ** r >= n`."""
+    r, power = 0, 1
+    while power < n:
+        r += 1
+        power *= base
+    return r
@@ -1,7 +1,15 @@
 """Common caching methods, using `lru_cache` sometimes has its downsides."""
+import logging
+import os
+import pickle
+import tempfile
 from functools import wraps, lru_cache
 import weakref
 
+from Orange.misc.environ import cache_dir
+
+log = logging.getLogger(__name__)
+
 
 def single_cache(func):
     """Cache with size 1."""
@@ -54,3 +62,111 @@ def memoize_method(*lru_args, **lru_kwargs):
         return _wrapped_func
 
     return _decorator
+
+
+class DiskCache:
+    """Persistent cache of pickled objects with least-recently-used eviction.
+
+    Each object is stored in a separate file in `directory`. When the total
+    size of the files exceeds `max_size` bytes, the least recently used
+    files are removed. The cache can be shared between processes; files
+    are written atomically and a corrupted or unreadable entry is treated
+    as missing.
+
+    Keys must be strings that are valid file names, typically hex digests.
+
+    Parameters
+    ----------
+    directory : str, optional
+        cache directory; defaults to `diskcache` in Orange's cache directory
+    max_size : int
+        maximal total size of cached files in bytes
+    """
+    suffix = ".pkl"
+
+    def __init__(self, directory=None, max_size=2 ** 30):
+        if directory is None:
+            directory = os.path.join(cache_dir(), "diskcache")
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def get(self, key, default=None):
+        """Return the object stored under `key` or `default` if none."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                obj = pickle.load(f)
+        except FileNotFoundError:
+            return default
+        except Exception:  # pylint: disable=broad-except
+            log.warning("Removing unreadable cache entry %s", path,
+                        exc_info=True)
+            self._remove(path)
+            return default
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return obj
+
+    def put(self, key, obj):
+        """Store `obj` under `key` and evict old entries if needed.
+
+        Objects that cannot be pickled are not stored."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except Exception:  # pylint: disable=broad-except
+            log.warning("Object for key %s cannot be cached", key,
+                        exc_info=True)
+            self._remove(tmp_path)
+            return
+        self.evict()
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(self.suffix):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    @property
+    def size(self):
+        """Total size of cached objects in bytes."""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Remove the least recently used entries exceeding `max_size`."""
+        entries = sorted(self._entries(), reverse=True)
+        total = 0
+        for _, size, path in entries:
+            total += size
+            if total > self.max_size:
+                self._remove(path)
+
+    def clear(self):
+        """Remove all cached objects."""
+        for *_, path in self._entries():
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
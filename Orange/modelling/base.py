@@ -44,6 +44,9 @@ class Fitter(Learner):
     def preprocess(self, data, progress_callback=None):
         return self.get_learner(data).preprocess(data, progress_callback)
 
+    def preprocessing_key(self, data):
+        return self.get_learner(data).preprocessing_key(data)
+
     def get_learner(self, problem_type):
         """Get the learner for a given problem type.
 
@@ -110,6 +113,27 @@ class Fitter(Learner):
             getattr(self.get_learner(self.REGRESSION), 'supports_weights', False)
         )
 
+    @property
+    def supports_partial_fit(self):
+        """The fitter supports incremental learning if both the
+        classification and regression learners support it."""
+        return (
+            getattr(self.get_learner(self.CLASSIFICATION), 'supports_partial_fit', False) and
+            getattr(self.get_learner(self.REGRESSION), 'supports_partial_fit', False)
+        )
+
+    def init_partial_fit(self, model, data):
+        self.get_learner(data).init_partial_fit(model, data)
+
+    def update_model(self, model, data):
+        self.get_learner(data).update_model(model, data)
+
+    def _model_cache_params(self):
+        params = super()._model_cache_params()
+        # learners are constructed lazily from kwargs
+        params.pop("_Fitter__learners", None)
+        return params
+
     @property
     def params(self):
         raise TypeError(
@@ -222,16 +222,20 @@ class RemoveNaNColumns(Preprocess):
         self.threshold = threshold
 
     def __call__(self, data, threshold=None):
+        compact = getattr(data, "compact_columns", None)
         # missing entries in sparse data are treated as zeros so we skip removing NaNs
-        if sp.issparse(data.X):
+        if compact is None and sp.issparse(data.X):
             return data
 
         if threshold is None:
-            threshold = data.X.shape[0] if self.threshold is None else \
+            threshold = len(data) if self.threshold is None else \
                         self.threshold
         if isinstance(threshold, float):
-            threshold = threshold * data.X.shape[0]
-        nans = np.sum(np.isnan(data.X), axis=0)
+            threshold = threshold * len(data)
+        if compact is not None:
+            nans = compact.count_nans()
+        else:
+            nans = np.sum(np.isnan(data.X), axis=0)
         att = [a for a, n in zip(data.domain.attributes, nans) if n < threshold]
         domain = Orange.data.Domain(att, data.domain.class_vars,
                                     data.domain.metas)
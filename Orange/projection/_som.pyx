@@ -7,6 +7,8 @@
 
 import numpy as np
 cimport numpy as np
+from cython cimport floating
+from cython.parallel import prange
 
 cdef extern from "numpy/npy_math.h":
     bint npy_isnan(double x) nogil
@@ -15,41 +17,61 @@ cdef extern from "math.h":
     double exp(double x) nogil
 
 
-def get_winners(np.float64_t[:, :, :] weights, np.float64_t[:, :] X, int hex):
+def get_winners(np.float64_t[:, :, :] weights, const floating[:, :] X,
+                int hex):
+    winners, _ = quantization(weights, X, hex)
+    return winners
+
+
+def quantization(np.float64_t[:, :, :] weights,
+                 const floating[:, :] X, int hex):
+    """
+    Return winning units for rows of `X` and squared distances of rows to
+    their winners.
+
+    The GIL is released, so blocks of rows can be processed in threads.
+    """
     cdef:
-        int x, y, win_x, win_y
-        double diff, min_diff
-        np.float64_t[:] row
-        np.ndarray[np.int16_t, ndim=2] winners = \
+        np.ndarray[np.int16_t, ndim=2] winners_arr = \
             np.empty((X.shape[0], 2), dtype=np.int16)
-        int nrows = X.shape[0]
+        np.ndarray[np.float64_t] dists_arr = np.empty(X.shape[0])
+        np.int16_t[:, :] winners = winners_arr
+        np.float64_t[:] dists = dists_arr
+        Py_ssize_t rowi, nrows = X.shape[0]
 
-    with nogil:
-        for rowi in range(nrows):
-            row = X[rowi]
+    for rowi in prange(nrows, nogil=True, schedule="static"):
+        dists[rowi] = _winner(weights, X, rowi, hex, winners)
+    return winners_arr, dists_arr
 
-            min_diff = 1e30
-            for y in range(weights.shape[0]):
-                for x in range(weights.shape[1] - hex * (y % 2)):
-                    diff = 0
-                    for col in range(weights.shape[2]):
-                        diff += (row[col] - weights[y, x, col]) ** 2
-                    if diff < min_diff:
-                        win_x = x
-                        win_y = y
-                        min_diff = diff
-            winners[rowi, 0] = win_x
-            winners[rowi, 1] = win_y
 
-    return winners
+cdef inline double _winner(np.float64_t[:, :, :] weights,
+                           const floating[:, :] X, Py_ssize_t rowi,
+                           int hex,
+                           np.int16_t[:, :] winners) nogil:
+    cdef:
+        Py_ssize_t x, y, col, win_x = 0, win_y = 0
+        double diff, min_diff = 1e30
+
+    for y in range(weights.shape[0]):
+        for x in range(weights.shape[1] - hex * (y % 2)):
+            diff = 0
+            for col in range(weights.shape[2]):
+                diff += (X[rowi, col] - weights[y, x, col]) ** 2
+            if diff < min_diff:
+                win_x = x
+                win_y = y
+                min_diff = diff
+    winners[rowi, 0] = win_x
+    winners[rowi, 1] = win_y
+    return min_diff
 
 
 def update(np.float64_t[:, :, :] weights,
-           np.float64_t[:, :] X,
+           floating[:, :] X,
            double eta, double sigma):
     cdef:
         int rowi, x, y, win_x, win_y
-        np.float64_t[:] row
+        floating[:] row
         int max_dist = weights.shape[0] ** 2 + weights.shape[1] ** 2
         double[:] w_lookup = np.empty(max_dist + 1)
         double d = 6.28 * sigma * sigma
@@ -81,11 +103,11 @@ def update(np.float64_t[:, :, :] weights,
 
 
 def update_hex(np.float64_t[:, :, :] weights,
-               np.float64_t[:, :] X,
+               floating[:, :] X,
                double eta, double sigma):
     cdef:
         int rowi, x, y, win_x, win_y
-        np.float64_t[:] row
+        floating[:] row
         double d = 6.28 * sigma * sigma
         double dist, dy
         double w, diff, min_diff
@@ -117,39 +139,63 @@ def update_hex(np.float64_t[:, :, :] weights,
 def get_winners_sparse(np.float64_t[:, :, :] weights,
                        np.float64_t[:, :] ssumweights,
                        X, int hex):
-    cdef:
-        int x, y, best_x, best_y, i, col
-        double diff, min_diff
-        np.float64_t[:] data = X.data
-        np.int32_t[:] indices = X.indices
-        np.int32_t[:] indptr = X.indptr
-        np.int32_t[:] columns,
-        np.float64_t[:] row,
-        np.ndarray[np.int16_t, ndim=2] winners = \
-            np.empty((X.shape[0], 2), dtype=np.int16)
-        int nrows = X.shape[0]
+    winners, _ = quantization_sparse(weights, ssumweights, X, hex)
+    return winners
 
-    with nogil:
-        for rowi in range(nrows):
-            columns = indices[indptr[rowi]:indptr[rowi + 1]]
-            row = data[indptr[rowi]:indptr[rowi + 1]]
 
-            min_diff = 1e30
-            for y in range(weights.shape[0]):
-                for x in range(weights.shape[1] - hex * (y % 2)):
-                    diff = ssumweights[y, x]  # First assume that all values are zero
-                    for i in range(columns.shape[0]):
-                        col = columns[i]
-                        diff += (data[i] - weights[y, x, col]) ** 2 \
-                                - weights[y, x, col] ** 2
-                    if diff < min_diff:
-                        win_x = x
-                        win_y = y
-                        min_diff = diff
+def quantization_sparse(np.float64_t[:, :, :] weights,
+                        np.float64_t[:, :] ssumweights,
+                        X, int hex):
+    """
+    Return winning units for rows of sparse matrix `X` in CSR format and
+    squared distances of rows to their winners.
 
-            winners[rowi, 0] = win_x
-            winners[rowi, 1] = win_y
-    return winners
+    `ssumweights` contains sums of squared weights of units.
+    """
+    cdef:
+        const np.float64_t[:] data = X.data
+        const np.int32_t[:] indices = X.indices
+        const np.int32_t[:] indptr = X.indptr
+        np.ndarray[np.int16_t, ndim=2] winners_arr = \
+            np.empty((X.shape[0], 2), dtype=np.int16)
+        np.ndarray[np.float64_t] dists_arr = np.empty(X.shape[0])
+        np.int16_t[:, :] winners = winners_arr
+        np.float64_t[:] dists = dists_arr
+        Py_ssize_t rowi, nrows = X.shape[0]
+
+    for rowi in prange(nrows, nogil=True, schedule="static"):
+        dists[rowi] = _winner_sparse(weights, ssumweights, data, indices,
+                                     indptr[rowi], indptr[rowi + 1], hex,
+                                     winners, rowi)
+    return winners_arr, dists_arr
+
+
+cdef inline double _winner_sparse(np.float64_t[:, :, :] weights,
+                                  np.float64_t[:, :] ssumweights,
+                                  const np.float64_t[:] data,
+                                  const np.int32_t[:] indices,
+                                  Py_ssize_t start, Py_ssize_t end, int hex,
+                                  np.int16_t[:, :] winners,
+                                  Py_ssize_t rowi) nogil:
+    cdef:
+        Py_ssize_t x, y, i, col, win_x = 0, win_y = 0
+        double diff, min_diff = 1e30
+
+    for y in range(weights.shape[0]):
+        for x in range(weights.shape[1] - hex * (y % 2)):
+            diff = ssumweights[y, x]  # First assume that all values are zero
+            for i in range(start, end):
+                col = indices[i]
+                diff += (data[i] - weights[y, x, col]) ** 2 \
+                       - weights[y, x, col] ** 2
+            if diff < min_diff:
+                win_x = x
+                win_y = y
+                min_diff = diff
+    winners[rowi, 0] = win_x
+    winners[rowi, 1] = win_y
+    # rounding can make the distance slightly negative
+    return min_diff if min_diff > 0 else 0
 
 
 def update_sparse(np.ndarray[np.float64_t, ndim=3] weights,
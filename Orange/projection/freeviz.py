@@ -7,6 +7,9 @@ from Orange.projection import LinearProjector, DomainProjection
 
 __all__ = ["FreeViz"]
 
+#: FreeViz on data with more pairs of instances samples this many pairs
+FREEVIZ_MAX_PAIRS = 250000
+
 
 class FreeVizModel(DomainProjection):
     var_prefix = "freeviz"
@@ -22,7 +25,8 @@ class FreeViz(LinearProjector):
 
     def __init__(self, weights=None, center=True, scale=True, dim=2, p=1,
                  initial=None, maxiter=500, alpha=0.1,
-                 atol=1e-5, preprocessors=None):
+                 atol=1e-5, n_pairs=None, random_state=0,
+                 preprocessors=None):
         super().__init__(preprocessors=preprocessors)
         self.weights = weights
         self.center = center
@@ -33,6 +37,8 @@ class FreeViz(LinearProjector):
         self.maxiter = maxiter
         self.alpha = alpha
         self.atol = atol
+        self.n_pairs = n_pairs
+        self.random_state = random_state
         self.is_class_discrete = False
         self.components_ = None
 
@@ -50,7 +56,8 @@ class FreeViz(LinearProjector):
             X, Y, weights=self.weights, center=self.center, scale=self.scale,
             dim=self.dim, p=self.p, initial=self.initial,
             maxiter=self.maxiter, alpha=self.alpha, atol=self.atol,
-            is_class_discrete=self.is_class_discrete)[1].T
+            is_class_discrete=self.is_class_discrete, n_pairs=self.n_pairs,
+            random_state=self.random_state)[1].T
 
     @classmethod
     def squareform(cls, d):
@@ -220,6 +227,69 @@ class FreeViz(LinearProjector):
         G = cls.gradient(X, embedding, forces, embedding_dist=D, weights=weights)
         return G
 
+    @classmethod
+    def freeviz_gradient_pairs(cls, X, y, embedding, pairs, p=1, weights=None,
+                               is_class_discrete=False):
+        """
+        Return the FreeViz gradient estimated from forces between the given
+        pairs of instances.
+
+        The estimate is scaled to the number of all pairs, so it equals the
+        gradient from :obj:`freeviz_gradient` when `pairs` contains each pair
+        exactly once. Memory and time are linear in the number of pairs.
+
+        Parameters
+        ----------
+        X, y, embedding, p, weights, is_class_discrete :
+            As in :obj:`freeviz_gradient`
+        pairs : (2, M) ndarray
+            Indices of the first and the second instance of each pair
+
+        Returns
+        -------
+        G : (P, dim) ndarray
+            The projection gradient.
+        """
+        X = np.asarray(X)
+        y = np.asarray(y)
+        first, second = pairs
+        N, dim = embedding.shape
+
+        diff = embedding[first] - embedding[second]
+        distances = np.linalg.norm(diff, axis=1)
+        mask = distances > np.finfo(distances.dtype).eps * 100
+        diff[mask] /= distances[mask][:, np.newaxis]
+        if is_class_discrete:
+            forces = -distances ** p
+            mask &= y[first] != y[second]
+            forces[mask] = 1 / distances[mask] ** p
+        else:
+            forces = (y[first] - y[second]) ** 2
+            forces[mask] /= distances[mask] ** p
+        if weights is not None:
+            forces *= weights[first] * weights[second]
+        forces *= N * (N - 1) / 2 / len(first)
+
+        # pair (i, j) pushes j along e_i - e_j and i in the opposite direction
+        diff *= forces[:, np.newaxis]
+        F = np.column_stack(
+            [np.bincount(second, diff[:, k], N)
+             - np.bincount(first, diff[:, k], N) for k in range(dim)])
+        return X.T.dot(F)
+
+    @staticmethod
+    def sample_pairs(n, n_pairs, rstate=None):
+        """
+        Return a (2, n_pairs) array of random pairs of different indices
+        smaller than `n`.
+        """
+        if not isinstance(rstate, np.random.RandomState):
+            rstate = np.random.RandomState(rstate)
+        first = rstate.randint(n, size=n_pairs)
+        second = rstate.randint(n - 1, size=n_pairs)
+        second[second >= first] += 1
+        return np.vstack((first, second))
+
     @classmethod
     def _rotate(cls, A):
         """
@@ -234,7 +304,8 @@ class FreeViz(LinearProjector):
 
     @classmethod
     def freeviz(cls, X, y, weights=None, center=True, scale=True, dim=2, p=1,
-                initial=None, maxiter=500, alpha=0.1, atol=1e-5, is_class_discrete=False):
+                initial=None, maxiter=500, alpha=0.1, atol=1e-5, is_class_discrete=False,
+                n_pairs=None, random_state=0):
         """
         FreeViz
 
@@ -270,6 +341,13 @@ class FreeViz(LinearProjector):
             The step size ('learning rate')
         atol : float
             Terminating numerical tolerance (absolute).
+        n_pairs : int, optional
+            If given and smaller than the number of all pairs of instances,
+            forces are computed only between this many random pairs, which
+            stay the same in all iterations. By default, pairs are sampled
+            when there are more than `FREEVIZ_MAX_PAIRS` pairs.
+        random_state : int or RandomState
+            The seed for sampling pairs.
 
         Returns
         -------
@@ -335,13 +413,25 @@ class FreeViz(LinearProjector):
             scalenonzero = np.abs(scale) > np.finfo(scale.dtype).eps
             X[:, scalenonzero] /= scale[scalenonzero]
 
+        if n_pairs is None:
+            n_pairs = FREEVIZ_MAX_PAIRS
+        if N > 1 and n_pairs < N * (N - 1) // 2:
+            pairs = cls.sample_pairs(N, n_pairs, random_state)
+        else:
+            pairs = None
+
         A = initial
         embeddings = np.dot(X, A)
 
         step_i = 0
         while step_i < maxiter:
-            G = cls.freeviz_gradient(X, y, embeddings, p=p, weights=weights,
-                                     is_class_discrete=is_class_discrete)
+            if pairs is None:
+                G = cls.freeviz_gradient(X, y, embeddings, p=p, weights=weights,
+                                         is_class_discrete=is_class_discrete)
+            else:
+                G = cls.freeviz_gradient_pairs(
+                    X, y, embeddings, pairs, p=p, weights=weights,
+                    is_class_discrete=is_class_discrete)
 
             # Scale the changes (the largest anchor move is alpha * radius)
             with np.errstate(divide="ignore"):  # inf's will be ignored by min
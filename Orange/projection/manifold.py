@@ -1,5 +1,8 @@
+import copy
 import logging
+import threading
 import warnings
+from collections import OrderedDict
 from collections.abc import Iterable
 from itertools import chain
 
@@ -11,6 +14,7 @@ import sklearn.manifold as skl_manifold
 
 import Orange
 from Orange.data import Table, Domain, ContinuousVariable
+from Orange.data.table import _part_digest
 from Orange.data.util import get_unique_names
 from Orange.distance import Distance, DistanceModel, Euclidean
 from Orange.projection import SklProjector, Projector, Projection
@@ -34,7 +38,15 @@ class _LazyTSNE:  # pragma: no cover
 openTSNE = _LazyTSNE()
 
 
-def torgerson(distances, n_components=2, eigen_solver="auto"):
+#: Number of rows of the Guttman transform in SMACOF computed at once
+SMACOF_BLOCK_SIZE = 256
+
+#: Number of points that t-SNE in landmark mode adds to the embedding at once
+TSNE_TRANSFORM_BATCH_SIZE = 10000
+
+
+def torgerson(distances, n_components=2, eigen_solver="auto",
+              random_state=0):
     """
     Perform classical mds (Torgerson-Gower scaling).
 
@@ -49,8 +61,10 @@ def torgerson(distances, n_components=2, eigen_solver="auto"):
     n_components : int
         Number of components to return
     eigen_solver : str
-        One of `lapack`, `arpack` or `'auto'`. The later chooses between the
-        former based on the input.
+        One of `lapack`, `arpack`, `randomized` or `'auto'`. The later
+        chooses between the former based on the input.
+    random_state : int
+        Seed for the randomized eigensolver
 
     See Also
     --------
@@ -73,12 +87,17 @@ def torgerson(distances, n_components=2, eigen_solver="auto"):
     B = np.multiply(D_sq, -0.5, out=D_sq)
 
     if eigen_solver == 'auto':
-        if N > 200 and n_components < 10:  # arbitrary - follow skl KernelPCA
+        if N > 2000 and n_components < 10:
+            eigen_solver = 'randomized'
+        elif N > 200 and n_components < 10:  # arbitrary - follow skl KernelPCA
             eigen_solver = 'arpack'
         else:
             eigen_solver = 'lapack'
 
-    if eigen_solver == "arpack":
+    if eigen_solver == "randomized":
+        w, v = _randomized_eigh(B, min(n_components, N), random_state)
+        U, L = v[:, ::-1], w[::-1]
+    elif eigen_solver == "arpack":
         v0 = np.random.RandomState(0xD06).uniform(-1, 1, B.shape[0])
         w, v = arpack_eigh(B, k=n_components, v0=v0)
         assert np.all(np.diff(w) >= 0), "w was not in ascending order"
@@ -113,6 +132,164 @@ def torgerson(distances, n_components=2, eigen_solver="auto"):
     return U * np.sqrt(L.reshape((1, n_components)))
 
 
+def _randomized_eigh(B, n_components, random_state, n_oversamples=10,
+                     n_iter=7):
+    # Eigenvectors with the largest eigenvalues of a symmetric matrix, found
+    # by subspace iteration from a random subspace (Halko et al., 2011);
+    # eigenvalues are returned in ascending order, like from eigh
+    N = B.shape[0]
+    size = min(n_components + n_oversamples, N)
+    Q = np.random.RandomState(random_state).normal(size=(N, size))
+    Q = Q.astype(B.dtype, copy=False)
+    for _ in range(n_iter):
+        Q, _ = np.linalg.qr(B @ Q)
+    w, v = lapack_eigh(Q.T @ B @ Q)
+    return w[-n_components:], Q @ v[:, -n_components:]
+
+
+def landmark_mds(distances, n_components=2, n_landmarks=1000,
+                 random_state=0):
+    """
+    Perform landmark mds (de Silva and Tenenbaum, 2004).
+
+    Classical mds is computed for randomly chosen landmark points, and the
+    remaining points are placed by triangulation from their distances to
+    landmarks. Only distances to landmarks are used.
+
+    Parameters
+    ----------
+    distances : (N, N) ndarray
+        Input distance (dissimilarity) matrix.
+    n_components : int
+        Number of components to return
+    n_landmarks : int
+        Number of landmark points; if not smaller than `N`, the result is
+        the same as from :obj:`torgerson`
+    random_state : int
+        Seed for the choice of landmarks
+    """
+    distances = np.asarray(distances)
+    N = distances.shape[0]
+    if n_landmarks >= N:
+        return torgerson(distances, n_components)
+    landmarks = np.sort(np.random.RandomState(random_state)
+                        .choice(N, n_landmarks, replace=False))
+    D_sq = distances[:, landmarks].astype(float) ** 2
+    L_sq = D_sq[landmarks]
+
+    # classical mds of landmarks
+    B = L_sq - L_sq.mean(axis=0) - L_sq.mean(axis=1, keepdims=True) \
+        + L_sq.mean()
+    w, v = lapack_eigh(-0.5 * B, subset_by_index=(
+        max(n_landmarks - n_components, 0), n_landmarks - 1))
+    w, v = w[::-1], v[:, ::-1]
+    positive = w > 5 * np.finfo(w.dtype).eps
+    w, v = w[positive], v[:, positive]
+
+    # triangulation: x = -1/2 L# (d^2 - mean of landmarks' d^2)
+    embedding = np.zeros((N, n_components))
+    embedding[:, :len(w)] = \
+        -0.5 * (D_sq - L_sq.mean(axis=0)) @ (v / np.sqrt(w))
+    return embedding
+
+
+class SMACOF:
+    """
+    Resumable optimization of metric MDS stress with SMACOF.
+
+    Unlike `sklearn.manifold.MDS`, the optimization can be continued with
+    further calls of :obj:`run` without validating the distance matrix and
+    restarting. The Guttman transform is computed by blocks of
+    `SMACOF_BLOCK_SIZE` rows, so no other matrix of the size of the
+    distance matrix is allocated.
+
+    Args:
+        dissimilarities (np.ndarray): a symmetric (N, N) distance matrix
+        init (np.ndarray): initial embedding; if `None`, points are placed
+            randomly
+        n_components (int): the number of dimensions, if `init` is not
+            given
+        eps (float): the optimization converges when relative stress
+            decreases by less than `eps`
+        dtype (np.dtype): `np.float64` or `np.float32`, which halves the
+            memory and time for large matrices
+        random_state (int): seed for the random initialization
+
+    Attributes:
+        embedding (np.ndarray): the current embedding
+        stress (float): raw stress before the last iteration
+        n_iter (int): the number of iterations
+        converged (bool): whether the last iteration converged
+    """
+    def __init__(self, dissimilarities, init=None, n_components=2,
+                 eps=0.001, dtype=np.float64, random_state=None):
+        self.dissimilarities = np.asarray(dissimilarities, dtype=dtype)
+        n = len(self.dissimilarities)
+        if init is None:
+            init = np.random.RandomState(random_state) \
+                .uniform(size=(n, n_components))
+        elif init.shape[0] != n:
+            raise ValueError(
+                f"init matrix should be of shape ({n}, {init.shape[1]})")
+        self.embedding = np.array(init, dtype=dtype)
+        self.eps = eps
+        self.stress = None
+        self.n_iter = 0
+        self.converged = False
+        self._relative_stress = None
+
+    @property
+    def relative_stress(self):
+        """Stress, divided by the sum of norms of embedded points"""
+        return self._relative_stress
+
+    def run(self, max_iter=1):
+        """
+        Run at most `max_iter` iterations or until convergence.
+
+        Returns:
+            (bool): `True` if the optimization converged
+        """
+        for _ in range(max_iter):
+            self.embedding, self.stress = self._guttman_transform()
+            self.n_iter += 1
+            norm = np.sqrt((self.embedding ** 2).sum(axis=1)).sum()
+            relative_stress = self.stress / norm if norm > 0 else 0
+            self.converged = \
+                self._relative_stress is not None \
+                and self._relative_stress - relative_stress < self.eps
+            self._relative_stress = relative_stress
+            if self.converged:
+                break
+        return self.converged
+
+    def _guttman_transform(self):
+        X = self.embedding
+        n = len(X)
+        new_X = np.empty_like(X)
+        stress = 0
+        dis_buffer = np.empty((min(n, SMACOF_BLOCK_SIZE), n), dtype=X.dtype)
+        diff_buffer = np.empty_like(dis_buffer)
+        for start in range(0, n, SMACOF_BLOCK_SIZE):
+            block = slice(start, start + SMACOF_BLOCK_SIZE)
+            size = len(X[block])
+            dis, diff = dis_buffer[:size], diff_buffer[:size]
+            dis.fill(0)
+            for comp in range(X.shape[1]):
+                np.subtract.outer(X[block, comp], X[:, comp], out=diff)
+                np.square(diff, out=diff)
+                dis += diff
+            np.sqrt(dis, out=dis)
+            disparities = self.dissimilarities[block]
+            np.subtract(dis, disparities, out=diff)
+            stress += np.vdot(diff, diff)
+            dis[dis == 0] = 1e-5
+            ratio = np.divide(disparities, dis, out=dis)
+            new_X[block] = \
+                (ratio.sum(axis=1)[:, None] * X[block] - ratio @ X) / n
+        return new_X, float(stress) / 2
+
+
 class MDS(SklProjector):
     __wraps__ = skl_manifold.MDS
     name = 'MDS'
@@ -198,6 +375,97 @@ class SpectralEmbedding(SklProjector):
         self.params = vars()
 
 
+class AffinityCache:
+    """
+    A cache of t-SNE affinities, which reuses the nearest neighbours of
+    data with the same content.
+
+    Affinities are keyed by a fingerprint of the data and parameters of the
+    nearest neighbour search. If the perplexity changes, affinities are
+    recomputed from the cached neighbours if it is not higher than the
+    perplexity for which they were searched; otherwise the neighbours are
+    searched again.
+
+    Args:
+        max_size (int): the number of data sets whose affinities are kept
+    """
+    def __init__(self, max_size=2):
+        self.max_size = max_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(X):
+        """
+        Return a digest of the array's shape, type and content; it is
+        computed like the digests of parts in `Table.fingerprint`
+        """
+        return _part_digest(X).hex()
+
+    def get(self, X, perplexity, compute, **params):
+        """
+        Return affinities for the data and perplexity.
+
+        Args:
+            X (np.ndarray): data
+            perplexity (float or list of float): perplexity, or a list of
+                perplexities for multiscale affinities
+            compute (callable): a function that computes affinities from data
+                and perplexity if they can not be reused
+            params: parameters of the search that define the neighbours, such
+                as metric and method
+        """
+        key = (self.fingerprint(X), tuple(sorted(params.items())))
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None:
+            affinities = self._with_perplexity(cached, perplexity)
+            if affinities is not None:
+                with self._lock:
+                    if key in self._cache:
+                        self._cache.move_to_end(key)
+                return affinities
+        affinities = compute(X, perplexity)
+        with self._lock:
+            self._cache[key] = affinities
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return affinities
+
+    @staticmethod
+    def _with_perplexity(affinities, perplexity):
+        multiscale = isinstance(affinities, openTSNE.affinity.Multiscale)
+        if multiscale != isinstance(perplexity, Iterable):
+            return None
+        if multiscale:
+            if np.array_equal(affinities.perplexities, perplexity):
+                return affinities
+        elif affinities.perplexity == perplexity:
+            return affinities
+        # neighbours for a higher perplexity would be too few
+        if multiscale:
+            if np.max(perplexity) > np.max(affinities.perplexities):
+                return None
+        elif perplexity > affinities.perplexity:
+            return None
+        # a copy shares neighbours, but not the affinity matrix, with the
+        # cached affinities, which may be used by existing embeddings
+        affinities = copy.copy(affinities)
+        try:
+            if multiscale:
+                affinities.set_perplexities(list(perplexity))
+            else:
+                affinities.set_perplexity(perplexity)
+        except RuntimeError:  # not enough neighbours
+            return None
+        return affinities
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
 class TSNEModel(Projection):
     """A t-SNE embedding object. Supports further optimization as well as
     adding new data into the existing embedding.
@@ -211,7 +479,12 @@ class TSNEModel(Projection):
         The embedding in an Orange table, easily accessible.
     pre_domain : Domain
         Original data domain
+    landmarks : Optional[np.ndarray]
+        In landmark mode, indices of instances in `embedding_`; the embedding
+        of other instances can not be further optimized
     """
+    landmarks = None
+
     def __init__(self, embedding: openTSNE.TSNEEmbedding, table: Table,
                  pre_domain: Domain):
         transformer = TransformDomain(self)
@@ -263,6 +536,8 @@ class TSNEModel(Projection):
 
     def optimize(self, n_iter, inplace=False, propagate_exception=False, **kwargs):
         """Resume optimization for the current embedding."""
+        if self.landmarks is not None:
+            raise ValueError("Embeddings in landmark mode can not be optimized")
         kwargs = {"n_iter": n_iter, "inplace": inplace,
                   "propagate_exception": propagate_exception, **kwargs}
         if inplace:
@@ -373,6 +648,14 @@ class TSNE(Projector):
         number generator. If the value is a RandomState instance, then it will
         be used as the random number generator. If the value is None, the random
         number generator is the RandomState instance used by `np.random`.
+    affinity_cache : Optional[AffinityCache]
+        If given, affinities are taken from and stored into the cache, so
+        that nearest neighbours are not searched again for the same data.
+    n_landmarks : Optional[int]
+        If set and the data has more instances, t-SNE is run on a random
+        sample of `n_landmarks` instances, and the remaining instances are
+        added to the embedding with `TSNEModel.transform`, in batches of
+        `TSNE_TRANSFORM_BATCH_SIZE`.
     preprocessors
 
     """
@@ -389,7 +672,8 @@ class TSNE(Projector):
                  initialization="pca", metric="euclidean", n_jobs=1,
                  neighbors="exact", negative_gradient_method="bh",
                  multiscale=False, callbacks=None, callbacks_every_iters=50,
-                 random_state=None, preprocessors=None):
+                 random_state=None, affinity_cache=None, n_landmarks=None,
+                 preprocessors=None):
         super().__init__(preprocessors=preprocessors)
         self.n_components = n_components
         self.perplexity = perplexity
@@ -410,6 +694,8 @@ class TSNE(Projector):
         self.callbacks = callbacks
         self.callbacks_every_iters = callbacks_every_iters
         self.random_state = random_state
+        self.affinity_cache = affinity_cache
+        self.n_landmarks = n_landmarks
 
     def compute_affinities(self, X):
         # Sparse data are not supported
@@ -418,33 +704,45 @@ class TSNE(Projector):
                 "A sparse matrix was passed, but dense data is required. Use "
                 "X.toarray() to convert to a dense numpy array."
             )
-
+        if self.affinity_cache is None:
+            return self._compute_affinities(X, self.perplexity)
+
+        random_state = self.random_state
+        if not isinstance(random_state, (int, type(None))):
+            # neighbours depend on the generator's state; don't reuse them
+            return self._compute_affinities(X, self.perplexity)
+        return self.affinity_cache.get(
+            X, self.perplexity, self._compute_affinities,
+            metric=self.metric, method=self.neighbors,
+            random_state=random_state, multiscale=self.multiscale)
+
+    def _compute_affinities(self, X, perplexity):
         # Build up the affinity matrix, using multiscale if needed
         if self.multiscale:
             # The local perplexity should be on the order ~50 while the higher
             # perplexity should be on the order ~N/50
-            if not isinstance(self.perplexity, Iterable):
+            if not isinstance(perplexity, Iterable):
                 raise ValueError(
                     "Perplexity should be an instance of `Iterable`, `%s` "
-                    "given." % type(self.perplexity).__name__
+                    "given." % type(perplexity).__name__
                 )
             affinities = openTSNE.affinity.Multiscale(
                 X,
-                perplexities=self.perplexity,
+                perplexities=perplexity,
                 metric=self.metric,
                 method=self.neighbors,
                 random_state=self.random_state,
                 n_jobs=self.n_jobs,
             )
         else:
-            if isinstance(self.perplexity, Iterable):
+            if isinstance(perplexity, Iterable):
                 raise ValueError(
                     "Perplexity should be an instance of `float`, `%s` "
-                    "given." % type(self.perplexity).__name__
+                    "given." % type(perplexity).__name__
                 )
             affinities = openTSNE.affinity.PerplexityBasedNN(
                 X,
-                perplexity=self.perplexity,
+                perplexity=perplexity,
                 metric=self.metric,
                 method=self.neighbors,
                 random_state=self.random_state,
@@ -507,9 +805,12 @@ class TSNE(Projector):
 
         return embedding
 
-    def convert_embedding_to_model(self, data, embedding):
+    def convert_embedding_to_model(self, data, embedding, coordinates=None):
         # The results should be accessible in an Orange table, which doesn't
-        # need the full embedding attributes and is cast into a regular array
+        # need the full embedding attributes and is cast into a regular array;
+        # in landmark mode, coordinates of all data differ from the embedding
+        if coordinates is None:
+            coordinates = embedding.view(np.ndarray)
         n = self.n_components
         postfixes = ["x", "y"] if n == 2 else list(range(1, n + 1))
         names = [var.name for var in chain(data.domain.class_vars, data.domain.metas) if var]
@@ -517,7 +818,7 @@ class TSNE(Projector):
         uniq_names = get_unique_names(names, proposed)
         tsne_cols = [ContinuousVariable(name) for name in uniq_names]
         embedding_domain = Domain(tsne_cols, data.domain.class_vars, data.domain.metas)
-        embedding_table = Table(embedding_domain, embedding.view(np.ndarray), data.Y, data.metas)
+        embedding_table = Table(embedding_domain, coordinates, data.Y, data.metas)
 
         # Create a model object which will be capable of transforming new data
         # into the existing embedding
@@ -529,6 +830,8 @@ class TSNE(Projector):
     def __call__(self, data: Table) -> TSNEModel:
         # Preprocess the data - convert discrete to continuous
         data = self.preprocess(data)
+        if self.n_landmarks is not None and len(data) > self.n_landmarks:
+            return self._fit_landmarks(data)
 
         # Run tSNE optimization
         embedding = self.fit(data.X, data.Y)
@@ -537,6 +840,25 @@ class TSNE(Projector):
         # embedding table with t-SNE meta variables
         return self.convert_embedding_to_model(data, embedding)
 
+    def _fit_landmarks(self, data):
+        random_state = self.random_state
+        if not isinstance(random_state, np.random.RandomState):
+            random_state = np.random.RandomState(random_state)
+        landmarks = np.sort(random_state.choice(
+            len(data), self.n_landmarks, replace=False))
+        embedding = self.fit(data.X[landmarks], data.Y[landmarks])
+
+        coordinates = np.zeros((len(data), embedding.shape[1]))
+        coordinates[landmarks] = embedding
+        model = self.convert_embedding_to_model(data, embedding, coordinates)
+        model.landmarks = landmarks
+        others = np.setdiff1d(np.arange(len(data)), landmarks)
+        for start in range(0, len(others), TSNE_TRANSFORM_BATCH_SIZE):
+            batch = others[start:start + TSNE_TRANSFORM_BATCH_SIZE]
+            with model.embedding.unlocked(model.embedding.X):
+                model.embedding.X[batch] = model.transform(data.X[batch])
+        return model
+
     @staticmethod
     def default_initialization(data, n_components=2, random_state=None):
         return openTSNE.initialization.pca(
@@ -19,6 +19,74 @@ from Orange.projection import SklProjector, DomainProjection
 
 __all__ = ["PCA", "SparsePCA", "IncrementalPCA", "TruncatedSVD"]
 
+# Dense data is processed in chunks of rows with about this many values, so
+# that large (e.g. memory-mapped or float32) arrays are never copied whole
+CHUNK_SIZE = 2 ** 22
+
+# With svd_solver="auto", the covariance solver is used when its covariance
+# matrix (n_features ** 2 values) needs at most this fraction of the memory
+# that other solvers need for a copy of data (n_samples * n_features values)
+COVARIANCE_MEMORY_RATIO = 0.1
+
+SVD_SOLVERS = ("auto", "full", "arpack", "randomized", "covariance_eigh")
+
+
+def _row_chunks(X):
+    step = max(CHUNK_SIZE // max(X.shape[1], 1), 1)
+    for start in range(0, X.shape[0], step):
+        yield slice(start, start + step)
+
+
+def covariance_eigh_pca(X, n_components=None):
+    """
+    Compute the PCA decomposition of a dense matrix from the eigenvectors of
+    its covariance matrix.
+
+    The covariance matrix is accumulated in float64 from chunks of rows, so
+    `X` can be a memory-mapped array or an array of float32 and is never
+    copied as a whole. The time is linear in the number of rows and the
+    memory is quadratic in the number of columns.
+
+    Returns a tuple with column means, variances explained by all
+    components (eigenvalues) and the first `n_components` (by default, all)
+    components, sorted by decreasing variance.
+    """
+    n_samples, n_features = X.shape
+    # rows are shifted by the mean of the first chunk for numerical stability
+    shift = np.asarray(X[:CHUNK_SIZE // max(n_features, 1) + 1],
+                       dtype=np.float64).mean(axis=0)
+    sums = np.zeros(n_features)
+    gram = np.zeros((n_features, n_features))
+    for rows in _row_chunks(X):
+        chunk = np.asarray(X[rows], dtype=np.float64) - shift
+        sums += chunk.sum(axis=0)
+        gram += chunk.T @ chunk
+    offset = sums / n_samples
+    # the covariance matrix is computed in place of gram matrix
+    cov = gram
+    cov -= n_samples * np.outer(offset, offset)
+    cov /= max(n_samples - 1, 1)
+    variances, vectors = np.linalg.eigh(cov)
+    del gram, cov
+    variances = np.maximum(variances[::-1], 0)
+    if n_components is None:
+        n_components = n_features
+    components = np.ascontiguousarray(vectors[:, ::-1][:, :n_components].T)
+    mean = shift + offset
+
+    # flip signs as svd_flip does: the largest (in absolute value) element
+    # of each column of the projection must be positive
+    largest = np.zeros(n_components)
+    for rows in _row_chunks(X):
+        projected = (np.asarray(X[rows], dtype=np.float64) - mean) \
+            @ components.T
+        indices = np.argmax(np.abs(projected), axis=0)
+        values = projected[indices, np.arange(n_components)]
+        replace = np.abs(values) > np.abs(largest)
+        largest[replace] = values[replace]
+    components[largest < 0] *= -1
+    return mean, variances, components
+
 
 def randomized_pca(A, n_components, n_oversamples=10, n_iter="auto",
                    flip_sign=True, random_state=0):
@@ -96,15 +164,24 @@ class ImprovedPCA(skl_decomposition.PCA):
         implements this functionality.
 
     """
+    if hasattr(skl_decomposition.PCA, "_parameter_constraints"):
+        # pylint: disable=import-outside-toplevel
+        from sklearn.utils._param_validation import StrOptions
+        _parameter_constraints = {
+            **skl_decomposition.PCA._parameter_constraints,
+            "svd_solver": [StrOptions(set(SVD_SOLVERS))]}
+
     # pylint: disable=too-many-branches
     def _fit(self, X):
         """Dispatch to the right submethod depending on the chosen solver."""
+        covariance = self._use_covariance(X)
         X = self._validate_data(
             X,
             dtype=[np.float64, np.float32],
             reset=False,
             accept_sparse=["csr", "csc"],
-            copy=self.copy
+            # the covariance solver does not modify the data
+            copy=self.copy and not covariance
         )
 
         # Handle n_components==None
@@ -118,7 +195,9 @@ class ImprovedPCA(skl_decomposition.PCA):
 
         # Handle svd_solver
         self._fit_svd_solver = self.svd_solver
-        if self._fit_svd_solver == "auto":
+        if covariance:
+            self._fit_svd_solver = "covariance_eigh"
+        elif self._fit_svd_solver == "auto":
             # Sparse data can only be handled with the randomized solver
             if sp.issparse(X):
                 self._fit_svd_solver = "randomized"
@@ -136,7 +215,9 @@ class ImprovedPCA(skl_decomposition.PCA):
             raise ValueError("only the randomized solver supports sparse matrices")
 
         # Call different fits for either full or truncated SVD
-        if self._fit_svd_solver == "full":
+        if self._fit_svd_solver == "covariance_eigh":
+            return self._fit_covariance(X, n_components)
+        elif self._fit_svd_solver == "full":
             return self._fit_full(X, n_components)
         elif self._fit_svd_solver in ["arpack", "randomized"]:
             return self._fit_truncated(X, n_components, self._fit_svd_solver)
@@ -145,6 +226,59 @@ class ImprovedPCA(skl_decomposition.PCA):
                 "Unrecognized svd_solver='{0}'".format(self._fit_svd_solver)
             )
 
+    def _use_covariance(self, X):
+        if self.svd_solver == "covariance_eigh":
+            if sp.issparse(X):
+                raise ValueError("the covariance solver does not support "
+                                 "sparse matrices")
+            return True
+        n_samples, n_features = X.shape
+        return (self.svd_solver == "auto"
+                and not sp.issparse(X)
+                and (self.n_components is None
+                     or isinstance(self.n_components, numbers.Integral))
+                and max(n_samples, n_features) > 500
+                and n_features ** 2
+                <= COVARIANCE_MEMORY_RATIO * n_samples * n_features)
+
+    def _fit_covariance(self, X, n_components):
+        """
+        Fit the model from the covariance matrix of X, which is computed
+        in chunks of rows. Variances of all components are kept in
+        `all_explained_variance_`.
+        """
+        n_samples, n_features = X.shape
+        if not 0 <= n_components <= min(n_samples, n_features):
+            raise ValueError(
+                "n_components=%r must be between 0 and min(n_samples, "
+                "n_features)=%r with svd_solver='covariance_eigh'" % (
+                    n_components, min(n_samples, n_features)))
+        mean, variances, components = covariance_eigh_pca(X, n_components)
+        # covariance of n rows has rank of at most n - 1
+        variances = variances[:min(n_samples, n_features)]
+        total_var = variances.sum()
+
+        self.n_samples_ = n_samples
+        self.mean_ = mean.astype(X.dtype)
+        self.components_ = components.astype(X.dtype)
+        self.n_components_ = n_components
+        self.all_explained_variance_ = variances
+        self.explained_variance_ = variances[:n_components]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.explained_variance_ratio_ = \
+                self.explained_variance_ / total_var
+        self.singular_values_ = \
+            np.sqrt(self.explained_variance_ * (n_samples - 1))
+        if n_components < min(n_features, n_samples):
+            self.noise_variance_ = variances[n_components:].mean()
+        else:
+            self.noise_variance_ = 0
+        # U is not computed; see fit_transform
+        return None, self.singular_values_, self.components_
+
+    def fit_transform(self, X, y=None):
+        return self.fit(X, y).transform(X)
+
     def _fit_truncated(self, X, n_components, svd_solver):
         """Fit the model by computing truncated SVD (by ARPACK or randomized) on X"""
         n_samples, n_features = X.shape
@@ -226,12 +360,22 @@ class ImprovedPCA(skl_decomposition.PCA):
             accept_sparse=["csr", "csc"],
             dtype=[np.float64, np.float32],
             reset=False,
-            copy=self.copy
+            copy=False
         )
 
-        if self.mean_ is not None:
-            X = X - self.mean_
-        X_transformed = np.dot(X, self.components_.T)
+        if sp.issparse(X):
+            X_transformed = safe_sparse_dot(X, self.components_.T)
+            if self.mean_ is not None:
+                X_transformed -= self.mean_ @ self.components_.T
+        else:
+            dtype = np.result_type(X.dtype, self.components_.dtype)
+            X_transformed = np.empty((X.shape[0], len(self.components_)),
+                                     dtype=dtype)
+            for rows in _row_chunks(X):
+                chunk = X[rows]
+                if self.mean_ is not None:
+                    chunk = chunk - self.mean_
+                X_transformed[rows] = chunk @ self.components_.T
         if self.whiten:
             X_transformed /= np.sqrt(self.explained_variance_)
         return X_transformed
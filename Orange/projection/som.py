@@ -1,8 +1,45 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import scipy.sparse as sp
 
 from Orange.projection import _som
 
+# Winners are found for blocks of this many rows in parallel threads;
+# the kernels release the GIL
+QUANTIZATION_BLOCK_ROWS = 10000
+QUANTIZATION_THREADS = os.cpu_count() or 1
+
+
+def _as_csr64(x):
+    # kernels for sparse data are implemented for float64 only
+    x = sp.csr_matrix(x)
+    if x.dtype != np.float64:
+        x = x.astype(np.float64)
+    return x
+
+
+def _quantization(weights, ssum_weights, x, hexagonal):
+    """
+    Return winning units for rows of `x` and squared distances of rows to
+    their winners; sparse `x` must be a CSR matrix of float64.
+    """
+    def quantize(rows):
+        if sp.issparse(x):
+            return _som.quantization_sparse(
+                weights, ssum_weights, x[rows], int(hexagonal))
+        return _som.quantization(weights, x[rows], int(hexagonal))
+
+    blocks = [slice(start, start + QUANTIZATION_BLOCK_ROWS)
+              for start in range(0, x.shape[0], QUANTIZATION_BLOCK_ROWS)]
+    if len(blocks) <= 1 or QUANTIZATION_THREADS == 1:
+        return quantize(slice(None))
+    with ThreadPoolExecutor(
+            max_workers=min(QUANTIZATION_THREADS, len(blocks))) as executor:
+        winners, dists = zip(*executor.map(quantize, blocks))
+    return np.vstack(winners), np.concatenate(dists)
+
 
 class SOM:
     def __init__(self, dim_x, dim_y,
@@ -21,7 +58,7 @@ class SOM:
         norms = np.sum(self.weights ** 2, axis=2)
         norms[norms == 0] = 1
         self.weights /= norms[:, :, None]
-        self.ssum_weights = np.ones((self.dim_y, self.dim_x))
+        self.ssum_weights = np.sum(self.weights ** 2, axis=2)
 
     def init_weights_pca(self, x):
         pc_length, pc = np.linalg.eig(np.cov(x.T))
@@ -34,10 +71,26 @@ class SOM:
         norms = np.sum(self.weights ** 2, axis=2)
         norms[norms == 0] = 1
         self.weights /= norms[:, :, None]
-        self.ssum_weights = np.ones((self.dim_y, self.dim_x))
+        self.ssum_weights = np.sum(self.weights ** 2, axis=2)
+
+    def init_weights_sample(self, x):
+        # all units would be equal after the first batch update if they
+        # were initialized far from data, as in init_weights_random
+        random = (np.random if self.random_seed is None
+                  else np.random.RandomState(self.random_seed))
+        n_units = self.dim_x * self.dim_y
+        rows = random.choice(x.shape[0], n_units,
+                             replace=x.shape[0] < n_units)
+        sample = x[rows]
+        if sp.issparse(sample):
+            sample = sample.toarray()
+        self.weights = np.array(sample, dtype=float) \
+            .reshape(self.dim_y, self.dim_x, x.shape[1])
+        self.ssum_weights = np.sum(self.weights ** 2, axis=2)
 
     def fit(self, x, n_iterations, learning_rate=0.5, sigma=1.0, callback=None):
         if sp.issparse(x):
+            x = _as_csr64(x)
             f = _som.update_sparse_hex if self.hexagonal else _som.update_sparse
 
             def update(decay):
@@ -60,6 +113,83 @@ class SOM:
             if callback is not None and not callback(iteration / n_iterations):
                 break
 
+    def fit_batch(self, x, n_iterations, sigma=None, sigma_end=0.5,
+                  tol=1e-4, callback=None):
+        """
+        Train the map with the batch algorithm.
+
+        Unless the map is initialized with principal components, weights
+        are initialized to randomly chosen rows. Each iteration finds
+        winners of all rows and then sets weights of each unit to the
+        average of rows, weighted by the neighbourhood function of their
+        winners. The neighbourhood's width shrinks from `sigma` (by default,
+        a half of the larger dimension of the map) to `sigma_end` during the
+        first half of iterations. In the second, training stops when the
+        quantization error improves by less than `tol` (relative).
+
+        The final quantization error (the mean distance of rows to their
+        winners) and the number of iterations are stored in
+        `quantization_error` and `n_iter`.
+        """
+        if sp.issparse(x):
+            x = _as_csr64(x)
+        if self.pca_init and not sp.issparse(x) and x.shape[1] > 1:
+            self.init_weights_pca(x)
+        else:
+            self.init_weights_sample(x)
+        if sigma is None:
+            sigma = max(self.dim_x, self.dim_y) / 2
+        sigma = max(sigma, sigma_end)
+        sq_dists = self._grid_distances()
+        n_shrink = max(n_iterations // 2, 1)
+
+        error = np.inf
+        for iteration in range(n_iterations):
+            t = min(iteration / n_shrink, 1)
+            width = sigma * (sigma_end / sigma) ** t
+            winners, dists = self._quantization(x)
+            self._batch_update(x, winners, np.exp(-sq_dists / (2 * width ** 2)))
+            self.n_iter = iteration + 1
+            last_error, error = error, np.mean(np.sqrt(dists))
+            if callback is not None \
+                    and not callback(iteration / n_iterations):
+                break
+            if t == 1 and last_error - error <= tol * last_error:
+                break
+        self.quantization_error = np.mean(np.sqrt(self._quantization(x)[1]))
+
+    def _quantization(self, x):
+        return _quantization(
+            self.weights, self.ssum_weights, x, self.hexagonal)
+
+    def _grid_distances(self):
+        # squared distances between units; in hexagonal grid, odd rows are
+        # shifted by a half and rows are sqrt(3) / 2 apart
+        y, x = np.indices((self.dim_y, self.dim_x), dtype=float)
+        if self.hexagonal:
+            x += (y % 2) / 2
+            y *= np.sqrt(3) / 2
+        coords = np.column_stack((x.ravel(), y.ravel()))
+        return ((coords[:, None] - coords[None]) ** 2).sum(axis=2)
+
+    def _batch_update(self, x, winners, neighbourhood):
+        n_units = self.dim_x * self.dim_y
+        units = winners[:, 1].astype(int) * self.dim_x + winners[:, 0]
+        # sums of rows for each winning unit
+        membership = sp.csr_matrix(
+            (np.ones(len(units)), (units, np.arange(len(units)))),
+            shape=(n_units, x.shape[0]))
+        sums = membership @ x
+        if sp.issparse(sums):
+            sums = sums.toarray()
+        counts = np.bincount(units, minlength=n_units)
+        totals = neighbourhood @ counts
+        weights = self.weights.reshape(n_units, -1)
+        nonempty = totals > 0
+        weights[nonempty] = \
+            (neighbourhood @ sums)[nonempty] / totals[nonempty, None]
+        self.ssum_weights = np.sum(self.weights ** 2, axis=2)
+
     def winners(self, x):
         return self.winner_from_weights(
             x, self.weights, self.ssum_weights, self.hexagonal)
@@ -67,7 +197,5 @@ class SOM:
     @staticmethod
     def winner_from_weights(x, weights, ssum_weights, hexagonal):
         if sp.issparse(x):
-            return _som.get_winners_sparse(
-                weights, ssum_weights, x, int(hexagonal))
-        else:
-            return _som.get_winners(weights, x, int(hexagonal))
+            x = _as_csr64(x)
+        return _quantization(weights, ssum_weights, x, hexagonal)[0]
@@ -1,4 +1,5 @@
 import numpy as np
+import scipy.sparse as sp
 
 import sklearn.linear_model as skl_linear_model
 import sklearn.preprocessing as skl_preprocessing
@@ -37,6 +38,52 @@ class LinearRegressionLearner(SklLearner, _FeatureScorerMixin):
         model = super().fit(X, Y, W)
         return LinearModel(model.skl_model)
 
+    @property
+    def _fits_least_squares(self):
+        return self.__wraps__ is skl_linear_model.LinearRegression
+
+    @property
+    def supports_partial_fit(self):
+        # ordinary least squares is updated through sufficient statistics
+        return self._fits_least_squares or super().supports_partial_fit
+
+    def init_partial_fit(self, model, data):
+        if self._fits_least_squares:
+            model.xtx, model.xty = self._sufficient_statistics(data)
+
+    def update_model(self, model, data):
+        if not self._fits_least_squares:
+            super().update_model(model, data)
+            return
+
+        xtx, xty = self._sufficient_statistics(data)
+        model.xtx += xtx
+        model.xty += xty
+        coef = np.linalg.lstsq(model.xtx, model.xty, rcond=None)[0]
+        skl_model = model.skl_model
+        if self.params["fit_intercept"]:
+            skl_model.intercept_, skl_model.coef_ = coef[0], coef[1:]
+        else:
+            skl_model.coef_ = coef
+
+    def _sufficient_statistics(self, data):
+        """Return (weighted) X'X and X'y; X includes a column of ones
+        if the intercept is fitted."""
+        X, y = data.X, data.Y.reshape(-1)
+        if self.params["fit_intercept"]:
+            ones = np.ones((len(y), 1))
+            X = sp.hstack((ones, X), format="csr") if sp.issparse(X) \
+                else np.hstack((ones, X))
+        if data.has_weights():
+            w = data.W.reshape(-1, 1)
+            Xt = (X.multiply(w).tocsr() if sp.issparse(X) else X * w).T
+        else:
+            Xt = X.T
+        xtx = Xt @ X
+        if sp.issparse(xtx):
+            xtx = xtx.toarray()
+        return np.asarray(xtx, dtype=float), np.asarray(Xt @ y, dtype=float)
+
 
 class RidgeRegressionLearner(LinearRegressionLearner):
     __wraps__ = skl_linear_model.Ridge
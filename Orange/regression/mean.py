@@ -10,6 +10,8 @@ class MeanLearner(Learner):
     """
     Fit a regression model that returns the average response (class) value.
     """
+    supports_partial_fit = True
+
     def fit_storage(self, data):
         """
         Construct a :obj:`MeanModel` by computing the mean value of the given
@@ -26,6 +28,25 @@ class MeanLearner(Learner):
         dist = distribution.get_distribution(data, data.domain.class_var)
         return MeanModel(dist)
 
+    def update_model(self, model, data):
+        """
+        Update the mean with data from a new chunk.
+
+        :param model: model to update
+        :type model: :obj:`MeanModel`
+        :param data: data table in the model's domain
+        :type data: Orange.data.Table
+        """
+        dist = distribution.get_distribution(data, data.domain.class_var)
+        values, inverse = numpy.unique(
+            numpy.hstack((model.dist[0], dist[0])), return_inverse=True)
+        counts = numpy.bincount(
+            inverse, weights=numpy.hstack((model.dist[1], dist[1])))
+        model.dist = distribution.Continuous(
+            numpy.vstack((values, counts)), model.dist.variable,
+            model.dist.unknowns + dist.unknowns)
+        model.mean = model.dist.mean() if model.dist.any() else 0.0
+
 
 # noinspection PyMissingConstructor
 class MeanModel(Model):
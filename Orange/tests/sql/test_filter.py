@@ -3,6 +3,7 @@
 
 import unittest
 
+from Orange.data.sql.backend.base import ToSql
 from Orange.data.sql.table import SqlTable
 from Orange.data import filter, domain, Instance
 from Orange.tests.sql.base import DataBaseTest as dbt
@@ -197,6 +198,28 @@ class TestSameValueSql(unittest.TestCase, dbt):
         self.assertSequenceEqual(filtered_data, correct_data)
 
 
+class TestValuesSqlQuery(unittest.TestCase):
+    def test_nested_conditions(self):
+        x = domain.ContinuousVariable("x")
+        x.to_sql = ToSql('"x"')
+        d = domain.DiscreteVariable("d", values=("a", "b"))
+        d.to_sql = ToSql('"d"')
+        # a table without a connection suffices for translating filters
+        table = SqlTable.__new__(SqlTable)
+        table.domain = domain.Domain([x, d])
+        f = filter.Values([
+            filter.Values([
+                filter.FilterContinuous(x, filter.FilterContinuous.NotEqual,
+                                        1),
+                filter.SameValue(d, "b")], conjunction=False),
+            filter.IsDefined([x]),
+            filter.FilterContinuous(x, filter.FilterContinuous.Less, 5)])
+        self.assertEqual(
+            table._sql_values_filter(f).to_sql(),
+            """((("x" <> 1 OR "x" IS NULL) OR ("d" = 'b')))"""
+            """ AND ("x" IS NOT NULL) AND ("x" < 5)""")
+
+
 class TestValuesSql(unittest.TestCase, dbt):
     def setUpDB(self):
         self.data = [
@@ -1,10 +1,14 @@
 # Test methods with long descriptive names can omit docstrings
 # pylint: disable=missing-docstring
 import pickle
+import tempfile
 import unittest
 
+import numpy as np
+
 from Orange.base import SklLearner, Learner, Model
 from Orange.data import Domain, Table
+from Orange.misc.cache import DiskCache
 from Orange.preprocess import Discretize, Randomize, Continuize
 from Orange.regression import LinearRegressionLearner
 
@@ -89,6 +93,78 @@ class TestLearner(unittest.TestCase):
         self.assertEqual(max(args), 1)
         self.assertListEqual(args, sorted(args))
 
+    def test_partial_fit_not_supported(self):
+        self.assertFalse(DummyLearner().supports_partial_fit)
+        self.assertRaises(TypeError,
+                          DummyLearner().partial_fit, None, Table("iris"))
+
+
+    def test_model_cache(self):
+        data = Table("housing")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = DiskCache(tmpdir)
+            learner = LinearRegressionLearner(preprocessors=[Continuize()])
+            learner.model_cache = cache
+            with unittest.mock.patch.object(
+                    Learner, "_fit_model", autospec=True,
+                    side_effect=Learner._fit_model) as fit:
+                model = learner(data)
+                self.assertEqual(fit.call_count, 1)
+                cached = learner(data)
+                self.assertEqual(fit.call_count, 1)
+                self.assertIs(cached.original_data, data)
+                np.testing.assert_equal(cached(data), model(data))
+
+                # different parameters
+                other = LinearRegressionLearner(fit_intercept=False)
+                other.model_cache = cache
+                other(data)
+                self.assertEqual(fit.call_count, 2)
+
+                # different data
+                learner(data[:100])
+                self.assertEqual(fit.call_count, 3)
+                with data.unlocked():
+                    data.X[0, 0] += 1
+                learner(data)
+                self.assertEqual(fit.call_count, 4)
+
+    def test_fit_preprocessed(self):
+        data = Table("heart_disease")
+        learner = LinearRegressionLearner()
+        self.assertEqual(learner.preprocessing_key(data),
+                         LinearRegressionLearner(fit_intercept=False)
+                         .preprocessing_key(data))
+        self.assertNotEqual(
+            learner.preprocessing_key(data),
+            LinearRegressionLearner(preprocessors=[Continuize()])
+            .preprocessing_key(data))
+        self.assertNotEqual(learner.preprocessing_key(data),
+                            DummyLearner().preprocessing_key(data))
+
+        data = Table("housing")
+        preprocessed = learner.preprocess(data)
+        with unittest.mock.patch.object(Learner, "preprocess") as preprocess:
+            model = learner.fit_preprocessed(data, preprocessed)
+            preprocess.assert_not_called()
+        self.assertIs(model.original_domain, data.domain)
+        self.assertIs(model.domain, preprocessed.domain)
+        np.testing.assert_almost_equal(model(data), learner(data)(data))
+
+    def test_model_cache_key(self):
+        data = Table("iris")
+        learner = LinearRegressionLearner()
+        self.assertEqual(learner.model_cache_key(data),
+                         LinearRegressionLearner().model_cache_key(data))
+        self.assertNotEqual(learner.model_cache_key(data),
+                            learner.model_cache_key(data[:100]))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            learner.model_cache = DiskCache(tmpdir)
+            self.assertEqual(learner.model_cache_key(data),
+                             LinearRegressionLearner().model_cache_key(data))
+        learner.unpicklable = lambda x: x
+        self.assertIsNone(learner.model_cache_key(data))
+
 
 class TestSklLearner(unittest.TestCase):
     def test_sklearn_supports_weights(self):
@@ -113,6 +189,28 @@ class TestSklLearner(unittest.TestCase):
 
         self.assertFalse(DummyLearner().supports_weights)
 
+    def test_sklearn_supports_partial_fit(self):
+        class DummySklLearner:
+            def fit(self, X, y):
+                pass
+
+        class DummyLearner(SklLearner):
+            __wraps__ = DummySklLearner
+
+        self.assertFalse(DummyLearner().supports_partial_fit)
+
+        class DummySklLearner:
+            def fit(self, X, y):
+                pass
+
+            def partial_fit(self, X, y):
+                pass
+
+        class DummyLearner(SklLearner):
+            __wraps__ = DummySklLearner
+
+        self.assertTrue(DummyLearner().supports_partial_fit)
+
     def test_linreg(self):
         self.assertTrue(
             LinearRegressionLearner().supports_weights,
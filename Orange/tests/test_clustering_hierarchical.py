@@ -7,6 +7,9 @@ from itertools import chain, tee
 
 import numpy
 
+import scipy.cluster.hierarchy
+import scipy.spatial.distance
+
 from Orange.clustering import hierarchical
 import Orange.misc
 
@@ -195,6 +198,104 @@ class TestHierarchical(unittest.TestCase):
         self.assertEqual(tree, hierarchical.tree_from_linkage(Z))
 
 
+class TestLargeLinkage(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.X = numpy.random.RandomState(0).rand(200, 3)
+
+    def test_data_linkage(self):
+        for linkage in ("single", "complete", "average", "weighted", "ward"):
+            expected = scipy.cluster.hierarchy.linkage(self.X, linkage)
+            numpy.testing.assert_almost_equal(
+                hierarchical.data_linkage(self.X, linkage), expected,
+                decimal=5)
+        # distances are computed by blocks for other metrics
+        hierarchical.DISTANCES_BLOCK_SIZE = 30
+        try:
+            for linkage in ("single", "average"):
+                numpy.testing.assert_almost_equal(
+                    hierarchical.data_linkage(self.X, linkage, "cityblock"),
+                    scipy.cluster.hierarchy.linkage(self.X, linkage,
+                                                    "cityblock"),
+                    decimal=5)
+        finally:
+            hierarchical.DISTANCES_BLOCK_SIZE = 1000
+
+    def test_condensed_linkage(self):
+        distances = scipy.spatial.distance.pdist(self.X)
+        for linkage in ("single", "complete", "average", "weighted", "ward"):
+            numpy.testing.assert_almost_equal(
+                hierarchical.condensed_linkage(
+                    distances.astype(numpy.float32), linkage),
+                scipy.cluster.hierarchy.linkage(distances, linkage),
+                decimal=5)
+        self.assertRaises(ValueError, hierarchical.condensed_linkage,
+                          distances, "centroid")
+
+        matrix = scipy.spatial.distance.squareform(distances)
+        expected = hierarchical.dist_matrix_linkage(matrix)
+        threshold = hierarchical.NN_CHAIN_THRESHOLD
+        try:
+            hierarchical.NN_CHAIN_THRESHOLD = 100
+            numpy.testing.assert_almost_equal(
+                hierarchical.dist_matrix_linkage(matrix), expected, decimal=5)
+        finally:
+            hierarchical.NN_CHAIN_THRESHOLD = threshold
+
+
+class TestLinkageTree(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        X = numpy.random.RandomState(0).rand(100, 3)
+        cls.Z = scipy.cluster.hierarchy.linkage(X, "average")
+        cls.tree = hierarchical.tree_from_linkage(cls.Z)
+        cls.linkage_tree = hierarchical.LinkageTree(cls.Z)
+
+    def test_order(self):
+        lt = self.linkage_tree
+        self.assertEqual(
+            lt.order.tolist(),
+            [leaf.value.index for leaf in hierarchical.leaves(self.tree)])
+        for node in hierarchical.postorder(self.tree):
+            first, last = node.value.range
+            self.assertEqual(
+                set(lt.order[first:last]),
+                {leaf.value.index for leaf in hierarchical.leaves(node)})
+        self.assertEqual(lt.leaves(lt.root).tolist(), lt.order.tolist())
+
+    def test_prune(self):
+        for level in (1, 2, 5):
+            self.assertEqual(
+                hierarchical.prune(self.linkage_tree, level=level),
+                hierarchical.prune(self.tree, level=level))
+        self.assertEqual(hierarchical.prune(self.linkage_tree, height=0.3),
+                         hierarchical.prune(self.tree, height=0.3))
+        self.assertEqual(self.linkage_tree.to_tree(), self.tree)
+        self.assertRaises(ValueError, hierarchical.prune, self.linkage_tree,
+                          condition=lambda node: True)
+
+    def test_top_clusters(self):
+        lt = self.linkage_tree
+        for k in (1, 2, 5, 20):
+            expected = {frozenset(leaf.value.index
+                                  for leaf in hierarchical.leaves(cluster))
+                        for cluster in hierarchical.top_clusters(self.tree, k)}
+            nodes = hierarchical.top_clusters(lt, k)
+            self.assertEqual({frozenset(lt.leaves(node)) for node in nodes},
+                             expected)
+            labels = lt.cut(k)
+            for i, node in enumerate(nodes):
+                numpy.testing.assert_equal(labels[lt.leaves(node)], i)
+
+    def test_deep_tree(self):
+        # single linkage on a line is a chain deeper than recursion limit
+        X = numpy.arange(5000, dtype=float)[:, None] ** 1.1
+        Z = hierarchical.data_linkage(X, "single")
+        tree = hierarchical.tree_from_linkage(Z)
+        self.assertEqual(tree, hierarchical.LinkageTree(Z).to_tree())
+        self.assertEqual(hierarchical.cluster_depths(tree)[tree], 0)
+
+
 class TestTree(unittest.TestCase):
     def test_tree(self):
         Tree = hierarchical.Tree
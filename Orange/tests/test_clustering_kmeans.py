@@ -6,9 +6,10 @@ import warnings
 
 import numpy as np
 from scipy.sparse import csc_matrix, csr_matrix
+from sklearn.metrics import silhouette_samples, silhouette_score
 
 import Orange
-from Orange.clustering.kmeans import KMeans, KMeansModel
+from Orange.clustering.kmeans import KMeans, KMeansModel, KMeansSweep
 from Orange.data import Table, Domain, ContinuousVariable
 from Orange.data.table import DomainTransformationError
 
@@ -57,6 +58,27 @@ class TestKMeans(unittest.TestCase):
         self.assertEqual(np.ndarray, type(c))
         self.assertEqual(len(self.iris), len(c))
 
+    def test_partial_fit(self):
+        kmeans = KMeans(n_clusters=3, random_state=0)
+        data = self.iris[np.random.RandomState(0).permutation(150)]
+        model = kmeans.partial_fit(None, data[:60])
+        self.assertEqual(model.counts.sum(), 60)
+        counts = model.counts.copy()
+        labels = model(data[60:])
+        self.assertIs(kmeans.partial_fit(model, data[60:]), model)
+        np.testing.assert_equal(
+            model.counts, counts + np.bincount(labels, minlength=3))
+        self.assertEqual(model.centroids.shape, (3, 4))
+        # centroids remain means of the assigned instances
+        first = kmeans.partial_fit(None, data[:60])
+        X = data.X
+        assigned = np.hstack((first.labels, labels))
+        np.testing.assert_almost_equal(
+            model.centroids[assigned[0]],
+            (first.centroids[assigned[0]] * counts[assigned[0]]
+             + X[60:][labels == assigned[0]].sum(axis=0))
+            / model.counts[assigned[0]])
+
     def test_model(self):
         c = self.kmeans.get_model(self.iris)
         self.assertEqual(KMeansModel, type(c))
@@ -150,3 +172,83 @@ class TestKMeans(unittest.TestCase):
 
             assert len(w) == 1
             assert issubclass(w[-1].category, DeprecationWarning)
+
+
+class TestKMeansSweep(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.iris = Orange.data.Table('iris')
+
+    def test_fit_matches_kmeans(self):
+        sweep = KMeansSweep(self.iris, n_init=3, random_state=0)
+        self.assertFalse(sweep.minibatch)
+        self.assertFalse(sweep.warm_start)
+        model = sweep.fit(3)
+        expected = KMeans(n_clusters=3, n_init=3, random_state=0,
+                          preprocessors=[]).get_model(self.iris)
+        np.testing.assert_equal(model.labels, expected.labels)
+        np.testing.assert_almost_equal(
+            model.silhouette_samples,
+            silhouette_samples(self.iris.X, expected.labels))
+        self.assertAlmostEqual(model.silhouette,
+                               np.mean(model.silhouette_samples))
+        np.testing.assert_equal(model(self.iris), model.labels)
+
+    def test_minibatch_warm_start(self):
+        sweep = KMeansSweep(self.iris, minibatch_threshold=100)
+        self.assertTrue(sweep.minibatch)
+        self.assertTrue(sweep.warm_start)
+        models = dict(sweep.sweep([4, 2, 3]))
+        self.assertEqual(list(models), [2, 3, 4])
+        for k, model in models.items():
+            self.assertEqual(model.k, k)
+            self.assertEqual(model.centroids.shape, (k, 4))
+            self.assertEqual(len(set(model.labels)), k)
+
+        centroids = models[2].centroids
+        extended = sweep._extend_centroids(centroids, 5)
+        self.assertEqual(extended.shape, (5, 4))
+        np.testing.assert_equal(extended[:2], centroids)
+        # new centroids are data instances
+        for centroid in extended[2:]:
+            self.assertTrue(np.any(np.all(self.iris.X == centroid, axis=1)))
+
+    def test_sparse_warm_start(self):
+        data = self.iris.copy()
+        with data.unlocked():
+            data.X = csr_matrix(data.X)
+        sweep = KMeansSweep(data, warm_start=True)
+        models = dict(sweep.sweep([2, 3]))
+        self.assertEqual(models[3].centroids.shape, (3, 4))
+        np.testing.assert_almost_equal(
+            models[3].silhouette,
+            silhouette_score(self.iris.X, models[3].labels))
+
+    def test_estimated_silhouette(self):
+        sweep = KMeansSweep(self.iris, silhouette_sample_size=50)
+        model = sweep.fit(3)
+        self.assertIsNone(model.silhouette_samples)
+        self.assertAlmostEqual(
+            model.silhouette,
+            silhouette_score(self.iris.X, model.labels, sample_size=50,
+                             random_state=0))
+
+        sweep = KMeansSweep(self.iris, silhouette_sample_size=50,
+                            simplified_silhouette=True)
+        sweep.chunk_size = 32
+        model = sweep.fit(3)
+        dist = np.sqrt(((self.iris.X[:, None] - model.centroids) ** 2)
+                       .sum(axis=2))
+        own = dist[np.arange(150), model.labels]
+        dist[np.arange(150), model.labels] = np.inf
+        other = dist.min(axis=1)
+        np.testing.assert_almost_equal(
+            model.silhouette_samples, (other - own) / np.maximum(own, other))
+        self.assertAlmostEqual(model.silhouette,
+                               np.mean(model.silhouette_samples))
+
+    def test_sweep_failure(self):
+        sweep = KMeansSweep(self.iris[:5], n_init=1)
+        models = dict(sweep.sweep([2, 6]))
+        self.assertIsInstance(models[2], KMeansModel)
+        self.assertIsInstance(models[6], Exception)
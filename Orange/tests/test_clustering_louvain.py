@@ -2,13 +2,17 @@
 # pylint: disable=missing-docstring
 
 import unittest
+from unittest.mock import patch
 
 import numpy as np
 import networkx
+import scipy.sparse as sp
 from scipy.sparse import csc_matrix, csr_matrix
 
+import Orange.clustering.louvain as louvain_module
 from Orange.clustering.clustering import ClusteringModel
-from Orange.clustering.louvain import matrix_to_knn_graph
+from Orange.clustering.louvain import matrix_to_knn_graph, knn_graph, \
+    louvain_partition, jaccard, nearest_neighbors
 from Orange.data import Table
 from Orange.clustering.louvain import Louvain
 
@@ -120,3 +124,93 @@ class TestLouvain(unittest.TestCase):
         """
         c = self.louvain.get_model(self.iris)
         self.assertRaises(TypeError, c, 10)
+
+
+class TestKnnGraph(unittest.TestCase):
+    def setUp(self):
+        self.iris = Table('iris')
+
+    def test_jaccard_weights(self):
+        neighbors = list(map(set, nearest_neighbors(self.iris.X, 10, "l2")))
+        for block_size in (7, 10000):
+            with patch.object(
+                    louvain_module, "KNN_GRAPH_BLOCK_SIZE", block_size):
+                graph = knn_graph(self.iris.X, 10, "l2")
+            self.assertIsInstance(graph, csr_matrix)
+            np.testing.assert_equal(graph.toarray(), graph.T.toarray())
+            rows, cols = graph.nonzero()
+            for i, j, weight in zip(rows, cols, graph.data):
+                self.assertTrue(j in neighbors[i] or i in neighbors[j])
+                self.assertAlmostEqual(
+                    weight, jaccard(neighbors[i], neighbors[j]))
+            self.assertEqual(
+                graph.nnz,
+                sum(len(n | {j for j in range(150) if i in neighbors[j]})
+                    for i, n in enumerate(neighbors)))
+
+    def test_networkx_graph(self):
+        graph = matrix_to_knn_graph(self.iris.X, 10, "l2")
+        adjacency = knn_graph(self.iris.X, 10, "l2")
+        np.testing.assert_almost_equal(
+            networkx.to_scipy_sparse_array(
+                graph, nodelist=range(150)).toarray(),
+            adjacency.toarray())
+
+    def test_cosine(self):
+        graph = knn_graph(self.iris.X, 10, "cosine")
+        self.assertEqual(graph.shape, (150, 150))
+
+    @unittest.skipIf(louvain_module.pynndescent is None,
+                     "pynndescent is not installed")
+    def test_approximate(self):
+        exact = knn_graph(self.iris.X, 10, "l2")
+        approximate = knn_graph(self.iris.X, 10, "l2", approximate=True,
+                                random_state=0)
+        self.assertGreater((exact.multiply(approximate) > 0).sum(),
+                           0.9 * exact.nnz)
+
+    @patch.object(louvain_module, "pynndescent", None)
+    def test_approximate_missing(self):
+        self.assertRaises(ImportError, knn_graph, self.iris.X, 10, "l2",
+                          approximate=True)
+
+
+class TestLouvainCSR(unittest.TestCase):
+    def test_cliques(self):
+        # three cliques, connected by weak edges
+        adjacency = sp.block_diag([np.ones((5, 5))] * 3).tolil()
+        adjacency[0, 5] = adjacency[5, 0] = 0.1
+        adjacency[5, 10] = adjacency[10, 5] = 0.1
+        labels = louvain_partition(adjacency.tocsr(), random_state=0)
+        self.assertEqual(len(set(labels)), 3)
+        for i in range(3):
+            self.assertEqual(len(set(labels[5 * i:5 * i + 5])), 1)
+
+        labels = louvain_partition(adjacency.tocsr(), resolution=0.001,
+                                   random_state=0)
+        self.assertEqual(len(set(labels)), 1)
+
+    def test_empty_graph(self):
+        labels = louvain_partition(csr_matrix((4, 4)))
+        np.testing.assert_equal(labels, np.arange(4))
+
+    def test_modularity(self):
+        # pylint: disable=import-outside-toplevel
+        try:
+            from community import best_partition, modularity
+        except ImportError:
+            self.skipTest("python-louvain is not installed")
+        graph = matrix_to_knn_graph(Table('iris').X, 15, "l2")
+        adjacency = networkx.to_scipy_sparse_array(
+            graph, nodelist=range(150), format="csr")
+        labels = louvain_partition(adjacency, random_state=0)
+        partition = best_partition(graph, random_state=0)
+        self.assertGreater(modularity(dict(enumerate(labels)), graph),
+                           modularity(partition, graph) - 0.01)
+
+    def test_louvain_on_sparse_graph(self):
+        iris = Table('iris')
+        graph = knn_graph(iris.X, 30, "l2")
+        np.testing.assert_equal(Louvain(random_state=0)(graph),
+                                Louvain(random_state=0)(iris))
+
@@ -295,6 +295,17 @@ class TestEuclidean(TestCase):
             np.array([[0., 0.53851648, 0.50990195],
                       [0.53851648, 0., 0.3]]))
 
+    def test_euclidean_distance_float32(self):
+        data = Table.from_numpy(self.iris.domain, self.iris.X, self.iris.Y,
+                                dtype=np.float32)
+        for axis in (0, 1):
+            for normalize in (False, True):
+                dist = self.dist(data, axis=axis, normalize=normalize)
+                self.assertEqual(dist.dtype, np.float32)
+                np.testing.assert_allclose(
+                    dist, self.dist(self.iris, axis=axis, normalize=normalize),
+                    rtol=1e-4, atol=1e-4)
+
 
 # noinspection PyTypeChecker
 class TestManhattan(TestCase):
@@ -384,6 +395,16 @@ class TestManhattan(TestCase):
             np.array([[0., 0.7, 0.8],
                       [0.7, 0., 0.5]]))
 
+    def test_manhattan_distance_float32(self):
+        data = Table.from_numpy(self.iris.domain, self.iris.X, self.iris.Y,
+                                dtype=np.float32)
+        for axis in (0, 1):
+            for normalize in (False, True):
+                np.testing.assert_allclose(
+                    self.dist(data, axis=axis, normalize=normalize),
+                    self.dist(self.iris, axis=axis, normalize=normalize),
+                    rtol=1e-4, atol=1e-4)
+
 
 # noinspection PyTypeChecker
 class TestCosine(TestCase):
@@ -4,10 +4,13 @@
 import unittest
 
 import numpy as np
+from sklearn.metrics import pairwise_distances
+from sklearn.metrics import silhouette_samples as skl_silhouette_samples
 
 import Orange
 from Orange.evaluation.clustering import Silhouette, \
-    AdjustedMutualInfoScore, ClusteringEvaluation, ClusteringResults
+    AdjustedMutualInfoScore, ClusteringEvaluation, ClusteringResults, \
+    silhouette_samples
 from Orange.clustering.kmeans import KMeans, KMeansModel
 
 
@@ -46,3 +49,44 @@ class TestClusteringEvaluation(unittest.TestCase):
         self.assertEqual(cr.models.shape, (3, 1))
         self.assertTrue(all(isinstance(m, KMeansModel)
                             for m in cr.models.flatten()))
+
+
+class TestSilhouetteSamples(unittest.TestCase):
+    def setUp(self):
+        rgen = np.random.RandomState(0)
+        self.x = rgen.normal(size=(200, 3))
+        self.labels = rgen.randint(4, size=200)
+        self.labels[0] = 4  # singleton
+        self.expected = skl_silhouette_samples(self.x, self.labels)
+
+    def test_blocks(self):
+        x = self.x
+        np.testing.assert_almost_equal(
+            silhouette_samples(pairwise_distances(x), self.labels),
+            self.expected)
+        for n_jobs in (1, 3):
+            np.testing.assert_almost_equal(
+                silhouette_samples(
+                    lambda rows: pairwise_distances(x[rows], x), self.labels,
+                    block_size=7, n_jobs=n_jobs),
+                self.expected)
+
+    def test_ignored_instances(self):
+        dist = pairwise_distances(self.x)
+        dist[3] = dist[:, 3] = np.nan
+        labels = self.labels.astype(float)
+        labels[5] = np.nan
+        labels[6] = -1
+        valid = np.ones(200, dtype=bool)
+        valid[[3, 5, 6]] = False
+        sil = silhouette_samples(dist, labels)
+        self.assertTrue(np.all(np.isnan(sil[~valid])))
+        np.testing.assert_almost_equal(
+            sil[valid],
+            skl_silhouette_samples(dist[valid][:, valid], self.labels[valid],
+                                   metric="precomputed"))
+
+    def test_single_cluster(self):
+        sil = silhouette_samples(pairwise_distances(self.x), np.zeros(200))
+        self.assertTrue(np.all(np.isnan(sil)))
+
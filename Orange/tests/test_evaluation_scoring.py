@@ -464,6 +464,80 @@ class TestSpecificity(unittest.TestCase):
         self.assertRaises(ValueError, self.score, res, average="abc")
 
 
+class TestWeightedScores(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.heart = Table("heart_disease")
+        cls.iris = Table("iris")
+        learners = [LogisticRegressionLearner(), NaiveBayesLearner(),
+                    MajorityLearner()]
+        cls.heart_results = CrossValidation(k=5)(cls.heart, learners)
+        cls.iris_results = CrossValidation(k=5)(cls.iris, learners)
+
+    @staticmethod
+    def _fold_scores(score, results, **kwargs):
+        return np.array([score.compute_score(results.get_fold(fold), **kwargs)
+                         for fold in range(len(results.folds))])
+
+    def test_scores_by_folds(self):
+        for results in (self.heart_results, self.iris_results):
+            for score in (CA(), AUC(), LogLoss(), MatthewsCorrCoefficient()):
+                self.assertTrue(score.vectorized)
+                np.testing.assert_almost_equal(
+                    score.scores_by_folds(results),
+                    self._fold_scores(score, results))
+            for score in (Precision(), Recall(), F1()):
+                for kwargs in ({"target": 0}, {"average": "macro"},
+                               {"average": "micro"}):
+                    np.testing.assert_almost_equal(
+                        score.scores_by_folds(results, **kwargs),
+                        self._fold_scores(score, results, **kwargs))
+        np.testing.assert_almost_equal(
+            Specificity().scores_by_folds(self.heart_results),
+            self._fold_scores(Specificity(), self.heart_results))
+
+    def test_overridden_compute_score_is_not_vectorized(self):
+        class HalfCA(CA, abstract=True):
+            def compute_score(self, results):
+                return super().compute_score(results) / 2
+
+        results = self.heart_results
+        np.testing.assert_almost_equal(
+            HalfCA().scores_by_folds(results),
+            CA().scores_by_folds(results) / 2)
+
+    def test_bootstrap(self):
+        results = self.heart_results
+        scores, ci = CA().bootstrap(results, n_samples=50, confidence=0.9)
+        self.assertEqual(scores.shape, (50, 3))
+        self.assertEqual(ci.shape, (3, 2))
+        ca = CA(results)
+        np.testing.assert_array_less(ci[:, 0], ca)
+        np.testing.assert_array_less(ca, ci[:, 1])
+
+        again, _ = CA().bootstrap(results, n_samples=50, confidence=0.9)
+        np.testing.assert_equal(scores, again)
+
+        self.assertRaises(ValueError, CA().bootstrap, results, n_samples=0)
+
+    def test_bootstrap_matches_resampling(self):
+        results = self.heart_results
+        weights = np.vstack(list(scoring._bootstrap_weights(
+            len(results.actual), 20, 0)))
+        for score in (CA(), AUC(), F1(), LogLoss()):
+            np.testing.assert_almost_equal(
+                score.bootstrap(results, n_samples=20)[0],
+                scoring.Score.weighted_scores(score, results, weights))
+
+    def test_weighted_auc_ties(self):
+        positive = np.array([True, False, True, False, True])
+        scores = np.array([0.9, 0.9, 0.5, 0.1, 0.1])
+        weights = np.array([[1, 1, 1, 1, 1], [2, 0, 1, 1, 0]])
+        # ties count as half: (1.5 + 1 + 0.5) / 6
+        np.testing.assert_almost_equal(
+            AUC.weighted_auc(weights, positive, scores), [0.5, 1])
+
+
 if __name__ == '__main__':
     unittest.main()
     del TestScoreMetaType
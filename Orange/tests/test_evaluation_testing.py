@@ -1,18 +1,22 @@
 # Test methods with long descriptive names can omit docstrings
 # pylint: disable=missing-docstring
 
+import tempfile
 import unittest
 from unittest.mock import Mock, patch
 
 import numpy as np
 
-from Orange.classification import NaiveBayesLearner, MajorityLearner
-from Orange.evaluation.testing import Validation
+from Orange.base import Learner
+from Orange.classification import NaiveBayesLearner, MajorityLearner, \
+    LogisticRegressionLearner, KNNLearner
+from Orange.evaluation.testing import Validation, _run_parts
 from Orange.regression import LinearRegressionLearner, MeanLearner
 from Orange.data import Table, Domain, DiscreteVariable
 from Orange.evaluation import (Results, CrossValidation, LeaveOneOut, TestOnTrainingData,
                                TestOnTestData, ShuffleSplit, sample, RMSE,
-                               CrossValidationFeature)
+                               CrossValidationFeature, CA, AUC)
+from Orange.misc.cache import DiskCache
 from Orange.preprocess import discretize, preprocess
 
 
@@ -226,6 +230,115 @@ class TestCrossValidation(TestSampling):
         self.assertEqual(len(res.models), 5)
         self.check_models(res, learners, 5)
 
+    def test_model_cache(self):
+        learners = [NaiveBayesLearner(), MajorityLearner()]
+        cv = CrossValidation(k=5, store_models=True)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = DiskCache(tmpdir)
+            res = cv(self.random_table, learners, model_cache=cache)
+            self.assertIsNone(learners[0].model_cache)
+            with patch.object(NaiveBayesLearner, "fit_storage") as fit, \
+                    patch.object(MajorityLearner, "fit_storage") as fit_majority:
+                res2 = cv(self.random_table, learners, model_cache=cache)
+                fit.assert_not_called()
+                fit_majority.assert_not_called()
+        np.testing.assert_almost_equal(res2.probabilities, res.probabilities)
+        self.check_models(res2, learners, 5)
+
+    def test_shared_preprocessing(self):
+        data = Table("heart_disease")
+        learners = [LogisticRegressionLearner(), KNNLearner(),
+                    LogisticRegressionLearner(C=0.1), NaiveBayesLearner()]
+        cv = CrossValidation(k=3)
+        with patch.object(Learner, "preprocess", autospec=True,
+                          side_effect=Learner.preprocess) as preprocess:
+            res = cv(data, learners)
+        # logistic regression and kNN share SklLearner's preprocessing;
+        # naive Bayes has its own
+        self.assertEqual(preprocess.call_count, 3 * 2)
+        self.assertFalse(any(res.failed))
+
+        # parts that run in parallel still preprocess only once
+        with patch.object(Learner, "preprocess", autospec=True,
+                          side_effect=Learner.preprocess) as preprocess:
+            parallel = cv(data, learners, n_jobs=4)
+        self.assertEqual(preprocess.call_count, 3 * 2)
+        np.testing.assert_almost_equal(parallel.probabilities,
+                                       res.probabilities)
+
+        with patch.object(Learner, "preprocessing_key", return_value=None):
+            res2 = cv(data, learners)
+        np.testing.assert_almost_equal(res2.probabilities, res.probabilities)
+
+    def test_compact(self):
+        data = Table("iris")
+        learners = [LogisticRegressionLearner(), MajorityLearner()]
+        res = CrossValidation(k=3)(data, learners)
+        compact = CrossValidation(k=3)(data, learners, compact=True)
+        self.assertEqual(compact.predicted.dtype, np.int32)
+        self.assertEqual(compact.probabilities.dtype, np.float32)
+        np.testing.assert_equal(compact.predicted, res.predicted)
+        np.testing.assert_almost_equal(
+            compact.probabilities, res.probabilities, decimal=6)
+        np.testing.assert_almost_equal(CA(compact), CA(res))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            mapped = CrossValidation(k=3)(
+                data, learners, compact=True, memmap_dir=tmp)
+            self.assertIsInstance(mapped.probabilities, np.memmap)
+            np.testing.assert_equal(mapped.probabilities,
+                                    compact.probabilities)
+            del mapped
+
+    def test_scorers(self):
+        data = Table("iris")
+        learners = [LogisticRegressionLearner(), MajorityLearner()]
+        res = CrossValidation(k=3)(data, learners)
+        scored = CrossValidation(k=3)(data, learners, scorers=[CA(), AUC()])
+        self.assertIsNone(scored.predicted)
+        self.assertIsNone(scored.probabilities)
+        self.assertEqual(scored.fold_scores[CA].shape, (3, 2))
+        np.testing.assert_almost_equal(
+            CA().scores_by_folds(scored), CA().scores_by_folds(res))
+        np.testing.assert_almost_equal(
+            AUC(scored), np.mean(AUC().scores_by_folds(res), axis=0))
+
+        scored = TestOnTestData()(data, data, learners, scorers=[CA()])
+        np.testing.assert_almost_equal(
+            CA(scored), CA(TestOnTestData()(data, data, learners)))
+
+    def test_n_jobs(self):
+        data = Table("heart_disease")
+        learners = [LogisticRegressionLearner(), NaiveBayesLearner(),
+                    MajorityLearner()]
+        callback = Mock()
+        res = CrossValidation(k=3)(data, learners)
+        parallel = CrossValidation(k=3)(data, learners, n_jobs=2,
+                                        callback=callback)
+        np.testing.assert_almost_equal(parallel.probabilities,
+                                       res.probabilities)
+        self.assertEqual(callback.call_count, 3 * 3 + 1)
+
+        parallel = TestOnTestData()(data, data, learners, n_jobs=-1)
+        np.testing.assert_almost_equal(
+            parallel.probabilities,
+            TestOnTestData()(data, data, learners).probabilities)
+
+    def test_run_parts_consumes_arguments_lazily(self):
+        consumed = []
+
+        def args_iter():
+            for i in range(20):
+                consumed.append(i)
+                yield (i, )
+
+        with patch("Orange.evaluation.testing._mp_worker",
+                   side_effect=lambda i: i):
+            parts = _run_parts(args_iter(), n_jobs=2)
+            self.assertEqual(next(parts), 0)
+            self.assertLessEqual(len(consumed), 3)
+            self.assertEqual(list(parts), list(range(1, 20)))
+
     def test_split_by_model(self):
         learners = [NaiveBayesLearner(), MajorityLearner()]
         res = CrossValidation(k=5, store_models=True)(self.random_table, learners)
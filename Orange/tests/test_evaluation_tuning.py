@@ -0,0 +1,138 @@
+# Test methods with long descriptive names can omit docstrings
+# pylint: disable=missing-docstring
+
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import scipy.stats
+
+from Orange.classification import LogisticRegressionLearner
+from Orange.data import Table
+from Orange.evaluation import CrossValidation, GridSearch, RandomSearch, \
+    SuccessiveHalving, Hyperband, TunedLearner, MSE, CA
+from Orange.regression import RidgeRegressionLearner
+
+
+class TestParameterSearch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.iris = Table("iris")
+        cls.housing = Table("housing")
+
+    def test_grid_search(self):
+        search = GridSearch(
+            LogisticRegressionLearner,
+            {"C": [0.001, 1, 100], "penalty": ["l1", "l2"]},
+            validation=CrossValidation(k=3))
+        results = search(self.iris)
+        self.assertEqual(len(results.params), 6)
+        self.assertEqual(results.params[1], {"C": 0.001, "penalty": "l2"})
+        self.assertEqual(results.best_score, np.nanmax(results.scores))
+        np.testing.assert_equal(results.resources, len(self.iris))
+
+        learners = [LogisticRegressionLearner(**params)
+                    for params in results.params]
+        res = CrossValidation(k=3)(self.iris, learners)
+        np.testing.assert_almost_equal(results.scores, CA(res))
+
+        learner = results.learner
+        self.assertIsInstance(learner, LogisticRegressionLearner)
+        self.assertEqual(learner.params["C"], results.best_params["C"])
+
+    def test_lower_is_better(self):
+        alphas = [0.01, 10000]
+        search = GridSearch(RidgeRegressionLearner, {"alpha": alphas},
+                            validation=CrossValidation(k=3))
+        results = search(self.housing)
+        self.assertEqual(results.best_params, {"alpha": 0.01})
+
+        search.score = MSE()
+        self.assertEqual(search(self.housing).best_params, {"alpha": 0.01})
+
+    def test_failed_learners_are_worst(self):
+        def factory(fail):
+            if fail:
+                return LogisticRegressionLearner(penalty="unknown")
+            return LogisticRegressionLearner()
+
+        results = GridSearch(factory, {"fail": [True, False]},
+                             validation=CrossValidation(k=3))(self.iris)
+        self.assertTrue(np.isnan(results.scores[0]))
+        self.assertEqual(results.best_index, 1)
+
+    def test_random_search(self):
+        params = {"C": scipy.stats.loguniform(1e-3, 1e3),
+                  "penalty": ["l1", "l2"]}
+        search = RandomSearch(LogisticRegressionLearner, params,
+                              n_candidates=4, random_state=42,
+                              validation=CrossValidation(k=3))
+        results = search(self.iris)
+        self.assertEqual(len(results.params), 4)
+        for candidate in results.params:
+            self.assertTrue(1e-3 <= candidate["C"] <= 1e3)
+            self.assertIn(candidate["penalty"], ("l1", "l2"))
+        self.assertEqual(search(self.iris).params, results.params)
+
+    def test_successive_halving(self):
+        search = SuccessiveHalving(
+            LogisticRegressionLearner,
+            {"C": [0.0001, 0.001, 0.01, 0.1, 1, 10, 100, 1000, 10000]},
+            validation=CrossValidation(k=3), min_resources=16)
+        results = search(self.iris)
+        sizes = [resources for resources, *_ in results.rounds]
+        self.assertEqual(sizes, [16, 48, 144])
+        self.assertEqual([len(indices) for _, indices, _ in results.rounds],
+                         [9, 3, 1])
+        self.assertEqual(results.resources[results.best_index], 144)
+        # only candidates from the previous round proceed
+        for (_, prev, _), (_, indices, _) in zip(results.rounds,
+                                                  results.rounds[1:]):
+            self.assertTrue(set(indices) <= set(prev))
+
+        # the default makes the last round use all data
+        search.min_resources = None
+        results = search(self.iris)
+        self.assertEqual(results.rounds[-1][0], len(self.iris))
+        self.assertEqual(len(results.rounds), 3)
+
+    def test_successive_halving_number_of_rounds(self):
+        # math.log(125, 5) exceeds 3 due to rounding
+        search = SuccessiveHalving(
+            LogisticRegressionLearner, {"C": list(range(1, 126))}, eta=5,
+            min_resources=1)
+        data = self.iris[np.arange(625) % len(self.iris)]
+        with patch.object(search, "evaluate",
+                          side_effect=lambda _, params: np.ones(len(params))):
+            results = search(data)
+        self.assertEqual([len(indices) for _, indices, _ in results.rounds],
+                         [125, 25, 5, 1])
+        self.assertEqual([resources for resources, *_ in results.rounds],
+                         [5, 25, 125, 625])
+
+    def test_hyperband(self):
+        search = Hyperband(
+            LogisticRegressionLearner,
+            {"C": scipy.stats.loguniform(1e-3, 1e3)},
+            validation=CrossValidation(k=3), min_resources=16)
+        results = search(self.iris)
+        # brackets with 3, 2, 1 rounds
+        self.assertEqual(len(results.params), 9 + 5 + 3)
+        self.assertEqual(len(results.rounds), 3 + 2 + 1)
+        self.assertEqual(results.resources[results.best_index],
+                         len(self.iris))
+
+    def test_tuned_learner(self):
+        learner = TunedLearner(
+            GridSearch(LogisticRegressionLearner, {"C": [0.001, 1]},
+                       validation=CrossValidation(k=3)))
+        model = learner(self.iris)
+        self.assertEqual(model.tuning_results.best_params, {"C": 1})
+        self.assertGreater(np.mean(model(self.iris) == self.iris.Y), 0.9)
+
+        res = CrossValidation(k=3)(self.iris, [learner])
+        self.assertGreater(CA(res)[0], 0.9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -38,6 +38,53 @@ class TestFilterValues(unittest.TestCase):
                          (~((self.iris.X[:, 0] < 5) | (self.iris.X[:, 1] > 3)) &
                           (self.iris.Y == 2)).sum())
 
+    def test_values_table(self):
+        vs = self.iris.domain.variables
+        f1 = FilterContinuous(vs[0], FilterContinuous.Less, 5)
+        f2 = FilterContinuous(vs[1], FilterContinuous.Greater, 3)
+        f3 = FilterDiscrete(vs[4], [2])
+        f4 = SameValue(vs[4], "Iris-setosa", negate=True)
+        f5 = IsDefined([vs[2]])
+        for conjunction, negate in itertools.product((False, True), repeat=2):
+            f = Values([Values([f1, f2], conjunction=not conjunction,
+                               negate=True), f3, f4, f5],
+                       conjunction=conjunction, negate=negate)
+            with patch("Orange.data.Table._filter_values", NIMOCK):
+                expected = f(self.iris)
+            np.testing.assert_equal(f(self.iris).ids, expected.ids)
+
+    def test_values_undecided_rows(self):
+        zoo = Table("zoo")
+        hair = zoo.get_column("hair") == 1
+        legs = zoo.get_column("legs") == zoo.domain["legs"].to_val("4")
+        names = zoo.get_column("name")
+        f1 = FilterString("name", FilterString.StartsWith, "c")
+        f2 = FilterDiscrete("hair", ["1"])
+        f3 = FilterDiscrete("legs", ["4"])
+        to_indicator = Table._filter_to_indicator
+        with patch.object(Table, "_filter_to_indicator", autospec=True,
+                          side_effect=to_indicator) as filter_to_indicator:
+            data = Values([f1, f2, f3])(zoo)
+        np.testing.assert_equal(
+            data.metas[:, 0],
+            [name for name, h, l in zip(names, hair, legs)
+             if h and l and name.startswith("c")])
+        # numeric conditions go first; the string condition is checked only
+        # on the remaining rows
+        (_, first, rows1), (_, second, rows2), (_, third, rows3) = \
+            [call[0] for call in filter_to_indicator.call_args_list]
+        self.assertEqual((first, second, third), (f2, f3, f1))
+        self.assertIsNone(rows1)
+        self.assertIsNone(rows2)  # too many rows for gathering
+        np.testing.assert_equal(rows3, np.flatnonzero(hair & legs))
+
+        # no conditions are checked after all rows are decided
+        f4 = FilterDiscrete("hair", [])
+        with patch.object(Table, "_filter_to_indicator", autospec=True,
+                          side_effect=to_indicator) as filter_to_indicator:
+            self.assertEqual(len(Values([f4, f1, f2])(zoo)), 0)
+        self.assertEqual(filter_to_indicator.call_count, 1)
+
 
 class TestIsDefinedFilter(unittest.TestCase):
     def setUp(self):
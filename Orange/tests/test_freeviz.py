@@ -1,6 +1,7 @@
 # Test methods with long descriptive names can omit docstrings
 # pylint: disable=missing-docstring
 
+import itertools
 import unittest
 import numpy as np
 
@@ -70,6 +71,40 @@ class TestFreeviz(unittest.TestCase):
         FreeViz.init_radial(3)
         FreeViz.init_random(2, 4, 5)
 
+    def test_gradient_pairs(self):
+        X, y = self.iris.X, self.iris.Y
+        embedding = X.dot(FreeViz.init_random(4, 2))
+        weights = np.random.RandomState(0).rand(150)
+        pairs = np.array(list(itertools.combinations(range(150), 2))).T
+        for is_class_discrete, p in itertools.product((True, False), (1, 2)):
+            np.testing.assert_almost_equal(
+                FreeViz.freeviz_gradient_pairs(
+                    X, y, embedding, pairs, p=p, weights=weights,
+                    is_class_discrete=is_class_discrete),
+                FreeViz.freeviz_gradient(
+                    X, y, embedding, p=p, weights=weights,
+                    is_class_discrete=is_class_discrete),
+                decimal=8)
+
+        pairs = FreeViz.sample_pairs(5, 1000, 0)
+        self.assertEqual(pairs.shape, (2, 1000))
+        self.assertFalse(np.any(pairs[0] == pairs[1]))
+        self.assertEqual(set(pairs.ravel()), set(range(5)))
+
+    def test_sampled_pairs(self):
+        X, y = self.iris.X, self.iris.Y
+        _, exact, *_ = FreeViz.freeviz(X, y, maxiter=100,
+                                       is_class_discrete=True)
+        _, sampled, *_ = FreeViz.freeviz(X, y, maxiter=100, n_pairs=5000,
+                                         is_class_discrete=True)
+        np.testing.assert_allclose(sampled, exact, atol=0.05)
+        _, again, *_ = FreeViz.freeviz(X, y, maxiter=100, n_pairs=5000,
+                                       is_class_discrete=True)
+        np.testing.assert_equal(again, sampled)
+
+        model = FreeViz(n_pairs=5000)(self.iris)
+        self.assertEqual(model.components_.shape, (2, 4))
+
     def test_transform_changed_domain(self):
         """
         1. Open data, apply some preprocessor, splits the data into two parts,
@@ -37,6 +37,19 @@ class TestLinearRegressionLearner(unittest.TestCase):
         z = clf(x2)
         self.assertTrue((abs(z.reshape(-1, 1) - y2) < 2.0).all())
 
+    def test_partial_fit(self):
+        data = self.housing
+        learner = LinearRegressionLearner()
+        self.assertTrue(learner.supports_partial_fit)
+        model = None
+        for i in range(0, len(data), 100):
+            model = learner.partial_fit(model, data[i:i + 100])
+        full = learner(data)
+        np.testing.assert_almost_equal(model.coefficients, full.coefficients)
+        np.testing.assert_almost_equal(model.intercept, full.intercept)
+
+        self.assertFalse(RidgeRegressionLearner().supports_partial_fit)
+
     def test_Regression(self):
         ridge = RidgeRegressionLearner()
         lasso = LassoRegressionLearner()
@@ -5,7 +5,7 @@ import unittest
 
 import numpy as np
 
-from Orange.data import Table
+from Orange.data import Table, Domain, ContinuousVariable, DiscreteVariable
 from Orange.classification import MajorityLearner
 from Orange.tests import test_filename
 
@@ -46,6 +46,18 @@ class TestMajorityLearner(unittest.TestCase):
         y = clf(self.iris[0], clf.Probs)
         self.assertTrue(np.allclose(y, y.sum() / y.size))
 
+    def test_partial_fit(self):
+        y = np.array([0] * 10 + [1] * 30 + [2] * 20, dtype=float)
+        domain = Domain([ContinuousVariable("x")],
+                        DiscreteVariable("y", values=("a", "b", "c")))
+        t = Table.from_numpy(domain, np.zeros((60, 1)), y)
+        model = None
+        for i in range(0, 60, 20):
+            model = self.learn.partial_fit(model, t[i:i + 20])
+        np.testing.assert_almost_equal(model(t[0], model.Probs),
+                                       [1 / 6, 1 / 2, 1 / 3])
+        self.assertEqual(model(t[0]), 1)
+
     def test_missing(self):
         iris = Table('iris')
         learn = MajorityLearner()
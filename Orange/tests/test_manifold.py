@@ -12,7 +12,9 @@ from Orange.data import Table
 from Orange.distance import Euclidean
 from Orange.projection import (MDS, Isomap, LocallyLinearEmbedding,
                                SpectralEmbedding, TSNE)
-from Orange.projection.manifold import torgerson
+from Orange.projection import manifold
+from Orange.projection.manifold import torgerson, landmark_mds, SMACOF, \
+    AffinityCache
 from Orange.tests import test_filename
 
 
@@ -139,6 +141,55 @@ class TestManifold(unittest.TestCase):
         with self.assertRaises(ValueError):
             torgerson(dis, eigen_solver="madness")
 
+        e4 = torgerson(dis, eigen_solver="randomized")
+        np.testing.assert_almost_equal(np.abs(e1), np.abs(e4), decimal=4)
+
+    def test_landmark_mds(self):
+        dis = Euclidean(self.iris)
+        expected = np.abs(torgerson(dis))
+        np.testing.assert_almost_equal(
+            np.abs(landmark_mds(dis, n_landmarks=150)), expected)
+        # landmarks suffice to place points in the space they span
+        data = self.iris.X[:, :2]
+        embedding = landmark_mds(Euclidean(data), n_landmarks=10)
+        np.testing.assert_almost_equal(Euclidean(embedding), Euclidean(data))
+
+    def test_smacof(self):
+        dis = Euclidean(self.iris)
+        init = torgerson(dis)
+        sk_mds = MDS(n_components=2, dissimilarity="precomputed",
+                     n_init=1, max_iter=300, init_data=init)(dis)
+
+        smacof = SMACOF(dis, init=init)
+        self.assertFalse(smacof.run(5))
+        self.assertEqual(smacof.n_iter, 5)
+        while not smacof.run(5):
+            pass
+        np.testing.assert_almost_equal(smacof.embedding, sk_mds.embedding_)
+        self.assertAlmostEqual(smacof.stress, sk_mds.stress_)
+        self.assertEqual(smacof.n_iter, sk_mds.n_iter_)
+        # init is not modified
+        np.testing.assert_equal(init, torgerson(dis))
+
+        block_size = manifold.SMACOF_BLOCK_SIZE
+        try:
+            manifold.SMACOF_BLOCK_SIZE = 7
+            blocked = SMACOF(dis, init=init)
+            blocked.run(300)
+        finally:
+            manifold.SMACOF_BLOCK_SIZE = block_size
+        np.testing.assert_almost_equal(blocked.embedding, smacof.embedding)
+
+        single = SMACOF(dis, init=init, dtype=np.float32)
+        single.run(300)
+        self.assertEqual(single.embedding.dtype, np.float32)
+        np.testing.assert_almost_equal(single.embedding, smacof.embedding,
+                                       decimal=3)
+
+        self.assertEqual(SMACOF(dis, n_components=3).embedding.shape,
+                         (150, 3))
+        self.assertRaises(ValueError, SMACOF, dis, init=init[:5])
+
 
 class TestTSNE(unittest.TestCase):
     @classmethod
@@ -174,6 +225,66 @@ class TestTSNE(unittest.TestCase):
         embedding = model(self.iris[1::2])
         self.assertFalse(np.any(np.isnan(embedding.X)))
 
+    def test_affinity_cache(self):
+        cache = AffinityCache(max_size=1)
+        tsne = TSNE(perplexity=30, affinity_cache=cache, random_state=0)
+        X = self.iris.X
+        affinities = tsne.compute_affinities(X)
+        self.assertIs(tsne.compute_affinities(X.copy()), affinities)
+
+        # lower perplexity reuses neighbours without changing cached values
+        tsne.perplexity = 10
+        lower = tsne.compute_affinities(X)
+        self.assertEqual(lower.perplexity, 10)
+        self.assertEqual(affinities.perplexity, 30)
+        expected = TSNE(perplexity=10, random_state=0).compute_affinities(X)
+        np.testing.assert_almost_equal(lower.P.toarray(), expected.P.toarray(),
+                                       decimal=5)
+
+        # higher perplexity needs more neighbours, which are searched again
+        tsne.perplexity = 40
+        higher = tsne.compute_affinities(X)
+        self.assertIsNot(higher, affinities)
+        expected = TSNE(perplexity=40, random_state=0).compute_affinities(X)
+        np.testing.assert_almost_equal(higher.P.toarray(), expected.P.toarray())
+
+        # other data or parameters are not taken from the cache
+        self.assertIsNot(tsne.compute_affinities(X[:100]), affinities)
+        tsne.perplexity = 30
+        self.assertIsNot(tsne.compute_affinities(X), affinities)
+
+        tsne = TSNE(perplexity=(10, 20), multiscale=True,
+                    affinity_cache=cache)
+        affinities = tsne.compute_affinities(X)
+        self.assertIs(tsne.compute_affinities(X), affinities)
+        tsne.perplexity = (10, 40)
+        higher = tsne.compute_affinities(X)
+        self.assertIsNot(higher, affinities)
+        self.assertEqual(list(affinities.perplexities), [10, 20])
+
+    def test_landmarks(self):
+        manifold.TSNE_TRANSFORM_BATCH_SIZE = 40
+        try:
+            tsne = TSNE(perplexity=10, n_landmarks=70, random_state=0,
+                        early_exaggeration_iter=50, n_iter=100)
+            model = tsne(self.iris)
+        finally:
+            manifold.TSNE_TRANSFORM_BATCH_SIZE = 10000
+        self.assertEqual(model.embedding.X.shape, (150, 2))
+        self.assertEqual(model.embedding_.shape, (70, 2))
+        np.testing.assert_equal(model.embedding.X[model.landmarks],
+                                model.embedding_)
+        self.assertFalse(np.any(np.isnan(model.embedding.X)))
+        self.assertRaises(ValueError, model.optimize, 10)
+
+        knn = KNeighborsClassifier(n_neighbors=5)
+        knn.fit(model.embedding.X[model.landmarks],
+                self.iris.Y[model.landmarks])
+        others = np.setdiff1d(np.arange(150), model.landmarks)
+        self.assertGreater(
+            accuracy_score(self.iris.Y[others],
+                           knn.predict(model.embedding.X[others])), 0.8)
+
     def test_continue_optimization(self):
         tsne = TSNE(n_iter=100)
         model = tsne(self.iris)
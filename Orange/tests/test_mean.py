@@ -42,6 +42,16 @@ class TestMeanLearner(unittest.TestCase):
         y2 = clf(x2)
         self.assertTrue(np.allclose(y2, expected_mean))
 
+    def test_partial_fit(self):
+        x = np.random.randint(1, 4, (100, 3))
+        y = np.random.randint(0, 5, (100, 1)) / 3.0
+        w = np.random.rand(100, 1)
+        t = Table.from_numpy(None, x, y, W=w)
+        model = None
+        for i in range(0, 100, 30):
+            model = self.learn.partial_fit(model, t[i:i + 30])
+        self.assertAlmostEqual(model(x[0]), np.average(y, weights=w))
+
     def test_empty(self):
         autompg = Table(test_filename('datasets/imports-85.tab'))
         clf = self.learn(autompg[:0])
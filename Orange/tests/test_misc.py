@@ -1,6 +1,8 @@
+import os
+import tempfile
 import unittest
 
-from Orange.misc.cache import memoize_method, single_cache
+from Orange.misc.cache import memoize_method, single_cache, DiskCache
 
 
 class Calculator:
@@ -34,3 +36,51 @@ class TestCache(unittest.TestCase):
         # Clear cache
         calc.my_sum.cache_clear()
         self.assertEqual(calc.my_sum.cache_info().currsize, 0)
+
+
+class TestDiskCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = DiskCache(self.tmpdir.name, max_size=800)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_get_put(self):
+        cache = self.cache
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("a", 42), 42)
+        cache.put("a", [1, 2, 3])
+        self.assertIn("a", cache)
+        self.assertEqual(cache.get("a"), [1, 2, 3])
+        self.assertEqual(DiskCache(self.tmpdir.name).get("a"), [1, 2, 3])
+        cache.clear()
+        self.assertNotIn("a", cache)
+        self.assertEqual(cache.size, 0)
+
+    def test_unpicklable_and_corrupted(self):
+        cache = self.cache
+        cache.put("a", lambda x: x)
+        self.assertNotIn("a", cache)
+        self.assertEqual(os.listdir(self.tmpdir.name), [])
+
+        with open(os.path.join(self.tmpdir.name, "b.pkl"), "wb") as f:
+            f.write(b"not a pickle")
+        self.assertIsNone(cache.get("b"))
+        self.assertNotIn("b", cache)
+
+    def test_lru_eviction(self):
+        cache = self.cache
+        cache.put("a", b"a" * 300)
+        cache.put("b", b"b" * 300)
+        path_a, path_b = (os.path.join(self.tmpdir.name, f"{key}.pkl")
+                          for key in "ab")
+        os.utime(path_a, (1, 1))
+        os.utime(path_b, (2, 2))
+        # reading refreshes the entry
+        cache.get("a")
+        cache.put("c", b"c" * 300)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertLessEqual(cache.size, 800)
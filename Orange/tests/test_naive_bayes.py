@@ -2,14 +2,17 @@
 # pylint: disable=missing-docstring
 
 import unittest
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import numpy as np
 import scipy.sparse as sp
 
 from Orange.classification import NaiveBayesLearner
+from Orange.classification import naive_bayes
 from Orange.data import Table, Domain, DiscreteVariable, ContinuousVariable
 from Orange.evaluation import CrossValidation, CA
+from Orange.statistics.contingency import get_contingencies, \
+    get_contingency
 
 
 # This class is used to force predict_storage to fall back to the slower
@@ -34,6 +37,61 @@ class TestNaiveBayesLearner(unittest.TestCase):
     def setUp(self):
         self.model = self.learner(self.data)
 
+    def test_partial_fit(self):
+        data = self.data[np.random.RandomState(0).permutation(len(self.data))]
+        model = None
+        for i in range(0, len(data), 500):
+            model = self.learner.partial_fit(model, data[i:i + 500])
+        full = self.learner(data)
+        np.testing.assert_almost_equal(model.class_prob, full.class_prob)
+        np.testing.assert_equal(model.counts, full.counts)
+        np.testing.assert_almost_equal(model(data, model.Probs),
+                                       full(data, full.Probs))
+
+    def test_counts_match_contingencies(self):
+        rng = np.random.RandomState(0)
+        domain = Domain([DiscreteVariable(f"a{i}", values="abcd"[:2 + i % 3])
+                         for i in range(5)],
+                        DiscreteVariable("y", values="xyz"))
+        x = np.column_stack([rng.randint(0, 2 + i % 3, 200)
+                             for i in range(5)]).astype(float)
+        x[rng.rand(*x.shape) < 0.1] = np.nan
+        x[rng.rand(*x.shape) < 0.3] = 0
+        y = rng.randint(0, 3, 200).astype(float)
+        y[:5] = np.nan
+        w = rng.rand(200)
+        for xx in (x, sp.csr_matrix(x)):
+            data = Table.from_numpy(domain, xx, y, W=w)
+            counts = np.hstack(
+                [np.array(c) for c in get_contingencies(data)])
+            class_freq = np.diag(
+                get_contingency(data, domain.class_var)).astype(float)
+            with patch.object(naive_bayes, "_BLOCK_SIZE", 30):
+                fast_counts, fast_freq = \
+                    naive_bayes.NaiveBayesLearner._counts(data)
+            np.testing.assert_almost_equal(fast_counts, counts)
+            np.testing.assert_almost_equal(fast_freq, class_freq)
+
+    def test_compact_data(self):
+        compact = self.data.to_compact()
+        with patch.object(Table, "_expand_compact") as expand:
+            model = self.learner(compact)
+            probs = model(compact, model.Probs)
+            expand.assert_not_called()
+        np.testing.assert_almost_equal(model.counts, self.model.counts)
+        np.testing.assert_almost_equal(probs,
+                                       self.model(self.data, model.Probs))
+
+    def test_merge(self):
+        first, second = self.data[::2], self.data[1::2]
+        merged = self.learner(first).merge(self.learner(second))
+        full = self.learner(self.data)
+        np.testing.assert_equal(merged.counts, full.counts)
+        np.testing.assert_almost_equal(merged(self.data, merged.Probs),
+                                       full(self.data, full.Probs))
+        other = self.learner(Table("iris"))
+        self.assertRaises(ValueError, merged.merge, other)
+
     def test_NaiveBayes(self):
         cv = CrossValidation(k=10)
         results = cv(self.table, [self.learner])
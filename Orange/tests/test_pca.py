@@ -1,10 +1,14 @@
 # Test methods with long descriptive names can omit docstrings
 # pylint: disable=missing-docstring
+import os
 import pickle
+import tempfile
+import tracemalloc
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import numpy as np
+import scipy.sparse as sp
 from sklearn import __version__ as sklearn_version
 from sklearn.utils import check_random_state
 
@@ -155,6 +159,76 @@ class TestPCA(unittest.TestCase):
             pca.singular_values_, rpca.singular_values_, decimal=8
         )
 
+    def test_covariance_pca(self):
+        rs = np.random.RandomState(0)
+        X = rs.normal(size=(2000, 30)) @ rs.normal(size=(30, 30)) + 100
+        full = pca.ImprovedPCA(n_components=5, svd_solver="full").fit(X)
+        cov = pca.ImprovedPCA(n_components=5)
+        np.testing.assert_almost_equal(cov.fit_transform(X),
+                                       full.fit_transform(X))
+        self.assertEqual(cov._fit_svd_solver, "covariance_eigh")
+        for attr in ("components_", "mean_", "explained_variance_",
+                     "explained_variance_ratio_", "singular_values_",
+                     "noise_variance_"):
+            np.testing.assert_almost_equal(getattr(cov, attr),
+                                           getattr(full, attr))
+        self.assertEqual(cov.all_explained_variance_.shape, (30, ))
+        self.assertAlmostEqual(cov.all_explained_variance_.sum(),
+                               X.var(axis=0, ddof=1).sum())
+
+        # data is processed in chunks, which are not copied or converted
+        X32 = X.astype(np.float32)
+        X32.flags.writeable = False
+        with patch.object(pca, "CHUNK_SIZE", 300):
+            cov32 = pca.ImprovedPCA(n_components=5).fit(X32)
+            transformed = cov32.transform(X32)
+        self.assertEqual(cov32.components_.dtype, np.float32)
+        self.assertEqual(transformed.dtype, np.float32)
+        np.testing.assert_almost_equal(
+            transformed / 100, full.transform(X) / 100, decimal=4)
+
+        # small or wide data, sparse data and fractions of variance are
+        # decomposed with other solvers
+        for X, n_components in ((X[:200], 5), (X[:, :1000].T, 5),
+                                (sp.csr_matrix(X), 5), (X, 0.9)):
+            model = pca.ImprovedPCA(n_components=n_components).fit(X)
+            self.assertNotEqual(model._fit_svd_solver, "covariance_eigh")
+        self.assertRaises(
+            ValueError,
+            pca.ImprovedPCA(svd_solver="covariance_eigh").fit,
+            sp.csr_matrix(X))
+
+    def test_covariance_pca_wide_memmap(self):
+        # the covariance matrix of 1100 features is ten times smaller than
+        # the data, which therefore is not copied by other solvers
+        n_samples, n_features = 11000, 1100
+        with tempfile.TemporaryDirectory() as tmpdir:
+            X = np.memmap(os.path.join(tmpdir, "X.dat"), dtype=np.float32,
+                          mode="w+", shape=(n_samples, n_features))
+            rs = np.random.RandomState(0)
+            for start in range(0, n_samples, 1000):
+                X[start:start + 1000] = rs.normal(size=(1000, n_features))
+            X[:, 0] *= 10
+            X.flush()
+            X = np.memmap(os.path.join(tmpdir, "X.dat"), dtype=np.float32,
+                          mode="r", shape=(n_samples, n_features))
+
+            model = pca.ImprovedPCA(n_components=2)
+            tracemalloc.start()
+            try:
+                with patch.object(pca, "CHUNK_SIZE", 2 ** 16):
+                    model.fit(X)
+                    transformed = model.transform(X)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+            nbytes = X.nbytes
+            del X
+        self.assertEqual(model._fit_svd_solver, "covariance_eigh")
+        self.assertEqual(transformed.shape, (n_samples, 2))
+        self.assertAlmostEqual(abs(model.components_[0, 0]), 1, places=2)
+        self.assertLess(peak, nbytes)
+
     @unittest.skipIf(sklearn_version.startswith('0.20'),
                      "https://github.com/scikit-learn/scikit-learn/issues/12234")
     def test_incremental_pca(self):
@@ -10,7 +10,8 @@ from Orange.classification.rules import (_RuleLearner, _RuleClassifier,
                                          RuleHunter, Rule, EntropyEvaluator,
                                          LaplaceAccuracyEvaluator,
                                          WeightedRelativeAccuracyEvaluator,
-                                         argmaxrnd, hash_dist)
+                                         argmaxrnd, hash_dist, get_dist,
+                                         popcount, BitsetIndex, Selector)
 from Orange.data import Table
 from Orange.data.filter import HasClass
 from Orange.preprocess import Impute
@@ -205,5 +206,62 @@ class TestRuleInduction(unittest.TestCase):
         self.assertEqual(argmaxrnd(temp, hash_dist(np.array([3, 4]))), 5)
         self.assertRaises(ValueError, argmaxrnd, np.ones((1, 1, 1)))
 
+    def test_popcount(self):
+        covered = np.random.RandomState(0).rand(3, 100) > 0.3
+        index = BitsetIndex(covered[:, :1])
+        bits = np.vstack([index.pack(row) for row in covered])
+        np.testing.assert_equal(popcount(bits), covered.sum(axis=1))
+
+    def test_bitset_index(self):
+        X, Y = self.iris.X, self.iris.Y.astype(int)
+        W = np.random.RandomState(0).rand(len(Y))
+        index = BitsetIndex(X, Y, 3)
+        selectors = [Selector(column=0, op="<=", value=5.5),
+                     Selector(column=2, op=">=", value=2)]
+        covered = np.ones(len(X), dtype=bool)
+        for selector in selectors:
+            covered &= selector.filter_data(X)
+        bits = index.rule(selectors)
+        np.testing.assert_equal(index.unpack(bits), covered)
+        self.assertIs(index.selector(selectors[0]),
+                      index.selector(selectors[0]))
+        np.testing.assert_equal(index.class_dist(bits),
+                                get_dist(Y[covered], None, self.iris.domain))
+        np.testing.assert_almost_equal(
+            index.class_dist(bits, W),
+            get_dist(Y[covered], W[covered], self.iris.domain))
+        np.testing.assert_equal(index.unpack(index.rule([])),
+                                np.ones(len(X), dtype=bool))
+
+    def test_rule_coverage_bits(self):
+        X, Y = self.iris.X, self.iris.Y.astype(int)
+        index = BitsetIndex(X, Y, 3)
+        selectors = [Selector(column=3, op=">=", value=1)]
+        rule = Rule(selectors=selectors, domain=self.iris.domain)
+        rule.filter_and_store(X, Y, None, None, index=index)
+        other = Rule(selectors=selectors, domain=self.iris.domain)
+        other.filter_and_store(X, Y, None, None)
+        np.testing.assert_equal(rule.covered_examples, other.covered_examples)
+        np.testing.assert_equal(rule.curr_class_dist, other.curr_class_dist)
+        self.assertEqual(rule, other)
+        self.assertEqual(rule.n_examples, len(X))
+
+    def test_predict_coverage(self):
+        for learner in (CN2Learner(), CN2UnorderedLearner()):
+            classifier = learner(self.iris)
+            X = self.iris.X
+            covered = classifier.coverage(X)
+            for rule, rule_covered in zip(classifier.rule_list, covered):
+                np.testing.assert_equal(rule_covered, rule.evaluate_data(X))
+
+            # predictions do not depend on the number of rows at once
+            expected = classifier.predict(X)
+            classifier.MAX_COVERAGE_SIZE = 1
+            np.testing.assert_almost_equal(classifier.predict(X), expected)
+            np.testing.assert_almost_equal(
+                classifier.predict(X[:0]),
+                np.zeros((0, 3)))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -34,6 +34,15 @@ class TestSGDRegressionLearner(unittest.TestCase):
         mod = lrn(Table("housing"))
         self.assertEqual(len(mod.coefficients), len(mod.domain.attributes))
 
+    def test_partial_fit(self):
+        data = Table("housing")
+        data = data[np.random.RandomState(0).permutation(len(data))]
+        lrn = SGDRegressionLearner(random_state=0)
+        model = None
+        for i in range(0, len(data), 100):
+            model = lrn.partial_fit(model, data[i:i + 100])
+        self.assertLess(np.mean(np.abs(model(data) - data.Y)), 5)
+
 
 class TestSGDClassificationLearner(unittest.TestCase):
     @classmethod
@@ -56,6 +65,19 @@ class TestSGDClassificationLearner(unittest.TestCase):
         mod = lrn(self.iris)
         self.assertEqual(len(mod.coefficients[0]), len(mod.domain.attributes))
 
+    def test_partial_fit(self):
+        data = self.iris[np.random.RandomState(0).permutation(150)]
+        lrn = SGDClassificationLearner(random_state=0)
+        model = lrn.partial_fit(None, data[:50])
+        coef = model.coefficients.copy()
+        self.assertIs(lrn.partial_fit(model, data[50:]), model)
+        self.assertFalse(np.array_equal(coef, model.coefficients))
+        self.assertGreater(np.mean(model(data) == data.Y), 0.7)
+
+        # classes not seen in the first chunk are refused
+        model = lrn.partial_fit(None, self.iris[:100])
+        self.assertRaises(ValueError, lrn.partial_fit, model, self.iris[100:])
+
     def test_predictions_shapes(self):
         """
         Test the resulting shapes of probabilities for SGD
@@ -0,0 +1,107 @@
+# Test methods with long descriptive names can omit docstrings
+# pylint: disable=missing-docstring, protected-access
+
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import scipy.sparse as sp
+
+from Orange.data import Table
+from Orange.projection import _som, som as som_module
+from Orange.projection.som import SOM
+
+
+class TestSOM(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.x = Table("iris").X
+
+    def test_quantization(self):
+        som = SOM(4, 3, random_seed=0)
+        som.init_weights_random(self.x)
+        for hexagonal in (0, 1):
+            dists = ((self.x[:, None, None] - som.weights) ** 2).sum(axis=3)
+            if hexagonal:
+                dists[:, 1::2, -1] = np.inf
+            winners, sq_dists = _som.quantization(som.weights, self.x,
+                                                  hexagonal)
+            flat = dists.reshape(len(self.x), -1)
+            np.testing.assert_almost_equal(sq_dists, flat.min(axis=1))
+            np.testing.assert_equal(
+                winners[:, 1] * 4 + winners[:, 0], flat.argmin(axis=1))
+
+            swinners, ssq_dists = _som.quantization_sparse(
+                som.weights, np.sum(som.weights ** 2, axis=2),
+                sp.csr_matrix(self.x), hexagonal)
+            np.testing.assert_equal(swinners, winners)
+            np.testing.assert_almost_equal(ssq_dists, sq_dists)
+
+    def test_quantization_blocks(self):
+        som = SOM(4, 3, hexagonal=True, random_seed=0)
+        som.init_weights_random(self.x)
+        som.ssum_weights = np.sum(som.weights ** 2, axis=2)
+        for x in (self.x, sp.csr_matrix(self.x)):
+            winners, dists = som._quantization(x)
+            with patch.object(som_module, "QUANTIZATION_BLOCK_ROWS", 40), \
+                    patch.object(som_module, "QUANTIZATION_THREADS", 3):
+                bwinners, bdists = som._quantization(x)
+                np.testing.assert_equal(som.winners(x), winners)
+            np.testing.assert_equal(bwinners, winners)
+            np.testing.assert_equal(bdists, dists)
+
+    def test_float32(self):
+        som = SOM(4, 3, random_seed=0)
+        som.init_weights_random(self.x)
+        x32 = self.x.astype(np.float32)
+        winners, sq_dists = _som.quantization(som.weights, self.x, 1)
+        winners32, sq_dists32 = _som.quantization(som.weights, x32, 1)
+        np.testing.assert_equal(winners32, winners)
+        np.testing.assert_allclose(sq_dists32, sq_dists, rtol=1e-5)
+
+        som.fit(x32, 5)
+        self.assertEqual(som.weights.dtype, np.float64)
+
+    def test_fit_batch(self):
+        for hexagonal in (False, True):
+            som = SOM(5, 4, hexagonal=hexagonal)
+            som.fit_batch(self.x, 50)
+            self.assertLessEqual(som.n_iter, 50)
+            self.assertLess(som.quantization_error, 0.5)
+            winners = som.winners(self.x)
+            self.assertEqual(winners.shape, (150, 2))
+            # units are averages of their members with a narrow neighbourhood
+            unit = winners[0]
+            members = np.all(winners == unit, axis=1)
+            self.assertGreater(np.sum(members), 1)
+            np.testing.assert_array_less(
+                np.abs(som.weights[unit[1], unit[0]]
+                       - self.x[members].mean(axis=0)), 0.3)
+
+    def test_fit_batch_sparse(self):
+        som = SOM(5, 4, random_seed=0)
+        som.fit_batch(sp.csr_matrix(self.x), 20)
+        dense = SOM(5, 4, pca_init=False, random_seed=0)
+        dense.fit_batch(self.x, 20)
+        np.testing.assert_almost_equal(som.weights, dense.weights)
+        np.testing.assert_almost_equal(
+            som.ssum_weights, np.sum(som.weights ** 2, axis=2))
+        self.assertAlmostEqual(som.quantization_error,
+                               dense.quantization_error)
+
+    def test_fit_batch_early_stopping(self):
+        som = SOM(3, 3)
+        som.fit_batch(self.x, 200, tol=0.1)
+        self.assertLess(som.n_iter, 200)
+        # shrinking of the neighbourhood is never stopped early
+        self.assertGreaterEqual(som.n_iter, 100)
+
+        progress = []
+        som.fit_batch(self.x, 10, callback=lambda p: progress.append(p) or
+                      len(progress) < 3)
+        self.assertEqual(som.n_iter, 3)
+        self.assertEqual(progress, [0, 0.1, 0.2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,14 @@
+import tempfile
 import unittest
+from unittest.mock import patch
 
+import numpy as np
+
+from Orange.classification import NaiveBayesLearner
 from Orange.data import Table
-from Orange.ensembles.stack import StackedFitter
+from Orange.ensembles.stack import StackedFitter, StackedClassificationLearner
 from Orange.evaluation import CA, CrossValidation, MSE
+from Orange.misc.cache import DiskCache
 from Orange.modelling import KNNLearner, TreeLearner
 
 
@@ -26,3 +32,24 @@ class TestStackedFitter(unittest.TestCase):
         mse = MSE()(results)
         self.assertLess(mse[0], mse[1])
         self.assertLess(mse[0], mse[2])
+
+    def test_n_jobs(self):
+        learners = [TreeLearner(), KNNLearner()]
+        cv = CrossValidation(k=3)
+        results = cv(self.iris, [StackedFitter(learners)])
+        parallel = cv(self.iris, [StackedFitter(learners, n_jobs=2)])
+        np.testing.assert_almost_equal(parallel.probabilities,
+                                       results.probabilities)
+
+    def test_model_cache(self):
+        nb = NaiveBayesLearner()
+        stack = StackedClassificationLearner([nb], k=3)
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch.object(NaiveBayesLearner, "fit_storage", autospec=True,
+                             side_effect=NaiveBayesLearner.fit_storage) \
+                as fit:
+            CrossValidation(k=4)(self.iris, [nb, stack],
+                                 model_cache=DiskCache(tmp))
+        # base models on the outer training data are fitted only once;
+        # 4 outer folds for naive Bayes and 4 * 3 inner folds for stacking
+        self.assertEqual(fit.call_count, 4 + 4 * 3)
@@ -383,6 +383,104 @@ class TableTestCase(unittest.TestCase):
         self.assertNotEqual(crc1, crc5)
         self.assertEqual(crc1, crc6)
 
+    def test_fingerprint(self):
+        d = data.Table("zoo")
+        fp = d.fingerprint()
+        self.assertEqual(fp, d.fingerprint())
+        self.assertEqual(fp, d.copy().fingerprint())
+        self.assertEqual(fp, pickle.loads(pickle.dumps(d)).fingerprint())
+        self.assertNotEqual(fp, d[:10].fingerprint())
+        self.assertNotEqual(fp, d.fingerprint(include_metas=False))
+
+        with d.unlocked(d.metas):
+            d[0, "name"] = "non-animal"
+        fp2 = d.fingerprint()
+        self.assertNotEqual(fp, fp2)
+        self.assertEqual(d.fingerprint(False),
+                         data.Table("zoo").fingerprint(False))
+
+        with d.unlocked(d.X):
+            d.X[0, 0] = 1 - d.X[0, 0]
+        self.assertNotEqual(fp2, d.fingerprint())
+        with d.unlocked(d.X):
+            d.X[0, 0] = 1 - d.X[0, 0]
+        self.assertEqual(fp2, d.fingerprint())
+
+        with d.unlocked_reference():
+            d.Y = d.Y[::-1].copy()
+        self.assertNotEqual(fp2, d.fingerprint())
+
+    def test_fingerprint_without_locking(self):
+        with patch.object(data.Table, "LOCKING", None):
+            d = data.Table("iris")
+            d.X[0, 0] = 50
+            fp, crc = d.fingerprint(), d.checksum()
+            # digests are cached ...
+            with patch("Orange.data.table._part_digest") as part_digest:
+                self.assertEqual(d.fingerprint(), fp)
+                part_digest.assert_not_called()
+            # ... because hashed arrays cannot be changed without unlocking
+            with self.assertRaises(ValueError):
+                d.X[0, 0] = 100
+            with d.unlocked(d.X):
+                d.X[0, 0] = 100
+            self.assertNotEqual(fp, d.fingerprint())
+            self.assertNotEqual(crc, d.checksum())
+            with self.assertRaises(ValueError):
+                d.X[0, 0] = 50
+
+            # arrays shared with other tables are also protected
+            shared = d[:5]
+            fp = shared.fingerprint()
+            with self.assertRaises(ValueError):
+                d.X[0, 0] = 50
+            with d.unlocked(d.X):
+                d.X[0, 0] = 50
+            self.assertNotEqual(fp, shared.fingerprint())
+
+    def test_fingerprint_sparse_and_blocks(self):
+        x = np.arange(20.).reshape(4, 5).copy()
+        x[x % 3 == 0] = 0
+        dense = data.Table.from_numpy(None, x)
+        csr = data.Table.from_numpy(None, sp.csr_matrix(x))
+        csc = data.Table.from_numpy(None, sp.csc_matrix(x))
+        self.assertNotEqual(dense.fingerprint(), csr.fingerprint())
+        self.assertEqual(csr.fingerprint(), csc.fingerprint())
+
+        fp = dense.fingerprint()
+        with patch("Orange.data.table._HASH_BLOCK_SIZE", 16):
+            dense2 = data.Table.from_numpy(None, x.copy())
+            fp_blocks = dense2.fingerprint()
+            self.assertEqual(fp_blocks, dense2.fingerprint())
+            with dense2.unlocked(dense2.X):
+                dense2.X[3, 4] += 1
+            self.assertNotEqual(fp_blocks, dense2.fingerprint())
+        self.assertNotEqual(fp, fp_blocks)
+
+    def test_version(self):
+        d = data.Table("zoo")
+        version = d.version
+        fp = d.fingerprint()
+        self.assertEqual(d.version, version)
+        with d.unlocked():
+            d.X[0, 0] = 1 - d.X[0, 0]
+        self.assertGreater(d.version, version)
+        version = d.version
+
+        with d.unlocked_reference():
+            d.W = np.ones(len(d))
+        self.assertGreater(d.version, version)
+
+        # changes through a table that shares the arrays
+        d = data.Table("zoo")
+        shared = d[:5]
+        self.assertTrue(np.shares_memory(shared.X, d.X))
+        version, fp = shared.version, shared.fingerprint()
+        with d.unlocked(d.X):
+            d.X[0, 0] = 1 - d.X[0, 0]
+        self.assertGreater(shared.version, version)
+        self.assertNotEqual(shared.fingerprint(), fp)
+
     def test_total_weight(self):
         d = data.Table("zoo")
         self.assertEqual(d.total_weight(), len(d))
@@ -1160,6 +1258,46 @@ class TableTestCase(unittest.TestCase):
                                           table_metas)
         self.assertEqual(new_table.metas.dtype, np.float64)
 
+    def test_float32_tables(self):
+        iris = data.Table("iris")
+        table = data.Table.from_numpy(iris.domain, iris.X, iris.Y,
+                                      dtype=np.float32)
+        self.assertEqual(table.X.dtype, np.float32)
+        self.assertEqual(table.Y.dtype, np.float32)
+        self.assertEqual(table.W.dtype, np.float64)
+        np.testing.assert_almost_equal(table.X, iris.X, decimal=6)
+
+        # conversions keep the precision of X and Y, but not of metas
+        domain = data.Domain(iris.domain.attributes[:2],
+                             iris.domain.class_var,
+                             iris.domain.attributes[2:])
+        new_table = table.transform(domain)
+        self.assertEqual(new_table.X.dtype, np.float32)
+        self.assertEqual(new_table.Y.dtype, np.float32)
+        self.assertEqual(new_table.metas.dtype, np.float64)
+        self.assertEqual(table[::2].X.dtype, np.float32)
+        self.assertEqual(iris.transform(domain).X.dtype, np.float64)
+
+        # concatenation keeps float32 unless some parts are float64
+        for axis, other in ((0, table), (1, new_table.transform(
+                data.Domain([data.ContinuousVariable("a")])))):
+            conc = data.Table.concatenate([table, other], axis=axis)
+            self.assertEqual(conc.X.dtype, np.float32)
+            self.assertEqual(conc.Y.dtype, np.float32)
+        conc = data.Table.concatenate([table, table[:0], table])
+        self.assertEqual(conc.X.dtype, np.float32)
+        np.testing.assert_equal(conc.X[150:], table.X)
+        conc = data.Table.concatenate([table, iris])
+        self.assertEqual(conc.X.dtype, np.float64)
+
+        sparse = data.Table.from_numpy(iris.domain, sp.csr_matrix(iris.X),
+                                       iris.Y, dtype=np.float32)
+        self.assertTrue(sp.issparse(sparse.X))
+        self.assertEqual(sparse.X.dtype, np.float32)
+
+        self.assertRaises(ValueError, data.Table.from_numpy,
+                          iris.domain, iris.X, iris.Y, dtype=np.int32)
+
     def test_attributes(self):
         table = data.Table("iris")
         table.attributes = {1: "test"}
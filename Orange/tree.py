@@ -192,6 +192,9 @@ class TreeModel(TreeModelInterface):
 
     def get_values(self, X):
         from Orange.classification import _tree_scorers
+        if sp.issparse(X) and X.dtype != np.float64:
+            # only dense data can be in float32
+            X = X.astype(np.float64)
         if sp.isspmatrix_csc(X):
             func = _tree_scorers.compute_predictions_csc
         elif sp.issparse(X):
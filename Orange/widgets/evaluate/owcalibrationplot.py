@@ -354,7 +354,8 @@ class OWCalibrationPlot(widget.OWWidget):
         no_valid_models = []
         shadow_width = 4 + 4 * plot_folds
         for clsf in self.selected_classifiers:
-            data = Curves.from_results(results, target, clsf)
+            index = results.score_index(clsf, target)
+            data = Curves.from_score_index(index)
             if data.tot == 0:  # all probabilities are nan
                 no_valid_models.append(clsf)
                 continue
@@ -376,9 +377,8 @@ class OWCalibrationPlot(widget.OWWidget):
                 pen_args = dict(
                     pen=pg.mkPen(color, width=1, style=Qt.DashLine),
                     antiAlias=True)
-                for fold in range(len(results.folds)):
-                    fold_results = results.get_fold(fold)
-                    fold_curve = Curves.from_results(fold_results, target, clsf)
+                for fold in results.folds:
+                    fold_curve = Curves.from_score_index(index.subset(fold))
                     # Can't check this before: p and n can be 0 because of
                     # nan probabilities
                     if fold_curve.p * fold_curve.n == 0:
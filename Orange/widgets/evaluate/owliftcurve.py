@@ -2,8 +2,6 @@ from enum import IntEnum
 from typing import NamedTuple, Dict, Tuple, List
 
 import numpy as np
-from sklearn.metrics import precision_recall_curve
-from sklearn.preprocessing import label_binarize
 
 from AnyQt.QtWidgets import QListView, QFrame
 from AnyQt.QtGui import QColor, QPen, QFont
@@ -17,6 +15,7 @@ from orangewidget.widget import Msg
 import Orange
 from Orange.base import Model
 from Orange.classification import ThresholdClassifier
+from Orange.evaluation.performance_curves import ScoreIndex
 from Orange.widgets import widget, gui, settings
 from Orange.widgets.evaluate.contexthandlers import \
     EvaluationResultsContextHandler
@@ -543,13 +542,8 @@ def points_from_results(results, target, clf_index, curve_type):
 
 
 def precision_recall_from_results(results, target, clf_idx):
-    y_true = results.actual
-    classes = np.unique(results.actual)
-    if len(classes) > 2:
-        y_true = label_binarize(y_true, classes=sorted(classes))
-        y_true = y_true[:, target]
-    scores = results.probabilities[clf_idx][:, target]
-    precision, recall, thresholds = precision_recall_curve(y_true, scores)
+    index = ScoreIndex.from_results(results, clf_idx, target)
+    precision, recall, thresholds = index.precision_recall_curve()
 
     # scikit's precision_recall_curve adds a (0, 1) point,
     # so we add a corresponding threshold = 1.
@@ -564,32 +558,14 @@ def precision_recall_from_results(results, target, clf_idx):
 
 
 def cumulative_gains_from_results(results, target, clf_idx):
-    y_true = results.actual
-    scores = results.probabilities[clf_idx][:, target]
-    yrate, tpr, thresholds = cumulative_gains(y_true, scores, target)
-    return yrate, tpr, thresholds
+    index = ScoreIndex.from_results(results, clf_idx, target)
+    return index.cumulative_gains()
 
 
 def cumulative_gains(y_true, y_score, target=1):
     if len(y_true) != len(y_score):
         raise ValueError("array dimensions don't match")
-
-    if not y_true.size:
-        return np.array([], dtype=int), np.array([], dtype=int), np.array([])
-
-    y_true = (y_true == target)
-
-    desc_score_indices = np.argsort(y_score, kind="mergesort")[::-1]
-    y_score = y_score[desc_score_indices]
-    y_true = y_true[desc_score_indices]
-
-    distinct_value_indices = np.where(np.diff(y_score))[0]
-    threshold_idxs = np.r_[distinct_value_indices, y_true.size - 1]
-
-    respondents = np.cumsum(y_true)[threshold_idxs]
-    respondents = respondents / respondents[-1]
-    contacted = (1 + threshold_idxs) / (1 + threshold_idxs[-1])
-    return contacted, respondents, y_score[threshold_idxs]
+    return ScoreIndex(y_true, y_score, target).cumulative_gains()
 
 
 def compute_area(x: np.ndarray, y: np.ndarray) -> float:
@@ -3,7 +3,7 @@ from functools import reduce, wraps
 from collections import namedtuple, deque, OrderedDict
 
 import numpy as np
-import sklearn.metrics as skl_metrics
+from scipy.spatial import ConvexHull, QhullError
 
 from AnyQt.QtWidgets import QListView, QLabel, QGridLayout, QFrame, QAction, \
     QToolTip
@@ -25,6 +25,7 @@ from Orange.widgets import report
 
 from Orange.widgets.evaluate.utils import results_for_preview
 from Orange.evaluation.testing import Results
+from Orange.evaluation.performance_curves import ScoreIndex
 
 
 #: Points on a ROC curve
@@ -817,27 +818,17 @@ def interp(x, xp, fp, left=None, right=None):
 
 
 def roc_curve_for_fold(res, fold, clf_idx, target):
-    fold_actual = res.actual[fold]
-    P = np.sum(fold_actual == target)
-    N = fold_actual.size - P
+    # the index is sorted once per classifier and target, for all folds
+    index = ScoreIndex.from_results(res, clf_idx, target).subset(fold)
+    P = np.count_nonzero(index.positive)
+    N = index.positive.size - P
 
     if P == 0 or N == 0:
         # Undefined TP and FP rate
         return np.array([]), np.array([]), np.array([])
 
-    fold_probs = res.probabilities[clf_idx][fold][:, target]
-    drop_intermediate = len(fold_actual) > 20
-    fpr, tpr, thresholds = skl_metrics.roc_curve(
-        fold_actual, fold_probs, pos_label=target,
-        drop_intermediate=drop_intermediate
-    )
-
-    # skl sets the first threshold to the highest threshold in the data + 1
-    # since we deal with probabilities, we (carefully) set it to 1
-    # Unrelated comparisons, thus pylint: disable=chained-comparison
-    if len(thresholds) > 1 and thresholds[1] <= 1:
-        thresholds[0] = 1
-    return fpr, tpr, thresholds
+    drop_intermediate = index.positive.size > 20
+    return index.roc_curve(drop_intermediate=drop_intermediate)
 
 
 def roc_curve_vertical_average(curves, samples=10):
@@ -898,32 +889,48 @@ def roc_curve_convex_hull(curve):
         else:
             return np.inf
 
-    fpr, _, _ = curve
-
-    if len(fpr) <= 2:
-        return curve
-    points = map(RocPoint._make, zip(*curve))
+    def upper_hull(curve):
+        points = map(RocPoint._make, zip(*curve))
 
-    hull = deque([next(points)])
+        hull = deque([next(points)])
 
-    for point in points:
-        while True:
-            if len(hull) < 2:
-                hull.append(point)
-                break
-            else:
-                last = hull[-1]
-                if point.fpr != last.fpr and \
-                        slope(hull[-2], last) > slope(last, point):
+        for point in points:
+            while True:
+                if len(hull) < 2:
                     hull.append(point)
                     break
                 else:
-                    hull.pop()
+                    last = hull[-1]
+                    if point.fpr != last.fpr and \
+                            slope(hull[-2], last) > slope(last, point):
+                        hull.append(point)
+                        break
+                    else:
+                        hull.pop()
 
-    fpr = np.array([p.fpr for p in hull])
-    tpr = np.array([p.tpr for p in hull])
-    thres = np.array([p.threshold for p in hull])
-    return (fpr, tpr, thres)
+        fpr = np.array([p.fpr for p in hull])
+        tpr = np.array([p.tpr for p in hull])
+        thres = np.array([p.threshold for p in hull])
+        return (fpr, tpr, thres)
+
+    fpr, tpr, _ = curve
+
+    if len(fpr) <= 2:
+        return curve
+    if len(fpr) > 100:
+        # The hull of qhull's vertices lies within the true hull (up to
+        # qhull's precision); points below it cannot be on the ROC hull
+        try:
+            vertices = ConvexHull(np.column_stack((fpr, tpr))).vertices
+        except QhullError:  # degenerate curve
+            pass
+        else:
+            vertices = np.union1d(vertices, [0, len(fpr) - 1])
+            inner = upper_hull(tuple(np.asarray(a)[vertices] for a in curve))
+            keep = tpr >= np.interp(fpr, inner[0], inner[1]) - 1e-9
+            keep[0] = keep[-1] = True
+            curve = tuple(np.asarray(a)[keep] for a in curve)
+    return upper_hull(curve)
 
 
 def convex_hull(curves):
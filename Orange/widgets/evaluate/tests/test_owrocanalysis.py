@@ -74,6 +74,23 @@ class TestROC(unittest.TestCase):
                 self.assertFalse(rocdata.avg_vertical.is_valid)
                 self.assertFalse(rocdata.avg_threshold.is_valid)
 
+    def test_convex_hull(self):
+        rgen = np.random.RandomState(0)
+        actual = rgen.randint(0, 2, 5000).astype(float)
+        probs = np.clip(actual * 0.2 + rgen.random(5000), 0, 1)
+        res = Results(domain=Orange.data.Table("heart_disease").domain,
+                      actual=actual,
+                      probabilities=np.vstack((1 - probs, probs)).T[None])
+        curve = owrocanalysis.roc_curve_for_fold(res, ..., 0, 1)
+        self.assertGreater(len(curve[0]), 100)
+        hull = owrocanalysis.roc_curve_convex_hull(curve)
+        # without prefiltering by qhull
+        with patch.object(owrocanalysis, "ConvexHull",
+                          side_effect=owrocanalysis.QhullError):
+            plain = owrocanalysis.roc_curve_convex_hull(curve)
+        for hull_part, plain_part in zip(hull, plain):
+            np.testing.assert_equal(hull_part, plain_part)
+
 
 class TestOWROCAnalysis(WidgetTest, EvaluateTest):
     @classmethod
@@ -26,8 +26,8 @@ from Orange.data import Domain, DiscreteVariable, ContinuousVariable, \
     StringVariable
 import Orange.misc
 from Orange.clustering.hierarchical import \
-    postorder, preorder, Tree, tree_from_linkage, dist_matrix_linkage, \
-    leaves, prune, top_clusters
+    postorder, preorder, Tree, LinkageTree, dist_matrix_linkage, leaves, \
+    prune, top_clusters
 from Orange.data.util import get_unique_names
 
 from Orange.widgets import widget, gui, settings
@@ -248,6 +248,7 @@ class OWHierarchicalClustering(widget.OWWidget):
         self.subset = None
         self.subset_rows = set()
         self.linkmatrix = None
+        self.linkage_tree = None
         self.root = None
         self._displayed_root = None
         self.cutoff_height = 0.0
@@ -507,7 +508,7 @@ class OWHierarchicalClustering(widget.OWWidget):
             elif not subsetids <= dataids:
                 self.Warning.subset_not_subset()
             else:
-                indices = [leaf.value.index for leaf in leaves(self.root)]
+                indices = self.linkage_tree.order.tolist()
                 rows = {
                     row for row, rowid in enumerate(self.items.ids[indices])
                     if rowid in subsetids
@@ -592,19 +593,22 @@ class OWHierarchicalClustering(widget.OWWidget):
             method = LINKAGE_ARGS[self.linkage]
             Z = dist_matrix_linkage(distances, linkage=method)
 
-            tree = tree_from_linkage(Z)
             self.linkmatrix = Z
+            self.linkage_tree = LinkageTree(Z)
+            tree = self.linkage_tree.to_tree()
             self.root = tree
 
             self.top_axis.setRange(tree.value.height, 0.0)
             self.bottom_axis.setRange(tree.value.height, 0.0)
 
             if self.pruning:
-                self._set_displayed_root(prune(tree, level=self.max_depth))
+                self._set_displayed_root(
+                    prune(self.linkage_tree, level=self.max_depth))
             else:
                 self._set_displayed_root(tree)
         else:
             self.linkmatrix = None
+            self.linkage_tree = None
             self.root = None
             self._set_displayed_root(None)
 
@@ -624,7 +628,7 @@ class OWHierarchicalClustering(widget.OWWidget):
                   and (self.subset_rows or self.color_by is not None))
         labels = []
         if self.root and self._displayed_root:
-            indices = [leaf.value.index for leaf in leaves(self.root)]
+            indices = self.linkage_tree.order.tolist()
 
             if self.annotation is None:
                 if not self.pruning \
@@ -689,8 +693,7 @@ class OWHierarchicalClustering(widget.OWWidget):
                     not np.all(np.isclose(linkstruct[:, 2], linkstruct[:, 2])):
                 return False
             selection = []
-            indices = np.array([n.value.index for n in leaves(self.root)],
-                               dtype=int)
+            indices = self.linkage_tree.order
             # mapping from ranges to display (pruned) nodes
             mapping = {node.value.range: node
                        for node in postorder(self._displayed_root)}
@@ -749,7 +752,7 @@ class OWHierarchicalClustering(widget.OWWidget):
             ranges = [node.value.range for node in selection]
             if self.pruning:
                 self._set_displayed_root(
-                    prune(self.root, level=self.max_depth))
+                    prune(self.linkage_tree, level=self.max_depth))
             else:
                 self._set_displayed_root(self.root)
             selected = [node for node in preorder(self._displayed_root)
@@ -770,7 +773,7 @@ class OWHierarchicalClustering(widget.OWWidget):
         selection = self.dendrogram.selected_nodes()
         selection = sorted(selection, key=lambda c: c.value.first)
 
-        indices = [leaf.value.index for leaf in leaves(self.root)]
+        indices = self.linkage_tree.order.tolist()
 
         maps = [indices[node.value.first:node.value.last]
                 for node in selection]
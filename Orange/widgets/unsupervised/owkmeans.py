@@ -8,10 +8,9 @@ from AnyQt.QtCore import Qt, QTimer, QAbstractTableModel, QModelIndex, QThread,
     pyqtSlot as Slot
 from AnyQt.QtGui import QIntValidator
 from AnyQt.QtWidgets import QGridLayout, QTableView
-from sklearn.metrics import silhouette_samples, silhouette_score
 
 from Orange.clustering import KMeans
-from Orange.clustering.kmeans import KMeansModel
+from Orange.clustering.kmeans import KMeansModel, KMeansSweep
 from Orange.data import Table, Domain, DiscreteVariable, ContinuousVariable
 from Orange.data.util import get_unique_names, array_equal
 from Orange.preprocess import Normalize
@@ -283,27 +282,18 @@ class OWKMeans(widget.OWWidget):
         return len(self.data.domain.attributes)
 
     @staticmethod
-    def _compute_clustering(data, k, init, n_init, max_iter, random_state):
-        # type: (Table, int, str, int, int, bool) -> KMeansModel
-        if k > len(data):
+    def _compute_clustering(sweep, k, previous=None):
+        # type: (KMeansSweep, int, Optional[Future]) -> KMeansModel
+        if k > len(sweep.data):
             raise NotEnoughData()
 
-        model = KMeans(
-            n_clusters=k, init=init, n_init=n_init, max_iter=max_iter,
-            random_state=random_state, preprocessors=[]
-        ).get_model(data)
-
-        if data.X.shape[0] <= SILHOUETTE_MAX_SAMPLES:
-            model.silhouette_samples = silhouette_samples(data.X, model.labels)
-            model.silhouette = np.mean(model.silhouette_samples)
-        else:
-            model.silhouette_samples = None
-            model.silhouette = \
-                silhouette_score(data.X, model.labels,
-                                 sample_size=SILHOUETTE_MAX_SAMPLES,
-                                 random_state=RANDOM_STATE)
-
-        return model
+        # With warm start, wait for the clustering with the previous k;
+        # if it failed, start from scratch
+        try:
+            previous = previous and previous.result()
+        except Exception:  # pylint: disable=broad-except
+            previous = None
+        return sweep.fit(k, previous)
 
     @Slot(int, int)
     def __progress_changed(self, n, d):
@@ -356,16 +346,21 @@ class OWKMeans(widget.OWWidget):
     def __launch_tasks(self, ks):
         # type: (List[int]) -> None
         """Execute clustering in separate threads for all given ks."""
-        preprocessed_data = self.preproces(self.data)
-        futures = [self.__executor.submit(
-            self._compute_clustering,
-            data=preprocessed_data,
-            k=k,
+        sweep = KMeansSweep(
+            self.preproces(self.data),
             init=self.INIT_METHODS[self.smart_init][1],
             n_init=self.n_init,
             max_iter=self.max_iterations,
             random_state=RANDOM_STATE,
-        ) for k in ks]
+            silhouette_sample_size=SILHOUETTE_MAX_SAMPLES,
+        )
+        futures = []
+        for k in ks:
+            # Warm-started clusterings depend on the previous one; since
+            # the executor starts tasks in order, waiting cannot deadlock
+            previous = futures[-1] if sweep.warm_start and futures else None
+            futures.append(self.__executor.submit(
+                self._compute_clustering, sweep=sweep, k=k, previous=previous))
         watcher = FutureSetWatcher(futures)
         watcher.resultReadyAt.connect(self.__clustering_complete)
         watcher.progressChanged.connect(self.__progress_changed)
@@ -8,14 +8,13 @@ from typing import Optional, Callable, Tuple, Any
 
 import numpy as np
 import scipy.sparse as sp
-import networkx as nx
 
 from AnyQt.QtCore import (
     Qt, QObject, QTimer, pyqtSignal as Signal, pyqtSlot as Slot
 )
 from AnyQt.QtWidgets import QSlider, QCheckBox, QWidget, QLabel
 
-from Orange.clustering.louvain import matrix_to_knn_graph, Louvain
+from Orange.clustering.louvain import knn_graph, Louvain
 from Orange.data import Table, DiscreteVariable
 from Orange.data.util import get_unique_names, array_equal
 from Orange import preprocess
@@ -84,7 +83,7 @@ class OWLouvainClustering(widget.OWWidget):
         self.data = None  # type: Optional[Table]
         self.preprocessed_data = None  # type: Optional[Table]
         self.pca_projection = None  # type: Optional[Table]
-        self.graph = None  # type: Optional[nx.Graph]
+        self.graph = None  # type: Optional[sp.csr_matrix]
         self.partition = None  # type: Optional[np.array]
         # Use a executor with a single worker, to limit CPU overcommitment for
         # cancelled tasks. The method does not have a fine cancellation
@@ -280,7 +279,7 @@ class OWLouvainClustering(widget.OWWidget):
             assert isinstance(res, Table) and len(res) == len(self.data)
             self.pca_projection = res
         elif which == "graph":
-            assert isinstance(res, nx.Graph)
+            assert isinstance(res, sp.csr_matrix)
             self.graph = res
         elif which == "partition":
             assert isinstance(res, np.ndarray)
@@ -395,10 +394,8 @@ class OWLouvainClustering(widget.OWWidget):
         self.Outputs.annotated_data.send(new_table)
 
         if Network is not None:
-            n_edges = self.graph.number_of_edges()
-            edges = sp.coo_matrix(
-                (np.ones(n_edges), np.array(self.graph.edges()).T),
-                shape=(n_edges, n_edges))
+            edges = sp.triu(self.graph, format="coo")
+            edges.data[:] = 1
             graph = Network(new_table, edges)
             self.Outputs.graph.send(graph)
 
@@ -565,7 +562,7 @@ class Results(namespace):
     normalize = None         # type: Optional[bool]
     k_neighbors = None       # type: Optional[int]
     metric = None            # type: Optional[str]
-    graph = None             # type: Optional[nx.Graph]
+    graph = None             # type: Optional[sp.csr_matrix]
     resolution = None        # type: Optional[float]
     partition = None         # type: Optional[np.ndarray]
 
@@ -588,9 +585,9 @@ def run_on_data(data, normalize, pca_components, k_neighbors, metric, resolution
         If not `None` then the data is first projected onto first
         `pca_components` principal components.
     k_neighbors : int
-        Passed to `table_to_knn_graph`
+        Passed to `knn_graph`
     metric : str
-        Passed to `table_to_knn_graph`
+        Passed to `knn_graph`
     resolution : float
         Passed to `Louvain`
     state : TaskState
@@ -639,7 +636,7 @@ def run_on_data(data, normalize, pca_components, k_neighbors, metric, resolution
             raise InteruptRequested()
 
     try:
-        res.graph = graph = matrix_to_knn_graph(
+        res.graph = graph = knn_graph(
             data.X, k_neighbors=k_neighbors, metric=metric,
             progress_callback=pcallback)
     except InteruptRequested:
@@ -659,7 +656,7 @@ def run_on_data(data, normalize, pca_components, k_neighbors, metric, resolution
 
 
 def run_on_graph(graph, resolution, state):
-    # type: (nx.Graph, float, TaskState) -> Results
+    # type: (sp.csr_matrix, float, TaskState) -> Results
     """
     Run the louvain clustering on `graph`.
     """
@@ -16,7 +16,7 @@ from Orange.data import ContinuousVariable, Domain, Table, StringVariable
 from Orange.data.util import array_equal
 from Orange.distance import Euclidean
 from Orange.misc import DistMatrix
-from Orange.projection.manifold import torgerson, MDS
+from Orange.projection.manifold import torgerson, MDS, SMACOF
 
 from Orange.widgets import gui
 from Orange.widgets.settings import SettingProvider, Setting
@@ -35,36 +35,20 @@ def run_mds(matrix: DistMatrix, max_iter: int, step_size: int, init_type: int,
             embedding: np.ndarray, state: TaskState):
     res = Result(embedding=embedding)
 
-    iterations_done = 0
-    init = embedding
+    if embedding is None and init_type == "PCA":
+        embedding = torgerson(matrix)
+    smacof = SMACOF(matrix, init=embedding)
     state.set_status("Running...")
-    oldstress = np.finfo(float).max
 
     while True:
         loop_start = time.time()
-        step_iter = min(max_iter - iterations_done, step_size)
-        mds = MDS(
-            dissimilarity="precomputed", n_components=2,
-            n_init=1, max_iter=step_iter,
-            init_type=init_type, init_data=init
-        )
-
-        mdsfit = mds(matrix)
-        iterations_done += step_iter
-
-        embedding, stress = mdsfit.embedding_, mdsfit.stress_
-        emb_norm = np.sqrt(np.sum(embedding ** 2, axis=1)).sum()
-        if emb_norm > 0:
-            stress /= emb_norm
+        converged = smacof.run(min(max_iter - smacof.n_iter, step_size))
 
-        res.embedding = embedding
+        res.embedding = smacof.embedding
         state.set_partial_result(res)
-        state.set_progress_value(100 * iterations_done / max_iter)
-        if iterations_done >= max_iter or stress == 0 or \
-                (oldstress - stress) < mds.params["eps"]:
+        state.set_progress_value(100 * smacof.n_iter / max_iter)
+        if converged or smacof.n_iter >= max_iter or smacof.stress == 0:
             return res
-        init = embedding
-        oldstress = stress
         if state.is_interruption_requested():
             return res
         if (wait := 0.1 - (time.time() - loop_start)) > 0:
@@ -63,6 +63,8 @@ class OWPCA(widget.OWWidget):
         self._transformed = None
         self._variance_ratio = None
         self._cumulative = None
+        # fitted models for data with and without normalization
+        self._fitted = {}
         self._init_projector()
 
         # Components Selection
@@ -139,6 +141,7 @@ class OWPCA(widget.OWWidget):
                 return
 
         self._init_projector()
+        self._fitted.clear()
 
         self.data = data
         self.fit()
@@ -158,7 +161,9 @@ class OWPCA(widget.OWWidget):
             self._pca_projector.preprocessors = self._pca_preprocessors
 
         if not isinstance(data, SqlTable):
-            pca = self._pca_projector(data)
+            pca = self._fitted.get(self.normalize)
+            if pca is None:
+                pca = self._fitted[self.normalize] = self._pca_projector(data)
             variance_ratio = pca.explained_variance_ratio_
             cumulative = numpy.cumsum(variance_ratio)
 
@@ -182,6 +182,9 @@ def disconnected_spin(spin):
 
 
 N_ITERATIONS = 200
+# Larger data is trained with the batch algorithm
+BATCH_THRESHOLD = 10000
+N_BATCH_ITERATIONS = 40
 
 
 class OWSOM(OWWidget):
@@ -747,8 +750,12 @@ class OWSOM(OWWidget):
 
             def run(self):
                 try:
-                    self.som.fit(self.data, N_ITERATIONS,
-                                 callback=self.callback)
+                    if self.data.shape[0] > BATCH_THRESHOLD:
+                        self.som.fit_batch(self.data, N_BATCH_ITERATIONS,
+                                           callback=self.callback)
+                    else:
+                        self.som.fit(self.data, N_ITERATIONS,
+                                     callback=self.callback)
                     # Report an exception, but still remove the thread
                 finally:
                     self.done.emit(self.som)
@@ -38,6 +38,7 @@ class Task(namespace):
     affinities = None       # type: Optional[openTSNE.affinity.Affinities]
     tsne_embedding = None   # type: Optional[manifold.TSNEModel]
     iterations_done = 0     # type: int
+    affinity_cache = None   # type: Optional[manifold.AffinityCache]
 
     # These attributes need not be set by the widget
     tsne = None             # type: Optional[manifold.TSNE]
@@ -52,8 +53,9 @@ def pca_preprocessing(data, n_components, normalize):
     return model(data)
 
 
-def prepare_tsne_obj(data, perplexity, multiscale, exaggeration):
-    # type: (Table, float, bool, float) -> manifold.TSNE
+def prepare_tsne_obj(data, perplexity, multiscale, exaggeration,
+                     affinity_cache=None):
+    # type: (Table, float, bool, float, Optional[manifold.AffinityCache]) -> manifold.TSNE
     """Automatically determine the best parameters for the given data set."""
     # Compute perplexity settings for multiscale
     n_samples = data.X.shape[0]
@@ -85,6 +87,7 @@ def prepare_tsne_obj(data, perplexity, multiscale, exaggeration):
         negative_gradient_method=gradient_method,
         theta=0.8,
         random_state=0,
+        affinity_cache=affinity_cache,
     )
 
 
@@ -180,7 +183,8 @@ class TSNERunner:
 
         # Prepare the tsne object and add it to the spec
         task.tsne = prepare_tsne_obj(
-            task.data, task.perplexity, task.multiscale, task.exaggeration
+            task.data, task.perplexity, task.multiscale, task.exaggeration,
+            task.affinity_cache
         )
 
         job_queue = []
@@ -290,6 +294,8 @@ class OWtSNE(OWDataProjectionWidget, ConcurrentWidgetMixin):
         self.affinities = None      # type: Optional[openTSNE.affinity.Affinities]
         self.tsne_embedding = None  # type: Optional[manifold.TSNEModel]
         self.iterations_done = 0    # type: int
+        # nearest neighbours are reused when data or perplexity change back
+        self.affinity_cache = manifold.AffinityCache()
 
     @property
     def effective_data(self):
@@ -510,6 +516,7 @@ class OWtSNE(OWDataProjectionWidget, ConcurrentWidgetMixin):
             affinities=self.affinities,
             tsne_embedding=self.tsne_embedding,
             iterations_done=self.iterations_done,
+            affinity_cache=self.affinity_cache,
         )
         return self.start(TSNERunner.run, task)
 
@@ -622,6 +629,7 @@ class OWtSNE(OWDataProjectionWidget, ConcurrentWidgetMixin):
 
     def onDeleteWidget(self):
         self.clear()
+        self.affinity_cache.clear()
         self.data = None
         self.shutdown()
         super().onDeleteWidget()
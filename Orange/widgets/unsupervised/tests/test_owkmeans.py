@@ -249,7 +249,7 @@ class TestOWKMeans(WidgetTest):
                 raise ValueError("k={} fails".format(k))
             return super().fit(X, Y)
 
-    @patch("Orange.widgets.unsupervised.owkmeans.KMeans", new=KMeansFail)
+    @patch("Orange.clustering.kmeans.KMeans", new=KMeansFail)
     def test_optimization_fails(self):
         widget = self.widget
         widget.auto_commit = True
@@ -295,7 +295,7 @@ class TestOWKMeans(WidgetTest):
         self.assertEqual(widget.selected_row(), 0)
         self.assertIsNotNone(self.get_output(self.widget.Outputs.annotated_data))
 
-    @patch("Orange.widgets.unsupervised.owkmeans.KMeans", new=KMeansFail)
+    @patch("Orange.clustering.kmeans.KMeans", new=KMeansFail)
     def test_run_fails(self):
         self.widget.k = 3
         self.widget.auto_commit = True
@@ -514,13 +514,13 @@ class TestOWKMeans(WidgetTest):
         with patch.object(self.widget, "_compute_clustering",
                           wraps=self.widget._compute_clustering) as compute:
             self.commit_and_wait()
-            self.assertEqual(compute.call_args[1]['init'], "k-means++")
+            self.assertEqual(compute.call_args[1]["sweep"].init, "k-means++")
         self.widget.invalidate()  # reset caches
         self.widget.smart_init = 1
         with patch.object(self.widget, "_compute_clustering",
                           wraps=self.widget._compute_clustering) as compute:
             self.commit_and_wait()
-            self.assertEqual(compute.call_args[1]['init'], "random")
+            self.assertEqual(compute.call_args[1]["sweep"].init, "random")
 
     def test_always_same_cluster(self):
         """The same random state should always return the same clusters"""
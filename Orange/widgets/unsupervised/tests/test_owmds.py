@@ -100,14 +100,16 @@ class TestOWMDS(WidgetTest, ProjectionWidgetTestMixin,
         self.send_signal(self.widget.Inputs.data, data, wait=1000)
         combobox_run_through_all()
 
-    @patch("Orange.projection.MDS.__call__", Mock(side_effect=MemoryError))
+    @patch("Orange.projection.manifold.SMACOF.run",
+           Mock(side_effect=MemoryError))
     def test_out_of_memory(self):
         with patch("sys.excepthook", Mock()) as hook:
             self.send_signal(self.widget.Inputs.data, self.data, wait=1000)
             hook.assert_not_called()
             self.assertTrue(self.widget.Error.out_of_memory.is_shown())
 
-    @patch("Orange.projection.MDS.__call__", Mock(side_effect=ValueError))
+    @patch("Orange.projection.manifold.SMACOF.run",
+           Mock(side_effect=ValueError))
     def test_other_error(self):
         with patch("sys.excepthook", Mock()) as hook:
             self.send_signal(self.widget.Inputs.data, self.data, wait=1000)
@@ -349,7 +351,7 @@ class TestOWMDSRunner(unittest.TestCase):
         cls.data = Table("iris")
         cls.distances = Euclidean(cls.data)
         cls.init = torgerson(cls.distances)
-        cls.args = (cls.distances, 300, 25, 0, cls.init)
+        cls.args = (cls.distances, 300, 5, 0, cls.init)
 
     def test_Result(self):
         result = Result(embedding=self.init)
@@ -359,16 +361,21 @@ class TestOWMDSRunner(unittest.TestCase):
         state = Mock()
         state.is_interruption_requested.return_value = False
         result = run_mds(*(self.args + (state,)))
-        array = np.array([[-2.69280967, 0.32544313],
-                          [-2.72409383, -0.21287617],
-                          [-2.9022707, -0.13465859],
-                          [-2.75267253, -0.33899134],
-                          [-2.74108069, 0.35393209]])
+        array = np.array([[-2.6928912, 0.32603512],
+                          [-2.72432089, -0.21129957],
+                          [-2.90231621, -0.13535431],
+                          [-2.75269913, -0.33885988],
+                          [-2.74126561, 0.35366682]])
         np.testing.assert_almost_equal(array, result.embedding[:5])
         state.set_status.assert_called_once_with("Running...")
         self.assertGreater(state.set_partial_result.call_count, 2)
         self.assertGreater(state.set_progress_value.call_count, 2)
 
+        # optimization continues between steps instead of restarting
+        args = (self.distances, 300, 300, 0, self.init)
+        result = run_mds(*(args + (state,)))
+        np.testing.assert_almost_equal(array, result.embedding[:5])
+
     def test_run_do_not_modify_model_inplace(self):
         state = Mock()
         state.is_interruption_requested.return_value = True
@@ -248,6 +248,23 @@ class TestOWPCA(WidgetTest):
         invalidate.assert_not_called()
         self.assertEqual(widget.ncomponents, 0)
 
+    def test_fitted_models_are_reused(self):
+        widget = self.widget
+        widget.controls.normalize.setChecked(True)
+        self.send_signal(widget.Inputs.data, self.iris)
+        normalized = widget._pca
+        widget.controls.normalize.setChecked(False)
+        self.assertIsNot(widget._pca, normalized)
+        with patch.object(widget._pca_projector, "fit") as fit:
+            widget.controls.normalize.setChecked(True)
+            self.assertIs(widget._pca, normalized)
+            widget.controls.normalize.setChecked(False)
+            fit.assert_not_called()
+
+        self.send_signal(widget.Inputs.data, self.iris[::2])
+        self.assertIsNot(widget._pca, normalized)
+        self.assertEqual(widget._fitted, {False: widget._pca})
+
     def test_output_data(self):
         widget = self.widget
         widget.ncomponents = 2
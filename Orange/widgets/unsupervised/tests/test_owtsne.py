@@ -297,6 +297,18 @@ class TestOWtSNE(WidgetTest, ProjectionWidgetTestMixin, WidgetOutputsTestMixin):
             "The information message was not cleared on no data"
         )
 
+    def test_affinities_reused(self):
+        w = self.widget
+        w.controls.multiscale.setChecked(False)
+        self.send_signal(w.Inputs.data, self.data)
+        self.wait_until_finished()
+        affinities = w.affinities
+
+        # the same data again, e.g. from an upstream widget that recomputed it
+        self.send_signal(w.Inputs.data, self.data.copy())
+        self.wait_until_finished()
+        self.assertIs(w.affinities, affinities)
+
     def test_invalidation_flow(self):
         # pylint: disable=protected-access
         w = self.widget
@@ -3,10 +3,9 @@ import enum
 from xml.sax.saxutils import escape
 from types import SimpleNamespace as namespace
 
-from typing import Optional, Union, Tuple, cast
+from typing import Optional, Union, Tuple, Callable, cast
 
 import numpy as np
-import sklearn.metrics
 
 from AnyQt.QtWidgets import (
     QGraphicsWidget, QGraphicsGridLayout,
@@ -27,6 +26,7 @@ from Orange.data.util import get_unique_names
 import Orange.distance
 import Orange.misc
 from Orange.data import Table, Domain
+from Orange.evaluation.clustering import silhouette_samples
 from Orange.misc import DistMatrix
 
 from Orange.widgets import widget, gui, settings
@@ -43,6 +43,11 @@ from Orange.widgets.visualize.utils.plotutils import AxisItem
 from Orange.widgets.widget import Msg, Input, Output
 
 
+#: Distance matrices for data with more instances are not stored; distances
+#: are recomputed in blocks of rows whenever silhouettes are computed
+MAX_STORED_DISTANCES = 5000
+
+
 class InputValidationError(ValueError):
     message: str
 
@@ -123,8 +128,9 @@ class OWSilhouettePlot(widget.OWWidget):
         #: The input distance matrix (if present)
         self.distances = None  # type: Optional[Orange.misc.DistMatrix]
         #: The effective distance matrix (is self.distances or computed from
-        #: self.data depending on input)
-        self._matrix = None      # type: Optional[Orange.misc.DistMatrix]
+        #: self.data depending on input), or, for large data, a function
+        #: that computes distances between the given rows and all instances
+        self._matrix = None  # type: Union[DistMatrix, Callable, None]
         #: An bool mask (size == len(data)) indicating missing group/cluster
         #: assignments
         self._mask = None        # type: Optional[np.ndarray]
@@ -330,7 +336,10 @@ class OWSilhouettePlot(widget.OWWidget):
                     self.Warning.ignoring_categorical()
                     data = Orange.distance.remove_discrete_features(data)
                 try:
-                    self._matrix = np.asarray(metric(data))
+                    if len(data) > MAX_STORED_DISTANCES:
+                        self._matrix = _row_distances(metric, data)
+                    else:
+                        self._matrix = np.asarray(metric(data))
                 except MemoryError:
                     self.Error.memory_error()
                     return
@@ -354,10 +363,20 @@ class OWSilhouettePlot(widget.OWWidget):
         labels = self.data.get_column(self.cluster_var)
         labels = np.asarray(labels, dtype=float)
         cluster_mask = np.isnan(labels)
-        dist_mask = np.isnan(self._matrix).all(axis=0)
+        try:
+            silhouette = silhouette_samples(self._matrix, labels, n_jobs=-1)
+        except MemoryError:
+            self.Error.memory_error()
+            return
+        except ValueError as err:
+            self.Error.value_error(str(err))
+            return
+        # silhouettes are undefined for instances with undefined distances
+        # and, if there is a single cluster, for all instances
+        dist_mask = np.isnan(silhouette) & ~cluster_mask
         mask = cluster_mask | dist_mask
-        labels = labels.astype(int)
-        labels = labels[~mask]
+        labels = labels[~mask].astype(int)
+        silhouette = silhouette[~mask]
 
         labels_unq = np.unique(labels)
 
@@ -367,9 +386,6 @@ class OWSilhouettePlot(widget.OWWidget):
         elif len(labels_unq) == len(labels):
             self.Error.singleton_clusters_all()
             labels = silhouette = mask = None
-        else:
-            silhouette = sklearn.metrics.silhouette_samples(
-                self._matrix[~mask, :][:, ~mask], labels, metric="precomputed")
         self._mask = mask
         self._labels = labels
         self._silhouette = silhouette
@@ -1308,5 +1324,17 @@ class BarPlotItem(QGraphicsWidget):
                                 v - base, h).normalized())
 
 
+def _row_distances(metric, data):
+    """
+    Return a function that computes distances between the given rows of
+    data and all its rows.
+    """
+    if data.is_sparse():
+        # fallbacks for sparse data are not fitted to data
+        return lambda rows: metric(data[rows], data)
+    model = metric().fit(data)
+    return lambda rows: model(data[rows], data)
+
+
 if __name__ == "__main__":  # pragma: no cover
     WidgetPreview(OWSilhouettePlot).run(Orange.data.Table("brown-selected"))
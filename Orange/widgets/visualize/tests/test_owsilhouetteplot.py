@@ -3,7 +3,7 @@
 # pylint: disable=missing-docstring
 import random
 import unittest
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import numpy as np
 
@@ -110,6 +110,21 @@ class TestOWSilhouettePlot(WidgetTest, WidgetOutputsTestMixin):
         self.assertTrue(np.all(np.isnan(scores[::3])))
         self.assertTrue(np.all(np.isfinite(scores[valid])))
 
+    def test_large_data_distances_not_stored(self):
+        data = self.data
+        self.widget.distance_idx = 1
+        self.send_signal(self.widget.Inputs.data, data)
+        output = self.get_output(ANNOTATED_DATA_SIGNAL_NAME)
+        expected = output[:, self.scorename].metas.flatten()
+
+        with patch("Orange.widgets.visualize.owsilhouetteplot."
+                   "MAX_STORED_DISTANCES", 100):
+            self.widget._invalidate_distances()
+        self.assertTrue(callable(self.widget._matrix))
+        output = self.get_output(ANNOTATED_DATA_SIGNAL_NAME)
+        np.testing.assert_almost_equal(
+            output[:, self.scorename].metas.flatten(), expected)
+
     def test_ignore_categorical(self):
         data = Table('heart_disease')
         self.widget.distance_idx = 2